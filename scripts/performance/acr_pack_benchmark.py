@@ -0,0 +1,112 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Benchmark for packing the `az acr build` context on a synthetic source tree.
+
+Generates a tree with many small files, a large ignored dependency folder and a .dockerignore, then compares
+the sequential packer (per-rule regex matching, single-threaded gzip, no pruning) with the current packer.
+
+    python scripts/performance/acr_pack_benchmark.py --files 100000
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+
+from azure.cli.command_modules.acr._archive_utils import (
+    _archive_file_recursively, _load_dockerignore_file, _pack_source_code)
+
+DOCKERIGNORE = """# generated by acr_pack_benchmark.py
+node_modules
+**/*.log
+build/
+!build/keep.txt
+"""
+
+
+class _NullSink(object):
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+
+def generate_tree(root, files, files_per_dir=100):
+    with open(os.path.join(root, '.dockerignore'), 'w') as f:
+        f.write(DOCKERIGNORE)
+    with open(os.path.join(root, 'Dockerfile'), 'w') as f:
+        f.write('FROM scratch\n')
+    content = b'x = 1\n' * 200
+    # 80% of the files are source files, the rest sit in directories excluded by .dockerignore
+    for index in range(files):
+        if index % 5 == 0:
+            directory = os.path.join(root, 'node_modules', 'pkg{}'.format(index // files_per_dir))
+        else:
+            directory = os.path.join(root, 'src', 'module{}'.format(index // files_per_dir))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        name = 'file{}.log'.format(index) if index % 50 == 1 else 'file{}.py'.format(index)
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(content)
+
+
+def pack_sequential(source_location, output):
+    """The packer as it was: every rule is re-matched per path and the tree is walked in full."""
+    ignore_list, ignore_list_size = _load_dockerignore_file(source_location)
+
+    def _ignore_check(tarinfo, parent_ignored, parent_matching_rule_index):
+        for index, item in enumerate(ignore_list):
+            if index >= parent_matching_rule_index:
+                break
+            if re.match(item.pattern, tarinfo.name):
+                return item.ignore, index
+        return parent_ignored, parent_matching_rule_index
+
+    with tarfile.open(fileobj=output, mode='w|gz') as tar:
+        _archive_file_recursively(tar, source_location, arcname='', parent_ignored=False,
+                                  parent_matching_rule_index=ignore_list_size, ignore_check=_ignore_check)
+
+
+def _time(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=100000, help='number of files in the synthetic tree')
+    parser.add_argument('--keep', action='store_true', help='keep the generated tree')
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix='acr_pack_benchmark_')
+    try:
+        print('Generating {} files under {} ...'.format(args.files, root))
+        generate_tree(root, args.files)
+
+        sequential_sink = _NullSink()
+        sequential = _time(pack_sequential, root, sequential_sink)
+        print('Sequential packer: {:.2f}s ({:.1f} MiB)'.format(sequential, sequential_sink.size / 1048576.0))
+
+        parallel_sink = _NullSink()
+        parallel = _time(_pack_source_code, root, parallel_sink, os.path.join(root, 'Dockerfile'), 'Dockerfile.acr')
+        print('Parallel packer:   {:.2f}s ({:.1f} MiB)'.format(parallel, parallel_sink.size / 1048576.0))
+        print('Speed-up:          {:.1f}x'.format(sequential / parallel if parallel else float('inf')))
+    finally:
+        if not args.keep:
+            shutil.rmtree(root)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Offline benchmark suite for the CLI.
+
+Runs the commands in benchmark_catalogue.json through the real invoker, each in its own process, and replays their
+HTTP traffic from the scenario test recordings so no network is used. Every case is measured cold (a fresh
+configuration directory) and warm (a second run reusing it). The startup profiler (`az --profile-startup`) breaks
+each run down into import, command table, argument registration, parser build, parsing, execution, todict, query
+and output time.
+
+    python scripts/performance/benchmark.py run --samples 10 --output baseline.json
+    python scripts/performance/benchmark.py run --samples 10 --output current.json
+    python scripts/performance/benchmark.py compare baseline.json current.json
+
+`compare` reports the metrics whose difference is statistically significant (one-sided Mann-Whitney U test) and
+exits with 1 if any of them regressed.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import math
+import os
+import platform
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from collections import OrderedDict
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CATALOGUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_catalogue.json')
+
+MODES = ['cold', 'warm']
+TOTAL_METRIC = 'total'
+REPLAY_SETUP_PHASE = 'replay setup'
+# phases which contain the replay setup, which is not part of the command
+REPLAY_SETUP_PARENTS = ['invoke']
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def load_catalogue(pattern=None):
+    with open(CATALOGUE_FILE) as f:
+        cases = json.load(f)
+    if pattern:
+        cases = [c for c in cases if re.search(pattern, c['name'])]
+    return cases
+
+
+# Replay, run in the benchmark process of each sample
+
+def _start_replay(recording_file):
+    """Serve HTTP requests from a scenario test recording, with the same patches as a test in playback. Requests
+    which are not in the recording fail rather than reach the network."""
+    from azure.cli.testsdk import ScenarioTest
+
+    class _Replay(ScenarioTest):
+
+        def __init__(self):
+            super(_Replay, self).__init__('runTest')
+            self.recording_file = recording_file
+            self.in_recording = self.is_live = False
+            self.vcr.record_mode = 'none'
+
+        def runTest(self):
+            pass
+
+    replay = _Replay()
+    replay.setUp()
+    return replay
+
+
+def replay_case(name, trace_file):
+    startup_time = timeit.default_timer()
+    startup_module_count = len(sys.modules)
+
+    from azure.cli.core import get_default_cli
+    from azure.cli.core._startup_profiler import start_startup_profiler, stop_startup_profiler, startup_phase
+    from knack.events import EVENT_INVOKER_POST_PARSE_ARGS
+
+    case = next(c for c in load_catalogue() if c['name'] == name)
+    profiler = start_startup_profiler(origin=startup_time)
+    profiler.add_span('import azure.cli.core', startup_time, len(sys.modules) - startup_module_count)
+
+    with startup_phase('create CLI'):
+        az_cli = get_default_cli()
+
+    recording_file = os.path.join(REPO_ROOT, case['recording']) if case.get('recording') else \
+        os.path.join(az_cli.config.config_dir, 'no_recording.yaml')
+
+    def _replay_handler(_, **kwargs):  # pylint: disable=unused-argument
+        with startup_phase(REPLAY_SETUP_PHASE):
+            _replay_handler.replay = _start_replay(recording_file)
+
+    az_cli.register_event(EVENT_INVOKER_POST_PARSE_ARGS, _replay_handler)
+    try:
+        with open(os.devnull, 'w') as devnull:
+            with startup_phase('invoke'):
+                exit_code = az_cli.invoke(shlex.split(case['command']), out_file=devnull)
+    finally:
+        stop_startup_profiler().save(trace_file)
+        replay = getattr(_replay_handler, 'replay', None)
+        if replay:
+            replay.doCleanups()
+    return exit_code
+
+
+# Measurement
+
+def _get_phase_times(trace_file):
+    with open(trace_file) as f:
+        events = json.load(f)['traceEvents']
+    phases = {}
+    for event in events:
+        if event.get('cat') == 'phase':
+            phases[event['name']] = phases.get(event['name'], 0) + event['dur'] / 1e6
+    return phases
+
+
+def run_sample(case, config_dir):
+    """Run a case in a new process. Return the total time and the time of each phase in seconds."""
+    trace_file = os.path.join(config_dir, 'trace.json')
+    env = dict(os.environ)
+    env.pop('AZURE_TEST_RUN_LIVE', None)
+    env.update({
+        'AZURE_CONFIG_DIR': config_dir,
+        'AZURE_EXTENSION_DIR': os.path.join(config_dir, 'cliextensions'),
+        'AZURE_CORE_COLLECT_TELEMETRY': 'false'
+    })
+    start = timeit.default_timer()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), 'replay', case['name'], trace_file],
+                               env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, stderr = process.communicate()
+    total = timeit.default_timer() - start
+    if process.returncode or not os.path.isfile(trace_file):
+        raise BenchmarkError("'az {}' failed with exit code {}:\n{}".format(
+            case['command'], process.returncode, stderr.decode('utf-8', 'replace')))
+
+    metrics = _get_phase_times(trace_file)
+    os.remove(trace_file)
+    replay_setup = metrics.pop(REPLAY_SETUP_PHASE, 0)
+    for parent in REPLAY_SETUP_PARENTS:
+        if parent in metrics:
+            metrics[parent] -= replay_setup
+    metrics[TOTAL_METRIC] = total - replay_setup
+    return metrics
+
+
+def run_case(case, samples):
+    results = {mode: {} for mode in MODES}
+    for _ in range(samples):
+        config_dir = tempfile.mkdtemp(prefix='az_benchmark_')
+        try:
+            for mode in MODES:
+                for metric, value in run_sample(case, config_dir).items():
+                    results[mode].setdefault(metric, []).append(value)
+        finally:
+            shutil.rmtree(config_dir)
+    return results
+
+
+def _get_git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    from azure.cli.core import __version__ as core_version
+
+    results = OrderedDict([
+        ('metadata', {
+            'commit': _get_git_commit(),
+            'core_version': core_version,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'samples': args.samples
+        }),
+        ('cases', OrderedDict())
+    ])
+    failures = 0
+    for case in load_catalogue(args.cases):
+        print('{:<32} '.format(case['name']), end='')
+        sys.stdout.flush()
+        try:
+            measurements = run_case(case, args.samples)
+        except BenchmarkError as ex:
+            failures += 1
+            print('FAILED')
+            print(ex, file=sys.stderr)
+            continue
+        results['cases'][case['name']] = {'command': case['command'], 'measurements': measurements}
+        print('  '.join('{} {:.3f}s'.format(mode, _median(measurements[mode][TOTAL_METRIC])) for mode in MODES))
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print('Results written to {}'.format(args.output))
+    return 1 if failures else 0
+
+
+# Comparison
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+
+def mann_whitney_p(baseline, current):
+    """One-sided p-value of the Mann-Whitney U test that `current` tends to be larger than `baseline`, using the
+    normal approximation with tie correction."""
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    values = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(values)
+    ties = 0.0
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2.0 + 1
+        ties += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    n = n1 + n2
+    u = sum(r for r, (_, group) in zip(ranks, values) if group == 0) - n1 * (n1 + 1) / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_results(baseline, current, alpha, threshold, min_delta):
+    """Return (case, mode, metric, baseline median, current median, p-value, verdict) for every metric measured in
+    both runs. A metric is a regression or an improvement if the change is significant at `alpha`, exceeds the
+    relative `threshold` and is at least `min_delta` seconds."""
+    rows = []
+    for name, case in current['cases'].items():
+        if name not in baseline['cases']:
+            continue
+        for mode in MODES:
+            base_metrics = baseline['cases'][name]['measurements'][mode]
+            for metric, values in sorted(case['measurements'][mode].items()):
+                if metric not in base_metrics:
+                    continue
+                base_values = base_metrics[metric]
+                base_median, median = _median(base_values), _median(values)
+                delta = median - base_median
+                significant = abs(delta) >= min_delta and abs(delta) > threshold * base_median
+                verdict = ''
+                if significant and delta > 0 and mann_whitney_p(base_values, values) < alpha:
+                    verdict = 'regression'
+                elif significant and delta < 0 and mann_whitney_p(values, base_values) < alpha:
+                    verdict = 'improvement'
+                p_value = mann_whitney_p(base_values, values) if delta >= 0 else mann_whitney_p(values, base_values)
+                rows.append((name, mode, metric, base_median, median, p_value, verdict))
+    return rows
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, args.alpha, args.threshold, args.min_delta)
+    if not args.all:
+        rows = [r for r in rows if r[-1]]
+    print('{:<28} {:<5} {:<30} {:>10} {:>10} {:>8} {:>8}  {}'.format(
+        'Case', 'Mode', 'Metric', 'Baseline', 'Current', 'Change', 'p', ''))
+    for name, mode, metric, base_median, median, p_value, verdict in rows:
+        change = (median - base_median) / base_median * 100 if base_median else float('inf')
+        print('{:<28} {:<5} {:<30} {:>9.4f}s {:>9.4f}s {:>+7.1f}% {:>8.3f}  {}'.format(
+            name, mode, metric, base_median, median, change, p_value, verdict))
+    regressions = [r for r in rows if r[-1] == 'regression']
+    print('{} significant regression(s).'.format(len(regressions)))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='action')
+
+    run_parser = subparsers.add_parser('run', help='measure the catalogue and write the results as JSON')
+    run_parser.add_argument('--samples', type=int, default=10, help='cold and warm runs of each case')
+    run_parser.add_argument('--cases', help='regular expression selecting cases by name')
+    run_parser.add_argument('--output', default='benchmark.json', help='results file')
+
+    compare_parser = subparsers.add_parser('compare', help='report significant changes between two results files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--alpha', type=float, default=0.05, help='significance level')
+    compare_parser.add_argument('--threshold', type=float, default=0.05,
+                                help='smallest relative change reported, e.g. 0.05 for 5%%')
+    compare_parser.add_argument('--min-delta', type=float, default=0.002,
+                                help='smallest absolute change reported, in seconds')
+    compare_parser.add_argument('--all', action='store_true', help='show unchanged metrics too')
+
+    replay_parser = subparsers.add_parser('replay', help=argparse.SUPPRESS)
+    replay_parser.add_argument('case')
+    replay_parser.add_argument('trace_file')
+
+    args = parser.parse_args(argv)
+    if args.action == 'run':
+        return run(args)
+    if args.action == 'compare':
+        return compare(args)
+    if args.action == 'replay':
+        return replay_case(args.case, args.trace_file)
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Benchmark for the conversion of command results to dictionaries.
+
+Deserializes the SDK models of the todict parity corpus, which is built from the responses of the scenario test
+recordings, replicates them to the requested number of items and compares knack.util.todict with
+azure.cli.core.util.todict, the converter used by the invoker.
+
+    python scripts/performance/todict_benchmark.py run --items 50000
+    python scripts/performance/todict_benchmark.py corpus
+"""
+
+from __future__ import print_function
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CORPUS_FILE = os.path.join(ROOT, 'src', 'azure-cli-core', 'azure', 'cli', 'core', 'tests', 'data',
+                           'todict_corpus.json')
+RECORDINGS = os.path.join(ROOT, 'src', 'command_modules', 'azure-cli-resource', 'azure', 'cli', 'command_modules',
+                          'resource', 'tests', 'latest', 'recordings', '*.yaml')
+
+# (request, model of the response or of its items, the response is a list)
+RESPONSE_MODELS = [
+    (r'GET .*/resources\?', 'GenericResource', True),
+    (r'GET .*/resourcegroups\?', 'ResourceGroup', True),
+    (r'GET .*/resourcegroups/[^/?]+\?', 'ResourceGroup', False),
+    (r'GET .*/deployments/[^/?]+/operations\?', 'DeploymentOperation', True),
+    (r'GET .*/deployments/[^/?]+\?', 'DeploymentExtended', False),
+    (r'GET .*/locks\?', 'ManagementLockObject', True),
+]
+MAX_ITEMS_PER_MODEL = 8
+# bytes
+MAX_ITEM_SIZE = 8192
+
+
+def build_corpus(recordings=RECORDINGS):
+    """Returns [{'model': name, 'body': item}] from the responses of the recordings."""
+    import yaml
+
+    corpus, counts = [], {}
+    for path in sorted(glob.glob(recordings)):
+        with open(path) as f:
+            interactions = yaml.safe_load(f).get('interactions', [])
+        for interaction in interactions:
+            if interaction['response']['status']['code'] != 200:
+                continue
+            request = '{} {}'.format(interaction['request']['method'], interaction['request']['uri'])
+            for pattern, model, is_list in RESPONSE_MODELS:
+                if re.match(pattern, request, re.IGNORECASE):
+                    body = json.loads(interaction['response']['body']['string'])
+                    for item in body.get('value', []) if is_list else [body]:
+                        if counts.get(model, 0) < MAX_ITEMS_PER_MODEL and len(json.dumps(item)) <= MAX_ITEM_SIZE:
+                            counts[model] = counts.get(model, 0) + 1
+                            corpus.append({'model': model, 'body': item})
+                    break
+    return corpus
+
+
+def load_models(corpus_file=CORPUS_FILE):
+    """Returns the SDK models deserialized from the corpus."""
+    from msrest import Deserializer
+    from azure.mgmt.resource.locks import models as lock_models
+    from azure.mgmt.resource.resources import models as resource_models
+
+    classes = {k: v for module in [resource_models, lock_models] for k, v in vars(module).items()
+               if isinstance(v, type)}
+    deserialize = Deserializer(classes)
+    with open(corpus_file) as f:
+        return [deserialize(entry['model'], entry['body']) for entry in json.load(f)]
+
+
+def _time(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+
+def run(args):
+    from knack.util import todict as knack_todict
+    from azure.cli.core.commands import AzCliCommandInvoker
+    from azure.cli.core.util import todict
+
+    models = load_models()
+    result = [models[i % len(models)] for i in range(args.items)]
+    post_processor = AzCliCommandInvoker.remove_additional_prop_layer
+    if knack_todict(result, post_processor) != todict(result, post_processor):
+        print('The conversions differ.', file=sys.stderr)
+        return 1
+
+    knack = min(_time(knack_todict, result, post_processor) for _ in range(args.samples))
+    print('knack.util.todict:        {:.3f}s'.format(knack))
+    current = min(_time(todict, result, post_processor) for _ in range(args.samples))
+    print('azure.cli.core.util.todict: {:.3f}s'.format(current))
+    print('Speed-up:                 {:.1f}x'.format(knack / current if current else float('inf')))
+    return 0
+
+
+def corpus(args):  # pylint: disable=unused-argument
+    entries = build_corpus()
+    with open(CORPUS_FILE, 'w') as f:
+        json.dump(entries, f, indent=1, sort_keys=True)
+        f.write('\n')
+    print('Wrote {} items to {}'.format(len(entries), CORPUS_FILE))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command')
+    run_parser = subparsers.add_parser('run', help='compare the converters')
+    run_parser.add_argument('--items', type=int, default=50000, help='number of items in the result')
+    run_parser.add_argument('--samples', type=int, default=3, help='number of runs, the fastest is reported')
+    run_parser.set_defaults(func=run)
+    corpus_parser = subparsers.add_parser('corpus', help='rebuild the corpus from the recordings')
+    corpus_parser.set_defaults(func=corpus)
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Loopback benchmark for the `az webapp create-remote-connection` tunnel.
+
+Runs the TunnelServer against a local fake websocket endpoint which echoes every binary frame back,
+then measures the throughput through the tunnel and the number of concurrent connections it can hold.
+
+    python scripts/performance/tunnel_benchmark.py --clients 8 --megabytes 64 --max-connections 500
+"""
+
+from __future__ import print_function
+
+import argparse
+import base64
+import hashlib
+import socket
+import struct
+import sys
+import threading
+import time
+
+from azure.cli.command_modules.appservice.tunnel import TunnelServer, WebSocketFrameDecoder
+
+WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class FakeTunnelEndpoint(object):
+    """Minimal websocket server standing in for Kudu's /AppServiceTunnel/Tunnel.ashx, echoing data frames."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(1024)
+        self.port = self.sock.getsockname()[1]
+
+    def serve_forever(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except socket.error:
+                return
+            t = threading.Thread(target=self._serve, args=(conn,))
+            t.daemon = True
+            t.start()
+
+    def _serve(self, conn):
+        try:
+            self._handshake(conn)
+            decoder = WebSocketFrameDecoder()
+            while True:
+                data = conn.recv(256 * 1024)
+                if not data:
+                    break
+                for opcode, payload in decoder.feed(data):
+                    if opcode == 0x8:
+                        return
+                    conn.sendall(_server_frame(payload))
+        except socket.error:
+            pass
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _handshake(conn):
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                raise socket.error('connection closed during handshake')
+            request += chunk
+        key = [line.split(b':', 1)[1].strip() for line in request.split(b'\r\n')
+               if line.lower().startswith(b'sec-websocket-key:')][0]
+        accept = base64.b64encode(hashlib.sha1(key + WS_GUID).digest())
+        conn.sendall(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                     b'Sec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+
+
+def _server_frame(payload):
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x82, length)
+    elif length < (1 << 16):
+        header = struct.pack('!BBH', 0x82, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x82, 127, length)
+    return header + payload
+
+
+def _start_daemon(target):
+    t = threading.Thread(target=target)
+    t.daemon = True
+    t.start()
+    return t
+
+
+def _receive_all(sock, total_bytes, results):
+    received = 0
+    while received < total_bytes:
+        data = sock.recv(256 * 1024)
+        if not data:
+            break
+        received += len(data)
+    results.append(received)
+
+
+def _echo_client(port, total_bytes, chunk_size, results):
+    payload = b'x' * chunk_size
+    sock = socket.create_connection(('127.0.0.1', port))
+    try:
+        receiver = _start_daemon(lambda: _receive_all(sock, total_bytes, results))
+        sent = 0
+        while sent < total_bytes:
+            size = min(chunk_size, total_bytes - sent)
+            sock.sendall(payload[:size])
+            sent += size
+        receiver.join()
+    finally:
+        sock.close()
+
+
+def measure_throughput(port, clients, megabytes, chunk_size):
+    per_client = megabytes * 1024 * 1024 // clients
+    results = []
+    start = time.time()
+    threads = [_start_daemon(lambda: _echo_client(port, per_client, chunk_size, results)) for _ in range(clients)]
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+    # every byte travels through the tunnel twice, client -> endpoint and back
+    transferred = 2 * sum(results)
+    return transferred / (1024.0 * 1024.0) / elapsed, elapsed
+
+
+def measure_max_connections(port, limit, timeout=5):
+    sockets = []
+    try:
+        for _ in range(limit):
+            try:
+                sock = socket.create_connection(('127.0.0.1', port), timeout=timeout)
+                sock.sendall(b'ping')
+                if sock.recv(4) != b'ping':
+                    break
+            except (socket.error, socket.timeout):
+                break
+            sockets.append(sock)
+        return len(sockets)
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8, help='parallel connections for the throughput test')
+    parser.add_argument('--megabytes', type=int, default=64, help='total payload sent through the tunnel')
+    parser.add_argument('--chunk-size', type=int, default=64 * 1024, help='size of each client write')
+    parser.add_argument('--buffer-size', type=int, default=None, help='tunnel socket read size')
+    parser.add_argument('--max-pending', type=int, default=None, help='tunnel backpressure threshold')
+    parser.add_argument('--max-connections', type=int, default=500,
+                        help='upper bound for the concurrent connection test')
+    args = parser.parse_args(argv)
+
+    endpoint = FakeTunnelEndpoint()
+    _start_daemon(endpoint.serve_forever)
+
+    kwargs = {}
+    if args.buffer_size:
+        kwargs['buffer_size'] = args.buffer_size
+    if args.max_pending:
+        kwargs['max_pending'] = args.max_pending
+    server = TunnelServer('127.0.0.1', 0, 'http://127.0.0.1:{}'.format(endpoint.port), 'user', 'password',
+                          **kwargs)
+    _start_daemon(server.start_server)
+
+    throughput, elapsed = measure_throughput(server.get_port(), args.clients, args.megabytes, args.chunk_size)
+    print('Throughput: {:.1f} MB/s ({} clients, {} MB echoed in {:.2f}s)'.format(
+        throughput, args.clients, args.megabytes, elapsed))
+    connections = measure_max_connections(server.get_port(), args.max_connections)
+    print('Concurrent connections: {} (limit {})'.format(connections, args.max_connections))
+    server.stop_server()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -38,7 +38,9 @@ class AzCli(CLI):
             register_ids_argument, register_global_subscription_argument)
         from azure.cli.core.cloud import get_active_cloud
         from azure.cli.core.commands.transform import register_global_transforms
+        from azure.cli.core.commands.perf_report import register_perf_report_argument
         from azure.cli.core._session import ACCOUNT, CONFIG, SESSION
+        from azure.cli.core._startup_profiler import startup_phase
 
         from knack.util import ensure_dir
 
@@ -47,19 +49,25 @@ class AzCli(CLI):
         self.data['command_extension_name'] = None
         self.data['completer_active'] = ARGCOMPLETE_ENV_NAME in os.environ
         self.data['query_active'] = False
+        self.data['perf_report'] = None
+        self.data['help_store_enabled'] = self.config.getboolean('core', 'use_help_store', fallback=True)
+        self.data['completion_index_enabled'] = self.config.getboolean('core', 'use_completion_index', fallback=True)
+        self.data['query_cache_enabled'] = self.config.getboolean('core', 'use_query_cache', fallback=False)
 
         azure_folder = self.config.config_dir
         ensure_dir(azure_folder)
-        ACCOUNT.load(os.path.join(azure_folder, 'azureProfile.json'))
-        CONFIG.load(os.path.join(azure_folder, 'az.json'))
-        SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
-        self.cloud = get_active_cloud(self)
+        with startup_phase('session load'):
+            ACCOUNT.load(os.path.join(azure_folder, 'azureProfile.json'))
+            CONFIG.load(os.path.join(azure_folder, 'az.json'))
+            SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
+            self.cloud = get_active_cloud(self)
         logger.debug('Current cloud config:\n%s', str(self.cloud.name))
 
         register_global_transforms(self)
         register_global_subscription_argument(self)
         register_ids_argument(self)  # global subscription must be registered first!
         register_cache_arguments(self)
+        register_perf_report_argument(self)
 
         self.progress_controller = None
 
@@ -88,12 +96,21 @@ class AzCli(CLI):
         ver_string, updates_available = get_az_version_string()
         print(ver_string)
         if updates_available == -1:
-            logger.warning('Unable to check if your CLI is up-to-date. Check your internet connection.')
+            logger.warning('Unable to check if your CLI is up-to-date. The latest versions are retrieved in the '
+                           'background; if this persists, check your internet connection.')
         elif updates_available:
             logger.warning('You have %i updates available. Consider updating your CLI installation.', updates_available)
         else:
             print('Your CLI is up-to-date.')
 
+    def invoke(self, args, initial_invocation_data=None, out_file=None):
+        from azure.cli.core._session import flush_sessions
+        try:
+            return super(AzCli, self).invoke(args, initial_invocation_data=initial_invocation_data, out_file=out_file)
+        finally:
+            # the profile, config and session files are written once per command
+            flush_sessions()
+
     def exception_handler(self, ex):  # pylint: disable=no-self-use
         from azure.cli.core.util import handle_exception
         return handle_exception(ex)
@@ -121,7 +138,8 @@ class MainCommandsLoader(CLICommandsLoader):
         from azure.cli.core.commands import (
             _load_module_command_loader, _load_extension_command_loader, BLACKLISTED_MODS, ExtensionCommandSource)
         from azure.cli.core.extension import (
-            get_extensions, get_extension_path, get_extension_modname)
+            get_extensions, get_extension_path, get_extension_modname, set_extension_commands)
+        from azure.cli.core._startup_profiler import startup_phase
 
         def _update_command_table_from_modules(args):
             '''Loads command table(s)
@@ -142,7 +160,8 @@ class MainCommandsLoader(CLICommandsLoader):
             for mod in [m for m in installed_command_modules if m not in BLACKLISTED_MODS]:
                 try:
                     start_time = timeit.default_timer()
-                    module_command_table, module_group_table = _load_module_command_loader(self, args, mod)
+                    with startup_phase("command module '{}'".format(mod)):
+                        module_command_table, module_group_table = _load_module_command_loader(self, args, mod)
                     for cmd in module_command_table.values():
                         cmd.command_source = mod
                     self.command_table.update(module_command_table)
@@ -177,18 +196,33 @@ class MainCommandsLoader(CLICommandsLoader):
                         filtered_extensions.append(ext)
                 return filtered_extensions
 
-            extensions = get_extensions()
+            with startup_phase('extension discovery'):
+                extensions = get_extensions()
             if extensions:
                 logger.debug("Found %s extensions: %s", len(extensions), [e.name for e in extensions])
                 allowed_extensions = _handle_extension_suppressions(extensions)
                 module_commands = set(self.command_table.keys())
+                # Extensions known not to contribute to the command group being run are not loaded. All are loaded
+                # when the command word is unknown, so that the parser can suggest the closest commands. Extensions
+                # without commands of their own may extend any command, so they are always loaded.
+                command_word = args[0] if args and not args[0].startswith('-') else None
+                known_words = set(name.split()[0] for name in module_commands if name)
                 for ext in allowed_extensions:
-                    try:
-                        check_version_compatibility(ext.get_metadata())
-                    except CLIError as ex:
-                        # issue warning and skip loading extensions that aren't compatible with the CLI core
-                        logger.warning(ex)
+                    known_words.update(ext.commands or [])
+                if command_word not in known_words or \
+                        not self.cli_ctx.config.getboolean('extension', 'skip_unrelated', fallback=True):
+                    command_word = None
+                for ext in allowed_extensions:
+                    if command_word and ext.ext_type != 'dev' and ext.commands and command_word not in ext.commands:
+                        logger.debug("Skipped extension '%s' as it has no '%s' commands.", ext.name, command_word)
                         continue
+                    if not ext.compatible:
+                        try:
+                            check_version_compatibility(ext.metadata)
+                        except CLIError as ex:
+                            # issue warning and skip loading extensions that aren't compatible with the CLI core
+                            logger.warning(ex)
+                            continue
                     ext_name = ext.name
                     ext_dir = ext.path or get_extension_path(ext_name)
                     sys.path.append(ext_dir)
@@ -198,8 +232,9 @@ class MainCommandsLoader(CLICommandsLoader):
                         # from an extension requires this map to be up-to-date.
                         # self._mod_to_ext_map[ext_mod] = ext_name
                         start_time = timeit.default_timer()
-                        extension_command_table, extension_group_table = \
-                            _load_extension_command_loader(self, args, ext_mod)
+                        with startup_phase("extension '{}'".format(ext_name)):
+                            extension_command_table, extension_group_table = \
+                                _load_extension_command_loader(self, args, ext_mod)
 
                         for cmd_name, cmd in extension_command_table.items():
                             cmd.command_source = ExtensionCommandSource(
@@ -209,6 +244,9 @@ class MainCommandsLoader(CLICommandsLoader):
 
                         self.command_table.update(extension_command_table)
                         self.command_group_table.update(extension_group_table)
+                        set_extension_commands(ext_name, sorted(set(
+                            name.split()[0] for name in list(extension_command_table) + list(extension_group_table)
+                            if name)))
                         elapsed_time = timeit.default_timer() - start_time
                         logger.debug("Loaded extension '%s' in %.3f seconds.", ext_name, elapsed_time)
                     except Exception:  # pylint: disable=broad-except
@@ -524,6 +562,7 @@ def get_default_cli():
     from azure.cli.core._config import GLOBAL_CONFIG_DIR, ENV_VAR_PREFIX
     from azure.cli.core._help import AzCliHelp
     from azure.cli.core._output import AzOutputProducer
+    from azure.cli.core._query import AzCliQuery
 
     return AzCli(cli_name='az',
                  config_dir=GLOBAL_CONFIG_DIR,
@@ -533,4 +572,5 @@ def get_default_cli():
                  parser_cls=AzCliCommandParser,
                  logging_cls=AzCliLogging,
                  output_cls=AzOutputProducer,
-                 help_cls=AzCliHelp)
+                 help_cls=AzCliHelp,
+                 query_cls=AzCliQuery)
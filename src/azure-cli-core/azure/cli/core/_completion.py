@@ -0,0 +1,216 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Fast paths for tab completion.
+
+Command, group and argument names are answered from a persisted index without loading any command module.
+The index is filled as completions fall through to the full parser. Values produced by completers which call
+Azure, such as resource names, are cached per subscription and, once stale, refreshed by a detached process
+after the completions are printed.
+"""
+
+import argparse
+import os
+import time
+import timeit
+
+import argcomplete
+
+from azure.cli.core._help_store import InstallationStore
+
+COMPLETION_INDEX_FILE_NAME = 'completionIndex.json'
+COMPLETION_CACHE_FILE_NAME = 'completionCache.json'
+# cached completer values older than this many seconds are refreshed in the background
+COMPLETION_CACHE_TTL = 60
+# cached completer values older than this many seconds are not shown at all
+COMPLETION_CACHE_MAX_AGE = 24 * 3600
+# seconds after which the process refreshing stale completer values is stopped
+BACKGROUND_REFRESH_TIMEOUT = 60
+
+_completion_cache = None
+# (key, loader) of the stale completer values to refresh once the completions are printed
+_background_refreshes = []
+
+
+def log_completion_latency(name, start_time):
+    """Report how long a completion step took. Shown on fd 9 when `_ARC_DEBUG` is set."""
+    argcomplete.debug('{} took {:.3f} seconds'.format(name, timeit.default_timer() - start_time))
+
+
+class CompletionIndex(InstallationStore):
+    """Option names and subcommands of each command and group, keyed by command path."""
+
+    file_name = COMPLETION_INDEX_FILE_NAME
+    enabled_key = 'completion_index_enabled'
+
+
+def _get_option_strings(parser):
+    return [option for action in parser._actions if action.help != argparse.SUPPRESS  # pylint: disable=protected-access
+            for option in action.option_strings]
+
+
+def record_completion_entry(cli_ctx, parser, command, command_table):
+    """Record the completions of the command or group that the full parser was loaded for."""
+    from azure.cli.core.commands.events import EVENT_INVOKER_ON_TAB_COMPLETION
+
+    # completions contributed by event handlers depend on the whole command line and cannot be indexed
+    if cli_ctx._event_handlers.get(EVENT_INVOKER_ON_TAB_COMPLETION):  # pylint: disable=protected-access
+        return
+
+    nouns = tuple(command.split())
+    if command in command_table:
+        command_parser = parser.subparsers[nouns[:-1]].choices.get(nouns[-1])
+        if not isinstance(command_parser, argparse.ArgumentParser):
+            return
+        entry = {'options': _get_option_strings(command_parser)}
+    elif nouns in parser.subparsers:
+        group_parser = parser.subparsers[nouns[:-1]].choices[nouns[-1]] if nouns else parser
+        entry = {'options': _get_option_strings(group_parser), 'children': list(parser.subparsers[nouns].choices)}
+    else:
+        return
+
+    index = CompletionIndex(cli_ctx)
+    if index.get_entry(command) != entry:
+        index.set_entry(command, entry)
+
+
+def _get_index_candidates(index, words, cword_prefix):
+    nouns = []
+    for word in words:
+        if word.startswith('-'):
+            break
+        nouns.append(word)
+
+    entry = index.get_entry(' '.join(nouns))
+    if not entry:
+        return None
+    if cword_prefix.startswith('-'):
+        return entry['options']
+    # anything else after a command is an argument value, which needs the full parser and its completers
+    if len(nouns) != len(words) or 'children' not in entry:
+        return None
+    return entry['options'] + entry['children']
+
+
+class _IndexCompletionFinder(argcomplete.CompletionFinder):
+
+    candidates = []
+
+    def _get_completions(self, comp_words, cword_prefix, cword_prequote, last_wordbreak_pos):
+        completions = [c for c in self.candidates if c.lower().startswith(cword_prefix.lower())]
+        return self.quote_completions(completions, cword_prequote, last_wordbreak_pos)
+
+
+def complete_from_index(cli_ctx):
+    """Print completions from the completion index and exit. Return if the index cannot answer."""
+    from knack.completion import ARGCOMPLETE_ENV_NAME
+
+    start_time = timeit.default_timer()
+    index = CompletionIndex(cli_ctx)
+    if not index.enabled or 'COMP_LINE' not in os.environ:
+        return
+
+    comp_line = os.environ['COMP_LINE']
+    comp_point = int(os.environ.get('COMP_POINT', len(comp_line)))
+    _, cword_prefix, _, comp_words, _ = argcomplete.split_line(comp_line, comp_point)
+    # the first word after the offset given by the shell script is the program itself
+    words = comp_words[int(os.environ[ARGCOMPLETE_ENV_NAME]):]
+
+    candidates = _get_index_candidates(index, words, cword_prefix)
+    log_completion_latency('Completion index lookup', start_time)
+    if candidates is None:
+        return
+
+    finder = _IndexCompletionFinder()
+    finder.candidates = candidates
+    finder(argparse.ArgumentParser(prog=cli_ctx.name), exit_method=exit_after_background_refresh)
+
+
+def exit_after_background_refresh(code):
+    """Exit method for argcomplete. Stale completer values are refreshed by a detached process, since the shell
+    waits for this process to exit before showing the completions."""
+    if _background_refreshes and _detach():
+        try:
+            import signal
+            signal.alarm(BACKGROUND_REFRESH_TIMEOUT)
+            run_background_refreshes()
+        finally:
+            os._exit(0)  # pylint: disable=protected-access
+    os._exit(code)  # pylint: disable=protected-access
+
+
+def _detach():
+    """Fork a process which is not waited for by the shell. Returns True in that process."""
+    pid = os.fork()
+    if pid:
+        # the intermediate process exits at once, leaving the refreshing process orphaned
+        os.waitpid(pid, 0)
+        return False
+    os.setsid()
+    if os.fork():
+        os._exit(0)  # pylint: disable=protected-access
+    # the shell reads the completions and the debug output until every process holding them has exited
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2, 8, 9):
+        os.dup2(devnull, fd)
+    return True
+
+
+def run_background_refreshes():
+    """Refresh the stale completer values returned by this process."""
+    while _background_refreshes:
+        cli_ctx, key, loader = _background_refreshes.pop(0)
+        try:
+            _refresh_cached_completions(cli_ctx, key, loader)
+        except Exception as ex:  # pylint: disable=broad-except
+            argcomplete.debug("Unable to refresh completions for '{}': {}".format(key, ex))
+
+
+def _get_completion_cache(cli_ctx):
+    global _completion_cache  # pylint: disable=global-statement
+    if _completion_cache is None:
+        from azure.cli.core._session import Session
+        _completion_cache = Session()
+        _completion_cache.load(os.path.join(cli_ctx.config.config_dir, COMPLETION_CACHE_FILE_NAME))
+    return _completion_cache
+
+
+def _refresh_cached_completions(cli_ctx, key, loader):
+    start_time = timeit.default_timer()
+    values = loader()
+    elapsed = timeit.default_timer() - start_time
+    log_completion_latency("Loading completions for '{}'".format(key), start_time)
+    cache = _get_completion_cache(cli_ctx)
+    now = time.time()
+    cache.data = {k: v for k, v in cache.data.items() if now - v['time'] < COMPLETION_CACHE_MAX_AGE}
+    cache[key] = {'time': now, 'values': values, 'elapsed': elapsed}
+    return values
+
+
+def get_cached_completions(cli_ctx, key, loader):
+    """Return the values of a completer which calls Azure from a per-subscription cache.
+
+    :param list key: The parts which identify the values within the current subscription, e.g. the resource type
+    :param callable loader: Returns the values as a list of strings
+    """
+    from azure.cli.core.commands.client_factory import get_subscription_id
+
+    ttl = cli_ctx.config.getint('core', 'completion_cache_ttl', fallback=COMPLETION_CACHE_TTL)
+    if ttl <= 0:
+        return loader()
+
+    key = '|'.join([get_subscription_id(cli_ctx)] + [str(k) for k in key if k])
+    entry = _get_completion_cache(cli_ctx).get(key)
+    age = time.time() - entry['time'] if entry else None
+
+    if entry and age < ttl:
+        return entry['values']
+    # without fork, stale values are loaded again while the shell waits
+    if entry and age < COMPLETION_CACHE_MAX_AGE and hasattr(os, 'fork'):
+        argcomplete.debug("Refreshing stale completions for '{}' in the background".format(key))
+        _background_refreshes.append((cli_ctx, key, loader))
+        return entry['values']
+    return _refresh_cached_completions(cli_ctx, key, loader)
@@ -5,8 +5,12 @@
 
 from __future__ import print_function
 import argparse
+import sys
+
+from six import StringIO
 
 from azure.cli.core.commands import ExtensionCommandSource
+from azure.cli.core._help_store import HelpStore
 
 from knack.help import (HelpFile as KnackHelpFile, CommandHelpFile as KnackCommandHelpFile,
                         GroupHelpFile as KnackGroupHelpFile, ArgumentGroupRegistry as KnackArgumentGroupRegistry,
@@ -105,12 +109,17 @@ class CLIPrintMixin(CLIHelp):
 
     @staticmethod
     def _print_extensions_msg(help_file):
-        if help_file.type != 'command':
-            return
-        if isinstance(help_file.command_source, ExtensionCommandSource):
-            logger.warning(help_file.command_source.get_command_warn_msg())
+        for msg in CLIPrintMixin._get_extensions_msgs(help_file):
+            logger.warning(msg)
+
+    @staticmethod
+    def _get_extensions_msgs(help_file):
+        msgs = []
+        if help_file.type == 'command' and isinstance(help_file.command_source, ExtensionCommandSource):
+            msgs.append(help_file.command_source.get_command_warn_msg())
             if help_file.command_source.preview:
-                logger.warning(help_file.command_source.get_preview_warn_msg())
+                msgs.append(help_file.command_source.get_preview_warn_msg())
+        return msgs
 
 
 class AzCliHelp(CLIPrintMixin, CLIHelp):
@@ -141,11 +150,54 @@ class AzCliHelp(CLIPrintMixin, CLIHelp):
 
         self._register_help_loaders()
         self._name_to_content = {}
+        self.help_store = HelpStore(cli_ctx)
 
     # override
     def show_help(self, cli_name, nouns, parser, is_group):
+        import colorama
+        colorama.init(autoreset=True)
         self.update_loaders_with_help_file_contents(nouns)
-        super(AzCliHelp, self).show_help(cli_name, nouns, parser, is_group)
+
+        delimiters = ' '.join(nouns)
+        help_file = self.command_help_cls(self, delimiters, parser) if not is_group \
+            else self.group_help_cls(self, delimiters, parser)
+        help_file.load(parser)
+        if not nouns:
+            help_file.command = ''
+
+        if not self.help_store.enabled:
+            self._print_detailed_help(cli_name, help_file)
+            return
+
+        # render into a buffer so the same text can be replayed from the help store
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            self._print_detailed_help(cli_name, help_file)
+            text = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        self.help_store.set(nouns, text, CLIPrintMixin._get_extensions_msgs(help_file))
+        self._print_stored_text(text)
+
+    def show_stored_help(self, nouns):
+        """Print help for a command or group from the help store. Return False if it has not been stored yet."""
+        stored = self.help_store.get(nouns)
+        if stored is None:
+            return False
+        text, warnings = stored
+        logger.debug("Showing help for '%s' from the help store.", ' '.join(nouns))
+        for msg in warnings:
+            logger.warning(msg)
+        self._print_stored_text(text)
+        return True
+
+    @staticmethod
+    def _print_stored_text(text):
+        try:
+            sys.stdout.write(text)
+        except UnicodeEncodeError:
+            sys.stdout.write(text.encode('ascii', 'ignore').decode('utf-8', 'ignore'))
 
     def _register_help_loaders(self):
         import azure.cli.core._help_loaders as help_loaders
@@ -0,0 +1,135 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import hashlib
+import os
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+HELP_STORE_FILE_NAME = 'helpStore.json'
+HELP_FLAGS = ['-h', '--help']
+# flags which do not change the rendered help
+HELP_PASSTHROUGH_FLAGS = ['--debug', '--verbose', '--only-show-errors']
+
+
+def get_help_nouns(args):
+    """Return the command or group path of a plain help request such as `az vm create -h`, otherwise None."""
+    args = [a for a in args if a not in HELP_PASSTHROUGH_FLAGS]
+    if not args or args[-1] not in HELP_FLAGS:
+        return None
+    nouns = args[:-1]
+    if any(n.startswith('-') for n in nouns):
+        return None
+    return nouns
+
+
+def _get_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+def _get_source_stamps(root, depth=2):
+    """List every entry under root up to the given depth along with its modification time.
+
+    Installing, upgrading or removing a command module or extension, as well as editing a dev install,
+    touches at least one of these entries.
+    """
+    stamps = []
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return stamps
+    for name in names:
+        if name.endswith('.pyc') or name == '__pycache__':
+            continue
+        path = os.path.join(root, name)
+        stamps.append('{}:{}'.format(path, _get_mtime(path)))
+        if depth > 1 and os.path.isdir(path):
+            stamps.extend(_get_source_stamps(path, depth - 1))
+    return stamps
+
+
+def get_installation_fingerprint(cli_ctx):
+    """Fingerprint of everything the available commands and their help depend on: the CLI version, the installed
+    command modules and extensions, the active API profile and the configured defaults."""
+    from azure.cli.core import __version__ as core_version
+    from azure.cli.core._config import ENV_VAR_PREFIX
+    from azure.cli.core.extension import EXTENSIONS_DIR, DEV_EXTENSION_SOURCES
+
+    parts = [core_version, cli_ctx.cloud.profile, str(_get_mtime(cli_ctx.config.config_path))]
+    parts.extend(sorted('{}={}'.format(k, v) for k, v in os.environ.items() if k.startswith(ENV_VAR_PREFIX)))
+    try:
+        import azure.cli.command_modules as command_modules
+        sources = list(command_modules.__path__)
+    except ImportError:
+        sources = []
+    for source in sources + [EXTENSIONS_DIR] + DEV_EXTENSION_SOURCES:
+        parts.extend(_get_source_stamps(source))
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+class InstallationStore(object):
+    """A JSON file in the config directory holding data derived from the installed commands. It is dropped as a
+    whole when the installation fingerprint no longer matches."""
+
+    file_name = None
+    enabled_key = None
+
+    def __init__(self, cli_ctx):
+        self.cli_ctx = cli_ctx
+        self._store = None
+
+    @property
+    def enabled(self):
+        return bool(self.cli_ctx.data.get(self.enabled_key))
+
+    def _load(self):
+        if self._store is None:
+            from azure.cli.core._session import Session
+            fingerprint = get_installation_fingerprint(self.cli_ctx)
+            self._store = Session()
+            self._store.load(os.path.join(self.cli_ctx.config.config_dir, self.file_name))
+            if self._store.get('fingerprint') != fingerprint:
+                logger.debug("%s is out of date and will be rebuilt.", self.file_name)
+                self._store.data = {'fingerprint': fingerprint, 'entries': {}}
+        return self._store
+
+    def get_entry(self, key):
+        if not self.enabled:
+            return None
+        return self._load().get('entries', {}).get(key)
+
+    def set_entry(self, key, value):
+        if not self.enabled:
+            return
+        store = self._load()
+        entries = store.get('entries', {})
+        entries[key] = value
+        try:
+            store['entries'] = entries
+        except (OSError, IOError) as ex:
+            logger.debug("Unable to save %s: %s", self.file_name, ex)
+
+
+class HelpStore(InstallationStore):
+    """Rendered help keyed by command path, so `-h` can be answered without loading the command table or
+    parsing help YAML. The store is filled the first time help for a command or group is shown."""
+
+    file_name = HELP_STORE_FILE_NAME
+    enabled_key = 'help_store_enabled'
+
+    def get(self, nouns):
+        """Return the stored (text, warnings) for a command or group path, or None."""
+        entry = self.get_entry(' '.join(nouns))
+        if entry is None:
+            return None
+        return entry['text'], entry.get('warnings', [])
+
+    def set(self, nouns, text, warnings=None):
+        self.set_entry(' '.join(nouns), {'text': text, 'warnings': warnings or []})
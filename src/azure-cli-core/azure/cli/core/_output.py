@@ -30,6 +30,11 @@ class AzOutputProducer(knack.output.OutputProducer):
     def format_none(_):
         return ""
 
+    def out(self, obj, formatter=None, out_file=None):
+        from azure.cli.core._startup_profiler import startup_phase
+        with startup_phase('output'):
+            super(AzOutputProducer, self).out(obj, formatter=formatter, out_file=out_file)
+
     def check_valid_format_type(self, format_type):
         return format_type in self._FORMAT_DICT
 
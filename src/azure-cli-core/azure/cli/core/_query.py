@@ -0,0 +1,183 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+The `--query` argument.
+
+Compiled expressions are cached in memory and, when `core.use_query_cache` is true, in the config directory, one
+file per expression, so that scripts running the same queries in many `az` processes parse each of them once.
+Writing an expression costs more than parsing it, so the config directory cache only pays off for queries which
+are run many times. Expressions projecting each item of a list, such as `[?...]` filters, `[*].name` or `[].{...}`
+multi-selects, optionally followed by pipes, are evaluated item by item as the pages of a paged result are
+retrieved, so the whole list is never held in memory.
+"""
+
+import os
+from collections import OrderedDict
+
+from knack.events import EVENT_PARSER_GLOBAL_CREATE, EVENT_INVOKER_POST_PARSE_ARGS, EVENT_INVOKER_FILTER_RESULT
+from knack.log import get_logger
+from knack.query import CLIQuery
+
+logger = get_logger(__name__)
+
+QUERY_CACHE_DIR_NAME = 'queryCache'
+# the number of expressions kept in the config directory, the least recently used are removed first
+QUERY_CACHE_SIZE = 100
+
+_compiled_queries = {}
+
+
+def _get_query_cache_path(cache_dir, raw_query):
+    import hashlib
+    return os.path.join(cache_dir, QUERY_CACHE_DIR_NAME,
+                        hashlib.sha256(raw_query.encode('utf-8')).hexdigest() + '.json')
+
+
+def _load_cached_query(path, raw_query):
+    import json
+    from jmespath.parser import ParsedResult
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+        if entry['query'] != raw_query:
+            return None
+        # the modification time tells which expressions were used last
+        os.utime(path, None)
+        return ParsedResult(raw_query, entry['ast'])
+    except (OSError, IOError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_cached_query(path, parsed):
+    import json
+    from azure.cli.core._session import _replace_file
+    try:
+        cache_dir = os.path.dirname(path)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        _replace_file(path, json.dumps({'query': parsed.expression, 'ast': parsed.parsed}), None)
+        files = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith('.json')]
+        if len(files) > QUERY_CACHE_SIZE:
+            for file_path in sorted(files, key=os.path.getmtime)[:-QUERY_CACHE_SIZE]:
+                os.remove(file_path)
+    except (OSError, IOError) as ex:
+        logger.debug('Unable to cache the query in %s: %s', path, ex)
+
+
+def _parse_query(raw_query, cache_dir=None):
+    from jmespath.parser import Parser
+
+    if not cache_dir:
+        return Parser().parse(raw_query)
+
+    path = _get_query_cache_path(cache_dir, raw_query)
+    parsed = _load_cached_query(path, raw_query)
+    if parsed is None:
+        parsed = Parser().parse(raw_query)
+        _save_cached_query(path, parsed)
+    return parsed
+
+
+def compile_query(raw_query, cache_dir=None):
+    """ Returns the compiled JMESPath expression, from the caches if it was compiled before. """
+    compiled = _compiled_queries.get(raw_query)
+    if compiled is None:
+        compiled = _compiled_queries[raw_query] = _parse_query(raw_query, cache_dir)
+    return compiled
+
+
+class ItemQuery(object):
+    """
+    A query which applies an expression to each item of a list and then, optionally, expressions to the list of
+    the results, e.g. `[?location=='westus'].name | sort(@)`.
+    """
+
+    def __init__(self, projection, tail):
+        self.projection = projection
+        self.tail = tail
+
+    @staticmethod
+    def from_expression(expression):
+        """ Returns the ItemQuery of a compiled expression, or None if the expression cannot be evaluated per item. """
+        node, tail = expression.parsed, []
+        while node['type'] == 'pipe':
+            tail.insert(0, node['children'][1])
+            node = node['children'][0]
+        if node['type'] not in ('projection', 'filter_projection'):
+            return None
+        base = node['children'][0]
+        if base['type'] == 'flatten':
+            base = base['children'][0]
+        if base['type'] != 'identity':
+            return None
+        return ItemQuery(node, tail)
+
+    def search_items(self, items, convert):
+        """ Returns the result of the query on the list of the converted items, as `ParsedResult.search` does. """
+        from jmespath import Options
+        from jmespath.visitor import TreeInterpreter
+
+        interpreter = TreeInterpreter(Options(OrderedDict))
+        flatten = self.projection['children'][0]['type'] == 'flatten'
+        right = self.projection['children'][1]
+        comparator = self.projection['children'][2] if self.projection['type'] == 'filter_projection' else None
+        collected = []
+        for item in items:
+            value = convert(item)
+            for element in value if flatten and isinstance(value, list) else [value]:
+                if comparator is not None and not interpreter._is_true(  # pylint: disable=protected-access
+                        interpreter.visit(comparator, element)):
+                    continue
+                current = interpreter.visit(right, element)
+                if current is not None:
+                    collected.append(current)
+        result = collected
+        for node in self.tail:
+            result = interpreter.visit(node, result)
+        return result
+
+
+class AzCliQuery(CLIQuery):
+
+    def __init__(self, cli_ctx=None):  # pylint: disable=super-init-not-called
+        # CLIQuery registers its own handlers
+        self.cli_ctx = cli_ctx
+        self.cli_ctx.register_event(EVENT_PARSER_GLOBAL_CREATE, AzCliQuery.on_global_arguments)
+        self.cli_ctx.register_event(EVENT_INVOKER_POST_PARSE_ARGS, AzCliQuery.handle_query_parameter)
+
+    @staticmethod
+    def on_global_arguments(cli_ctx, **kwargs):
+        cache_dir = cli_ctx.config.config_dir if cli_ctx.data.get('query_cache_enabled') else None
+
+        def jmespath_type(raw_query):
+            # JMESPath raises ValueErrors, which argparse turns into argument errors, and KeyErrors
+            try:
+                return compile_query(raw_query, cache_dir)
+            except KeyError:
+                raise ValueError
+
+        arg_group = kwargs.get('arg_group')
+        arg_group.add_argument('--query', dest='_jmespath_query', metavar='JMESPATH',
+                               help='JMESPath query string. See http://jmespath.org/ for more'
+                                    ' information and examples.',
+                               type=jmespath_type)
+
+    @staticmethod
+    def handle_query_parameter(cli_ctx, **kwargs):
+        args = kwargs['args']
+        query_expression = args._jmespath_query  # pylint: disable=protected-access
+        del args._jmespath_query
+        if query_expression:
+            def filter_output(cli_ctx, **kwargs):
+                from jmespath import Options
+                # the query was applied to the items of a paged result as they were retrieved
+                if not cli_ctx.invocation.data.get('query_applied'):
+                    kwargs['event_data']['result'] = query_expression.search(
+                        kwargs['event_data']['result'], Options(OrderedDict))
+                cli_ctx.unregister_event(EVENT_INVOKER_FILTER_RESULT, filter_output)
+            cli_ctx.register_event(EVENT_INVOKER_FILTER_RESULT, filter_output)
+            cli_ctx.invocation.data['query_active'] = True
+            cli_ctx.invocation.data['item_query'] = ItemQuery.from_expression(query_expression)
@@ -14,6 +14,7 @@ except ImportError:
     import collections
 
 from codecs import open as codecs_open
+from contextlib import contextmanager
 
 from knack.log import get_logger
 
@@ -23,23 +24,60 @@ except AttributeError:  # in Python 2.7
     t_JSONDecodeError = ValueError
 
 
+# seconds to wait for the lock of a session file held by another az process
+LOCK_TIMEOUT = 10
+
+
+def _replace_file(file_path, content, encoding):
+    """ Write to a temporary file which then replaces the file, so that a partially written file is never read. """
+    import tempfile
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or None, prefix='.', suffix='.tmp')
+    os.close(fd)
+    try:
+        with codecs_open(temp_path, 'w', encoding=encoding) as f:
+            f.write(content)
+        replace = getattr(os, 'replace', None)
+        if replace:
+            replace(temp_path, file_path)
+        else:
+            # Python 2.7: rename does not overwrite on Windows
+            if os.name == 'nt' and os.path.exists(file_path):
+                os.remove(file_path)
+            os.rename(temp_path, file_path)
+    except (OSError, IOError):
+        try:
+            os.remove(temp_path)
+        except (OSError, IOError):
+            pass
+        raise
+
+
 class Session(collections.MutableMapping):
     """
     A simple dict-like class that is backed by a JSON file.
 
-    All direct modifications will save the file. Indirect modifications should
-    be followed by a call to `save_with_retry` or `save`.
+    All direct modifications will save the file, unless `deferred` is set: the modified keys are then written
+    by `flush`, merged into the current content of the file. Indirect modifications should be followed by a
+    call to `save_with_retry` or `save`.
+
+    The file is replaced atomically while holding an advisory lock on '<filename>.lock', and is only written
+    when its content changes, so that az processes sharing the config directory do not corrupt it.
     """
 
-    def __init__(self, encoding=None):
+    def __init__(self, encoding=None, deferred=False):
         super(Session, self).__init__()
         self.filename = None
         self.data = {}
+        self.deferred = deferred
         self._encoding = encoding if encoding else 'utf-8-sig'
+        self._changed_keys = set()
+        self._deleted_keys = set()
 
     def load(self, filename, max_age=0):
         self.filename = filename
         self.data = {}
+        self._changed_keys.clear()
+        self._deleted_keys.clear()
         try:
             if max_age > 0:
                 st = os.stat(self.filename)
@@ -58,12 +96,15 @@ class Session(collections.MutableMapping):
             get_logger(__name__).log(log_level,
                                      "Failed to load or parse file %s. It will be overridden by default settings.",
                                      self.filename)
-            self.save()
+            if os.path.exists(self.filename):
+                self.save()
 
     def save(self):
         if self.filename:
-            with codecs_open(self.filename, 'w', encoding=self._encoding) as f:
-                json.dump(self.data, f)
+            with self._lock():
+                self._write(json.dumps(self.data))
+            self._changed_keys.clear()
+            self._deleted_keys.clear()
 
     def save_with_retry(self, retries=5):
         for _ in range(retries - 1):
@@ -75,6 +116,57 @@ class Session(collections.MutableMapping):
         else:
             self.save()
 
+    def flush(self):
+        """ Write the keys modified since the file was loaded or saved. Keys modified by other processes in the
+        meantime are kept. """
+        if not self.filename or not (self._changed_keys or self._deleted_keys):
+            return
+        with self._lock():
+            try:
+                with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
+                    data = json.load(f)
+            except (OSError, IOError, t_JSONDecodeError):
+                data = {}
+            for key in self._changed_keys:
+                if key in self.data:
+                    data[key] = self.data[key]
+            for key in self._deleted_keys:
+                data.pop(key, None)
+            self._write(json.dumps(data))
+        self.data = data
+        self._changed_keys.clear()
+        self._deleted_keys.clear()
+
+    @contextmanager
+    def _lock(self):
+        try:
+            import portalocker
+        except ImportError:
+            portalocker = None
+        lock = None
+        if portalocker:
+            try:
+                lock = portalocker.Lock(self.filename + '.lock', mode='a', timeout=LOCK_TIMEOUT)
+                lock.acquire()
+            except (portalocker.LockException, OSError, IOError) as ex:
+                # the file is still replaced atomically, but concurrent modifications may be lost
+                get_logger(__name__).debug("Unable to lock %s: %s", self.filename, ex)
+                lock = None
+        try:
+            yield
+        finally:
+            if lock:
+                lock.release()
+
+    def _write(self, content):
+        try:
+            with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
+                if f.read() == content:
+                    return
+        except (OSError, IOError):
+            pass
+        _replace_file(self.filename, content, self._encoding)
+
     def get(self, key, default=None):
         return self.data.get(key, default)
 
@@ -83,11 +175,17 @@ class Session(collections.MutableMapping):
 
     def __setitem__(self, key, value):
         self.data[key] = value
-        self.save_with_retry()
+        self._changed_keys.add(key)
+        self._deleted_keys.discard(key)
+        if not self.deferred:
+            self.save_with_retry()
 
     def __delitem__(self, key):
         del self.data[key]
-        self.save_with_retry()
+        self._changed_keys.discard(key)
+        self._deleted_keys.add(key)
+        if not self.deferred:
+            self.save_with_retry()
 
     def __iter__(self):
         return iter(self.data)
@@ -96,11 +194,60 @@ class Session(collections.MutableMapping):
         return len(self.data)
 
 
+class ExpiringCache(object):
+    """
+    Values kept in a deferred session file for `ttl` seconds, shared by the az processes using the config
+    directory. A `ttl` of 0 or less disables the cache. Modifications are written by `save`.
+    """
+
+    def __init__(self, file_path, ttl):
+        self.ttl = ttl
+        self._store = Session(deferred=True)
+        if self.ttl > 0:
+            self._store.load(file_path)
+            now = time.time()
+            for key in [k for k, v in self._store.data.items() if now - v.get('time', 0) >= self.ttl]:
+                del self._store[key]
+
+    def get(self, key):
+        entry = self._store.get(key)
+        return entry['value'] if entry else None
+
+    def set(self, key, value):
+        if self.ttl > 0:
+            self._store[key] = {'time': time.time(), 'value': value}
+
+    def save(self):
+        try:
+            self._store.flush()
+        except (OSError, IOError) as ex:
+            get_logger(__name__).debug("Unable to save %s: %s", self._store.filename, ex)
+
+
+_command_sessions = []
+
+
+def flush_with_command(session):
+    """ Have `flush_sessions` write the modifications of a deferred session once the command completes. """
+    if not any(s is session for s in _command_sessions):
+        _command_sessions.append(session)
+    return session
+
+
+def flush_sessions():
+    """ Write the modifications of the deferred sessions, once per command. """
+    for session in [ACCOUNT, CONFIG, SESSION] + _command_sessions:
+        try:
+            session.flush()
+        except (OSError, IOError) as ex:
+            get_logger(__name__).warning("Unable to save %s: %s", session.filename, ex)
+
+
 # ACCOUNT contains subscriptions information
-ACCOUNT = Session()
+ACCOUNT = Session(deferred=True)
 
 # CONFIG provides external configuration options
-CONFIG = Session()
+CONFIG = Session(deferred=True)
 
 # SESSION provides read-write session variables
-SESSION = Session()
+SESSION = Session(deferred=True)
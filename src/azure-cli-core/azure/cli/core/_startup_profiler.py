@@ -0,0 +1,211 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Startup profiler for `az --profile-startup`.
+
+Records a hierarchical timeline of the startup phases (session load, extension discovery, command table,
+argument registration, parser build, execution and output) together with every module import made along the way,
+and writes it in the Chrome trace event format, which can be opened with chrome://tracing or https://ui.perfetto.dev.
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import sys
+import threading
+import timeit
+from contextlib import contextmanager
+
+STARTUP_PROFILE_FLAG = '--profile-startup'
+STARTUP_PROFILE_FILE_NAME = 'az-startup-profile.json'
+# number of slowest spans of each category shown in the summary
+STARTUP_PROFILE_SUMMARY_SIZE = 10
+
+CATEGORY_PHASE = 'phase'
+CATEGORY_IMPORT = 'import'
+
+_profiler = None
+
+
+class StartupSpan(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, name, category, start, depth, args=None):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.depth = depth
+        self.thread_id = threading.current_thread().ident
+        self.duration = 0
+        self.imports = 0
+        self.args = args or {}
+
+
+class StartupProfiler(object):
+    """Collects spans for phases and module imports. Imports are timed by wrapping `__import__` and
+    `importlib.import_module`; only the calls that load at least one new module are kept. Imports are only
+    timed on the thread which started the profiler, phases on any thread."""
+
+    def __init__(self, origin=None):
+        self.origin = origin if origin is not None else timeit.default_timer()
+        self.spans = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread_id = threading.current_thread().ident
+        self._original_import = None
+        self._original_import_module = None
+
+    def start(self):
+        from six.moves import builtins
+        import importlib
+
+        self._original_import = builtins.__import__
+        self._original_import_module = importlib.import_module
+
+        def _profiled_import(name, *args, **kwargs):
+            if threading.current_thread().ident != self._thread_id:
+                return self._original_import(name, *args, **kwargs)
+            fromlist = args[2] if len(args) > 2 else kwargs.get('fromlist')
+            level = args[3] if len(args) > 3 else kwargs.get('level', 0)
+            label = name
+            if level and level > 0:
+                label = '.' * level + name
+            if fromlist:
+                names = [str(f) for f in fromlist]
+                if len(names) > 3:
+                    names = names[:3] + ['... ({} names)'.format(len(names))]
+                label = 'from {} import {}'.format(label, ', '.join(names))
+            with self.span(label, CATEGORY_IMPORT, keep_empty=False):
+                return self._original_import(name, *args, **kwargs)
+
+        def _profiled_import_module(name, package=None):
+            if threading.current_thread().ident != self._thread_id:
+                return self._original_import_module(name, package)
+            with self.span(name, CATEGORY_IMPORT, keep_empty=False):
+                return self._original_import_module(name, package)
+
+        builtins.__import__ = _profiled_import
+        importlib.import_module = _profiled_import_module
+
+    def stop(self):
+        from six.moves import builtins
+        import importlib
+
+        if self._original_import:
+            builtins.__import__ = self._original_import
+            importlib.import_module = self._original_import_module
+            self._original_import = self._original_import_module = None
+
+    @contextmanager
+    def span(self, name, category=CATEGORY_PHASE, args=None, keep_empty=True):
+        module_count = len(sys.modules)
+        depth = getattr(self._local, 'depth', 0)
+        span = StartupSpan(name, category, timeit.default_timer() - self.origin, depth, args)
+        self._local.depth = depth + 1
+        try:
+            yield span
+        finally:
+            self._local.depth = depth
+            span.duration = timeit.default_timer() - self.origin - span.start
+            span.imports = len(sys.modules) - module_count
+            if keep_empty or span.imports:
+                with self._lock:
+                    self.spans.append(span)
+
+    def add_span(self, name, start, imports, category=CATEGORY_PHASE):
+        """Record a span which ended now but was not timed by the profiler, e.g. imports made before it started."""
+        span = StartupSpan(name, category, start - self.origin, getattr(self._local, 'depth', 0))
+        span.duration = timeit.default_timer() - start
+        span.imports = imports
+        with self._lock:
+            self.spans.append(span)
+
+    def to_trace(self):
+        """Return the spans as a Chrome trace. Times are in microseconds from the start of the profile."""
+        pid = os.getpid()
+        events = [{
+            'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'az ' + ' '.join(sys.argv[1:])}
+        }]
+        # the thread which started the profiler is shown first
+        thread_ids = {self._thread_id: 0}
+        for span in sorted(self.spans, key=lambda s: (s.start, s.depth)):
+            tid = thread_ids.setdefault(span.thread_id, len(thread_ids))
+            args = dict(span.args)
+            args['imports'] = span.imports
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round(span.start * 1e6, 1),
+                'dur': round(span.duration * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+                'args': args
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_trace(), f)
+
+    def get_summary(self, size=STARTUP_PROFILE_SUMMARY_SIZE):
+        lines = []
+        phases = [s for s in self.spans if s.category == CATEGORY_PHASE]
+        for span in sorted(phases, key=lambda s: s.start):
+            lines.append('{:>9.3f}s {:>6} imports  {}{}'.format(span.duration, span.imports,
+                                                                '  ' * span.depth, span.name))
+        imports = [s for s in self.spans if s.category == CATEGORY_IMPORT]
+        if imports:
+            lines.append('Slowest imports:')
+            for span in sorted(imports, key=lambda s: s.duration, reverse=True)[:size]:
+                lines.append('{:>9.3f}s {:>6} imports  {}'.format(span.duration, span.imports, span.name))
+        return '\n'.join(lines)
+
+
+def pop_startup_profile_arg(args):
+    """Remove `--profile-startup[=FILE]` from the arguments. Return the remaining arguments and the trace file path,
+    which is None when profiling was not requested."""
+    path = None
+    remaining = []
+    for arg in args:
+        if arg == STARTUP_PROFILE_FLAG:
+            path = STARTUP_PROFILE_FILE_NAME
+        elif arg.startswith(STARTUP_PROFILE_FLAG + '='):
+            path = arg.split('=', 1)[1] or STARTUP_PROFILE_FILE_NAME
+        else:
+            remaining.append(arg)
+    return remaining, path
+
+
+def start_startup_profiler(origin=None):
+    global _profiler  # pylint: disable=global-statement
+    _profiler = StartupProfiler(origin)
+    _profiler.start()
+    return _profiler
+
+
+def stop_startup_profiler(path=None):
+    """Stop profiling and write the trace to the given path, along with a summary on stderr."""
+    global _profiler  # pylint: disable=global-statement
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    profiler.stop()
+    if path:
+        profiler.save(path)
+        print(profiler.get_summary(), file=sys.stderr)
+        print('Startup profile written to {}'.format(os.path.abspath(path)), file=sys.stderr)
+    return profiler
+
+
+@contextmanager
+def startup_phase(name, **kwargs):
+    """Time a startup phase when the startup profiler is running. Keyword arguments are shown with the span."""
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.span(name, CATEGORY_PHASE, kwargs):
+            yield
@@ -0,0 +1,157 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Installed component versions and latest released versions for `az --version`.
+
+The versions of the installed CLI components and extensions are kept in a manifest in the config directory. It is
+written when an extension is added, updated or removed, and rebuilt when the CLI installation or extension
+directories change, so reading it does not require scanning the installed distributions.
+
+The latest versions on PyPI are kept in a separate record which is refreshed by a background process once it is
+older than `core.version_check_ttl` hours, so checking for updates never delays the version output.
+"""
+
+import os
+import sys
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+VERSION_MANIFEST_FILE_NAME = 'versionManifest.json'
+LATEST_VERSIONS_FILE_NAME = 'latestVersions.json'
+# hours, see `core.version_check_ttl`
+DEFAULT_VERSION_CHECK_TTL = 24
+# seconds after which a background refresh which did not complete may be started again
+VERSION_CHECK_RETRY_INTERVAL = 600
+PYPI_PACKAGE_URL = 'https://pypi.org/pypi/{}/json'
+
+
+def _get_manifest_stamp():
+    """Identify the installation: the CLI version, the Python interpreter and the modification times of the
+    directories which change when a component or extension is installed, upgraded or removed."""
+    from azure.cli.core import __version__ as core_version
+    from azure.cli.core._help_store import _get_mtime
+    from azure.cli.core.extension import EXTENSIONS_DIR, DEV_EXTENSION_SOURCES
+
+    try:
+        import azure.cli.command_modules as command_modules
+        sources = list(command_modules.__path__)
+    except ImportError:
+        sources = []
+    paths = set([EXTENSIONS_DIR] + DEV_EXTENSION_SOURCES)
+    for source in sources:
+        paths.add(source)
+        # the distribution metadata of the command modules is in site-packages, three levels up
+        paths.add(os.path.dirname(os.path.dirname(os.path.dirname(source))))
+    return [core_version, sys.executable] + ['{}:{}'.format(p, _get_mtime(p)) for p in sorted(paths)]
+
+
+def _load(config_dir, file_name):
+    from azure.cli.core._session import Session
+    store = Session()
+    store.load(os.path.join(config_dir, file_name))
+    return store
+
+
+def build_version_manifest(config_dir):
+    """Scan the installed CLI distributions and extensions and write the manifest."""
+    from azure.cli.core.util import get_installed_cli_distributions, CLI_PACKAGE_NAME, COMPONENT_PREFIX
+    from azure.cli.core.extension import get_extensions
+
+    components = {}
+    for dist in get_installed_cli_distributions():
+        if dist.key == CLI_PACKAGE_NAME:
+            components[CLI_PACKAGE_NAME] = dist.version
+        elif dist.key.startswith(COMPONENT_PREFIX):
+            components[dist.key.replace(COMPONENT_PREFIX, '')] = dist.version
+    extensions = [{'name': ext.name, 'version': ext.version, 'type': ext.ext_type, 'path': ext.path}
+                  for ext in get_extensions()]
+
+    manifest = _load(config_dir, VERSION_MANIFEST_FILE_NAME)
+    manifest.data = {'stamp': _get_manifest_stamp(), 'components': components, 'extensions': extensions}
+    try:
+        manifest.save()
+    except (OSError, IOError) as ex:
+        logger.debug('Unable to save %s: %s', VERSION_MANIFEST_FILE_NAME, ex)
+    return manifest.data
+
+
+def get_version_manifest(config_dir):
+    """Return {'components': {name: version}, 'extensions': [{name, version, type, path}]}."""
+    manifest = _load(config_dir, VERSION_MANIFEST_FILE_NAME)
+    if manifest.get('stamp') != _get_manifest_stamp():
+        logger.debug('%s is out of date and will be rebuilt.', VERSION_MANIFEST_FILE_NAME)
+        return build_version_manifest(config_dir)
+    return manifest.data
+
+
+def get_latest_versions(config_dir, ttl=DEFAULT_VERSION_CHECK_TTL):
+    """Return the latest released version of each component as last recorded, or None if they were never
+    retrieved. A refresh is started in the background when the record is older than `ttl` hours."""
+    record = _load(config_dir, LATEST_VERSIONS_FILE_NAME)
+    now = time.time()
+    if now - record.get('time', 0) > ttl * 3600 and \
+            now - record.get('refreshStarted', 0) > VERSION_CHECK_RETRY_INTERVAL:
+        try:
+            record['refreshStarted'] = now
+            _start_refresh(config_dir)
+        except (OSError, IOError) as ex:
+            logger.debug('Unable to start checking for updates: %s', ex)
+    return record.get('versions') if record.get('success') else None
+
+
+def _start_refresh(config_dir):
+    import subprocess
+
+    args = [sys.executable, '-m', __name__, config_dir]
+    logger.debug('Checking for updates in the background: %s', args)
+    kwargs = {'args': args}
+    if os.name == 'nt':
+        # do not share the console of the parent, so that it can exit immediately
+        kwargs['creationflags'] = 0x00000008  # DETACHED_PROCESS
+    devnull = open(os.devnull, 'w')
+    kwargs.update({'stdin': devnull, 'stdout': devnull, 'stderr': devnull})
+    try:
+        subprocess.Popen(**kwargs)
+    finally:
+        devnull.close()
+
+
+def _get_pypi_version(package_name):
+    import requests
+    response = requests.get(PYPI_PACKAGE_URL.format(package_name), timeout=10)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()['info']['version']
+
+
+def refresh_latest_versions(config_dir):
+    """Query PyPI for the latest version of each installed component and record them."""
+    from multiprocessing.pool import ThreadPool
+    from azure.cli.core.util import CLI_PACKAGE_NAME, COMPONENT_PREFIX
+
+    names = list(get_version_manifest(config_dir)['components'].keys())
+    packages = [n if n == CLI_PACKAGE_NAME else COMPONENT_PREFIX + n for n in names]
+    pool = ThreadPool(8)
+    try:
+        versions = dict(zip(names, pool.map(_get_pypi_version, packages)))
+    except Exception as ex:  # pylint: disable=broad-except
+        # keep the previous record, the refresh is retried after VERSION_CHECK_RETRY_INTERVAL
+        logger.debug('Unable to query PyPI: %s', ex)
+        return None
+    finally:
+        pool.close()
+    record = _load(config_dir, LATEST_VERSIONS_FILE_NAME)
+    record.data = {'time': time.time(), 'success': True, 'versions': {k: v for k, v in versions.items() if v}}
+    record.save()
+    return record.data
+
+
+if __name__ == '__main__':
+    refresh_latest_versions(sys.argv[1])
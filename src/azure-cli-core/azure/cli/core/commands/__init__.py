@@ -15,6 +15,7 @@ import os
 import re
 import sys
 import time
+import timeit
 import copy
 from importlib import import_module
 import six
@@ -26,7 +27,10 @@ from azure.cli.core.commands.constants import (
 from azure.cli.core.commands.parameters import (
     AzArgumentContext, patch_arg_make_required, patch_arg_make_optional)
 from azure.cli.core.extension import get_extension
-from azure.cli.core.util import get_command_type_kwarg, read_file_content, get_arg_list, poller_classes
+from azure.cli.core._help_store import get_help_nouns
+from azure.cli.core._startup_profiler import startup_phase
+from azure.cli.core.commands.perf_report import get_perf_report, emit_perf_report
+from azure.cli.core.util import get_command_type_kwarg, read_file_content, get_arg_list, poller_classes, todict
 import azure.cli.core.telemetry as telemetry
 
 from knack.arguments import CLICommandArgument
@@ -35,7 +39,7 @@ from knack.deprecation import ImplicitDeprecated, resolve_deprecate_info
 from knack.invocation import CommandInvoker
 from knack.preview import ImplicitPreviewItem, PreviewItem, resolve_preview_info
 from knack.log import get_logger
-from knack.util import CLIError, CommandResultItem, todict
+from knack.util import CLIError, CommandResultItem
 from knack.events import EVENT_INVOKER_TRANSFORM_RESULT
 
 try:
@@ -112,6 +116,59 @@ def _pre_command_table_create(cli_ctx, args):
     return _expand_file_prefixed_files(args)
 
 
+OBJECT_CACHE_DIR = 'object_cache'
+# megabytes, see `core.object_cache_max_size`
+DEFAULT_OBJECT_CACHE_MAX_SIZE = 50
+# keyword arguments of SDK operations which do not identify the object
+_CACHE_IGNORED_KWARGS = ['self', 'cmd', 'raw', 'polling', 'custom_headers']
+
+
+def _is_object_cache_enabled(cli_ctx):
+    return cli_ctx.config.getboolean('core', 'object_cache', fallback=False)
+
+
+def _write_cache_file(file_path, content):
+    """ Write to a temporary file which then replaces the entry, so that concurrent az processes never read a
+    partially written entry. """
+    from azure.cli.core._session import _replace_file
+    _replace_file(file_path, content, 'utf-8')
+
+
+def _evict_cache_entries(cli_ctx):
+    """ Remove the least recently used entries until the object cache fits in `core.object_cache_max_size`
+    megabytes. Entries saved with --defer have not been sent to Azure yet and are never evicted. """
+    from azure.cli.core._environment import get_config_dir
+
+    max_size = cli_ctx.config.getint('core', 'object_cache_max_size',
+                                     fallback=DEFAULT_OBJECT_CACHE_MAX_SIZE) * 1024 * 1024
+    entries = []
+    total_size = 0
+    for dir_name, _, file_list in os.walk(os.path.join(get_config_dir(), OBJECT_CACHE_DIR)):
+        for file_name in file_list:
+            if not file_name.endswith('.json'):
+                continue
+            file_path = os.path.join(dir_name, file_name)
+            try:
+                stat = os.stat(file_path)
+            except (OSError, IOError):  # removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+            total_size += stat.st_size
+
+    for _, size, file_path in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            with open(file_path, 'r') as f:
+                if json.loads(f.read()).get('deferred', True):
+                    continue
+            os.remove(file_path)
+            logger.debug('Evicted from object cache: %s', file_path)
+        except (OSError, IOError, ValueError):
+            continue
+        total_size -= size
+
+
 # pylint: disable=too-many-instance-attributes
 class CacheObject(object):
 
@@ -125,9 +182,14 @@ class CacheObject(object):
             raise CLIError('subscription ID unexpectedly empty')
         if not cli_ctx.cloud.name:
             raise CLIError('cloud name unexpectedly empty')
-        copy_kwargs = kwargs.copy()
-        copy_kwargs.pop('self', None)
-        resource_group = copy_kwargs.pop('resource_group_name', None) or args[0]
+        if not self._model_name:
+            raise CLIError('unable to determine the model returned by {}'.format(self._operation))
+        copy_kwargs = {k: v for k, v in kwargs.items() if k not in _CACHE_IGNORED_KWARGS and v is not None}
+        resource_group = copy_kwargs.pop('resource_group_name', None)
+        if not resource_group:
+            if not args:
+                raise CLIError('unable to determine the resource group of {}'.format(self._operation))
+            resource_group = args[0]
 
         if len(args) > 2:
             raise CLIError('expected 2 args, got {}: {}'.format(len(args), args))
@@ -144,7 +206,7 @@ class CacheObject(object):
 
         directory = os.path.join(
             get_config_dir(),
-            'object_cache',
+            OBJECT_CACHE_DIR,
             cli_ctx.cloud.name,
             subscription_id,
             self._resource_group,
@@ -174,36 +236,51 @@ class CacheObject(object):
         except AttributeError:
             return
 
-    def _dump_to_file(self, open_file):
-        cache_obj_dump = json.dumps({
+    def _dump(self):
+        return json.dumps({
             'last_saved': self.last_saved,
+            'etag': self.cache_etag,
+            'deferred': self.deferred,
             '_payload': self._payload
         })
-        open_file.write(cache_obj_dump)
 
     def load(self, args, kwargs):
         directory, filename = self.path(args, kwargs)
-        with open(os.path.join(directory, filename), 'r') as f:
+        file_path = os.path.join(directory, filename)
+        with open(file_path, 'r') as f:
             logger.info(
-                "Loading %s '%s' from cache: %s", self._model_name, self._resource_name,
-                os.path.join(directory, filename)
+                "Loading %s '%s' from cache: %s", self._model_name, self._resource_name, file_path
             )
             obj_data = json.loads(f.read())
             self._payload = obj_data['_payload']
             self.last_saved = obj_data['last_saved']
+            object.__setattr__(self, 'cache_etag', obj_data.get('etag'))
+            # entries written before ETags were stored all come from --defer
+            object.__setattr__(self, 'deferred', obj_data.get('deferred', True))
         self._payload = self.result()
+        # the modification time orders entries for LRU eviction
+        try:
+            os.utime(file_path, None)
+        except (OSError, IOError):
+            pass
 
     def save(self, args, kwargs):
         from knack.util import ensure_dir
         directory, filename = self.path(args, kwargs)
         ensure_dir(directory)
-        with open(os.path.join(directory, filename), 'w') as f:
-            logger.info(
-                "Caching %s '%s' as: %s", self._model_name, self._resource_name,
-                os.path.join(directory, filename)
-            )
-            self.last_saved = str(datetime.datetime.now())
-            self._dump_to_file(f)
+        logger.info(
+            "Caching %s '%s' as: %s", self._model_name, self._resource_name, os.path.join(directory, filename)
+        )
+        self.last_saved = str(datetime.datetime.now())
+        _write_cache_file(os.path.join(directory, filename), self._dump())
+        _evict_cache_entries(self._cmd.cli_ctx)
+
+    def delete(self, args, kwargs):
+        directory, filename = self.path(args, kwargs)
+        try:
+            os.remove(os.path.join(directory, filename))
+        except (OSError, IOError):  # FileNotFoundError introduced in Python 3
+            pass
 
     def result(self):
         module = import_module(self._model_path)
@@ -217,13 +294,15 @@ class CacheObject(object):
             'group': self._resource_group
         }
 
-    def __init__(self, cmd, payload, operation):
+    def __init__(self, cmd, payload, operation, etag=None, deferred=True):
         self._cmd = cmd
         self._operation = operation
         self._resource_group = None
         self._resource_name = None
         self._model_name = None
         self._model_path = None
+        self.cache_etag = etag
+        self.deferred = deferred
         self._payload = payload
         self.last_saved = None
         self._resolve_model()
@@ -370,22 +449,68 @@ def cached_get(cmd_obj, operation, *args, **kwargs):
             result = operation(**kwargs)
         return result
 
+    use_object_cache = _is_object_cache_enabled(cmd_obj.cli_ctx)
+
     # early out if the command does not use the cache
-    if not cmd_obj.command_kwargs.get('supports_local_cache', False):
+    if not cmd_obj.command_kwargs.get('supports_local_cache', False) and not use_object_cache:
         return _get_operation()
 
     cache_obj = CacheObject(cmd_obj, None, operation)
     try:
         cache_obj.load(args, kwargs)
+    except Exception:  # pylint: disable=broad-except
+        message = "{model} '{name}' not found in cache. Retrieving from Azure...".format(**cache_obj.prop_dict())
+        logger.debug(message)
+        cache_obj = None
+
+    if cache_obj and cache_obj.deferred:
         if _is_stale(cmd_obj.cli_ctx, cache_obj):
             message = "{model} '{name}' stale in cache. Retrieving from Azure...".format(**cache_obj.prop_dict())
             logger.warning(message)
             return _get_operation()
         return cache_obj
-    except Exception:  # pylint: disable=broad-except
-        message = "{model} '{name}' not found in cache. Retrieving from Azure...".format(**cache_obj.prop_dict())
-        logger.debug(message)
+
+    if not use_object_cache:
         return _get_operation()
+    return _get_revalidated(cmd_obj, operation, cache_obj, args, kwargs)
+
+
+def _get_revalidated(cmd_obj, operation, cache_obj, args, kwargs):
+    """ Get an object, sending the ETag of the cached copy in If-None-Match where the operation allows it. The
+    cached copy is returned when the service answers 304 Not Modified; otherwise the new object replaces it. """
+    from azure.cli.core.util import get_arg_list
+
+    op_args = get_arg_list(operation)
+    if 'raw' in op_args and 'custom_headers' in op_args and 'raw' not in kwargs and 'custom_headers' not in kwargs:
+        headers = {'If-None-Match': cache_obj.cache_etag} if cache_obj and cache_obj.cache_etag else None
+        try:
+            response = operation(*args, custom_headers=headers, raw=True, **kwargs)
+        except Exception as ex:  # pylint: disable=broad-except
+            if headers and getattr(getattr(ex, 'response', None), 'status_code', None) == 304:
+                logger.info("%s '%s' not modified, using the cached copy.", cache_obj.prop_dict()['model'],
+                            cache_obj.prop_dict()['name'])
+                return object.__getattribute__(cache_obj, '_payload')
+            raise
+        result = response.output
+        etag = response.response.headers.get('ETag') if response.response is not None else None
+    else:
+        result = operation(*args, **kwargs)
+        etag = None
+    _save_fetched(cmd_obj, operation, result, etag, args, kwargs)
+    return result
+
+
+def _save_fetched(cmd_obj, operation, result, etag, args, kwargs):
+    """ Cache an object received from Azure along with its ETag, which is required to revalidate it. """
+    etag = etag or getattr(result, 'etag', None)
+    try:
+        if etag and hasattr(result, 'serialize'):
+            CacheObject(cmd_obj, result.serialize(keep_readonly=True), operation, etag=etag,
+                        deferred=False).save(args, kwargs)
+        else:
+            CacheObject(cmd_obj, None, operation).delete(args, kwargs)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.debug('Unable to cache object: %s', ex)
 
 
 def cached_put(cmd_obj, operation, parameters, *args, **kwargs):
@@ -399,26 +524,37 @@ def cached_put(cmd_obj, operation, parameters, *args, **kwargs):
             result = operation(parameters=parameters, **kwargs)
         return result
 
+    use_object_cache = _is_object_cache_enabled(cmd_obj.cli_ctx)
+
     # early out if the command does not use the cache
-    if not cmd_obj.command_kwargs.get('supports_local_cache', False):
+    if not cmd_obj.command_kwargs.get('supports_local_cache', False) and not use_object_cache:
         return _put_operation()
 
     use_cache = cmd_obj.cli_ctx.data.get('_cache', False)
     if not use_cache:
         result = _put_operation()
 
-    cache_obj = CacheObject(cmd_obj, parameters.serialize(), operation)
     if use_cache:
+        cache_obj = CacheObject(cmd_obj, parameters.serialize(), operation)
         cache_obj.save(args, kwargs)
         return cache_obj
 
     # for a successful PUT, attempt to delete the cache file
-    obj_dir, obj_file = cache_obj.path(args, kwargs)
-    obj_path = os.path.join(obj_dir, obj_file)
     try:
-        os.remove(obj_path)
-    except (OSError, IOError):  # FileNotFoundError introduced in Python 3
-        pass
+        CacheObject(cmd_obj, None, operation).delete(args, kwargs)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.debug('Unable to locate cached object: %s', ex)
+
+    if use_object_cache:
+        # cache the updated object, so that the next read-modify-write only has to revalidate it
+        if _is_poller(result):
+            def _save_polled(polling):
+                resource = getattr(polling, 'resource', None)
+                resource = resource() if callable(resource) else resource
+                _save_fetched(cmd_obj, operation, resource, None, args, kwargs)
+            result.add_done_callback(_save_polled)
+        else:
+            _save_fetched(cmd_obj, operation, result, None, args, kwargs)
     return result
 
 
@@ -436,10 +572,21 @@ class AzCliCommandInvoker(CommandInvoker):
         # TODO: Can't simply be invoked as an event because args are transformed
         args = _pre_command_table_create(self.cli_ctx, args)
 
+        if self.cli_ctx.data['completer_active']:
+            from azure.cli.core._completion import complete_from_index
+            complete_from_index(self.cli_ctx)
+
+        help_nouns = get_help_nouns(args)
+        if help_nouns is not None and self.help.show_stored_help(help_nouns):
+            telemetry.set_command_details(' '.join(help_nouns))
+            telemetry.set_success(summary='show help')
+            return CommandResultItem(None, exit_code=0)
+
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_CMD_TBL_CREATE, args=args)
-        self.commands_loader.load_command_table(args)
-        self.cli_ctx.raise_event(EVENT_INVOKER_PRE_CMD_TBL_TRUNCATE,
-                                 load_cmd_tbl_func=self.commands_loader.load_command_table, args=args)
+        with startup_phase('command table'):
+            self.commands_loader.load_command_table(args)
+            self.cli_ctx.raise_event(EVENT_INVOKER_PRE_CMD_TBL_TRUNCATE,
+                                     load_cmd_tbl_func=self.commands_loader.load_command_table, args=args)
         command = self._rudimentary_get_command(args)
         self.cli_ctx.invocation.data['command_string'] = command
         telemetry.set_raw_command_name(command)
@@ -480,14 +627,20 @@ class AzCliCommandInvoker(CommandInvoker):
 
         self.commands_loader.command_table = self.commands_loader.command_table  # update with the truncated table
         self.commands_loader.command_name = command
-        self.commands_loader.load_arguments(command)
-        self.cli_ctx.raise_event(EVENT_INVOKER_POST_CMD_TBL_CREATE, commands_loader=self.commands_loader)
+        with startup_phase('argument registration'):
+            self.commands_loader.load_arguments(command)
+            self.cli_ctx.raise_event(EVENT_INVOKER_POST_CMD_TBL_CREATE, commands_loader=self.commands_loader)
         self.parser.cli_ctx = self.cli_ctx
-        self.parser.load_command_table(self.commands_loader)
+        with startup_phase('parser build'):
+            self.parser.load_command_table(self.commands_loader)
 
         self.cli_ctx.raise_event(EVENT_INVOKER_CMD_TBL_LOADED, cmd_tbl=self.commands_loader.command_table,
                                  parser=self.parser)
 
+        if self.cli_ctx.data['completer_active']:
+            from azure.cli.core._completion import record_completion_entry
+            record_completion_entry(self.cli_ctx, self.parser, command, self.commands_loader.command_table)
+
         arg_check = [a for a in args if a not in ['--debug', '--verbose']]
         if not arg_check:
             self.parser.enable_autocomplete()
@@ -505,7 +658,8 @@ class AzCliCommandInvoker(CommandInvoker):
         self.parser.enable_autocomplete()
 
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_PARSE_ARGS, args=args)
-        parsed_args = self.parser.parse_args(args)
+        with startup_phase('argument parsing'):
+            parsed_args = self.parser.parse_args(args)
         self.cli_ctx.raise_event(EVENT_INVOKER_POST_PARSE_ARGS, command=parsed_args.command, args=parsed_args)
 
         # TODO: This fundamentally alters the way Knack.invocation works here. Cannot be customized
@@ -550,10 +704,15 @@ class AzCliCommandInvoker(CommandInvoker):
             jobs.append((expanded_arg, cmd_copy))
 
         ids = getattr(parsed_args, '_ids', None) or [None] * len(jobs)
-        if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
-            results, exceptions = self._run_jobs_serially(jobs, ids)
-        else:
-            results, exceptions = self._run_jobs_concurrently(jobs, ids)
+        if len(jobs) > 1:
+            # the query applies to the list of the results of the jobs
+            self.data['item_query'] = None
+        with startup_phase('execution'):
+            if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
+                results, exceptions = self._run_jobs_serially(jobs, ids)
+            else:
+                results, exceptions = self._run_jobs_concurrently(jobs, ids)
+        emit_perf_report(self.cli_ctx)
 
         # handle exceptions
         if len(exceptions) == 1 and not results:
@@ -570,7 +729,8 @@ class AzCliCommandInvoker(CommandInvoker):
             results = results[0]
 
         event_data = {'result': results}
-        self.cli_ctx.raise_event(EVENT_INVOKER_FILTER_RESULT, event_data=event_data)
+        with startup_phase('filter result'):
+            self.cli_ctx.raise_event(EVENT_INVOKER_FILTER_RESULT, event_data=event_data)
 
         return CommandResultItem(
             event_data['result'],
@@ -598,19 +758,31 @@ class AzCliCommandInvoker(CommandInvoker):
 
             if _is_poller(result):
                 result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name))(result)
+            elif _is_paged(result) and self.data.get('item_query'):
+                # apply the query to the items as the pages are retrieved rather than to the whole list
+                with startup_phase('todict'):
+                    result = self.data['item_query'].search_items(
+                        result, lambda item: self._transform_result(cmd_copy, item))
+                self.data['query_applied'] = True
+                return result
             elif _is_paged(result):
                 result = list(result)
 
-            result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
-            event_data = {'result': result}
-            cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
-            return event_data['result']
+            with startup_phase('todict'):
+                return self._transform_result(cmd_copy, result)
         except Exception as ex:  # pylint: disable=broad-except
             if cmd_copy.exception_handler:
                 cmd_copy.exception_handler(ex)
                 return CommandResultItem(None, exit_code=1, error=ex)
             six.reraise(*sys.exc_info())
 
+    @staticmethod
+    def _transform_result(cmd_copy, result):
+        result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
+        event_data = {'result': result}
+        cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
+        return event_data['result']
+
     def _run_jobs_serially(self, jobs, ids):
         results, exceptions = [], []
         for job, id_arg in zip(jobs, ids):
@@ -830,7 +1002,10 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
         cli_logger = get_logger()  # get CLI logger which has the level set through command lines
         is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
 
+        start_time = timeit.default_timer()
+        polls = 0
         while not poller.done():
+            polls += 1
             self.cli_ctx.get_progress_controller().add(message='Running')
             try:
                 # pylint: disable=protected-access
@@ -861,6 +1036,10 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
             from azure.cli.core.commands.arm import handle_long_running_operation_exception
             self.cli_ctx.get_progress_controller().stop()
             handle_long_running_operation_exception(client_exception)
+        finally:
+            perf_report = get_perf_report(self.cli_ctx)
+            if perf_report:
+                perf_report.record_lro(timeit.default_timer() - start_time, polls)
 
         self.cli_ctx.get_progress_controller().end()
         colorama.deinit()
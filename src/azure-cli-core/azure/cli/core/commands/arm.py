@@ -17,13 +17,13 @@ from azure.cli.core.commands import LongRunningOperation, _is_poller, cached_get
 from azure.cli.core.commands.client_factory import get_mgmt_service_client
 from azure.cli.core.commands.validators import IterateValue
 from azure.cli.core.util import (
-    shell_safe_json_parse, augment_no_wait_handler_args, get_command_type_kwarg, find_child_item)
+    shell_safe_json_parse, augment_no_wait_handler_args, get_command_type_kwarg, find_child_item, todict)
 from azure.cli.core.profiles import ResourceType, get_sdk
 
 from knack.arguments import CLICommandArgument, ignore_type
 from knack.introspection import extract_args_from_signature, extract_full_summary_from_signature
 from knack.log import get_logger
-from knack.util import todict, CLIError
+from knack.util import CLIError
 
 logger = get_logger(__name__)
 EXCLUDED_NON_CLIENT_PARAMS = list(set(EXCLUDED_PARAMS) - set(['self', 'client']))
@@ -732,7 +732,7 @@ def _cli_show_command(context, name, getter_op, custom_command=False, **kwargs):
 
         getter = context_copy.get_op_handler(getter_op, operation_group=kwargs.get('operation_group'))
         try:
-            return getter(**args)
+            return cached_get(cmd, getter, **args)
         except Exception as ex:  # pylint: disable=broad-except
             show_exception_handler(ex)
     context._cli_command(name, handler=handler, argument_loader=generic_show_arguments_loader,  # pylint: disable=protected-access
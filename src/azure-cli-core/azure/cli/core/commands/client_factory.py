@@ -7,6 +7,7 @@ import os
 
 from azure.cli.core import __version__ as core_version
 import azure.cli.core._debug as _debug
+from azure.cli.core.commands.perf_report import instrument_mgmt_client, instrument_data_client
 from azure.cli.core.extension import EXTENSIONS_MOD_PREFIX
 from azure.cli.core.profiles._shared import get_client_class, SDKProfile
 from azure.cli.core.profiles import ResourceType, CustomResourceType, get_api_version, get_sdk
@@ -107,6 +108,7 @@ def configure_common_settings(cli_ctx, client):
         client._client.add_header('ParameterSetName',
                                   ' '.join(cli_ctx.data['safe_params']))
     client.config.generate_client_request_id = 'x-ms-client-request-id' not in cli_ctx.data['headers']
+    instrument_mgmt_client(cli_ctx, client)
 
 
 def _get_mgmt_service_client(cli_ctx,
@@ -169,6 +171,7 @@ def get_data_service_client(cli_ctx, service_type, account_name, account_key, co
         raise CLIError('Unable to obtain data client. Check your connection parameters.')
     # TODO: enable Fiddler
     client.request_callback = _get_add_headers_callback(cli_ctx)
+    instrument_data_client(cli_ctx, client)
     return client
 
 
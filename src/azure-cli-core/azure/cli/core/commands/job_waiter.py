@@ -0,0 +1,103 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Wait for many service-side jobs at once.
+
+The jobs are polled concurrently. Each job is polled again after an interval which starts at `min_interval` and
+doubles up to `max_interval` while its state does not change, so that short jobs are noticed quickly and long ones
+do not flood the service. The wait ends as soon as every job is done or the overall deadline is reached.
+"""
+
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+# seconds
+DEFAULT_MIN_INTERVAL = 2
+DEFAULT_MAX_INTERVAL = 30
+MAX_WORKERS = 8
+
+
+def log_transition(job_id, job, old_state, new_state):  # pylint: disable=unused-argument
+    if old_state is None:
+        logger.warning("Job '%s': %s", job_id, new_state)
+    else:
+        logger.warning("Job '%s': %s -> %s", job_id, old_state, new_state)
+
+
+class JobWaitResult(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, jobs, timed_out):
+        # the last retrieved job of each job ID, in the order of the IDs
+        self.jobs = jobs
+        # the IDs of the jobs which were not done at the deadline
+        self.timed_out = timed_out
+
+
+def wait_for_jobs(job_ids, get_job, get_state, is_done, timeout=None, min_interval=DEFAULT_MIN_INTERVAL,
+                  max_interval=DEFAULT_MAX_INTERVAL, on_transition=log_transition):
+    """
+    Poll the jobs until they are all done or `timeout` seconds have elapsed.
+
+    :param job_ids: the identifiers of the jobs, passed to `get_job`. Duplicates are waited for once.
+    :param get_job: retrieves a job from its identifier. It is called from several threads.
+    :param get_state: returns the state of a job, which is reported to `on_transition` when it changes.
+    :param is_done: returns True if a job is in a final state.
+    :param timeout: seconds, None or a value <= 0 waits without deadline.
+    :param on_transition: called with (job ID, job, previous state or None, state) as soon as a state is observed.
+    :rtype: JobWaitResult
+    """
+    from collections import OrderedDict
+    from multiprocessing.pool import ThreadPool
+
+    job_ids = list(OrderedDict.fromkeys(job_ids))
+    deadline = time.time() + timeout if timeout and timeout > 0 else None
+    min_interval = min(min_interval, max_interval)
+    jobs, states = {}, {}
+    intervals = {job_id: min_interval for job_id in job_ids}
+    next_poll = {job_id: 0 for job_id in job_ids}
+    pending = list(job_ids)
+
+    def _poll(job_id):
+        return job_id, get_job(job_id)
+
+    pool = ThreadPool(min(MAX_WORKERS, len(job_ids))) if job_ids else None
+    try:
+        while pending:
+            now = time.time()
+            due = [j for j in pending if next_poll[j] <= now]
+            # report the transitions as the jobs are retrieved, not once all the due jobs are
+            for job_id, job in pool.imap_unordered(_poll, due):
+                jobs[job_id] = job
+                state = get_state(job)
+                if job_id not in states or state != states[job_id]:
+                    on_transition(job_id, job, states.get(job_id), state)
+                    states[job_id] = state
+                    intervals[job_id] = min_interval
+                else:
+                    intervals[job_id] = min(intervals[job_id] * 2, max_interval)
+                if is_done(job):
+                    pending.remove(job_id)
+                else:
+                    next_poll[job_id] = time.time() + intervals[job_id]
+            if not pending:
+                break
+            wake = min(next_poll[j] for j in pending)
+            if deadline:
+                if time.time() >= deadline:
+                    break
+                if wake > deadline:
+                    # poll the pending jobs a last time at the deadline
+                    for job_id in pending:
+                        next_poll[job_id] = min(next_poll[job_id], deadline)
+                    wake = deadline
+            time.sleep(max(0, wake - time.time()))
+    finally:
+        if pool:
+            pool.close()
+    return JobWaitResult([jobs[j] for j in job_ids], pending)
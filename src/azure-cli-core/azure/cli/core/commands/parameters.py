@@ -141,10 +141,15 @@ def get_resource_name_completion_list(resource_type=None):
 
     @Completer
     def completer(cmd, prefix, namespace, **kwargs):  # pylint: disable=unused-argument
+        from azure.cli.core._completion import get_cached_completions
         rg = getattr(namespace, 'resource_group_name', None)
         if rg:
-            return [r.name for r in get_resources_in_resource_group(cmd.cli_ctx, rg, resource_type=resource_type)]
-        return [r.name for r in get_resources_in_subscription(cmd.cli_ctx, resource_type)]
+            return get_cached_completions(
+                cmd.cli_ctx, ['resources', resource_type, rg],
+                lambda: [r.name for r in get_resources_in_resource_group(cmd.cli_ctx, rg, resource_type=resource_type)])
+        return get_cached_completions(
+            cmd.cli_ctx, ['resources', resource_type],
+            lambda: [r.name for r in get_resources_in_subscription(cmd.cli_ctx, resource_type)])
 
     return completer
 
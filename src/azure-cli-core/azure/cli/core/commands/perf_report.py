@@ -0,0 +1,388 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Per-command HTTP performance report for `az ... --perf-report [table|json]`.
+
+The service clients created by the CLI are instrumented to count the requests made by a command per host and
+operation, with latency histograms, retries, throttled (429) responses, bytes sent and received, token acquisition
+time and long-running operation polling time. The report is written to stderr at the end of the command, and
+appended as a JSON line to the file set in `core.perf_report_file`, if any.
+"""
+
+from __future__ import print_function
+
+import copy
+import datetime
+import json
+import sys
+import threading
+import timeit
+
+import six
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+PERF_REPORT_FORMATS = ['table', 'json']
+PERF_REPORT_FILE_CONFIG = 'perf_report_file'
+# upper bounds, in seconds, of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+_ARM_NAMED_SEGMENTS = ['subscriptions', 'resourcegroups']
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(percent / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def get_operation_name(method, url):
+    """Return (host, operation) for a request, with the resource names of ARM paths replaced by `{}` so that
+    requests made to different resources of the same type are counted together."""
+    from six.moves.urllib.parse import urlparse
+
+    parsed = urlparse(url)
+    segments = [s for s in parsed.path.split('/') if s]
+    lower_segments = [s.lower() for s in segments]
+    if not any(s in lower_segments for s in _ARM_NAMED_SEGMENTS + ['providers']):
+        # data plane requests are grouped by the first segment of their path
+        path = '/' + segments[0] if segments else '/'
+        if len(segments) > 1:
+            path += '/...'
+        return parsed.netloc, '{} {}'.format(method, path)
+
+    normalized = []
+    provider_index = None
+    for index, segment in enumerate(segments):
+        previous = lower_segments[index - 1] if index else None
+        if previous in _ARM_NAMED_SEGMENTS:
+            normalized.append('{}')
+        elif provider_index is not None and index > provider_index + 1 and (index - provider_index) % 2 == 1:
+            # under a provider namespace, segments alternate between resource types and resource names
+            normalized.append('{}')
+        else:
+            normalized.append(segment)
+        if lower_segments[index] == 'providers':
+            provider_index = index
+    return parsed.netloc, '{} /{}'.format(method, '/'.join(normalized))
+
+
+class _OperationStats(object):
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.throttled = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latencies = []
+
+    def add(self, status, elapsed, bytes_out, bytes_in):
+        self.count += 1
+        if status is None or status >= 400:
+            self.errors += 1
+        if status == 429:
+            self.throttled += 1
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+        self.latencies.append(elapsed)
+
+    def to_dict(self):
+        latencies = sorted(self.latencies)
+        histogram = {}
+        for bound in LATENCY_BUCKETS:
+            histogram['le_{}'.format(bound)] = len([x for x in latencies if x <= bound])
+        histogram['le_inf'] = len(latencies)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'throttled': self.throttled,
+            'bytesOut': self.bytes_out,
+            'bytesIn': self.bytes_in,
+            'totalSeconds': round(sum(latencies), 4),
+            'p50Seconds': round(_percentile(latencies, 50), 4),
+            'p95Seconds': round(_percentile(latencies, 95), 4),
+            'maxSeconds': round(latencies[-1], 4) if latencies else 0,
+            'histogram': histogram
+        }
+
+
+class PerfReport(object):
+    """HTTP statistics of one command invocation. Thread-safe, as the requests of a command made with `--ids` are
+    sent concurrently."""
+
+    def __init__(self, command=None, output_format=None):
+        self.command = command
+        self.output_format = output_format
+        self.start_time = timeit.default_timer()
+        self.operations = {}
+        self.retries = 0
+        self.retry_wait = 0.0
+        self.throttled_retries = 0
+        self.token_requests = 0
+        self.token_time = 0.0
+        self.lro_count = 0
+        self.lro_polls = 0
+        self.lro_time = 0.0
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # every job of a command gets a deep copy of cli_ctx.data; they must all report to the same instance
+        return self
+
+    def record_request(self, method, url, status, elapsed, bytes_out=0, bytes_in=0):
+        key = get_operation_name(method, url)
+        with self._lock:
+            stats = self.operations.get(key)
+            if stats is None:
+                stats = self.operations[key] = _OperationStats()
+            stats.add(status, elapsed, bytes_out, bytes_in)
+
+    def record_retry(self, status=None):
+        with self._lock:
+            self.retries += 1
+            if status == 429:
+                self.throttled_retries += 1
+
+    def record_retry_wait(self, elapsed):
+        with self._lock:
+            self.retry_wait += elapsed
+
+    def record_token(self, elapsed):
+        with self._lock:
+            self.token_requests += 1
+            self.token_time += elapsed
+
+    def record_lro(self, elapsed, polls):
+        with self._lock:
+            self.lro_count += 1
+            self.lro_polls += polls
+            self.lro_time += elapsed
+
+    def to_dict(self):
+        with self._lock:
+            operations = [dict(host=host, operation=operation, **stats.to_dict())
+                          for (host, operation), stats in sorted(self.operations.items())]
+            return {
+                'command': self.command,
+                'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+                'durationSeconds': round(timeit.default_timer() - self.start_time, 4),
+                'requests': sum(o['count'] for o in operations),
+                'errors': sum(o['errors'] for o in operations),
+                'throttled': sum(o['throttled'] for o in operations) + self.throttled_retries,
+                'retries': self.retries,
+                'retryWaitSeconds': round(self.retry_wait, 4),
+                'bytesOut': sum(o['bytesOut'] for o in operations),
+                'bytesIn': sum(o['bytesIn'] for o in operations),
+                'tokenRequests': self.token_requests,
+                'tokenSeconds': round(self.token_time, 4),
+                'longRunningOperations': self.lro_count,
+                'longRunningOperationPolls': self.lro_polls,
+                'longRunningOperationSeconds': round(self.lro_time, 4),
+                'operations': operations
+            }
+
+    def to_table(self):
+        report = self.to_dict()
+        lines = [
+            "Performance report for 'az {}' ({:.3f}s)".format(report['command'], report['durationSeconds']),
+            'HTTP requests: {} ({} errors, {} retries, {} throttled), {} bytes sent, {} bytes received'.format(
+                report['requests'], report['errors'], report['retries'], report['throttled'], report['bytesOut'],
+                report['bytesIn']),
+            'Retry backoff: {:.3f}s'.format(report['retryWaitSeconds']),
+            'Token acquisition: {} in {:.3f}s'.format(report['tokenRequests'], report['tokenSeconds']),
+            'Long-running operations: {} ({} polls) in {:.3f}s'.format(
+                report['longRunningOperations'], report['longRunningOperationPolls'],
+                report['longRunningOperationSeconds'])
+        ]
+        if report['operations']:
+            row = '{:>6} {:>6} {:>9} {:>8} {:>8} {:>8}  {}'
+            lines.append('')
+            lines.append(row.format('Count', 'Errors', 'Total', 'p50', 'p95', 'Max', 'Operation'))
+            for op in report['operations']:
+                lines.append(row.format(op['count'], op['errors'], '{:.3f}s'.format(op['totalSeconds']),
+                                        '{:.3f}s'.format(op['p50Seconds']), '{:.3f}s'.format(op['p95Seconds']),
+                                        '{:.3f}s'.format(op['maxSeconds']),
+                                        '{} {}'.format(op['host'], op['operation'])))
+            latencies = [x for stats in self.operations.values() for x in stats.latencies]
+            buckets = []
+            lower = None
+            for bound in LATENCY_BUCKETS + [None]:
+                count = len([x for x in latencies if (lower is None or x > lower) and (bound is None or x <= bound)])
+                buckets.append('{}{}s: {}'.format('<=' if bound else '>', bound or lower, count))
+                lower = bound
+            lines.append('')
+            lines.append('Latency histogram: ' + ', '.join(buckets))
+        return '\n'.join(lines)
+
+
+def get_perf_report(cli_ctx):
+    return cli_ctx.data.get('perf_report') if cli_ctx else None
+
+
+def _get_counting_retry(report, retry):
+    """Return a copy of a urllib3 Retry which records retries and backoff time in the report."""
+    class _CountingRetry(type(retry)):
+
+        # pylint: disable=keyword-arg-before-vararg
+        def increment(self, method=None, url=None, response=None, error=None, *args, **kwargs):
+            report.record_retry(getattr(response, 'status', None))
+            return super(_CountingRetry, self).increment(method, url, response, error, *args, **kwargs)
+
+        def sleep(self, response=None):
+            start = timeit.default_timer()
+            try:
+                super(_CountingRetry, self).sleep(response)
+            finally:
+                report.record_retry_wait(timeit.default_timer() - start)
+
+    counting_retry = copy.copy(retry)
+    counting_retry.__class__ = _CountingRetry
+    return counting_retry
+
+
+def _get_content_length(headers):
+    try:
+        return int(headers.get('Content-Length', 0))
+    except ValueError:
+        return 0
+
+
+def _get_body_length(body, headers):
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, six.text_type)):
+        return len(body)
+    return _get_content_length(headers)
+
+
+def instrument_mgmt_client(cli_ctx, client):
+    """Record the requests, retries and token acquisitions of an msrest service client in the command's report."""
+    report = get_perf_report(cli_ctx)
+    if report is None:
+        return
+
+    def _record_response(response, *_, **kwargs):
+        elapsed = response.elapsed.total_seconds()
+        if not kwargs.get('stream'):
+            # requests reads the body right after the hooks have run, read it now to include it in the latency
+            start = timeit.default_timer()
+            bytes_in = len(response.content or b'')
+            elapsed += timeit.default_timer() - start
+        else:
+            # msrest streams every response, the body is read after the hooks so only its announced size is known
+            bytes_in = _get_content_length(response.headers)
+        request = response.request
+        report.record_request(request.method, request.url, response.status_code, elapsed,
+                              _get_body_length(request.body, request.headers), bytes_in)
+
+    config = client.config
+    config.hooks.append(_record_response)
+    config.retry_policy.policy = _get_counting_retry(report, config.retry_policy.policy)
+
+    credentials = getattr(config, 'credentials', None)
+    signed_session = getattr(credentials, 'signed_session', None)
+    if signed_session is not None and not getattr(signed_session, 'perf_report', None):
+        def _timed_signed_session(*args, **kwargs):
+            start = timeit.default_timer()
+            try:
+                return signed_session(*args, **kwargs)
+            finally:
+                report.record_token(timeit.default_timer() - start)
+        _timed_signed_session.perf_report = report
+        try:
+            credentials.signed_session = _timed_signed_session
+        except AttributeError:
+            logger.debug('Unable to time the token acquisition of %s', type(credentials).__name__)
+
+
+def instrument_data_client(cli_ctx, client):
+    """Record the requests and retries of a storage data plane client in the command's report."""
+    report = get_perf_report(cli_ctx)
+    if report is None:
+        return
+
+    local = threading.local()
+    request_callback = getattr(client, 'request_callback', None)
+    response_callback = getattr(client, 'response_callback', None)
+    retry_callback = getattr(client, 'retry_callback', None)
+
+    def _request_callback(request):
+        if request_callback:
+            request_callback(request)
+        local.request = request
+        local.start = timeit.default_timer()
+
+    def _response_callback(response):
+        if response_callback:
+            response_callback(response)
+        request = getattr(local, 'request', None)
+        if request is None:
+            return
+        url = '{}://{}{}'.format(request.protocol or 'https', request.host, request.path)
+        report.record_request(request.method, url, response.status, timeit.default_timer() - local.start,
+                              _get_body_length(request.body, request.headers),
+                              _get_body_length(response.body, response.headers or {}))
+        local.request = None
+
+    def _retry_callback(retry_context):
+        if retry_callback:
+            retry_callback(retry_context)
+        response = getattr(retry_context, 'response', None)
+        report.record_retry(getattr(response, 'status', None))
+
+    client.request_callback = _request_callback
+    client.response_callback = _response_callback
+    client.retry_callback = _retry_callback
+
+
+def emit_perf_report(cli_ctx):
+    """Write the report of the command to stderr when requested, and append it to the metrics file if configured."""
+    report = get_perf_report(cli_ctx)
+    if report is None:
+        return
+    cli_ctx.data['perf_report'] = None
+
+    if report.output_format == 'json':
+        print(json.dumps(report.to_dict(), indent=2), file=sys.stderr)
+    elif report.output_format:
+        print(report.to_table(), file=sys.stderr)
+
+    metrics_file = cli_ctx.config.get('core', PERF_REPORT_FILE_CONFIG, None)
+    if metrics_file:
+        try:
+            with open(metrics_file, 'a') as f:
+                f.write(json.dumps(report.to_dict(), sort_keys=True) + '\n')
+        except (OSError, IOError) as ex:
+            logger.warning("Unable to write the performance report to '%s': %s", metrics_file, ex)
+
+
+def register_perf_report_argument(cli_ctx):
+    from knack.events import EVENT_PARSER_GLOBAL_CREATE, EVENT_INVOKER_POST_PARSE_ARGS
+
+    def add_perf_report_argument(_, **kwargs):
+        arg_group = kwargs.get('arg_group')
+        arg_group.add_argument('--perf-report', dest='_perf_report', nargs='?', const='table',
+                               choices=PERF_REPORT_FORMATS,
+                               help='Show the number, latency and size of the HTTP requests made by the command on '
+                                    'stderr. Allowed values: {}. Default: table.'.format(
+                                        ', '.join(PERF_REPORT_FORMATS)))
+
+    def handle_perf_report_argument(cli, **kwargs):
+        args = kwargs['args']
+        output_format = getattr(args, '_perf_report', None)
+        if hasattr(args, '_perf_report'):
+            del args._perf_report
+        metrics_file = cli.config.get('core', PERF_REPORT_FILE_CONFIG, None)
+        if output_format or metrics_file:
+            cli.data['perf_report'] = PerfReport(command=kwargs.get('command'), output_format=output_format)
+        else:
+            cli.data['perf_report'] = None
+
+    cli_ctx.register_event(EVENT_PARSER_GLOBAL_CREATE, add_perf_report_argument)
+    cli_ctx.register_event(EVENT_INVOKER_POST_PARSE_ARGS, handle_perf_report_argument)
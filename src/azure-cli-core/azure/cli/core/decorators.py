@@ -11,6 +11,7 @@ that it doesn't import modules other than those in the Python Standard Library
 """
 
 import hashlib
+import timeit
 from functools import wraps
 
 from knack.log import get_logger
@@ -23,10 +24,15 @@ class Completer(object):
         self.func = func
 
     def __call__(self, **kwargs):
+        from azure.cli.core._completion import log_completion_latency
         namespace = kwargs['parsed_args']
         prefix = kwargs['prefix']
         cmd = namespace._cmd  # pylint: disable=protected-access
-        return self.func(cmd, prefix, namespace)
+        start_time = timeit.default_timer()
+        try:
+            return self.func(cmd, prefix, namespace)
+        finally:
+            log_completion_latency("Completer '{}'".format(self.func.__name__), start_time)
 
 
 def call_once(factory_func):
@@ -25,6 +25,7 @@ EXTENSIONS_MOD_PREFIX = 'azext_'
 WHL_METADATA_FILENAME = 'metadata.json'
 EGG_INFO_METADATA_FILE_NAME = 'PKG-INFO'  # used for dev packages
 AZEXT_METADATA_FILENAME = 'azext_metadata.json'
+EXTENSION_REGISTRY_FILE_NAME = 'extensionRegistry.json'
 
 EXT_METADATA_MINCLICOREVERSION = 'azext.minCliCoreVersion'
 EXT_METADATA_MAXCLICOREVERSION = 'azext.maxCliCoreVersion'
@@ -57,6 +58,9 @@ class Extension(object):
         self._version = None
         self._metadata = None
         self._preview = None
+        self._compatible = None
+        # top-level command words of the extension, None until the extension has been loaded once
+        self.commands = None
 
     @property
     def version(self):
@@ -95,6 +99,16 @@ class Extension(object):
             logger.debug("Unable to get extension preview status: %s", traceback.format_exc())
         return self._preview
 
+    @property
+    def compatible(self):
+        """
+        Lazy load compatibility with the CLI core.
+        Returns True if the extension can be loaded by this version of the CLI.
+        """
+        if not isinstance(self._compatible, bool):
+            self._compatible = ext_compat_with_cli(self.metadata)[0]
+        return self._compatible
+
     def get_version(self):
         raise NotImplementedError()
 
@@ -116,11 +130,11 @@ class WheelExtension(Extension):
 
     def get_metadata(self):
         from glob import glob
-        if not extension_exists(self.name):
-            return None
-        metadata = {}
         ext_dir = self.path or get_extension_path(self.name)
         info_dirs = glob(os.path.join(ext_dir, '*.*-info'))
+        if not info_dirs:
+            return None
+        metadata = {}
         azext_metadata = WheelExtension.get_azext_metadata(ext_dir)
         if azext_metadata:
             metadata.update(azext_metadata)
@@ -174,10 +188,10 @@ class DevExtension(Extension):
 
     def get_metadata(self):
 
-        if not extension_exists(self.name):
+        ext_dir = self.path
+        if not os.path.isdir(ext_dir):
             return None
         metadata = {}
-        ext_dir = self.path
         egg_info_dirs = [f for f in os.listdir(ext_dir) if f.endswith('.egg-info')]
         azext_metadata = DevExtension.get_azext_metadata(ext_dir)
         if azext_metadata:
@@ -270,15 +284,109 @@ def get_extension_path(ext_name):
     return os.path.join(EXTENSIONS_DIR, ext_name)
 
 
+def _get_registry_stamp():
+    """Identify the installed extensions: the CLI version and the modification times of the extension
+    directories, which change when an extension is added, updated or removed."""
+    from azure.cli.core import __version__ as core_version
+    from azure.cli.core._help_store import _get_mtime
+
+    paths = []
+    for root in [EXTENSIONS_DIR] + DEV_EXTENSION_SOURCES:
+        paths.append(root)
+        try:
+            paths.extend(os.path.join(root, name) for name in sorted(os.listdir(root)))
+        except OSError:
+            pass
+    return [core_version] + ['{}:{}'.format(p, _get_mtime(p)) for p in paths]
+
+
+def _build_registry_entries(previous_entries):
+    commands = {(e['name'], e['path'], e['version']): e.get('commands') for e in previous_entries}
+    entries = []
+    for ext_cls in EXTENSION_TYPES:
+        for ext in ext_cls.get_all():
+            entries.append({
+                'name': ext.name,
+                'type': ext.ext_type,
+                'path': ext.path,
+                'version': ext.version,
+                'metadata': ext.metadata,
+                'compatible': ext.compatible,
+                'commands': commands.get((ext.name, ext.path, ext.version))
+            })
+    return entries
+
+
+_registry = None
+
+
+def _get_registry():
+    """
+    Return the registry of installed extensions, a Session with their metadata, compatibility and commands.
+    The registry is kept in the config directory and rebuilt when the extension directories change, so the
+    extensions do not have to be scanned on every command.
+    """
+    global _registry  # pylint: disable=global-statement
+    stamp = _get_registry_stamp()
+    if _registry is not None and _registry.get('stamp') == stamp:
+        return _registry
+
+    from azure.cli.core._session import Session
+    registry = Session()
+    try:
+        registry.load(os.path.join(GLOBAL_CONFIG_DIR, EXTENSION_REGISTRY_FILE_NAME))
+    except (OSError, IOError) as ex:
+        logger.debug('Unable to load %s: %s', EXTENSION_REGISTRY_FILE_NAME, ex)
+    if registry.get('stamp') != stamp:
+        logger.debug('%s is out of date and will be rebuilt.', EXTENSION_REGISTRY_FILE_NAME)
+        registry.data = {'stamp': stamp, 'extensions': _build_registry_entries(registry.get('extensions', []))}
+        _save_registry(registry)
+    _registry = registry
+    return registry
+
+
+def _save_registry(registry):
+    try:
+        registry.save()
+    except (OSError, IOError) as ex:
+        logger.debug('Unable to save %s: %s', EXTENSION_REGISTRY_FILE_NAME, ex)
+
+
+def invalidate_extension_registry():
+    """Drop the registry so that it is rebuilt from the extension directories on next use."""
+    global _registry  # pylint: disable=global-statement
+    _registry = None
+    try:
+        os.remove(os.path.join(GLOBAL_CONFIG_DIR, EXTENSION_REGISTRY_FILE_NAME))
+    except OSError:
+        pass
+
+
+def set_extension_commands(ext_name, commands):
+    """Record the top-level command words of a loaded extension."""
+    registry = _get_registry()
+    for entry in registry.get('extensions', []):
+        if entry['name'] == ext_name and entry.get('commands') != commands:
+            entry['commands'] = commands
+            _save_registry(registry)
+
+
 def get_extensions(ext_type=None):
     logger.debug("Extensions directory: '%s'", EXTENSIONS_DIR)
-    extensions = []
     if not ext_type:
         ext_type = EXTENSION_TYPES
     elif not isinstance(ext_type, list):
         ext_type = [ext_type]
-    for t in ext_type:
-        extensions.extend([ext for ext in t.get_all()])
+    extensions = []
+    for entry in _get_registry().get('extensions', []):
+        ext_cls = WheelExtension if entry['type'] == 'whl' else DevExtension
+        if ext_cls not in ext_type:
+            continue
+        ext = ext_cls(entry['name'], entry['path'])
+        # pylint: disable=protected-access
+        ext._version, ext._metadata, ext._compatible = entry['version'], entry['metadata'], entry['compatible']
+        ext.commands = entry.get('commands')
+        extensions.append(ext)
     return extensions
 
 
@@ -2,6 +2,8 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import os
+
 import requests
 
 from knack.log import get_logger
@@ -18,18 +20,64 @@ ERR_TMPL_BAD_JSON = '{}Response body does not contain valid json. Error detail:
 
 ERR_UNABLE_TO_GET_EXTENSIONS = 'Unable to get extensions from index. Improper index format.'
 TRIES = 3
+INDEX_CACHE_FILE_NAME = 'extensionIndex.json'
+
+
+def _load_index_cache():
+    from azure.cli.core._config import GLOBAL_CONFIG_DIR
+    from azure.cli.core._session import Session
+    cache = Session()
+    try:
+        cache.load(os.path.join(GLOBAL_CONFIG_DIR, INDEX_CACHE_FILE_NAME))
+    except (OSError, IOError) as ex:
+        logger.debug('Unable to load %s: %s', INDEX_CACHE_FILE_NAME, ex)
+    return cache
+
+
+def _save_index_cache(cache, index_url, response, index):
+    cache.data = {
+        'url': index_url,
+        'etag': response.headers.get('ETag'),
+        'lastModified': response.headers.get('Last-Modified'),
+        'index': index
+    }
+    try:
+        cache.save()
+    except (OSError, IOError, TypeError, ValueError) as ex:
+        logger.debug('Unable to save %s: %s', INDEX_CACHE_FILE_NAME, ex)
+        try:
+            os.remove(cache.filename)
+        except (OSError, TypeError):
+            pass
 
 
 # pylint: disable=inconsistent-return-statements
 def get_index(index_url=None):
+    """
+    Get the extension index. The last index retrieved is kept in the config directory and revalidated with
+    its ETag or modification time, so an unchanged index is not downloaded again.
+    """
     from azure.cli.core.util import should_disable_connection_verify
     index_url = index_url or DEFAULT_INDEX_URL
 
+    cache = _load_index_cache()
+    headers = {}
+    if cache.get('url') == index_url and cache.get('index') is not None:
+        if cache.get('etag'):
+            headers['If-None-Match'] = cache['etag']
+        if cache.get('lastModified'):
+            headers['If-Modified-Since'] = cache['lastModified']
+
     for try_number in range(TRIES):
         try:
-            response = requests.get(index_url, verify=(not should_disable_connection_verify()))
+            response = requests.get(index_url, verify=(not should_disable_connection_verify()), headers=headers)
+            if response.status_code == 304 and headers:
+                logger.debug('The extension index has not changed, using the copy in %s.', INDEX_CACHE_FILE_NAME)
+                return cache['index']
             if response.status_code == 200:
-                return response.json()
+                index = response.json()
+                _save_index_cache(cache, index_url, response, index)
+                return index
             msg = ERR_TMPL_NON_200.format(response.status_code, index_url)
             raise CLIError(msg)
         except (requests.exceptions.ConnectionError, requests.exceptions.HTTPError) as err:
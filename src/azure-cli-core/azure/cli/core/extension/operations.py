@@ -19,7 +19,8 @@ from pkg_resources import parse_version
 from azure.cli.core.util import CLIError, reload_module
 from azure.cli.core.extension import (extension_exists, get_extension_path, get_extensions, get_extension_modname,
                                       get_extension, ext_compat_with_cli, EXT_METADATA_ISPREVIEW,
-                                      WheelExtension, DevExtension, ExtensionNotInstalledException, WHEEL_INFO_RE)
+                                      WheelExtension, DevExtension, ExtensionNotInstalledException, WHEEL_INFO_RE,
+                                      invalidate_extension_registry)
 from azure.cli.core.telemetry import set_extension_management_detail
 
 from knack.log import get_logger
@@ -153,6 +154,7 @@ def _add_whl_ext(cmd, source, ext_sha256=None, pip_extra_index_urls=None, pip_pr
     dst = os.path.join(extension_path, whl_filename)
     shutil.copyfile(ext_file, dst)
     logger.debug('Saved the whl to %s', dst)
+    invalidate_extension_registry()
 
 
 def is_valid_sha256sum(a_file, expected_sum):
@@ -216,6 +218,7 @@ def add_extension(cmd, source=None, extension_name=None, index_url=None, yes=Non
     _add_whl_ext(cmd=cmd, source=source, ext_sha256=ext_sha256, pip_extra_index_urls=pip_extra_index_urls,
                  pip_proxy=pip_proxy)
     _augment_telemetry_with_ext_info(extension_name)
+    _refresh_extension_records()
     try:
         if extension_name and get_extension(extension_name).preview:
             logger.warning("The installed extension '%s' is in preview.", extension_name)
@@ -238,10 +241,21 @@ def remove_extension(extension_name):
         # We call this just before we remove the extension so we can get the metadata before it is gone
         _augment_telemetry_with_ext_info(extension_name)
         shutil.rmtree(get_extension_path(extension_name), onerror=log_err)
+        _refresh_extension_records()
     except ExtensionNotInstalledException as e:
         raise CLIError(e)
 
 
+def _refresh_extension_records():
+    from azure.cli.core._environment import get_config_dir
+    from azure.cli.core._version_manifest import build_version_manifest
+    invalidate_extension_registry()
+    try:
+        build_version_manifest(get_config_dir())
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.debug('Unable to update the version manifest: %s', ex)
+
+
 def list_extensions():
     return [{OUT_KEY_NAME: ext.name, OUT_KEY_VERSION: ext.version, OUT_KEY_TYPE: ext.ext_type}
             for ext in get_extensions()]
@@ -288,6 +302,7 @@ def update_extension(cmd, extension_name, index_url=None, pip_extra_index_urls=N
             logger.debug('Copying %s to %s', backup_dir, extension_path)
             shutil.copytree(backup_dir, extension_path)
             raise CLIError('Failed to update. Rolled {} back to {}.'.format(extension_name, cur_version))
+        _refresh_extension_records()
     except ExtensionNotInstalledException as e:
         raise CLIError(e)
 
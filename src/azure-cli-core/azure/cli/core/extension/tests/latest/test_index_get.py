@@ -3,6 +3,8 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 import os
+import shutil
+import tempfile
 import mock
 import unittest
 from requests.exceptions import ConnectionError, HTTPError
@@ -13,9 +15,10 @@ from azure.cli.core.extension._index import (get_index, get_index_extensions, DE
 
 
 class MockResponse(object):
-    def __init__(self, status_code, data):
+    def __init__(self, status_code, data, headers=None):
         self.status_code = status_code
         self.data = data
+        self.headers = headers or {}
 
     def json(self):
         if isinstance(self.data, Exception):
@@ -24,7 +27,7 @@ class MockResponse(object):
 
 
 def mock_index_get_generator(index_url, index_data):
-    def mock_req_get(url, verify):
+    def mock_req_get(url, verify, headers=None):  # pylint: disable=unused-argument
         if url == index_url:
             return MockResponse(200, index_data)
         return MockResponse(404, None)
@@ -33,10 +36,33 @@ def mock_index_get_generator(index_url, index_data):
 
 class TestExtensionIndexGet(unittest.TestCase):
 
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.patcher = mock.patch('azure.cli.core._config.GLOBAL_CONFIG_DIR', self.config_dir)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.config_dir)
+
     def test_get_index(self):
         with mock.patch('requests.get', side_effect=mock_index_get_generator(DEFAULT_INDEX_URL, {})):
             self.assertEqual(get_index(), {})
 
+    def test_get_index_revalidates_cached_copy(self):
+        sent_headers = []
+
+        def mock_req_get(url, verify, headers=None):  # pylint: disable=unused-argument
+            sent_headers.append(headers)
+            if headers and headers.get('If-None-Match') == '"1"':
+                return MockResponse(304, None)
+            return MockResponse(200, {'extensions': {'myext': []}}, headers={'ETag': '"1"'})
+
+        with mock.patch('requests.get', side_effect=mock_req_get):
+            self.assertEqual(get_index(), {'extensions': {'myext': []}})
+            self.assertEqual(get_index(), {'extensions': {'myext': []}})
+        self.assertEqual(sent_headers, [{}, {'If-None-Match': '"1"'}])
+
     def test_get_index_404(self):
         bad_index_url = 'http://contoso.com/cli-index'
         with mock.patch('requests.get', side_effect=mock_index_get_generator(DEFAULT_INDEX_URL, {})):
@@ -18,6 +18,7 @@ class DummyCli(AzCli):
         from azure.cli.core.parser import AzCliCommandParser
         from azure.cli.core._config import GLOBAL_CONFIG_DIR, ENV_VAR_PREFIX
         from azure.cli.core._help import AzCliHelp
+        from azure.cli.core._query import AzCliQuery
 
         from knack.completion import ARGCOMPLETE_ENV_NAME
 
@@ -29,12 +30,17 @@ class DummyCli(AzCli):
             parser_cls=AzCliCommandParser,
             logging_cls=AzCliLogging,
             help_cls=AzCliHelp,
-            invocation_cls=AzCliCommandInvoker)
+            invocation_cls=AzCliCommandInvoker,
+            query_cls=AzCliQuery)
 
         self.data['headers'] = {}  # the x-ms-client-request-id is generated before a command is to execute
         self.data['command'] = 'unknown'
         self.data['completer_active'] = ARGCOMPLETE_ENV_NAME in os.environ
         self.data['query_active'] = False
+        # help and completions in tests must reflect the command table of each test
+        self.data['help_store_enabled'] = False
+        self.data['completion_index_enabled'] = False
+        self.data['query_cache_enabled'] = False
 
         loader = self.commands_loader_cls(self)
         setattr(self, 'commands_loader', loader)
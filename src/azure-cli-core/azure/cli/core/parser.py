@@ -7,6 +7,7 @@ from __future__ import print_function
 
 import sys
 import difflib
+import timeit
 
 import argparse
 import argcomplete
@@ -34,6 +35,14 @@ class IncorrectUsageError(CLIError):
 class AzCompletionFinder(argcomplete.CompletionFinder):
 
     def _get_completions(self, comp_words, cword_prefix, cword_prequote, last_wordbreak_pos):
+        from azure.cli.core._completion import log_completion_latency
+        start_time = timeit.default_timer()
+        try:
+            return self._get_all_completions(comp_words, cword_prefix, cword_prequote, last_wordbreak_pos)
+        finally:
+            log_completion_latency('Completion', start_time)
+
+    def _get_all_completions(self, comp_words, cword_prefix, cword_prequote, last_wordbreak_pos):
         external_completions = []
         self._parser.cli_ctx.raise_event(EVENT_INVOKER_ON_TAB_COMPLETION,
                                          external_completions=external_completions,
@@ -157,9 +166,10 @@ class AzCliCommandParser(CLICommandParser):
         super(AzCliCommandParser, self).format_help()
 
     def enable_autocomplete(self):
+        from azure.cli.core._completion import exit_after_background_refresh
         argcomplete.autocomplete = AzCompletionFinder()
         argcomplete.autocomplete(self, validator=lambda c, p: c.lower().startswith(p.lower()),
-                                 default_completer=lambda _: ())
+                                 default_completer=lambda _: (), exit_method=exit_after_background_refresh)
 
     def _check_value(self, action, value):
         # Override to customize the error message when a argument is not among the available choices
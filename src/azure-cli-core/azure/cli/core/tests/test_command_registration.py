@@ -3,6 +3,7 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
 import sys
 import logging
 import mock
@@ -152,9 +153,12 @@ class TestCommandRegistration(unittest.TestCase):
         return ext_name
 
     def _mock_get_extensions():
-        MockExtension = namedtuple('Extension', ['name', 'preview', 'path', 'get_metadata'])
-        return [MockExtension(name=__name__ + '.ExtCommandsLoader', preview=False, path=None, get_metadata=lambda: {}),
-                MockExtension(name=__name__ + '.Ext2CommandsLoader', preview=False, path=None, get_metadata=lambda: {})]
+        MockExtension = namedtuple('Extension', ['name', 'ext_type', 'preview', 'path', 'metadata', 'compatible',
+                                                 'commands'])
+        return [MockExtension(name=__name__ + '.ExtCommandsLoader', ext_type='whl', preview=False, path=None,
+                              metadata={}, compatible=True, commands=None),
+                MockExtension(name=__name__ + '.Ext2CommandsLoader', ext_type='whl', preview=False, path=None,
+                              metadata={}, compatible=True, commands=None)]
 
     def _mock_load_command_loader(loader, args, name, prefix):
 
@@ -220,6 +224,34 @@ class TestCommandRegistration(unittest.TestCase):
         self.assertTrue(isinstance(ext2.command_source, ExtensionCommandSource))
         self.assertTrue(ext2.command_source.overrides_command)
 
+    def _mock_get_extensions_with_commands():
+        MockExtension = namedtuple('Extension', ['name', 'ext_type', 'preview', 'path', 'metadata', 'compatible',
+                                                 'commands'])
+        return [MockExtension(name=name, ext_type='whl', preview=False, path=None, metadata={}, compatible=True,
+                              commands=commands)
+                for name, commands in [('hello-ext', ['hello']), ('other-ext', ['other']), ('arguments-ext', []),
+                                       ('new-ext', None)]]
+
+    @mock.patch('azure.cli.core.extension.get_extensions', _mock_get_extensions_with_commands)
+    @mock.patch('azure.cli.core.extension.set_extension_commands', mock.MagicMock())
+    @mock.patch('azure.cli.core.commands._load_extension_command_loader', return_value=({}, {}))
+    @mock.patch('importlib.import_module', _mock_import_lib)
+    @mock.patch('pkgutil.iter_modules', _mock_iter_modules)
+    @mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader)
+    @mock.patch('azure.cli.core.extension.get_extension_modname', _mock_extension_modname)
+    def test_skip_unrelated_extensions(self, load_extension_mock):
+
+        def _load_extensions(args):
+            load_extension_mock.reset_mock()
+            MainCommandsLoader(DummyCli()).load_command_table(args)
+            return [c[0][2] for c in load_extension_mock.call_args_list]
+
+        # extensions without commands of their own and those not yet loaded are not skipped
+        self.assertEqual(_load_extensions(['hello', 'world']), ['hello-ext', 'arguments-ext', 'new-ext'])
+        self.assertEqual(_load_extensions(['unknown']), ['hello-ext', 'other-ext', 'arguments-ext', 'new-ext'])
+        with mock.patch.dict(os.environ, {'AZURE_EXTENSION_SKIP_UNRELATED': 'false'}):
+            self.assertEqual(_load_extensions(['hello', 'world']), ['hello-ext', 'other-ext', 'arguments-ext', 'new-ext'])
+
     def test_argument_with_overrides(self):
 
         global_vm_name_type = CLIArgumentType(
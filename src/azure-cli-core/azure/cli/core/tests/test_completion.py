@@ -0,0 +1,108 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import mock
+
+from azure.cli.core import _completion
+from azure.cli.core._completion import (CompletionIndex, get_cached_completions, _get_index_candidates,
+                                        run_background_refreshes, COMPLETION_CACHE_TTL)
+from azure.cli.core.mock import DummyCli
+
+
+class TestCompletion(unittest.TestCase):
+
+    def setUp(self):
+        self.cli_ctx = DummyCli()
+        self.cli_ctx.config.config_dir = tempfile.mkdtemp()
+        self.cli_ctx.data['completion_index_enabled'] = True
+        _completion._completion_cache = None  # pylint: disable=protected-access
+
+    def tearDown(self):
+        _completion._completion_cache = None  # pylint: disable=protected-access
+        shutil.rmtree(self.cli_ctx.config.config_dir)
+
+    def test_completion_index_candidates(self):
+        index = CompletionIndex(self.cli_ctx)
+        index.set_entry('', {'options': ['-h', '--help'], 'children': ['vm', 'webapp']})
+        index.set_entry('vm', {'options': ['-h', '--help'], 'children': ['create', 'list']})
+        index.set_entry('vm create', {'options': ['-h', '--help', '--name', '-n']})
+
+        self.assertEqual(_get_index_candidates(index, [], ''), ['-h', '--help', 'vm', 'webapp'])
+        self.assertEqual(_get_index_candidates(index, ['vm'], 'cr'), ['-h', '--help', 'create', 'list'])
+        self.assertEqual(_get_index_candidates(index, ['vm', 'create', '--name', 'x'], '--'),
+                         ['-h', '--help', '--name', '-n'])
+        # argument values, unknown paths and positionals go through the full parser
+        self.assertIsNone(_get_index_candidates(index, ['vm', 'create', '--name'], ''))
+        self.assertIsNone(_get_index_candidates(index, ['vm', 'create'], ''))
+        self.assertIsNone(_get_index_candidates(index, ['network'], ''))
+
+        # the index is dropped when the installation changes
+        with mock.patch('azure.cli.core._help_store.get_installation_fingerprint', return_value='changed'):
+            self.assertIsNone(_get_index_candidates(CompletionIndex(self.cli_ctx), ['vm'], ''))
+
+    @mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub1')
+    def test_cached_completions(self, _):
+        loader = mock.MagicMock(return_value=['a', 'b'])
+        self.assertEqual(get_cached_completions(self.cli_ctx, ['resources', 'type'], loader), ['a', 'b'])
+        self.assertEqual(get_cached_completions(self.cli_ctx, ['resources', 'type'], loader), ['a', 'b'])
+        self.assertEqual(loader.call_count, 1)
+
+        # stale values are returned immediately and refreshed in the background
+        cache = _completion._get_completion_cache(self.cli_ctx)  # pylint: disable=protected-access
+        cache.data['sub1|resources|type']['time'] = time.time() - COMPLETION_CACHE_TTL - 1
+        loader.return_value = ['c']
+        self.assertEqual(get_cached_completions(self.cli_ctx, ['resources', 'type'], loader), ['a', 'b'])
+        self.assertEqual(loader.call_count, 1)
+        run_background_refreshes()
+        self.assertEqual(loader.call_count, 2)
+        self.assertEqual(get_cached_completions(self.cli_ctx, ['resources', 'type'], loader), ['c'])
+
+        # values are cached per subscription
+        with mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub2'):
+            self.assertEqual(get_cached_completions(self.cli_ctx, ['resources', 'type'], loader), ['c'])
+        self.assertEqual(loader.call_count, 3)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'stale values are refreshed in the foreground without fork')
+    def test_exit_before_background_refresh(self):
+        # the shell waits for the completing process to exit and for its output to be closed
+        marker = os.path.join(self.cli_ctx.config.config_dir, 'refreshed')
+        script = """
+import sys, time
+from azure.cli.core import _completion
+
+def _load():
+    time.sleep(3)
+    open(sys.argv[1], 'w').close()
+    return []
+
+_completion._background_refreshes.append((None, 'key', _load))
+_completion._refresh_cached_completions = lambda cli_ctx, key, loader: loader()
+_completion.exit_after_background_refresh(0)
+"""
+        start = time.time()
+        process = subprocess.Popen([sys.executable, '-c', script, marker], stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        process.communicate()
+        self.assertEqual(process.returncode, 0)
+        self.assertLess(time.time() - start, 3)
+        self.assertFalse(os.path.exists(marker))
+
+        # the refresh finishes in a detached process
+        deadline = time.time() + 30
+        while not os.path.exists(marker) and time.time() < deadline:
+            time.sleep(0.1)
+        self.assertTrue(os.path.exists(marker))
+
+
+if __name__ == '__main__':
+    unittest.main()
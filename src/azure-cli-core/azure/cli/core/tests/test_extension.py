@@ -12,7 +12,7 @@ import mock
 
 from azure.cli.core.extension import (get_extensions, get_extension_path, extension_exists,
                                       get_extension, get_extension_names, get_extension_modname, ext_compat_with_cli,
-                                      ExtensionNotInstalledException, WheelExtension,
+                                      set_extension_commands, ExtensionNotInstalledException, WheelExtension,
                                       EXTENSIONS_MOD_PREFIX, EXT_METADATA_MINCLICOREVERSION, EXT_METADATA_MAXCLICOREVERSION)
 
 
@@ -238,5 +238,34 @@ class TestWheelExtension(TestExtensionsBase):
         self.assertTrue(ext.metadata.get(EXT_METADATA_MINCLICOREVERSION))
 
 
+class TestExtensionRegistry(TestExtensionsBase):
+
+    def setUp(self):
+        super(TestExtensionRegistry, self).setUp()
+        self.config_dir = tempfile.mkdtemp()
+        self.config_patcher = mock.patch('azure.cli.core.extension.GLOBAL_CONFIG_DIR', self.config_dir)
+        self.config_patcher.start()
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        shutil.rmtree(self.config_dir, ignore_errors=True)
+        super(TestExtensionRegistry, self).tearDown()
+
+    def test_registry_reused_until_extensions_change(self):
+        _install_test_extension1()
+        self.assertEqual(get_extension(EXT_NAME).version, EXT_VERSION)
+        self.assertTrue(os.path.isfile(os.path.join(self.config_dir, 'extensionRegistry.json')))
+        set_extension_commands(EXT_NAME, ['hello'])
+
+        # a new process reads the registry instead of scanning the extensions
+        with mock.patch('azure.cli.core.extension._registry', None), \
+                mock.patch.object(WheelExtension, 'get_all', side_effect=AssertionError('scanned')):
+            ext = get_extension(EXT_NAME)
+        self.assertEqual((ext.version, ext.compatible, ext.commands), (EXT_VERSION, True, ['hello']))
+
+        shutil.rmtree(get_extension_path(EXT_NAME))
+        self.assertEqual(get_extensions(), [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -327,6 +327,40 @@ class TestHelpLoads(unittest.TestCase):
         with self.assertRaises(SystemExit):
             self.test_cli.invoke(["test", "alpha", "-h"])
 
+    # Mock logic in core.MainCommandsLoader.load_command_table for retrieving installed modules.
+    @mock.patch('pkgutil.iter_modules', side_effect=lambda x: [(None, MOCKED_COMMAND_LOADER_MOD, None)])
+    @mock.patch('azure.cli.core.commands._load_command_loader', side_effect=mock_load_command_loader)
+    def test_help_store(self, mocked_load, mocked_pkg_util):
+        from six import StringIO
+        self.set_help_py()
+        self.test_cli.data['help_store_enabled'] = True
+        self.test_cli.config.config_dir = self._tempdirName
+
+        with mock.patch('sys.stdout', new_callable=StringIO) as rendered:
+            with self.assertRaises(SystemExit):
+                self.test_cli.invoke(["test", "alpha", "-h"])
+        self.assertIn("Foo Bar Baz Command is a fun command", rendered.getvalue())
+        mocked_load.reset_mock()
+
+        # the second request is answered from the help store without loading any command module
+        with mock.patch('sys.stdout', new_callable=StringIO) as stored:
+            self.assertEqual(self.test_cli.invoke(["test", "alpha", "--help"]), 0)
+        self.assertEqual(stored.getvalue(), rendered.getvalue())
+        mocked_load.assert_not_called()
+
+        # the store is dropped when anything the help depends on changes
+        with mock.patch('azure.cli.core._help_store.get_installation_fingerprint', return_value='changed'):
+            self.assertIsNone(self.test_cli.help_cls(self.test_cli).help_store.get(["test", "alpha"]))
+
+    def test_get_help_nouns(self):
+        from azure.cli.core._help_store import get_help_nouns
+        self.assertEqual(get_help_nouns(['vm', 'create', '-h']), ['vm', 'create'])
+        self.assertEqual(get_help_nouns(['--help']), [])
+        self.assertEqual(get_help_nouns(['vm', '--help', '--debug']), ['vm'])
+        self.assertIsNone(get_help_nouns(['vm', 'create', '--name', 'x', '-h']))
+        self.assertIsNone(get_help_nouns(['vm', 'list']))
+        self.assertIsNone(get_help_nouns([]))
+
     # Mock logic in core.MainCommandsLoader.load_command_table for retrieving installed modules.
     @mock.patch('pkgutil.iter_modules', side_effect=lambda x: [(None, MOCKED_COMMAND_LOADER_MOD, None)])
     @mock.patch('azure.cli.core.commands._load_command_loader', side_effect=mock_load_command_loader)
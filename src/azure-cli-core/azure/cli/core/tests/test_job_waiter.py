@@ -0,0 +1,55 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import unittest
+
+from azure.cli.core.commands.job_waiter import wait_for_jobs
+
+
+class TestJobWaiter(unittest.TestCase):
+
+    def setUp(self):
+        # the states each job goes through, one per poll; the last one is repeated
+        self.states = {'job1': ['Queued', 'Running', 'Succeeded'], 'job2': ['Running'] * 3 + ['Failed'],
+                       'job3': ['Running']}
+        self.polls = {}
+        self.lock = threading.Lock()
+
+    def _get_job(self, job_id):
+        with self.lock:
+            count = self.polls[job_id] = self.polls.get(job_id, 0) + 1
+        states = self.states[job_id]
+        return {'id': job_id, 'state': states[min(count, len(states)) - 1]}
+
+    def _wait(self, job_ids, **kwargs):
+        transitions = []
+        result = wait_for_jobs(job_ids, self._get_job, lambda job: job['state'],
+                               lambda job: job['state'] in ('Succeeded', 'Failed'), min_interval=0.01,
+                               max_interval=0.04, on_transition=lambda *args: transitions.append(args[:1] + args[2:]),
+                               **kwargs)
+        return result, transitions
+
+    def test_wait_for_jobs(self):
+        result, transitions = self._wait(['job1', 'job2', 'job1'])
+        self.assertEqual([j['state'] for j in result.jobs], ['Succeeded', 'Failed'])
+        self.assertEqual(result.timed_out, [])
+        self.assertEqual([t for t in transitions if t[0] == 'job1'],
+                         [('job1', None, 'Queued'), ('job1', 'Queued', 'Running'), ('job1', 'Running', 'Succeeded')])
+        self.assertEqual([t for t in transitions if t[0] == 'job2'],
+                         [('job2', None, 'Running'), ('job2', 'Running', 'Failed')])
+        # jobs which are done are not polled again
+        self.assertEqual(self.polls, {'job1': 3, 'job2': 4})
+
+    def test_wait_for_jobs_deadline(self):
+        result, _ = self._wait(['job1', 'job3'], timeout=0.2)
+        self.assertEqual(result.timed_out, ['job3'])
+        self.assertEqual([j['state'] for j in result.jobs], ['Succeeded', 'Running'])
+        # the polling interval of an unchanged job backs off to max_interval
+        self.assertLess(self.polls['job3'], 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from azure.cli.core.commands import cached_get, cached_put, _evict_cache_entries
+from azure.cli.core.mock import DummyCli
+
+
+class _NotModifiedError(Exception):
+
+    def __init__(self):
+        super(_NotModifiedError, self).__init__('Not Modified')
+        self.response = mock.MagicMock(status_code=304)
+
+
+class TestObjectCache(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.patches = [
+            mock.patch('azure.cli.core._environment.get_config_dir', return_value=self.config_dir),
+            mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub1'),
+            mock.patch.dict(os.environ, {'AZURE_CORE_OBJECT_CACHE': 'true'})
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.cmd = mock.MagicMock(command_kwargs={}, cli_ctx=DummyCli())
+        self.sent_headers = []
+        self.server_etag = '"1"'
+        self.server_location = 'westus'
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        shutil.rmtree(self.config_dir)
+
+    def _get_site(self, resource_group_name, name, custom_headers=None, raw=False, **operation_config):
+        """
+        :return: Site or ClientRawResponse if raw=true
+        :rtype: ~azure.mgmt.web.models.Site
+        """
+        from azure.mgmt.web.models import Site
+        self.sent_headers.append(custom_headers)
+        if custom_headers and custom_headers.get('If-None-Match') == self.server_etag:
+            raise _NotModifiedError()
+        site = Site(location=self.server_location)
+        response = mock.MagicMock(headers={'ETag': self.server_etag})
+        return mock.MagicMock(output=site, response=response) if raw else site
+
+    def _put_site(self, resource_group_name, name, parameters, custom_headers=None, raw=False, **operation_config):
+        """
+        :return: Site or ClientRawResponse if raw=true
+        :rtype: ~azure.mgmt.web.models.Site
+        """
+        return parameters
+
+    def test_cached_get_revalidates_with_etag(self):
+        site = cached_get(self.cmd, self._get_site, resource_group_name='rg1', name='site1')
+        self.assertEqual(site.location, 'westus')
+        self.assertEqual(self.sent_headers, [None])
+
+        # unchanged: the service answers 304 and the cached copy is used
+        site = cached_get(self.cmd, self._get_site, resource_group_name='rg1', name='site1')
+        self.assertEqual(site.location, 'westus')
+        self.assertEqual(self.sent_headers[-1], {'If-None-Match': '"1"'})
+
+        # changed: the new object replaces the cached copy
+        self.server_etag, self.server_location = '"2"', 'eastus'
+        site = cached_get(self.cmd, self._get_site, resource_group_name='rg1', name='site1')
+        self.assertEqual(site.location, 'eastus')
+        self.assertEqual(self.sent_headers[-1], {'If-None-Match': '"1"'})
+        cached_get(self.cmd, self._get_site, resource_group_name='rg1', name='site1')
+        self.assertEqual(self.sent_headers[-1], {'If-None-Match': '"2"'})
+
+        # a successful PUT drops the cached copy as the result carries no ETag
+        cached_put(self.cmd, self._put_site, site, resource_group_name='rg1', name='site1')
+        cached_get(self.cmd, self._get_site, resource_group_name='rg1', name='site1')
+        self.assertEqual(self.sent_headers[-1], None)
+
+    def test_cached_put_without_resource_group(self):
+        def _put_vault(vault_name, parameters):
+            """
+            :return: Vault
+            :rtype: ~azure.mgmt.keyvault.models.Vault
+            """
+            return parameters
+
+        # the cache entry cannot be located, which must not fail the successful PUT
+        result = cached_put(self.cmd, _put_vault, 'vault', vault_name='vault1')
+        self.assertEqual(result, 'vault')
+
+    def test_cached_get_disabled(self):
+        with mock.patch.dict(os.environ, {'AZURE_CORE_OBJECT_CACHE': 'false'}):
+            cached_get(self.cmd, self._get_site, resource_group_name='rg1', name='site1')
+            cached_get(self.cmd, self._get_site, resource_group_name='rg1', name='site1')
+        self.assertEqual(self.sent_headers, [None, None])
+        self.assertFalse(os.path.exists(os.path.join(self.config_dir, 'object_cache')))
+
+    def test_evict_least_recently_used(self):
+        directory = os.path.join(self.config_dir, 'object_cache', 'AzureCloud', 'sub1', 'rg1', 'Site')
+        os.makedirs(directory)
+        payload = 'x' * 400 * 1024
+        for index, name in enumerate(['deferred', 'old', 'used', 'new']):
+            file_path = os.path.join(directory, '{}.json'.format(name))
+            with open(file_path, 'w') as f:
+                f.write(json.dumps({'deferred': name == 'deferred', '_payload': payload}))
+            os.utime(file_path, (index, index))
+
+        with mock.patch.dict(os.environ, {'AZURE_CORE_OBJECT_CACHE_MAX_SIZE': '1'}):
+            _evict_cache_entries(self.cmd.cli_ctx)
+        self.assertEqual(sorted(os.listdir(directory)), ['deferred.json', 'new.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -144,9 +144,12 @@ class TestParser(unittest.TestCase):
         return ext_name
 
     def _mock_get_extensions():
-        MockExtension = namedtuple('Extension', ['name', 'preview', 'path', 'get_metadata'])
-        return [MockExtension(name=__name__ + '.ExtCommandsLoader', preview=False, path=None, get_metadata=lambda: {}),
-                MockExtension(name=__name__ + '.Ext2CommandsLoader', preview=False, path=None, get_metadata=lambda: {})]
+        MockExtension = namedtuple('Extension', ['name', 'ext_type', 'preview', 'path', 'metadata', 'compatible',
+                                                 'commands'])
+        return [MockExtension(name=__name__ + '.ExtCommandsLoader', ext_type='whl', preview=False, path=None,
+                              metadata={}, compatible=True, commands=None),
+                MockExtension(name=__name__ + '.Ext2CommandsLoader', ext_type='whl', preview=False, path=None,
+                              metadata={}, compatible=True, commands=None)]
 
     def _mock_load_command_loader(loader, args, name, prefix):
         from enum import Enum
@@ -0,0 +1,117 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from azure.cli.core.commands.perf_report import (PerfReport, get_operation_name, instrument_mgmt_client,
+                                                 emit_perf_report)
+from azure.cli.core.mock import DummyCli
+
+
+class TestPerfReport(unittest.TestCase):
+
+    def test_get_operation_name(self):
+        self.assertEqual(
+            get_operation_name('GET', 'https://management.azure.com/subscriptions/sub1/resourceGroups/rg1/providers/'
+                                      'Microsoft.Web/sites/app1/config/web?api-version=2018-02-01'),
+            ('management.azure.com',
+             'GET /subscriptions/{}/resourceGroups/{}/providers/Microsoft.Web/sites/{}/config/{}'))
+        self.assertEqual(
+            get_operation_name('GET', 'https://management.azure.com/subscriptions/sub1/providers/Microsoft.Web/sites'),
+            ('management.azure.com', 'GET /subscriptions/{}/providers/Microsoft.Web/sites'))
+        self.assertEqual(get_operation_name('PUT', 'https://myvault.vault.azure.net/secrets/mysecret'),
+                         ('myvault.vault.azure.net', 'PUT /secrets/...'))
+
+    def test_perf_report_summary(self):
+        report = PerfReport(command='webapp list', output_format='table')
+        url = 'https://management.azure.com/subscriptions/sub1/resourceGroups/{}/providers/Microsoft.Web/sites'
+        report.record_request('GET', url.format('rg1'), 200, 0.2, 0, 1000)
+        report.record_request('GET', url.format('rg2'), 429, 0.04, 0, 10)
+        report.record_request('GET', url.format('rg3'), 200, 3, 0, 500)
+        report.record_retry(429)
+        report.record_token(0.5)
+        report.record_lro(12, 4)
+        # jobs of a command share the report of the command
+        self.assertIs(copy.deepcopy({'perf_report': report})['perf_report'], report)
+
+        result = report.to_dict()
+        self.assertEqual(result['requests'], 3)
+        self.assertEqual(result['errors'], 1)
+        self.assertEqual(result['throttled'], 2)
+        self.assertEqual(result['retries'], 1)
+        self.assertEqual(result['bytesIn'], 1510)
+        self.assertEqual(result['tokenRequests'], 1)
+        self.assertEqual((result['longRunningOperations'], result['longRunningOperationPolls']), (1, 4))
+        operation = result['operations'][0]
+        self.assertEqual(operation['count'], 3)
+        self.assertEqual(operation['p50Seconds'], 0.2)
+        self.assertEqual(operation['maxSeconds'], 3)
+        self.assertEqual(operation['histogram']['le_0.05'], 1)
+        self.assertEqual(operation['histogram']['le_2.5'], 2)
+        self.assertEqual(operation['histogram']['le_inf'], 3)
+        self.assertIn('<=0.25s: 1', report.to_table())
+
+    def test_perf_report_mgmt_client(self):
+        from msrest import Configuration, ServiceClient
+        from msrest.authentication import BasicTokenAuthentication
+        import requests
+
+        cli_ctx = DummyCli()
+        report = cli_ctx.data['perf_report'] = PerfReport(command='test')
+        config = Configuration('https://management.azure.com')
+        config.credentials = BasicTokenAuthentication({'access_token': 'token'})
+        client = mock.MagicMock()
+        client.config = config
+        instrument_mgmt_client(cli_ctx, client)
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"value": []}'  # pylint: disable=protected-access
+        response.headers['Content-Length'] = '13'
+        with mock.patch('requests.adapters.HTTPAdapter.send', return_value=response) as send:
+            send.side_effect = lambda request, **kwargs: setattr(response, 'request', request) or response
+            service_client = ServiceClient(config.credentials, config)
+            request = service_client.get('/subscriptions/sub1/resourcegroups')
+            service_client.send(request)
+
+        result = report.to_dict()
+        self.assertEqual(result['requests'], 1)
+        self.assertEqual(result['bytesIn'], 13)
+        self.assertEqual(result['tokenRequests'], 1)
+        self.assertEqual(result['operations'][0]['operation'], 'GET /subscriptions/{}/resourcegroups')
+
+        # retries are counted by the retry policy of the client
+        retry = config.retry_policy.policy
+        retry = retry.increment('GET', '/', error=Exception())
+        self.assertEqual(report.to_dict()['retries'], 1)
+
+    def test_emit_perf_report_to_metrics_file(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cli_ctx = DummyCli()
+            metrics_file = os.path.join(temp_dir, 'metrics.jsonl')
+            cli_ctx.data['perf_report'] = PerfReport(command='vm list')
+            cli_ctx.data['perf_report'].record_request('GET', 'https://management.azure.com/subscriptions/s1', 200, 1)
+            with mock.patch.object(cli_ctx.config, 'get', return_value=metrics_file):
+                emit_perf_report(cli_ctx)
+            self.assertIsNone(cli_ctx.data['perf_report'])
+            with open(metrics_file) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(lines[0]['command'], 'vm list')
+            self.assertEqual(lines[0]['requests'], 1)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
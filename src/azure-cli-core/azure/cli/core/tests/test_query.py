@@ -0,0 +1,126 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+
+import mock
+from jmespath import Options
+from msrest.paging import Paged
+from six import StringIO
+
+from azure.cli.core import AzCommandsLoader, _query
+from azure.cli.core._query import compile_query, ItemQuery
+from azure.cli.core.commands import AzCliCommand
+from azure.cli.core.mock import DummyCli
+
+ITEMS = [{'name': 'vm{}'.format(i), 'location': 'westus' if i % 3 else 'eastus',
+          'tags': {'env': 'ci'} if i % 2 else None, 'disks': [{'size': i}, {'size': i * 2}]} for i in range(10)]
+ITEM_QUERIES = ["[?location=='westus']", "[?location=='westus'].name", "[].{n: name, env: tags.env}",
+                "[*].disks[0].size", "[?tags.env=='ci'].name | sort(@) | [-1]", "[?location=='eastus'] | length(@)",
+                "[][?size > `10`]"]
+LIST_QUERIES = ["[0]", "[*].disks[].size", "length(@)", "sort_by(@, &name)[].name", "[1:3]", "{first: [0].name}"]
+
+
+class _Paged(Paged):
+
+    def __init__(self, pages):
+        super(_Paged, self).__init__(None, {})
+        self.pages = list(pages)
+
+    def advance_page(self):
+        if not self.pages:
+            raise StopIteration()
+        self.current_page = self.pages.pop(0)
+        self._current_page_iter_index = 0
+        return self.current_page
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        _query._compiled_queries.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        _query._compiled_queries.clear()
+
+    def test_compile_query_cache(self):
+        query = "[?location=='westus'].{name: name, size: disks[0].size}"
+        expected = compile_query(query, self.cache_dir).search(ITEMS)
+        path = _query._get_query_cache_path(self.cache_dir, query)  # pylint: disable=protected-access
+        os.utime(path, (1, 1))
+
+        # other processes read the expression from the config directory, without writing it again
+        _query._compiled_queries.clear()
+        with mock.patch('jmespath.parser.Parser.parse') as parse, \
+                mock.patch('azure.cli.core._session._replace_file') as replace_file:
+            compiled = compile_query(query, self.cache_dir)
+            self.assertIs(compile_query(query, self.cache_dir), compiled)
+            parse.assert_not_called()
+            replace_file.assert_not_called()
+        self.assertEqual(compiled.search(ITEMS), expected)
+        # the time of the last use is refreshed
+        self.assertGreater(os.path.getmtime(path), 1)
+
+    def test_query_cache_evicts_least_recently_used(self):
+        queries = ['[?size > `{}`]'.format(i) for i in range(3)]
+        with mock.patch('azure.cli.core._query.QUERY_CACHE_SIZE', 2):
+            for index, query in enumerate(queries[:2]):
+                _query._parse_query(query, self.cache_dir)  # pylint: disable=protected-access
+                path = _query._get_query_cache_path(self.cache_dir, query)  # pylint: disable=protected-access
+                os.utime(path, (index + 1, index + 1))
+            # the first expression is used again, so the second one is removed
+            _query._parse_query(queries[0], self.cache_dir)  # pylint: disable=protected-access
+            _query._parse_query(queries[2], self.cache_dir)  # pylint: disable=protected-access
+
+        cached = [os.path.exists(_query._get_query_cache_path(self.cache_dir, q))  # pylint: disable=protected-access
+                  for q in queries]
+        self.assertEqual(cached, [True, False, True])
+
+    def test_item_query(self):
+        for query in ITEM_QUERIES:
+            expression = compile_query(query)
+            item_query = ItemQuery.from_expression(expression)
+            self.assertIsNotNone(item_query, query)
+            converted = []
+            result = item_query.search_items(iter(ITEMS), lambda item: converted.append(item) or item)
+            self.assertEqual(result, expression.search(ITEMS, Options(OrderedDict)), query)
+            self.assertEqual(converted, ITEMS)
+        for query in LIST_QUERIES:
+            self.assertIsNone(ItemQuery.from_expression(compile_query(query)), query)
+
+    def test_query_paged_result(self):
+        resource_id = '/subscriptions/sub1/resourceGroups/{}/providers/Microsoft.Compute/virtualMachines/{}'
+        items = [dict(item, id=resource_id.format('rg{}'.format(i % 2), item['name'])) for i, item in enumerate(ITEMS)]
+
+        def _handler(args):  # pylint: disable=unused-argument
+            return _Paged([items[:4], items[4:]])
+
+        class TestCommandsLoader(AzCommandsLoader):
+
+            def load_command_table(self, args):
+                super(TestCommandsLoader, self).load_command_table(args)
+                self.command_table = {'test': AzCliCommand(self, 'test', _handler)}
+                return self.command_table
+
+        # resourceGroup is added by the result transforms
+        for query, item_query in [("[?resourceGroup=='rg1'].name", True), ("[3:5].resourceGroup", False)]:
+            cli = DummyCli(commands_loader_cls=TestCommandsLoader)
+            output = StringIO()
+            self.assertEqual(cli.invoke(['test', '--query', query, '-o', 'json'], out_file=output), 0)
+            self.assertEqual(bool(cli.invocation.data.get('query_applied')), item_query)
+            expected = compile_query(query).search([dict(item, resourceGroup='rg{}'.format(i % 2))
+                                                    for i, item in enumerate(items)])
+            self.assertEqual(json.loads(output.getvalue()), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
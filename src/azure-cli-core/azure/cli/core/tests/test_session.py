@@ -0,0 +1,111 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from codecs import open as codecs_open
+
+import mock
+
+from azure.cli.core._session import Session
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'az.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self):
+        with codecs_open(self.filename, 'r', encoding='utf-8-sig') as f:
+            return json.load(f)
+
+    def test_session_saves_on_modification(self):
+        session = Session()
+        session.load(self.filename)
+        session['key1'] = 'value1'
+        self.assertEqual(self._read(), {'key1': 'value1'})
+        del session['key1']
+        self.assertEqual(self._read(), {})
+        # only the session file and its lock are left, the temporary files are renamed over the session file
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['az.json', 'az.json.lock'])
+
+    def test_deferred_session_flush_merges_changes(self):
+        session = Session(deferred=True)
+        session.load(self.filename)
+        session['key1'] = 'value1'
+        session['key2'] = 'value2'
+        self.assertFalse(os.path.exists(self.filename))
+
+        # another process modifies the file in the meantime
+        other = Session()
+        other.load(self.filename)
+        other['key2'] = 'other2'
+        other['key3'] = 'other3'
+
+        del session['key2']
+        session.flush()
+        self.assertEqual(self._read(), {'key1': 'value1', 'key3': 'other3'})
+        self.assertEqual(session.data, {'key1': 'value1', 'key3': 'other3'})
+
+    def test_session_unchanged_content_not_written(self):
+        session = Session()
+        session.load(self.filename)
+        session['key1'] = 'value1'
+        with mock.patch('azure.cli.core._session._replace_file') as replace_file:
+            session['key1'] = 'value1'
+            session.save()
+            self.assertFalse(replace_file.called)
+            session['key1'] = 'value2'
+            self.assertTrue(replace_file.called)
+
+    def test_flush_with_command(self):
+        from azure.cli.core import _session
+        session = Session(deferred=True)
+        session.load(self.filename)
+        with mock.patch.object(_session, '_command_sessions', []):
+            self.assertIs(_session.flush_with_command(session), session)
+            _session.flush_with_command(session)
+            self.assertEqual(len(_session._command_sessions), 1)  # pylint: disable=protected-access
+            session['key1'] = 'value1'
+            self.assertFalse(os.path.exists(self.filename))
+            _session.flush_sessions()
+        self.assertEqual(self._read(), {'key1': 'value1'})
+
+    def test_expiring_cache(self):
+        from azure.cli.core._session import ExpiringCache
+        with mock.patch('time.time', return_value=1000):
+            cache = ExpiringCache(self.filename, 60)
+            cache.set('key1', 'value1')
+            self.assertEqual(cache.get('key1'), 'value1')
+            self.assertFalse(os.path.exists(self.filename))
+            cache.save()
+        with mock.patch('time.time', return_value=1030):
+            cache = ExpiringCache(self.filename, 60)
+            self.assertEqual(cache.get('key1'), 'value1')
+            cache.set('key2', 'value2')
+            cache.save()
+        # expired entries are dropped when the cache is loaded
+        with mock.patch('time.time', return_value=1070):
+            cache = ExpiringCache(self.filename, 60)
+            self.assertIsNone(cache.get('key1'))
+            self.assertEqual(cache.get('key2'), 'value2')
+
+        # a ttl of 0 disables the cache
+        cache = ExpiringCache(self.filename, 0)
+        cache.set('key3', 'value3')
+        cache.save()
+        self.assertIsNone(cache.get('key2'))
+        self.assertNotIn('key3', self._read())
+
+
+if __name__ == '__main__':
+    unittest.main()
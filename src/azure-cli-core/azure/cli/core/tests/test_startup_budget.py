@@ -0,0 +1,157 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Startup budget regression tests.
+
+Each command below is run with `az --profile-startup` and the import count of every startup phase, including each
+command module, is compared with the budget recorded in data/startup_budget.json. Load times vary too much between
+machines to be budgeted. The counts depend on the installed command modules, so the budget test only runs when
+AZURE_CLI_TEST_STARTUP_BUDGET is set and the installed command modules are those the budget was recorded with.
+After an intended change, re-record the budget with all command modules installed:
+
+    python -m azure.cli.core.tests.test_startup_budget --record
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+STARTUP_BUDGET_FILE = os.path.join(TEST_DIR, 'data', 'startup_budget.json')
+
+PROFILED_COMMANDS = ['-h', 'webapp create -h', 'acr build -h']
+# headroom given when recording, so the budget catches regressions rather than noise
+IMPORT_BUDGET_FACTOR = 1.1
+MIN_IMPORT_BUDGET_SLACK = 5
+RUN_STARTUP_BUDGET_TEST = bool(os.environ.get('AZURE_CLI_TEST_STARTUP_BUDGET'))
+
+
+def get_installed_command_modules():
+    import pkgutil
+    import azure.cli.command_modules
+    return sorted(name for _, name, _ in pkgutil.iter_modules(azure.cli.command_modules.__path__))
+
+
+def get_startup_profile(command):
+    """Run a command with the startup profiler in a clean configuration. Return {phase: (seconds, imports)},
+    or None if the command failed, e.g. because its command module is not installed."""
+    from azure.cli.core._startup_profiler import STARTUP_PROFILE_FLAG, CATEGORY_PHASE
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        trace_file = os.path.join(temp_dir, 'trace.json')
+        env = dict(os.environ)
+        env.update({
+            'AZURE_CONFIG_DIR': temp_dir,
+            'AZURE_EXTENSION_DIR': os.path.join(temp_dir, 'cliextensions'),
+            'AZURE_CORE_COLLECT_TELEMETRY': 'false',
+            'AZURE_CORE_USE_HELP_STORE': 'false'
+        })
+        args = [sys.executable, '-m', 'azure.cli', '{}={}'.format(STARTUP_PROFILE_FLAG, trace_file)] + command.split()
+        with open(os.devnull, 'w') as devnull:
+            exit_code = subprocess.call(args, env=env, stdout=devnull, stderr=devnull)
+        if exit_code or not os.path.isfile(trace_file):
+            return None
+        with open(trace_file) as f:
+            events = json.load(f)['traceEvents']
+    finally:
+        shutil.rmtree(temp_dir)
+
+    profile = {}
+    for event in events:
+        if event.get('cat') == CATEGORY_PHASE:
+            seconds, imports = profile.get(event['name'], (0, 0))
+            profile[event['name']] = (seconds + event['dur'] / 1e6, imports + event['args']['imports'])
+    return profile
+
+
+def record_startup_budget():
+    budget = {'command_modules': get_installed_command_modules(), 'commands': {}}
+    for command in PROFILED_COMMANDS:
+        profile = get_startup_profile(command)
+        if profile is None:
+            print("Skipping '{}': the command failed.".format(command), file=sys.stderr)
+            continue
+        budget['commands'][command] = {
+            name: max(int(imports * IMPORT_BUDGET_FACTOR), imports + MIN_IMPORT_BUDGET_SLACK)
+            for name, (_, imports) in profile.items()}
+    with open(STARTUP_BUDGET_FILE, 'w') as f:
+        json.dump(budget, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print('Startup budget written to {}'.format(STARTUP_BUDGET_FILE))
+
+
+class TestStartupProfiler(unittest.TestCase):
+
+    def test_pop_startup_profile_arg(self):
+        from azure.cli.core._startup_profiler import pop_startup_profile_arg, STARTUP_PROFILE_FILE_NAME
+
+        self.assertEqual(pop_startup_profile_arg(['vm', 'list']), (['vm', 'list'], None))
+        self.assertEqual(pop_startup_profile_arg(['--profile-startup', 'vm', 'list']),
+                         (['vm', 'list'], STARTUP_PROFILE_FILE_NAME))
+        self.assertEqual(pop_startup_profile_arg(['vm', 'list', '--profile-startup=trace.json']),
+                         (['vm', 'list'], 'trace.json'))
+
+    def test_startup_profiler_trace(self):
+        from azure.cli.core._startup_profiler import (start_startup_profiler, stop_startup_profiler,
+                                                      startup_phase)
+
+        start_startup_profiler()
+        try:
+            with startup_phase('outer', command='vm list'):
+                with startup_phase('inner'):
+                    import azure.cli.core.tests.test_startup_budget  # pylint: disable=unused-variable
+                    sys.modules.pop('json.tool', None)
+                    import json.tool  # pylint: disable=unused-variable
+        finally:
+            profiler = stop_startup_profiler()
+
+        events = profiler.to_trace()['traceEvents']
+        phases = [e for e in events if e.get('cat') == 'phase']
+        self.assertEqual([e['name'] for e in phases], ['outer', 'inner'])
+        self.assertEqual(phases[0]['args'], {'command': 'vm list', 'imports': 1})
+        self.assertTrue(phases[0]['ts'] <= phases[1]['ts'])
+        self.assertTrue(phases[0]['dur'] >= phases[1]['dur'])
+        # only imports which load a module are recorded
+        self.assertEqual([e['name'] for e in events if e.get('cat') == 'import'], ['json.tool'])
+
+
+@unittest.skipUnless(RUN_STARTUP_BUDGET_TEST, 'set AZURE_CLI_TEST_STARTUP_BUDGET to check the startup budget')
+class TestStartupBudget(unittest.TestCase):
+
+    def test_startup_budget(self):
+        with open(STARTUP_BUDGET_FILE) as f:
+            budget = json.load(f)
+        if get_installed_command_modules() != budget['command_modules']:
+            self.skipTest('The installed command modules differ from those the startup budget was recorded with.')
+
+        violations = []
+        for command, phases in sorted(budget['commands'].items()):
+            profile = get_startup_profile(command)
+            if profile is None:
+                continue
+            for name, limit in sorted(phases.items()):
+                if name not in profile:
+                    continue
+                imports = profile[name][1]
+                if imports > limit:
+                    violations.append("az {}: {} imported {} modules, budget is {}".format(
+                        command, name, imports, limit))
+        self.assertFalse(violations, 'Startup budget exceeded:\n{}\nIf this is intended, re-record the budget with '
+                                     'python -m azure.cli.core.tests.test_startup_budget --record'
+                         .format('\n'.join(violations)))
+
+
+if __name__ == '__main__':
+    if '--record' in sys.argv:
+        record_startup_budget()
+    else:
+        unittest.main()
@@ -0,0 +1,89 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+azure.cli.core.util.todict must convert objects as knack.util.todict does. The SDK models are deserialized from
+data/todict_corpus.json, built from the responses of the scenario test recordings with
+`python scripts/performance/todict_benchmark.py corpus`.
+"""
+
+import datetime
+import enum
+import json
+import os
+import unittest
+from collections import namedtuple, OrderedDict
+
+import mock
+from knack.util import todict as knack_todict
+from msrest import Deserializer
+
+from azure.cli.core.commands import AzCliCommandInvoker
+from azure.cli.core.util import todict
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data', 'todict_corpus.json')
+
+
+class _Color(enum.Enum):
+    red = 'Red'
+
+
+class _Item(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+    def callback(self):
+        pass
+
+
+def _load_models():
+    from azure.mgmt.resource.locks import models as lock_models
+    from azure.mgmt.resource.resources import models as resource_models
+
+    classes = {k: v for module in [resource_models, lock_models] for k, v in vars(module).items()
+               if isinstance(v, type)}
+    deserialize = Deserializer(classes)
+    with open(CORPUS_FILE) as f:
+        return [deserialize(entry['model'], entry['body']) for entry in json.load(f)]
+
+
+class TestTodict(unittest.TestCase):
+
+    def _assert_parity(self, obj):
+        for post_processor in [None, AzCliCommandInvoker.remove_additional_prop_layer]:
+            expected = knack_todict(obj, post_processor)
+            actual = todict(obj, post_processor)
+            self.assertEqual(actual, expected)
+            # the key order is preserved as well
+            self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+    def test_todict_sdk_models(self):
+        models = _load_models()
+        self.assertEqual(len(set(type(m).__name__ for m in models)), 5)
+        self._assert_parity(models)
+
+        # attributes removed or added by the commands
+        for model in models[:3]:
+            model.extra_property = {'nested_value': _Color.red}
+            del model.id
+        self._assert_parity(models)
+
+    def test_todict_values(self):
+        point = namedtuple('Point', 'x_value y_value')
+        obj = _Item(
+            name='item', count=3, ratio=0.5, enabled=True, missing=None, color=_Color.red,
+            created_at=datetime.datetime(2019, 6, 1, 12, 30), day=datetime.date(2019, 6, 1),
+            at_time=datetime.time(12, 30), duration=datetime.timedelta(minutes=90), point=point(1, 2),
+            values_list=[1, 'a', [_Color.red, None]], values_tuple=(1, 2), ordered=OrderedDict([('b_key', 1)]),
+            nested_item=_Item(inner_value=_Item(deepest=[datetime.timedelta(0)])), _private=1,
+            handler=len)
+        self._assert_parity(obj)
+        self._assert_parity([obj, {'key_name': obj}, 'text', 42])
+        self._assert_parity(mock.MagicMock(spec=['attribute_one']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@
 
 # pylint: disable=line-too-long
 from collections import namedtuple
+import os
 import sys
 import unittest
 import mock
@@ -319,6 +320,43 @@ class TestHandleException(unittest.TestCase):
             self.assertEqual(config.use_local_config, False)
         self.assertTrue(config.use_local_config)
 
+    @mock.patch('azure.cli.core.extension.get_extensions', autospec=True)
+    @mock.patch('azure.cli.core.util.get_installed_cli_distributions', autospec=True)
+    @mock.patch('azure.cli.core._version_manifest._start_refresh', autospec=True)
+    def test_get_az_version_string(self, start_refresh_mock, get_distributions_mock, get_extensions_mock):
+        import shutil
+        import time
+        from azure.cli.core._session import Session
+        from azure.cli.core.util import get_az_version_string
+
+        Dist = namedtuple('Dist', ['key', 'version'])
+        Ext = namedtuple('Ext', ['name', 'version', 'ext_type', 'path'])
+        get_distributions_mock.return_value = [Dist('azure-cli', '2.0.66'), Dist('azure-cli-core', '2.0.66'),
+                                               Dist('azure-cli-vm', '2.2.22')]
+        get_extensions_mock.return_value = [Ext('aks-preview', '0.4.1', 'whl', '/ext/aks-preview')]
+        config_dir = tempfile.mkdtemp()
+        try:
+            with mock.patch('azure.cli.core._environment.get_config_dir', return_value=config_dir):
+                version_string, updates_available = get_az_version_string()
+                self.assertIn('vm'.ljust(20) + '2.2.22'.rjust(20), version_string)
+                self.assertIn('aks-preview'.ljust(20) + '0.4.1'.rjust(20), version_string)
+                # the latest versions are not known yet, they are retrieved in the background
+                self.assertEqual(updates_available, -1)
+                self.assertEqual(start_refresh_mock.call_count, 1)
+
+                # the manifest is read rather than scanning the installation again
+                latest_versions = Session()
+                latest_versions.load(os.path.join(config_dir, 'latestVersions.json'))
+                latest_versions.data = {'time': time.time(), 'success': True, 'versions': {'vm': '2.2.23'}}
+                latest_versions.save()
+                version_string, updates_available = get_az_version_string()
+                self.assertIn('2.2.22'.rjust(20) + ' *', version_string)
+                self.assertEqual(updates_available, 1)
+                self.assertEqual(get_distributions_mock.call_count, 1)
+                self.assertEqual(start_refresh_mock.call_count, 1)
+        finally:
+            shutil.rmtree(config_dir)
+
     @mock.patch('requests.request', autospec=True)
     def test_send_raw_requests(self, request_mock):
         from azure.cli.core.commands.client_factory import UA_AGENT
@@ -12,7 +12,7 @@ import binascii
 import six
 
 from knack.log import get_logger
-from knack.util import CLIError, to_snake_case
+from knack.util import CLIError, to_snake_case, to_camel_case
 
 logger = get_logger(__name__)
 
@@ -84,52 +84,26 @@ def get_installed_cli_distributions():
     return [d for d in list(working_set) if d.key == CLI_PACKAGE_NAME or d.key.startswith(COMPONENT_PREFIX)]
 
 
-def _update_latest_from_pypi(versions):
-    from subprocess import check_output, STDOUT, CalledProcessError
-
-    success = False
-
-    if not check_connectivity(max_retries=0):
-        return versions, success
-
-    try:
-        cmd = [sys.executable] + \
-            '-m pip search azure-cli -vv --disable-pip-version-check --no-cache-dir --retries 0'.split()
-        logger.debug('Running: %s', cmd)
-        log_output = check_output(cmd, stderr=STDOUT, universal_newlines=True)
-        success = True
-        for line in log_output.splitlines():
-            if not line.startswith(CLI_PACKAGE_NAME):
-                continue
-            comps = line.split()
-            mod = comps[0].replace(COMPONENT_PREFIX, '') or CLI_PACKAGE_NAME
-            version = comps[1].replace('(', '').replace(')', '')
-            try:
-                versions[mod]['pypi'] = version
-            except KeyError:
-                pass
-    except CalledProcessError:
-        pass
-    return versions, success
-
-
 def get_az_version_string():
     import platform
-    from azure.cli.core.extension import get_extensions, EXTENSIONS_DIR, DEV_EXTENSION_SOURCES
+    from azure.cli.core._environment import get_config_dir
+    from azure.cli.core._version_manifest import (get_version_manifest, get_latest_versions,
+                                                  DEFAULT_VERSION_CHECK_TTL)
+    from azure.cli.core.extension import az_config, EXTENSIONS_DIR, DEV_EXTENSION_SOURCES
 
     output = six.StringIO()
-    versions = {}
 
     # get locally installed versions
-    for dist in get_installed_cli_distributions():
-        if dist.key == CLI_PACKAGE_NAME:
-            versions[CLI_PACKAGE_NAME] = {'local': dist.version}
-        elif dist.key.startswith(COMPONENT_PREFIX):
-            comp_name = dist.key.replace(COMPONENT_PREFIX, '')
-            versions[comp_name] = {'local': dist.version}
-
-    # get the versions from pypi
-    versions, success = _update_latest_from_pypi(versions)
+    manifest = get_version_manifest(get_config_dir())
+    versions = {name: {'local': version} for name, version in manifest['components'].items()}
+
+    # get the latest versions last recorded from pypi
+    latest_versions = get_latest_versions(
+        get_config_dir(), az_config.getint('core', 'version_check_ttl', fallback=DEFAULT_VERSION_CHECK_TTL))
+    success = latest_versions is not None
+    for name, version in (latest_versions or {}).items():
+        if name in versions:
+            versions[name]['pypi'] = version
     updates_available = 0
 
     def _print(val=''):
@@ -154,14 +128,14 @@ def get_az_version_string():
             updates_available += 1
         _print(ver_string)
     _print()
-    extensions = get_extensions()
+    extensions = manifest['extensions']
     if extensions:
         _print('Extensions:')
         for ext in extensions:
-            if ext.ext_type == 'dev':
-                _print(ext.name.ljust(20) + ext.version.rjust(20) + ' (dev) ' + ext.path)
+            if ext['type'] == 'dev':
+                _print(ext['name'].ljust(20) + ext['version'].rjust(20) + ' (dev) ' + ext['path'])
             else:
-                _print(ext.name.ljust(20) + (ext.version or 'Unknown').rjust(20))
+                _print(ext['name'].ljust(20) + (ext['version'] or 'Unknown').rjust(20))
         _print()
     _print("Python location '{}'".format(sys.executable))
     _print("Extensions directory '{}'".format(EXTENSIONS_DIR))
@@ -596,3 +570,98 @@ class ConfiguredDefaultSetter(object):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         setattr(self.cli_config, 'use_local_config', self.original_use_local_config)
+
+
+# The conversion of each type, see _get_todict_converter, and the camel case of the attribute names.
+_TODICT_CONVERTERS = {}
+_TODICT_KEYS = {}
+
+
+def _todict_value(obj, post_processor):  # pylint: disable=unused-argument
+    return obj
+
+
+def _todict_dict(obj, post_processor):
+    result = {}
+    for k, v in obj.items():
+        converter = _TODICT_CONVERTERS.get(type(v)) or _get_todict_converter(v)
+        result[k] = v if converter is _todict_value else converter(v, post_processor)
+    return post_processor(obj, result) if post_processor else result
+
+
+def _todict_list(obj, post_processor):
+    result = []
+    for v in obj:
+        converter = _TODICT_CONVERTERS.get(type(v)) or _get_todict_converter(v)
+        result.append(v if converter is _todict_value else converter(v, post_processor))
+    return result
+
+
+def _todict_enum(obj, post_processor):  # pylint: disable=unused-argument
+    return obj.value
+
+
+def _todict_isoformat(obj, post_processor):  # pylint: disable=unused-argument
+    return obj.isoformat()
+
+
+def _todict_str(obj, post_processor):  # pylint: disable=unused-argument
+    return str(obj)
+
+
+def _todict_asdict(obj, post_processor):
+    return _todict_dict(obj._asdict(), post_processor)  # pylint: disable=protected-access
+
+
+def _todict_object(obj, post_processor):
+    result = {}
+    for k, v in obj.__dict__.items():
+        if k[:1] == '_' or callable(v):
+            continue
+        key = _TODICT_KEYS.get(k)
+        if key is None:
+            key = _TODICT_KEYS.setdefault(k, to_camel_case(k))
+        converter = _TODICT_CONVERTERS.get(type(v)) or _get_todict_converter(v)
+        result[key] = v if converter is _todict_value else converter(v, post_processor)
+    return post_processor(obj, result) if post_processor else result
+
+
+def _get_todict_converter(obj):
+    from datetime import date, time, datetime, timedelta
+    from enum import Enum
+
+    # the same checks, in the same order, as knack.util.todict
+    if isinstance(obj, dict):
+        converter = _todict_dict
+    elif isinstance(obj, list):
+        converter = _todict_list
+    elif isinstance(obj, Enum):
+        converter = _todict_enum
+    elif isinstance(obj, (date, time, datetime)):
+        converter = _todict_isoformat
+    elif isinstance(obj, timedelta):
+        converter = _todict_str
+    elif hasattr(obj, '_asdict'):
+        converter = _todict_asdict
+    elif hasattr(obj, '__dict__'):
+        converter = _todict_object
+        # the attributes of the msrest models are known up front
+        for k in getattr(obj, '_attribute_map', None) or {}:
+            if k not in _TODICT_KEYS:
+                _TODICT_KEYS[k] = to_camel_case(k)
+    else:
+        converter = _todict_value
+    # the attributes of objects resolving them dynamically, e.g. mocks, depend on the object rather than its type
+    if not hasattr(type(obj), '__getattr__'):
+        _TODICT_CONVERTERS[type(obj)] = converter
+    return converter
+
+
+def todict(obj, post_processor=None):
+    """
+    Convert an object to a dictionary, as knack.util.todict does. The conversion of each type is selected once and
+    the camel case attribute names of the objects are cached, which makes a difference on large results.
+    Use 'post_processor(original_obj, dictionary)' to update the dictionary in the process.
+    """
+    converter = _TODICT_CONVERTERS.get(type(obj)) or _get_todict_converter(obj)
+    return converter(obj, post_processor)
@@ -64,6 +64,7 @@ DEPENDENCIES = [
     'msrestazure>=0.4.25',
     'paramiko>=2.0.8,<2.5.0',
     'pip',
+    'portalocker~=1.2',
     'pygments',
     'PyJWT',
     'pyopenssl>=17.1.0',  # https://github.com/pyca/pyopenssl/pull/612
@@ -4,15 +4,24 @@
 # --------------------------------------------------------------------------------------------
 
 import sys
-import uuid
 import timeit
 
-from knack.completion import ARGCOMPLETE_ENV_NAME
-from knack.log import get_logger
+# taken before anything else is imported, so that `az --profile-startup` covers the import of azure.cli.core
+startup_time = timeit.default_timer()
+startup_module_count = len(sys.modules)
 
-from azure.cli.core import get_default_cli
+# pylint: disable=wrong-import-position
+import uuid  # noqa: E402
 
-import azure.cli.core.telemetry as telemetry
+from knack.completion import ARGCOMPLETE_ENV_NAME  # noqa: E402
+from knack.log import get_logger  # noqa: E402
+
+from azure.cli.core import get_default_cli  # noqa: E402
+from azure.cli.core._startup_profiler import (  # noqa: E402
+    pop_startup_profile_arg, start_startup_profiler, stop_startup_profiler, startup_phase)
+
+import azure.cli.core.telemetry as telemetry  # noqa: E402
+# pylint: enable=wrong-import-position
 
 
 # A workaround for https://bugs.python.org/issue32502 (https://github.com/Azure/azure-cli/issues/5184)
@@ -30,7 +39,13 @@ def cli_main(cli, args):
     return cli.invoke(args)
 
 
-az_cli = get_default_cli()
+args, startup_profile_path = pop_startup_profile_arg(sys.argv[1:])
+if startup_profile_path:
+    start_startup_profiler(origin=startup_time).add_span('import azure.cli.core', startup_time,
+                                                         len(sys.modules) - startup_module_count)
+
+with startup_phase('create CLI'):
+    az_cli = get_default_cli()
 
 telemetry.set_application(az_cli, ARGCOMPLETE_ENV_NAME)
 
@@ -38,7 +53,8 @@ try:
     telemetry.start()
     start_time = timeit.default_timer()
 
-    exit_code = cli_main(az_cli, sys.argv[1:])
+    with startup_phase('invoke'):
+        exit_code = cli_main(az_cli, args)
 
     if exit_code and exit_code != 0:
         telemetry.set_failure()
@@ -65,6 +81,7 @@ except SystemExit as ex:  # some code directly call sys.exit, this is to make su
     raise ex
 
 finally:
+    stop_startup_profiler(startup_profile_path)
     telemetry.conclude()
 
     try:
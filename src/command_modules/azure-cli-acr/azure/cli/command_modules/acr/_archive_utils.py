@@ -7,14 +7,18 @@ import tarfile
 import os
 import re
 import codecs
+import threading
+import zlib
+from collections import deque
 from io import open
 import requests
 from knack.log import get_logger
 from knack.util import CLIError
 from msrestazure.azure_exceptions import CloudError
 from azure.storage.blob import BlockBlobService
+from six.moves.queue import Queue, Full  # pylint: disable=import-error
 from ._azure_utils import get_blob_info
-from ._constants import TASK_VALID_VSTS_URLS
+from ._constants import TASK_VALID_VSTS_URLS, ARCHIVE_COMPRESSION_BLOCK_SIZE, ARCHIVE_UPLOAD_MAX_CONNECTIONS
 
 logger = get_logger(__name__)
 
@@ -26,20 +30,6 @@ def upload_source_code(client,
                        tar_file_path,
                        docker_file_path,
                        docker_file_in_tar):
-    _pack_source_code(source_location,
-                      tar_file_path,
-                      docker_file_path,
-                      docker_file_in_tar)
-
-    size = os.path.getsize(tar_file_path)
-    unit = 'GiB'
-    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
-        if size < 1024:
-            unit = S
-            break
-        size = size / 1024.0
-
-    logger.warning("Uploading archived source code from '%s'...", tar_file_path)
     upload_url = None
     relative_path = None
     try:
@@ -53,22 +43,173 @@ def upload_source_code(client,
     if not upload_url:
         raise CLIError("Failed to get a SAS URL to upload context.")
 
+    # the archive is packed on a background thread and uploaded block by block while it is being produced
+    upload_stream = _ArchiveUploadStream(tar_file_path)
+    packer_errors = []
+
+    def _pack():
+        try:
+            _pack_source_code(source_location, upload_stream, docker_file_path, docker_file_in_tar)
+        except Exception as ex:  # pylint: disable=broad-except
+            packer_errors.append(ex)
+        finally:
+            upload_stream.close_writer()
+
+    packer = threading.Thread(target=_pack)
+    packer.daemon = True
+    packer.start()
+
+    logger.warning("Uploading archived source code from '%s'...", tar_file_path)
     account_name, endpoint_suffix, container_name, blob_name, sas_token = get_blob_info(upload_url)
-    BlockBlobService(account_name=account_name,
-                     sas_token=sas_token,
-                     endpoint_suffix=endpoint_suffix).create_blob_from_path(
-                         container_name=container_name,
-                         blob_name=blob_name,
-                         file_path=tar_file_path)
+    try:
+        BlockBlobService(account_name=account_name,
+                         sas_token=sas_token,
+                         endpoint_suffix=endpoint_suffix).create_blob_from_stream(
+                             container_name=container_name,
+                             blob_name=blob_name,
+                             stream=upload_stream,
+                             max_connections=ARCHIVE_UPLOAD_MAX_CONNECTIONS)
+    finally:
+        upload_stream.close_reader()
+        packer.join()
+    if packer_errors:
+        raise packer_errors[0]
+
+    size = upload_stream.bytes_written
+    unit = 'GiB'
+    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            unit = S
+            break
+        size = size / 1024.0
+
     logger.warning("Sending context ({0:.3f} {1}) to registry: {2}...".format(
         size, unit, registry_name))
     return relative_path
 
 
-def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_file_in_tar):
+class _ArchiveUploadStream(object):
+    """Pipe between the archive packer and the blob uploader.
+
+    Compressed bytes written by the packer are appended to the local archive file and queued for the
+    uploader, which reads them as a non-seekable stream.
+    """
+
+    def __init__(self, tar_file_path, max_queued_blocks=16):
+        self._file = open(tar_file_path, 'wb')
+        self._queue = Queue(maxsize=max_queued_blocks)
+        self._pending = b''
+        self._reader_closed = False
+        self._eof = False
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def write(self, data):
+        self._file.write(data)
+        self.bytes_written += len(data)
+        if not self._put(bytes(data)):
+            raise CLIError("Upload of the archived source code was interrupted.")
+
+    def close_writer(self):
+        self._file.close()
+        self._put(None)
+
+    def _put(self, block):
+        # don't block forever if the uploader has given up
+        while not self._reader_closed:
+            try:
+                self._queue.put(block, timeout=1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def read(self, size=-1):
+        chunks = [self._pending]
+        length = len(self._pending)
+        while not self._eof and (size < 0 or length < size):
+            block = self._queue.get()
+            if block is None:
+                self._eof = True
+                break
+            chunks.append(block)
+            length += len(block)
+        data = b''.join(chunks)
+        if size >= 0:
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = b''
+        self.bytes_read += len(data)
+        return data
+
+    def tell(self):
+        return self.bytes_read
+
+    def seekable(self):  # pylint: disable=no-self-use
+        return False
+
+    def close_reader(self):
+        self._reader_closed = True
+
+
+class _ParallelGzipWriter(object):
+    """File-like object which gzips fixed-size blocks on worker threads and writes them in order.
+
+    Each block becomes a separate gzip member; concatenated members form a valid gzip stream.
+    """
+
+    def __init__(self, fileobj, workers=None, block_size=ARCHIVE_COMPRESSION_BLOCK_SIZE):
+        from concurrent.futures import ThreadPoolExecutor
+        self._fileobj = fileobj
+        self._workers = workers or _get_compression_worker_count()
+        self._block_size = block_size
+        self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        self._buffer = bytearray()
+        self._in_flight = deque()
+
+    @staticmethod
+    def _compress(block):
+        # wbits=31 writes the gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, 31)
+        return compressor.compress(block) + compressor.flush()
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            block = bytes(self._buffer[:self._block_size])
+            del self._buffer[:self._block_size]
+            self._submit(block)
+
+    def _submit(self, block):
+        self._in_flight.append(self._executor.submit(self._compress, block))
+        # keep a bounded number of blocks in memory
+        while len(self._in_flight) > self._workers * 2:
+            self._fileobj.write(self._in_flight.popleft().result())
+
+    def close(self):
+        try:
+            if self._buffer or not self._in_flight:
+                self._submit(bytes(self._buffer))
+                self._buffer = bytearray()
+            while self._in_flight:
+                self._fileobj.write(self._in_flight.popleft().result())
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+def _get_compression_worker_count():
+    import multiprocessing
+    try:
+        return min(multiprocessing.cpu_count(), 8)
+    except NotImplementedError:
+        return 1
+
+
+def _pack_source_code(source_location, output, docker_file_path, docker_file_in_tar):
     logger.warning("Packing source code into tar to upload...")
 
     ignore_list, ignore_list_size = _load_dockerignore_file(source_location)
+    matcher = IgnoreMatcher(ignore_list)
     common_vcs_ignore_list = {'.git', '.gitignore', '.bzr', 'bzrignore', '.hg', '.hgignore', '.svn'}
 
     def _ignore_check(tarinfo, parent_ignored, parent_matching_rule_index):
@@ -82,37 +223,44 @@ def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_f
             # eg, it will ignore the files under .git folder.
             return parent_ignored, parent_matching_rule_index
 
-        for index, item in enumerate(ignore_list):
-            # stop checking the remaining rules whose priorities are lower than the parent matching rule
-            # at this point, current item should just inherit from parent
-            if index >= parent_matching_rule_index:
-                break
-            if re.match(item.pattern, tarinfo.name):
-                logger.debug(".dockerignore: rule '%s' matches '%s'.",
-                             item.rule, tarinfo.name)
-                return item.ignore, index
+        # stop checking the remaining rules whose priorities are lower than the parent matching rule
+        # at this point, current item should just inherit from parent
+        index = matcher.match(tarinfo.name, parent_matching_rule_index)
+        if index is not None:
+            logger.debug(".dockerignore: rule '%s' matches '%s'.",
+                         ignore_list[index].rule, tarinfo.name)
+            return ignore_list[index].ignore, index
 
         logger.debug(".dockerignore: no rule for '%s'. parent ignore '%s'",
                      tarinfo.name, parent_ignored)
         # inherit from parent
         return parent_ignored, parent_matching_rule_index
 
-    with tarfile.open(tar_file_path, "w:gz") as tar:
-        # need to set arcname to empty string as the archive root path
-        _archive_file_recursively(tar,
-                                  source_location,
-                                  arcname="",
-                                  parent_ignored=False,
-                                  parent_matching_rule_index=ignore_list_size,
-                                  ignore_check=_ignore_check)
+    def _can_prune(tarinfo, ignored, matching_rule_index):
+        # children of an ignored dir stay ignored unless a higher priority '!' rule could include them again
+        return ignored and not matcher.may_include_below(tarinfo.name, matching_rule_index)
 
-        # Add the Dockerfile if it's specified.
-        # In the case of run, there will be no Dockerfile.
-        if docker_file_path:
-            docker_file_tarinfo = tar.gettarinfo(
-                docker_file_path, docker_file_in_tar)
-            with open(docker_file_path, "rb") as f:
-                tar.addfile(docker_file_tarinfo, f)
+    gzip_writer = _ParallelGzipWriter(output)
+    try:
+        with tarfile.open(fileobj=gzip_writer, mode="w|") as tar:
+            # need to set arcname to empty string as the archive root path
+            _archive_file_recursively(tar,
+                                      source_location,
+                                      arcname="",
+                                      parent_ignored=False,
+                                      parent_matching_rule_index=ignore_list_size,
+                                      ignore_check=_ignore_check,
+                                      can_prune=_can_prune)
+
+            # Add the Dockerfile if it's specified.
+            # In the case of run, there will be no Dockerfile.
+            if docker_file_path:
+                docker_file_tarinfo = tar.gettarinfo(
+                    docker_file_path, docker_file_in_tar)
+                with open(docker_file_path, "rb") as f:
+                    tar.addfile(docker_file_tarinfo, f)
+    finally:
+        gzip_writer.close()
 
 
 class IgnoreRule(object):  # pylint: disable=too-few-public-methods
@@ -143,6 +291,48 @@ class IgnoreRule(object):  # pylint: disable=too-few-public-methods
         self.pattern += "$"
 
 
+# Python 2.7 and 3.4 allow at most 100 groups in a regex
+IGNORE_RULES_PER_REGEX = 50
+
+
+class IgnoreMatcher(object):
+    """All .dockerignore rules compiled into a few regexes.
+
+    Alternatives are tried in priority order, so the matching group is the highest priority matching rule.
+    """
+
+    def __init__(self, ignore_list):
+        ignore_list = ignore_list or []
+        self._regexes = []
+        for start in range(0, len(ignore_list), IGNORE_RULES_PER_REGEX):
+            self._regexes.append(re.compile('|'.join(
+                '(?P<r{}>{})'.format(index, item.pattern)
+                for index, item in enumerate(ignore_list[start:start + IGNORE_RULES_PER_REGEX], start))))
+        # literal prefix of each '!' rule, used to tell whether it can apply below a directory
+        self._exceptions = [(index, re.split(r'[*?\[\\]', item.rule[1:], 1)[0])
+                            for index, item in enumerate(ignore_list) if not item.ignore]
+
+    def match(self, name, max_index):
+        """Return the index of the highest priority rule matching name, if it is lower than max_index."""
+        for regex in self._regexes:
+            m = regex.match(name)
+            if m is not None:
+                # the regexes hold the rules in priority order as well
+                index = int(m.lastgroup[1:])
+                return index if index < max_index else None
+        return None
+
+    def may_include_below(self, dir_name, max_index):
+        """Whether a '!' rule with a priority higher than max_index could match a path under dir_name."""
+        dir_prefix = dir_name + '/'
+        for index, literal in self._exceptions:
+            if index >= max_index:
+                break
+            if literal.startswith(dir_prefix) or dir_prefix.startswith(literal):
+                return True
+        return False
+
+
 def _load_dockerignore_file(source_location):
     # reference: https://docs.docker.com/engine/reference/builder/#dockerignore-file
     docker_ignore_file = os.path.join(source_location, ".dockerignore")
@@ -169,7 +359,8 @@ def _load_dockerignore_file(source_location):
     return ignore_list, len(ignore_list)
 
 
-def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matching_rule_index, ignore_check):
+def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matching_rule_index, ignore_check,
+                              can_prune=None):
     # create a TarInfo object from the file
     tarinfo = tar.gettarinfo(name, arcname)
 
@@ -189,11 +380,15 @@ def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matchin
             tar.addfile(tarinfo)
 
     # even the dir is ignored, its child items can still be included, so continue to scan
+    # unless no rule is able to include them again
     if tarinfo.isdir():
+        if can_prune and can_prune(tarinfo, ignored, matching_rule_index):
+            logger.debug("Skipping ignored directory '%s'", arcname)
+            return
         for f in os.listdir(name):
             _archive_file_recursively(tar, os.path.join(name, f), os.path.join(arcname, f),
                                       parent_ignored=ignored, parent_matching_rule_index=matching_rule_index,
-                                      ignore_check=ignore_check)
+                                      ignore_check=ignore_check, can_prune=can_prune)
 
 
 def check_remote_source_code(source_location):
@@ -17,6 +17,11 @@ ACR_TASK_YAML_DEFAULT_NAME = 'acb.yaml'
 
 ORYX_PACK_BUILDER_IMAGE = 'mcr.microsoft.com/oryx/pack-builder:stable'
 
+ARCHIVE_COMPRESSION_BLOCK_SIZE = 1024 * 1024
+ARCHIVE_UPLOAD_MAX_CONNECTIONS = 4
+
+REPOSITORY_LIST_MAX_WORKERS = 8
+
 
 def get_classic_sku(cmd):
     SkuName = cmd.get_models('SkuName')
@@ -9,9 +9,11 @@ except ImportError:
     from urllib import urlencode
     from urlparse import urlparse, urlunparse
 
+import os
+import threading
 import time
 from json import loads
-from base64 import b64encode
+from base64 import b64encode, urlsafe_b64decode
 import requests
 from requests import RequestException
 from requests.utils import to_native_string
@@ -24,6 +26,7 @@ from knack.log import get_logger
 from azure.cli.core.util import should_disable_connection_verify
 from azure.cli.core.cloud import CloudSuffixNotSetException
 from azure.cli.core._profile import _AZ_LOGIN_MESSAGE
+from azure.cli.core._session import Session, flush_with_command
 
 from ._client_factory import cf_acr_registries
 from ._constants import get_managed_sku
@@ -37,10 +40,28 @@ EMPTY_GUID = '00000000-0000-0000-0000-000000000000'
 ALLOWED_HTTP_METHOD = ['get', 'patch', 'put', 'delete']
 ACCESS_TOKEN_PERMISSION = ['pull', 'push', 'delete', 'push,pull', 'delete,pull']
 
+TOKEN_CACHE_FILE_NAME = 'acrTokenCache.json'
+# tokens expiring within this many seconds are not reused
+TOKEN_EXPIRY_MARGIN = 300
+_REFRESH_TOKENS = 'refresh'
+_ACCESS_TOKENS = 'access'
+# written once the command completes, rather than for each of the tokens retrieved by concurrent requests
+_TOKEN_CACHE = flush_with_command(Session(deferred=True))
+_TOKEN_CACHE_LOCK = threading.Lock()
+
 AAD_TOKEN_BASE_ERROR_MESSAGE = "Unable to get AAD authorization tokens with message"
 ADMIN_USER_BASE_ERROR_MESSAGE = "Unable to get admin user credentials with message"
 
 
+def _get_scope(repository, artifact_repository, permission):
+    if repository:
+        return 'repository:{}:{}'.format(repository, permission)
+    if artifact_repository:
+        return 'artifact-repository:{}:{}'.format(artifact_repository, permission)
+    # catalog only has * as permission, even for a read operation
+    return 'registry:catalog:*'
+
+
 def _get_aad_token_after_challenge(cli_ctx,
                                    token_params,
                                    login_server,
@@ -75,36 +96,121 @@ def _get_aad_token_after_challenge(cli_ctx,
                        .get_error_message())
 
     refresh_token = loads(response.content.decode("utf-8"))["refresh_token"]
+    if not is_diagnostics_context:
+        _cache_token(cli_ctx, _REFRESH_TOKENS, login_server, refresh_token, realm=token_params['realm'])
     if only_refresh_token:
         return refresh_token
 
-    authhost = urlunparse((authurl[0], authurl[1], '/oauth2/token', '', '', ''))
+    scope = _get_scope(repository, artifact_repository, permission)
+    response = _request_access_token(token_params['realm'], login_server, scope, refresh_token)
 
-    if repository:
-        scope = 'repository:{}:{}'.format(repository, permission)
-    elif artifact_repository:
-        scope = 'artifact-repository:{}:{}'.format(artifact_repository, permission)
-    else:
-        # catalog only has * as permission, even for a read operation
-        scope = 'registry:catalog:*'
+    if response.status_code not in [200]:
+        from ._errors import CONNECTIVITY_ACCESS_TOKEN_ERROR
+        if is_diagnostics_context:
+            return CONNECTIVITY_ACCESS_TOKEN_ERROR.format_error_message(login_server, response.status_code)
+        raise CLIError(CONNECTIVITY_ACCESS_TOKEN_ERROR.format_error_message(login_server, response.status_code)
+                       .get_error_message())
+
+    access_token = loads(response.content.decode("utf-8"))["access_token"]
+    if not is_diagnostics_context:
+        _cache_token(cli_ctx, _ACCESS_TOKENS, login_server, access_token, scope=scope)
+    return access_token
 
+
+def _request_access_token(realm, login_server, scope, refresh_token):
+    authurl = urlparse(realm)
+    authhost = urlunparse((authurl[0], authurl[1], '/oauth2/token', '', '', ''))
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
     content = {
         'grant_type': 'refresh_token',
         'service': login_server,
         'scope': scope,
         'refresh_token': refresh_token
     }
-    response = requests.post(authhost, urlencode(content), headers=headers,
-                             verify=(not should_disable_connection_verify()))
+    return requests.post(authhost, urlencode(content), headers=headers,
+                         verify=(not should_disable_connection_verify()))
 
-    if response.status_code not in [200]:
-        from ._errors import CONNECTIVITY_ACCESS_TOKEN_ERROR
-        if is_diagnostics_context:
-            return CONNECTIVITY_ACCESS_TOKEN_ERROR.format_error_message(login_server, response.status_code)
-        raise CLIError(CONNECTIVITY_ACCESS_TOKEN_ERROR.format_error_message(login_server, response.status_code)
-                       .get_error_message())
 
-    return loads(response.content.decode("utf-8"))["access_token"]
+def _get_token_cache(cli_ctx):
+    if _TOKEN_CACHE.filename is None:
+        cache = Session(deferred=True)
+        cache.load(os.path.join(cli_ctx.config.config_dir, TOKEN_CACHE_FILE_NAME))
+        try:
+            # the cache holds credentials, keep it private to the current user
+            os.chmod(cache.filename, 0o600)
+        except OSError:
+            pass
+        _TOKEN_CACHE.filename, _TOKEN_CACHE.data = cache.filename, cache.data
+    return _TOKEN_CACHE
+
+
+def _get_token_cache_key(cli_ctx, login_server, scope=None):
+    """Tokens are cached per signed in identity, so switching accounts never reuses another user's token."""
+    from azure.cli.core._profile import Profile
+    try:
+        account = Profile(cli_ctx=cli_ctx).get_subscription()
+    except CLIError:
+        return None
+    return '|'.join(x for x in [account['tenantId'], account['user']['name'], login_server, scope] if x)
+
+
+def _get_token_expiry(token):
+    """Return the 'exp' claim of an ACR token, or None if the token is not a JWT."""
+    import json
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return int(json.loads(urlsafe_b64decode(payload.encode('utf-8')).decode('utf-8'))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _cache_token(cli_ctx, kind, login_server, token, scope=None, realm=None):
+    expires_on = _get_token_expiry(token)
+    key = _get_token_cache_key(cli_ctx, login_server, scope)
+    if not expires_on or not key:
+        return
+    with _TOKEN_CACHE_LOCK:
+        cache = _get_token_cache(cli_ctx)
+        now = time.time()
+        entries = {k: v for k, v in cache.get(kind, {}).items() if v['expires_on'] > now}
+        entries[key] = {'token': token, 'expires_on': expires_on, 'realm': realm}
+        cache[kind] = entries
+
+
+def _get_cached_token(cli_ctx, kind, login_server, scope=None):
+    key = _get_token_cache_key(cli_ctx, login_server, scope)
+    if not key:
+        return None
+    with _TOKEN_CACHE_LOCK:
+        entry = _get_token_cache(cli_ctx).get(kind, {}).get(key)
+    if entry and entry['expires_on'] - TOKEN_EXPIRY_MARGIN > time.time():
+        logger.debug("Using cached %s token for '%s'.", kind, login_server)
+        return entry
+    return None
+
+
+def _get_cached_aad_token(cli_ctx, login_server, only_refresh_token, scope):
+    if not only_refresh_token:
+        access_entry = _get_cached_token(cli_ctx, _ACCESS_TOKENS, login_server, scope)
+        if access_entry:
+            return access_entry['token']
+    refresh_entry = _get_cached_token(cli_ctx, _REFRESH_TOKENS, login_server)
+    if not refresh_entry:
+        return None
+    if only_refresh_token:
+        return refresh_entry['token']
+    try:
+        response = _request_access_token(refresh_entry['realm'], login_server, scope, refresh_entry['token'])
+    except RequestException as e:
+        logger.debug("Could not use the cached refresh token. Exception: %s", str(e))
+        return None
+    if response.status_code not in [200]:
+        logger.debug("Cached refresh token was rejected with status code %s.", response.status_code)
+        return None
+    access_token = loads(response.content.decode("utf-8"))["access_token"]
+    _cache_token(cli_ctx, _ACCESS_TOKENS, login_server, access_token, scope=scope)
+    return access_token
 
 
 def _get_aad_token(cli_ctx,
@@ -131,6 +237,12 @@ def _get_aad_token(cli_ctx,
 
     login_server = login_server.rstrip('/')
 
+    if not is_diagnostics_context:
+        cached_token = _get_cached_aad_token(cli_ctx, login_server, only_refresh_token,
+                                             _get_scope(repository, artifact_repository, permission))
+        if cached_token:
+            return cached_token
+
     challenge = requests.get('https://' + login_server + '/v2/', verify=(not should_disable_connection_verify()))
     if challenge.status_code not in [401] or 'WWW-Authenticate' not in challenge.headers:
         from ._errors import CONNECTIVITY_CHALLENGE_ERROR
@@ -313,6 +425,26 @@ def get_access_credentials(cmd,
                             permission=permission)
 
 
+def get_repository_access_credentials(cmd,
+                                      login_server,
+                                      username,
+                                      password,
+                                      repository,
+                                      permission):
+    """Scope credentials returned by get_access_credentials to another repository of the same registry.
+    Admin and user specified credentials are not scoped and are returned as is, while an AAD access token
+    is exchanged for the repository without resolving the registry and probing the login server again.
+    :param str login_server: The login server returned by get_access_credentials
+    :param str username: The username returned by get_access_credentials
+    :param str password: The password returned by get_access_credentials
+    :param str repository: Repository for which the access token is requested
+    :param str permission: The requested permission on the repository
+    """
+    if username != EMPTY_GUID:
+        return username, password
+    return EMPTY_GUID, _get_aad_token(cmd.cli_ctx, login_server, False, repository=repository, permission=permission)
+
+
 def log_registry_response(response):
     """Log the HTTP request and response of a registry API call.
     :param Response response: The response object
@@ -350,6 +350,8 @@ short-summary: List repositories in an Azure Container Registry.
 examples:
   - name: List repositories in a given Azure Container Registry.
     text: az acr repository list -n MyRegistry
+  - name: List repositories with their tags and manifests, fetched concurrently for all repositories.
+    text: az acr repository list -n MyRegistry --include-tags --include-manifests
 """
 
 helps['acr repository show'] = """
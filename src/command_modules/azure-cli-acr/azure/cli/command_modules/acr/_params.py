@@ -96,6 +96,10 @@ def load_arguments(self, _):  # pylint: disable=too-many-statements
         c.argument('read_enabled', help='Indicates whether read operation is allowed.', arg_type=get_three_state_flag())
         c.argument('write_enabled', help='Indicates whether write or delete operation is allowed.', arg_type=get_three_state_flag())
 
+    with self.argument_context('acr repository list') as c:
+        c.argument('include_tags', help='Include the tags of each repository in the results.', action='store_true')
+        c.argument('include_manifests', help='Include the manifests of each repository in the results.', action='store_true')
+
     with self.argument_context('acr repository untag') as c:
         c.argument('image', options_list=['--image', '-t'], help="The name of the image. May include a tag in the format 'name:tag'.")
 
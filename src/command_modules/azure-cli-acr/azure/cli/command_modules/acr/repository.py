@@ -12,7 +12,9 @@ from knack.util import CLIError
 from knack.log import get_logger
 
 from ._utils import user_confirmation
-from ._docker_utils import request_data_from_registry, get_access_credentials, RegistryException
+from ._constants import REPOSITORY_LIST_MAX_WORKERS
+from ._docker_utils import (
+    request_data_from_registry, get_access_credentials, get_repository_access_credentials, RegistryException)
 
 logger = get_logger(__name__)
 
@@ -120,7 +122,9 @@ def acr_repository_list(cmd,
                         resource_group_name=None,  # pylint: disable=unused-argument
                         tenant_suffix=None,
                         username=None,
-                        password=None):
+                        password=None,
+                        include_tags=False,
+                        include_manifests=False):
     login_server, username, password = get_access_credentials(
         cmd=cmd,
         registry_name=registry_name,
@@ -128,7 +132,7 @@ def acr_repository_list(cmd,
         username=username,
         password=password)
 
-    return _obtain_data_from_registry(
+    repositories = _obtain_data_from_registry(
         login_server=login_server,
         path='/v2/_catalog',
         username=username,
@@ -136,26 +140,37 @@ def acr_repository_list(cmd,
         result_index='repositories',
         top=top)
 
+    if not include_tags and not include_manifests:
+        return repositories
 
-def acr_repository_show_tags(cmd,
-                             registry_name,
-                             repository,
-                             top=None,
-                             orderby=None,
-                             resource_group_name=None,  # pylint: disable=unused-argument
-                             tenant_suffix=None,
-                             username=None,
-                             password=None,
-                             detail=False):
-    login_server, username, password = get_access_credentials(
-        cmd=cmd,
-        registry_name=registry_name,
-        tenant_suffix=tenant_suffix,
-        username=username,
-        password=password,
-        repository=repository,
-        permission='pull')
+    return _get_repository_details(cmd, login_server, username, password, repositories,
+                                   include_tags, include_manifests)
+
+
+def _get_repository_details(cmd, login_server, username, password, repositories, include_tags, include_manifests):
+    """Fetch tags and/or manifests of the given repositories concurrently.
+    Pages of a single listing must be followed in order, so the work is spread across repositories.
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
+    def _get_details(repository):
+        repository_username, repository_password = get_repository_access_credentials(
+            cmd, login_server, username, password, repository, 'pull')
+        details = {'name': repository}
+        if include_tags:
+            details['tags'] = _list_tags(login_server, repository, repository_username, repository_password)
+        if include_manifests:
+            details['manifests'] = _list_manifests(login_server, repository, repository_username, repository_password)
+        return details
+
+    if not repositories:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(REPOSITORY_LIST_MAX_WORKERS, len(repositories))) as executor:
+        return list(executor.map(_get_details, repositories))
+
+
+def _list_tags(login_server, repository, username, password, top=None, orderby=None, detail=False):
     try:
         raw_result = _obtain_data_from_registry(
             login_server=login_server,
@@ -189,6 +204,49 @@ def acr_repository_show_tags(cmd,
     return raw_result
 
 
+def _list_manifests(login_server, repository, username, password, top=None, orderby=None, detail=False):
+    raw_result = _obtain_data_from_registry(
+        login_server=login_server,
+        path=_get_manifest_path(repository),
+        username=username,
+        password=password,
+        result_index='manifests',
+        top=top,
+        orderby=orderby)
+
+    # For backward compatibility, convert the results to the old schema
+    if not detail:
+        return [{
+            'digest': item['digest'] if 'digest' in item else '',
+            'tags': item['tags'] if 'tags' in item else [],
+            'timestamp': item['lastUpdateTime'] if 'lastUpdateTime' in item else ''
+        } for item in raw_result]
+
+    return raw_result
+
+
+def acr_repository_show_tags(cmd,
+                             registry_name,
+                             repository,
+                             top=None,
+                             orderby=None,
+                             resource_group_name=None,  # pylint: disable=unused-argument
+                             tenant_suffix=None,
+                             username=None,
+                             password=None,
+                             detail=False):
+    login_server, username, password = get_access_credentials(
+        cmd=cmd,
+        registry_name=registry_name,
+        tenant_suffix=tenant_suffix,
+        username=username,
+        password=password,
+        repository=repository,
+        permission='pull')
+
+    return _list_tags(login_server, repository, username, password, top, orderby, detail)
+
+
 def acr_repository_show_manifests(cmd,
                                   registry_name,
                                   repository,
@@ -208,24 +266,7 @@ def acr_repository_show_manifests(cmd,
         repository=repository,
         permission='pull')
 
-    raw_result = _obtain_data_from_registry(
-        login_server=login_server,
-        path=_get_manifest_path(repository),
-        username=username,
-        password=password,
-        result_index='manifests',
-        top=top,
-        orderby=orderby)
-
-    # For backward compatibility, convert the results to the old schema
-    if not detail:
-        return [{
-            'digest': item['digest'] if 'digest' in item else '',
-            'tags': item['tags'] if 'tags' in item else [],
-            'timestamp': item['lastUpdateTime'] if 'lastUpdateTime' in item else ''
-        } for item in raw_result]
-
-    return raw_result
+    return _list_manifests(login_server, repository, username, password, top, orderby, detail)
 
 
 def acr_repository_show(cmd,
@@ -8,6 +8,7 @@ try:
 except ImportError:
     from urllib import urlencode
 import json
+import os
 import unittest
 import mock
 import sys
@@ -36,6 +37,7 @@ from azure.cli.command_modules.acr._docker_utils import (
     EMPTY_GUID
 )
 from azure.cli.command_modules.acr._docker_utils import ResourceNotFound
+from azure.cli.command_modules.acr._archive_utils import _archive_file_recursively
 from azure.cli.core.mock import DummyCli
 
 
@@ -478,18 +480,111 @@ class AcrMockCommandsTests(unittest.TestCase):
             headers={'Content-Type': 'application/x-www-form-urlencoded'},
             verify=mock.ANY)
 
-    def _validate_access_token_request(self, mock_requests_get, mock_requests_post, login_server, scope):
+    def _validate_access_token_request(self, mock_requests_get, mock_requests_post, login_server, scope,
+                                       refresh_token=TEST_ACR_REFRESH_TOKEN):
         mock_requests_post.assert_called_with(
             'https://{}/oauth2/token'.format(login_server),
             urlencode({
                 'grant_type': 'refresh_token',
                 'service': login_server,
                 'scope': scope,
-                'refresh_token': TEST_ACR_REFRESH_TOKEN
+                'refresh_token': refresh_token
             }),
             headers={'Content-Type': 'application/x-www-form-urlencoded'},
             verify=mock.ANY)
 
+    @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
+    @mock.patch('requests.request', autospec=True)
+    def test_repository_list_include_tags_and_manifests(self, mock_requests_get, mock_get_access_credentials):
+        cmd = self._setup_cmd()
+
+        def _response(path):
+            response = mock.MagicMock()
+            response.headers = {}
+            response.status_code = 200
+            if path == '/v2/_catalog':
+                content = {'repositories': ['testrepo1', 'testrepo2']}
+            elif path.endswith('/_tags'):
+                content = {'tags': [{'name': 'v1'}]}
+            else:
+                content = {'manifests': [{'digest': 'sha256:abc', 'tags': ['v1'], 'lastUpdateTime': 'now'}]}
+            response.json.return_value = content
+            return response
+
+        mock_requests_get.side_effect = lambda **kwargs: _response(kwargs['url'][len('https://testregistry.azurecr.io'):])
+        mock_get_access_credentials.return_value = 'testregistry.azurecr.io', 'username', 'password'
+
+        result = acr_repository_list(cmd, 'testregistry', include_tags=True, include_manifests=True)
+
+        self.assertEqual(result, [{
+            'name': name,
+            'tags': ['v1'],
+            'manifests': [{'digest': 'sha256:abc', 'tags': ['v1'], 'timestamp': 'now'}]
+        } for name in ['testrepo1', 'testrepo2']])
+        # registry credentials are resolved once and reused for every repository
+        self.assertEqual(mock_get_access_credentials.call_count, 1)
+        self.assertEqual(mock_requests_get.call_count, 5)
+
+    @mock.patch('azure.cli.core._profile.Profile.get_subscription', autospec=True)
+    @mock.patch('requests.post', autospec=True)
+    @mock.patch('requests.get', autospec=True)
+    @mock.patch('azure.cli.core._profile.Profile.get_raw_token', autospec=True)
+    def test_get_docker_credentials_uses_token_cache(self, mock_get_raw_token, mock_requests_get, mock_requests_post,
+                                                     mock_get_subscription):
+        import base64
+        import tempfile
+        import time
+        from azure.cli.core._session import Session
+        from azure.cli.command_modules.acr import _docker_utils
+
+        def _jwt(expires_on):
+            payload = base64.urlsafe_b64encode(json.dumps({'exp': expires_on}).encode()).decode().rstrip('=')
+            return 'header.{}.signature'.format(payload)
+
+        cmd = self._setup_cmd()
+        login_server = 'testregistry.azurecr.io'
+        refresh_token, access_token = _jwt(time.time() + 3600), _jwt(time.time() + 3600)
+        self._setup_mock_token_requests(mock_get_raw_token, mock_requests_get, mock_requests_post, login_server)
+        mock_requests_post.return_value.content = json.dumps({
+            'refresh_token': refresh_token,
+            'access_token': access_token}).encode()
+        mock_get_subscription.return_value = {'tenantId': TEST_TENANT, 'user': {'name': 'user@example.com'}}
+
+        cache_dir = tempfile.mkdtemp()
+        try:
+            token_cache = Session(deferred=True)
+            token_cache.load(os.path.join(cache_dir, 'acrTokenCache.json'))
+            with mock.patch.object(_docker_utils, '_TOKEN_CACHE', token_cache):
+                self.assertEqual(_docker_utils._get_aad_token(cmd.cli_ctx, login_server, False, TEST_REPOSITORY,
+                                                              permission='pull'), access_token)
+                self.assertEqual(mock_requests_post.call_count, 2)
+                # the tokens are written once the command completes
+                self.assertFalse(os.path.exists(token_cache.filename))
+
+                # the access token for the same scope is reused without any request
+                self.assertEqual(_docker_utils._get_aad_token(cmd.cli_ctx, login_server, False, TEST_REPOSITORY,
+                                                              permission='pull'), access_token)
+                self.assertEqual(mock_requests_get.call_count, 1)
+                self.assertEqual(mock_requests_post.call_count, 2)
+
+                # another scope only exchanges the cached refresh token, skipping the challenge
+                _docker_utils._get_aad_token(cmd.cli_ctx, login_server, False, 'otherrepository', permission='pull')
+                self.assertEqual(mock_requests_get.call_count, 1)
+                self._validate_access_token_request(mock_requests_get, mock_requests_post, login_server,
+                                                    'repository:otherrepository:pull', refresh_token)
+
+                # diagnostics always go through the full flow
+                _docker_utils._get_aad_token(cmd.cli_ctx, login_server, True, is_diagnostics_context=True)
+                self.assertEqual(mock_requests_get.call_count, 2)
+
+                token_cache.flush()
+                written = Session()
+                written.load(token_cache.filename)
+                self.assertEqual(len(written['access']), 2)
+        finally:
+            import shutil
+            shutil.rmtree(cache_dir)
+
     @mock.patch('azure.cli.command_modules.acr.helm.get_access_credentials', autospec=True)
     @mock.patch('requests.request', autospec=True)
     def test_helm_list(self, mock_requests_get, mock_get_access_credentials):
@@ -662,3 +757,83 @@ class AcrMockCommandsTests(unittest.TestCase):
         mock_sku.premium.value = 'Premium'
         cmd.get_models.return_value = mock_sku
         return cmd
+
+
+class AcrArchiveTests(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        self.source = tempfile.mkdtemp()
+        for path in ['src/app.py', 'src/debug.log', 'node_modules/pkg/index.js', 'build/out.bin', 'build/keep.txt',
+                     '.git/HEAD', 'Dockerfile']:
+            full_path = os.path.join(self.source, *path.split('/'))
+            if not os.path.isdir(os.path.dirname(full_path)):
+                os.makedirs(os.path.dirname(full_path))
+            with open(full_path, 'w') as f:
+                f.write(path)
+        with open(os.path.join(self.source, '.dockerignore'), 'w') as f:
+            f.write('node_modules\n**/*.log\nbuild\n!build/keep.txt\n')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.source)
+
+    def test_ignore_matcher_uses_rule_priority(self):
+        from azure.cli.command_modules.acr._archive_utils import _load_dockerignore_file, IgnoreMatcher
+        ignore_list, size = _load_dockerignore_file(self.source)
+        matcher = IgnoreMatcher(ignore_list)
+
+        # the last rule in .dockerignore has the highest priority
+        self.assertEqual(matcher.match('build/keep.txt', size), 0)
+        self.assertFalse(ignore_list[0].ignore)
+        self.assertEqual(matcher.match('build', size), 1)
+        self.assertIsNone(matcher.match('build/keep.txt', 0))
+        self.assertEqual(matcher.match('src/debug.log', size), 2)
+        self.assertIsNone(matcher.match('src/app.py', size))
+        self.assertTrue(matcher.may_include_below('build', 1))
+        self.assertFalse(matcher.may_include_below('node_modules', 3))
+
+    def test_ignore_matcher_many_rules(self):
+        from azure.cli.command_modules.acr._archive_utils import IgnoreMatcher, IgnoreRule
+        # more rules than the groups a regex can hold on Python 2.7 and 3.4
+        ignore_list = [IgnoreRule('file{}.txt'.format(i)) for i in range(250)] + [IgnoreRule('*.txt')]
+        matcher = IgnoreMatcher(ignore_list)
+
+        self.assertEqual(matcher.match('file7.txt', len(ignore_list)), 7)
+        self.assertEqual(matcher.match('file120.txt', len(ignore_list)), 120)
+        self.assertEqual(matcher.match('other.txt', len(ignore_list)), 250)
+        self.assertIsNone(matcher.match('file120.txt', 100))
+        self.assertIsNone(matcher.match('other.bin', len(ignore_list)))
+
+    @mock.patch('azure.cli.command_modules.acr._archive_utils._archive_file_recursively',
+                wraps=_archive_file_recursively)
+    def test_pack_source_code(self, archive_mock):
+        import io
+        import tarfile
+        from azure.cli.command_modules.acr._archive_utils import _pack_source_code
+        output = io.BytesIO()
+
+        _pack_source_code(self.source, output, os.path.join(self.source, 'Dockerfile'), 'renamed_Dockerfile')
+
+        with tarfile.open(fileobj=io.BytesIO(output.getvalue()), mode='r:gz') as tar:
+            self.assertEqual(sorted(tar.getnames()), ['', '.dockerignore', 'Dockerfile', 'build/keep.txt',
+                                                      'renamed_Dockerfile', 'src', 'src/app.py'])
+        # ignored directories without exceptions below them are not walked
+        walked = [c[0][1] for c in archive_mock.call_args_list]
+        self.assertNotIn(os.path.join(self.source, 'node_modules', 'pkg'), walked)
+        self.assertNotIn(os.path.join(self.source, '.git', 'HEAD'), walked)
+        self.assertIn(os.path.join(self.source, 'build', 'out.bin'), walked)
+
+    def test_parallel_gzip_writer_produces_valid_stream(self):
+        import gzip
+        import io
+        from azure.cli.command_modules.acr._archive_utils import _ParallelGzipWriter
+        output = io.BytesIO()
+        data = os.urandom(1000) * 50
+
+        writer = _ParallelGzipWriter(output, workers=3, block_size=4096)
+        for i in range(0, len(data), 777):
+            writer.write(data[i:i + 777])
+        writer.close()
+
+        self.assertEqual(gzip.GzipFile(fileobj=io.BytesIO(output.getvalue())).read(), data)
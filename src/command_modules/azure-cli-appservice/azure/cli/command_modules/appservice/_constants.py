@@ -23,3 +23,14 @@ RUNTIME_TO_IMAGE = {
     'dotnet': 'mcr.microsoft.com/azure-functions/dotnet:2.0-appservice',
     'python': 'mcr.microsoft.com/azure-functions/python:2.0-python3.6-appservice'
 }
+ZIP_DEPLOY_CHUNK_SIZE = 1024 * 1024
+ZIP_DEPLOY_UPLOAD_RETRIES = 3
+ZIP_DEPLOY_STATUS_TIMEOUT = 1800
+ZIP_DEPLOY_STATUS_MIN_INTERVAL = 2
+ZIP_DEPLOY_STATUS_MAX_INTERVAL = 30
+WEBAPP_IGNORE_FILE_NAME = '.webappignore'
+ZIP_CACHE_ARCHIVE_NAME = 'content.zip'
+ZIP_CACHE_MANIFEST_NAME = 'manifest.json'
+# the zip caches of the source folders deployed by webapp up, the least recently used are removed first
+ZIP_CACHE_MAX_COUNT = 10
+ZIP_CACHE_MAX_AGE_DAYS = 30
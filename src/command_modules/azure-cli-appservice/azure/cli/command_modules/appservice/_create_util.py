@@ -3,14 +3,29 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import hashlib
+import json
 import os
+import re
+import struct
+import time
 import zipfile
+import zlib
 from azure.cli.core.commands.client_factory import get_mgmt_service_client
 from azure.mgmt.resource.resources.models import ResourceGroup
 from ._constants import (NETCORE_VERSION_DEFAULT, NETCORE_VERSIONS, NODE_VERSION_DEFAULT,
                          NODE_VERSIONS, NETCORE_RUNTIME_NAME, NODE_RUNTIME_NAME, DOTNET_RUNTIME_NAME,
                          DOTNET_VERSION_DEFAULT, DOTNET_VERSIONS, STATIC_RUNTIME_NAME,
-                         PYTHON_RUNTIME_NAME, PYTHON_VERSION_DEFAULT, LINUX_SKU_DEFAULT)
+                         PYTHON_RUNTIME_NAME, PYTHON_VERSION_DEFAULT, LINUX_SKU_DEFAULT,
+                         WEBAPP_IGNORE_FILE_NAME, ZIP_CACHE_ARCHIVE_NAME, ZIP_CACHE_MANIFEST_NAME,
+                         ZIP_CACHE_MAX_COUNT, ZIP_CACHE_MAX_AGE_DAYS)
+
+# skip node_modules folder for Node apps and build output for .NET Core apps,
+# since zip_deployment will perform the build operation
+_DEFAULT_ZIP_EXCLUDES = {
+    NODE_RUNTIME_NAME: ['node_modules/'],
+    NETCORE_RUNTIME_NAME: ['bin/', 'obj/']
+}
 
 
 def _resource_client_factory(cli_ctx, **_):
@@ -23,30 +38,358 @@ def web_client_factory(cli_ctx, **_):
     return get_mgmt_service_client(cli_ctx, WebSiteManagementClient)
 
 
-def zip_contents_from_dir(dirPath, lang):
-    relroot = os.path.abspath(os.path.join(dirPath, os.pardir))
-    path_and_file = os.path.splitdrive(dirPath)[1]
-    file_val = os.path.split(path_and_file)[1]
-    zip_file_path = relroot + os.path.sep + file_val + ".zip"
+def zip_contents_from_dir(dirPath, lang, cache_dir=None):
+    """Zip the contents of dirPath, honouring a .webappignore file in its root.
+
+    When cache_dir is given the archive is written there together with a content-hash manifest, and files
+    whose content did not change since the previous run are copied from the previous archive as-is instead
+    of being compressed again.
+    """
     abs_src = os.path.abspath(dirPath)
-    with zipfile.ZipFile("{}".format(zip_file_path), "w", zipfile.ZIP_DEFLATED) as zf:
-        for dirname, subdirs, files in os.walk(dirPath):
-            # skip node_modules folder for Node apps,
-            # since zip_deployment will perfom the build operation
-            if lang.lower() == NODE_RUNTIME_NAME and 'node_modules' in subdirs:
-                subdirs.remove('node_modules')
-            elif lang.lower() == NETCORE_RUNTIME_NAME:
-                if 'bin' in subdirs:
-                    subdirs.remove('bin')
-                elif 'obj' in subdirs:
-                    subdirs.remove('obj')
-            for filename in files:
-                absname = os.path.abspath(os.path.join(dirname, filename))
-                arcname = absname[len(abs_src) + 1:]
-                zf.write(absname, arcname)
+    if cache_dir:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        zip_file_path = os.path.join(cache_dir, ZIP_CACHE_ARCHIVE_NAME)
+    else:
+        relroot = os.path.abspath(os.path.join(dirPath, os.pardir))
+        path_and_file = os.path.splitdrive(dirPath)[1]
+        file_val = os.path.split(path_and_file)[1]
+        zip_file_path = relroot + os.path.sep + file_val + ".zip"
+
+    ignore_patterns = list(_DEFAULT_ZIP_EXCLUDES.get(lang.lower(), []))
+    ignore_file = os.path.join(abs_src, WEBAPP_IGNORE_FILE_NAME)
+    if os.path.isfile(ignore_file):
+        with open(ignore_file, 'r') as f:
+            ignore_patterns.extend(f.read().splitlines())
+    matcher = ZipIgnoreMatcher(ignore_patterns)
+    files = list(_walk_zip_sources(abs_src, matcher))
+
+    manifest_path = os.path.join(cache_dir, ZIP_CACHE_MANIFEST_NAME) if cache_dir else None
+    previous_manifest = {}
+    if manifest_path and os.path.isfile(manifest_path) and os.path.isfile(zip_file_path):
+        try:
+            with open(manifest_path, 'r') as f:
+                previous_manifest = json.load(f)
+        except ValueError:
+            previous_manifest = {}
+
+    tmp_zip_path = zip_file_path + '.tmp'
+    try:
+        if _needs_zip64(files):
+            # the raw writer does not write zip64 records, so large folders are zipped serially by zipfile
+            manifest = None
+            _write_zip_serially(tmp_zip_path, files)
+        else:
+            manifest = _write_zip_in_parallel(tmp_zip_path, files, zip_file_path, previous_manifest)
+    except BaseException:
+        if os.path.exists(tmp_zip_path):
+            os.remove(tmp_zip_path)
+        raise
+    if os.path.exists(zip_file_path):
+        os.remove(zip_file_path)
+    os.rename(tmp_zip_path, zip_file_path)
+    if manifest_path:
+        if manifest is None:
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+        else:
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f)
     return zip_file_path
 
 
+def _needs_zip64(files):
+    # deflate may expand incompressible content slightly, so leave a margin below the 4 GiB offsets
+    total_size = sum(os.path.getsize(absname) for absname, _ in files)
+    return total_size >= zipfile.ZIP64_LIMIT // 2 or len(files) >= zipfile.ZIP_FILECOUNT_LIMIT
+
+
+def _write_zip_serially(zip_path, files):
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for absname, arcname in files:
+            zf.write(absname, arcname.replace(os.sep, '/'))
+
+
+def _write_zip_in_parallel(zip_path, files, previous_zip_path, previous_manifest):
+    manifest = {}
+    previous_entries = {}
+    if previous_manifest:
+        with zipfile.ZipFile(previous_zip_path, 'r') as previous_zip:
+            previous_entries = {info.filename: info for info in previous_zip.infolist()}
+    previous_fp = open(previous_zip_path, 'rb') if previous_entries else None
+    writer = _RawZipWriter(zip_path)
+    try:
+        for absname, arcname, entry in _compress_files_in_parallel(files, previous_manifest):
+            raw = entry['raw']
+            if raw is None:
+                raw = _read_raw_zip_entry(previous_fp, previous_entries.get(arcname), entry)
+            if raw is None:
+                # the previous archive does not hold the entry the manifest lists
+                raw = _deflate(_read_file(absname))
+            writer.write(arcname, os.stat(absname), entry['crc'], entry['size'], raw)
+            manifest[arcname] = {'sha256': entry['sha256'], 'size': entry['size']}
+    finally:
+        writer.close()
+        if previous_fp:
+            previous_fp.close()
+    return manifest
+
+
+def evict_zip_caches(cache_root, current):
+    """Remove the zip caches of other source folders unused for ZIP_CACHE_MAX_AGE_DAYS, and the least recently
+    used beyond ZIP_CACHE_MAX_COUNT."""
+    import shutil
+    if not os.path.isdir(cache_root):
+        return
+    caches = []
+    for name in os.listdir(cache_root):
+        path = os.path.join(cache_root, name)
+        if name == current or not os.path.isdir(path):
+            continue
+        archive = os.path.join(path, ZIP_CACHE_ARCHIVE_NAME)
+        caches.append((os.path.getmtime(archive if os.path.exists(archive) else path), path))
+    caches.sort(reverse=True)
+    oldest = time.time() - ZIP_CACHE_MAX_AGE_DAYS * 24 * 3600
+    for index, (used, path) in enumerate(caches):
+        # the current folder's cache counts towards the limit
+        if used < oldest or index + 1 >= ZIP_CACHE_MAX_COUNT:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class ZipIgnoreMatcher(object):
+    """Matches archive-relative paths against .gitignore-style patterns compiled into a single regex.
+
+    Supported syntax: shell wildcards, a leading '/' to anchor a pattern to the root, a trailing '/' to match
+    directories only and a leading '!' to re-include paths excluded by an earlier pattern.
+    """
+
+    def __init__(self, patterns):
+        self._rules = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            negate = pattern.startswith('!')
+            if negate:
+                pattern = pattern[1:]
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            if '/' in pattern:
+                # patterns containing a separator are relative to the root
+                pattern = pattern.lstrip('/')
+            else:
+                pattern = '**/' + pattern
+            self._rules.append((negate, dir_only, _translate_ignore_pattern(pattern)))
+        self._has_negation = any(negate for negate, _, _ in self._rules)
+        # without negations a path is ignored if any rule matches, so all rules collapse into one regex
+        self._file_regex = self._compile([r for _, dir_only, r in self._rules if not dir_only])
+        self._dir_regex = self._compile([r for _, _, r in self._rules])
+        self._rules = [(negate, dir_only, re.compile(r)) for negate, dir_only, r in self._rules]
+
+    @staticmethod
+    def _compile(regexes):
+        return re.compile('|'.join('(?:{})'.format(r) for r in regexes)) if regexes else None
+
+    def is_ignored(self, relpath, is_dir=False):
+        relpath = relpath.replace(os.sep, '/')
+        if not self._has_negation:
+            regex = self._dir_regex if is_dir else self._file_regex
+            return bool(regex and regex.match(relpath))
+        ignored = False
+        for negate, dir_only, regex in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relpath):
+                ignored = not negate
+        return ignored
+
+
+def _translate_ignore_pattern(pattern):
+    i, n, res = 0, len(pattern), ''
+    while i < n:
+        if pattern.startswith('**/', i):
+            res += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            res += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            res += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            res += '[^/]'
+            i += 1
+        elif pattern[i] == '[':
+            i, char_class = _translate_char_class(pattern, i)
+            res += char_class
+        elif pattern[i] == '\\' and i + 1 < n:
+            # a backslash matches the next character literally, e.g. \# or \!
+            res += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            res += re.escape(pattern[i])
+            i += 1
+    return res + r'\Z'
+
+
+def _translate_char_class(pattern, start):
+    """Translate the character class starting at pattern[start], e.g. [a-z] or [!0-9]. Returns the index after
+    the class and its regex. A '[' without a closing ']' matches itself."""
+    i = start + 1
+    if i < len(pattern) and pattern[i] in '!^':
+        i += 1
+    # a ']' right after the opening bracket is part of the class
+    if i < len(pattern) and pattern[i] == ']':
+        i += 1
+    end = pattern.find(']', i)
+    if end < 0:
+        return start + 1, re.escape('[')
+    body = pattern[start + 1:end]
+    negate = body[:1] in ('!', '^')
+    if negate:
+        body = body[1:]
+    body = body.replace('\\', '\\\\').replace('^', '\\^').replace('[', '\\[').replace(']', '\\]')
+    # like the wildcards, a class never matches the path separator
+    return end + 1, '[^/{}]'.format(body) if negate else '(?!/)[{}]'.format(body)
+
+
+def _walk_zip_sources(abs_src, matcher):
+    for dirname, subdirs, files in os.walk(abs_src):
+        reldir = os.path.relpath(dirname, abs_src)
+        reldir = '' if reldir == os.curdir else reldir + os.sep
+        # prune ignored directories so that os.walk never descends into them
+        subdirs[:] = [d for d in subdirs if not matcher.is_ignored(reldir + d, is_dir=True)]
+        for filename in files:
+            arcname = reldir + filename
+            if not matcher.is_ignored(arcname):
+                yield os.path.join(dirname, filename), arcname
+
+
+def _read_file(absname):
+    with open(absname, 'rb') as f:
+        return f.read()
+
+
+def _deflate(content):
+    # raw deflate stream, as stored in zip entries
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return compressor.compress(content) + compressor.flush()
+
+
+def _compress_file(absname, arcname, previous_manifest):
+    content = _read_file(absname)
+    digest = hashlib.sha256(content).hexdigest()
+    entry = {'sha256': digest, 'size': len(content), 'crc': zlib.crc32(content) & 0xffffffff, 'raw': None}
+    if previous_manifest.get(arcname, {}).get('sha256') != digest:
+        entry['raw'] = _deflate(content)
+    return entry
+
+
+def _compress_files_in_parallel(files, previous_manifest):
+    """Compress files on worker threads (zlib releases the GIL) and yield the results in input order.
+
+    At most a few batches are in flight at a time to bound the memory held by compressed content.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    workers = _get_zip_worker_count()
+    batch_size = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(files), batch_size):
+            batch = files[start:start + batch_size]
+            futures = [executor.submit(_compress_file, absname, arcname, previous_manifest)
+                       for absname, arcname in batch]
+            for (absname, arcname), future in zip(batch, futures):
+                yield absname, arcname.replace(os.sep, '/'), future.result()
+
+
+def _get_zip_worker_count():
+    import multiprocessing
+    try:
+        return min(multiprocessing.cpu_count(), 8)
+    except NotImplementedError:
+        return 1
+
+
+def _read_raw_zip_entry(fp, zinfo, entry):
+    """Return the deflated content of an entry of the previous archive, or None if it cannot be reused."""
+    if zinfo is None or zinfo.compress_type != zipfile.ZIP_DEFLATED or zinfo.CRC != entry['crc'] or \
+            zinfo.file_size != entry['size']:
+        return None
+    fp.seek(zinfo.header_offset)
+    header = fp.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or header[:4] != b'PK\x03\x04':
+        return None
+    name_length, extra_length = _LOCAL_HEADER.unpack(header)[-2:]
+    fp.seek(name_length + extra_length, os.SEEK_CUR)
+    raw = fp.read(zinfo.compress_size)
+    return raw if len(raw) == zinfo.compress_size else None
+
+
+# signature, version needed, flags, method, time, date, crc, compressed size, size, name length, extra length
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+# signature, version made by, version needed, flags, method, time, date, crc, compressed size, size,
+# name length, extra length, comment length, disk, internal attributes, external attributes, header offset
+_CENTRAL_HEADER = struct.Struct('<4s6H3L5H2L')
+# signature, disk, central directory disk, entries on disk, entries, central directory size and offset, comment
+_END_RECORD = struct.Struct('<4s4H2LH')
+
+
+class _RawZipWriter(object):
+    """Writes a zip archive of entries deflated beforehand.
+
+    zipfile only accepts uncompressed content, so the records are written here following the zip format
+    specification rather than through zipfile internals. Archives needing zip64 records are not supported.
+    """
+
+    def __init__(self, path):
+        self._fp = open(path, 'wb')
+        self._central_headers = []
+
+    def write(self, arcname, st, crc, size, raw):
+        name, flags = _encode_arcname(arcname)
+        dos_time, dos_date = _dos_date_time(st.st_mtime)
+        offset = self._fp.tell()
+        self._fp.write(_LOCAL_HEADER.pack(b'PK\x03\x04', 20, flags, zipfile.ZIP_DEFLATED, dos_time, dos_date,
+                                          crc, len(raw), size, len(name), 0))
+        self._fp.write(name)
+        self._fp.write(raw)
+        # made by version 2.0 on Unix, which makes readers honour the permission bits of the external attributes
+        self._central_headers.append(_CENTRAL_HEADER.pack(
+            b'PK\x01\x02', (3 << 8) | 20, 20, flags, zipfile.ZIP_DEFLATED, dos_time, dos_date, crc, len(raw), size,
+            len(name), 0, 0, 0, 0, (st.st_mode & 0xFFFF) << 16, offset) + name)
+
+    def close(self):
+        if self._fp.closed:
+            return
+        try:
+            start = self._fp.tell()
+            for header in self._central_headers:
+                self._fp.write(header)
+            count = len(self._central_headers)
+            self._fp.write(_END_RECORD.pack(b'PK\x05\x06', 0, 0, count, count, self._fp.tell() - start, start, 0))
+        finally:
+            self._fp.close()
+
+
+def _encode_arcname(arcname):
+    if isinstance(arcname, bytes):
+        # Python 2 paths are written as they are named on disk
+        return arcname, 0
+    try:
+        return arcname.encode('ascii'), 0
+    except UnicodeError:
+        # bit 11: the name is UTF-8 encoded
+        return arcname.encode('utf-8'), 0x800
+
+
+def _dos_date_time(timestamp):
+    year, month, day, hour, minute, second = time.localtime(timestamp)[0:6]
+    if year < 1980:
+        # the earliest time representable in zip archives
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
 def get_runtime_version_details(file_path, lang_name):
     version_detected = None
     version_to_create = None
@@ -1435,6 +1435,13 @@ short-summary: >
   where the code is present. Current support includes Node, Python, .NET Core and ASP.NET, staticHtml. Node,
   Python apps are created as Linux apps. .Net Core, ASP.NET and static HTML apps are created as Windows apps.
   If command is run from an empty folder, an empty windows web app is created.
+long-summary: >
+  Files and folders matching the patterns in a .webappignore file in the root of the folder are not deployed.
+  It uses the syntax of .gitignore: *, ** and ? wildcards, [...] character classes, a leading / to match from
+  the root of the folder only, a trailing / to match folders only, ! to include paths excluded by an earlier
+  pattern and a backslash to match the next character literally. The zip of the folder contents is kept in the
+  CLI configuration folder so that files which did not change are not compressed again on the next deployment.
+  The zips of the 10 most recently deployed folders are kept, for up to 30 days.
 examples:
   - name: View the details of the app that will be created, without actually running the operation
     text: >
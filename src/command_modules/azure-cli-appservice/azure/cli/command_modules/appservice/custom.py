@@ -52,9 +52,10 @@ from ._client_factory import web_client_factory, ex_handler_factory
 from ._appservice_utils import _generic_site_operation
 from ._create_util import (zip_contents_from_dir, get_runtime_version_details, create_resource_group,
                            should_create_new_rg, set_location, should_create_new_app,
-                           get_lang_from_content, get_num_apps_in_asp)
+                           get_lang_from_content, get_num_apps_in_asp, evict_zip_caches)
 from ._constants import (NODE_RUNTIME_NAME, OS_DEFAULT, STATIC_RUNTIME_NAME, PYTHON_RUNTIME_NAME,
-                         RUNTIME_TO_IMAGE, NODE_VERSION_DEFAULT)
+                         RUNTIME_TO_IMAGE, NODE_VERSION_DEFAULT, ZIP_DEPLOY_CHUNK_SIZE, ZIP_DEPLOY_UPLOAD_RETRIES,
+                         ZIP_DEPLOY_STATUS_TIMEOUT, ZIP_DEPLOY_STATUS_MIN_INTERVAL, ZIP_DEPLOY_STATUS_MAX_INTERVAL)
 
 logger = get_logger(__name__)
 
@@ -283,20 +284,90 @@ def enable_zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=No
     headers = authorization
     headers['content-type'] = 'application/octet-stream'
 
-    import requests
     import os
-    from azure.cli.core.util import should_disable_connection_verify
-    # Read file content
-    with open(os.path.realpath(os.path.expanduser(src)), 'rb') as fs:
-        zip_content = fs.read()
-        logger.warning("Starting zip deployment. This operation can take a while to complete ...")
-        requests.post(zip_url, data=zip_content, headers=headers, verify=not should_disable_connection_verify())
+    zip_path = os.path.realpath(os.path.expanduser(src))
+    logger.warning("Starting zip deployment. This operation can take a while to complete ...")
+    _upload_zip_to_kudu(cmd, zip_url, zip_path, headers)
     # check the status of async deployment
     response = _check_zip_deployment_status(cmd, resource_group_name, name, deployment_status_url,
                                             authorization, timeout)
     return response
 
 
+class _ZipUploadStream(object):
+    """File-like wrapper which reads the zip from disk in chunks and reports upload progress."""
+
+    def __init__(self, file_obj, total_size, progress_controller=None, chunk_size=ZIP_DEPLOY_CHUNK_SIZE):
+        self._file = file_obj
+        self._total_size = total_size
+        self._progress = progress_controller
+        self._chunk_size = chunk_size
+        self.bytes_read = 0
+        self._last_reported = 0
+
+    def __len__(self):
+        return self._total_size - self.bytes_read
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self._chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._chunk_size:
+            size = self._chunk_size
+        chunk = self._file.read(size)
+        self.bytes_read += len(chunk)
+        # the transport reads in small blocks, only refresh the progress bar once per chunk
+        if self._progress and (self.bytes_read - self._last_reported >= self._chunk_size or
+                               self.bytes_read == self._total_size):
+            self._progress.add(message='Uploading', value=self.bytes_read, total_val=self._total_size)
+            self._last_reported = self.bytes_read
+        return chunk
+
+    def rewind(self):
+        self._file.seek(0)
+        self.bytes_read = 0
+        self._last_reported = 0
+
+
+def _upload_zip_to_kudu(cmd, zip_url, zip_path, headers, retries=ZIP_DEPLOY_UPLOAD_RETRIES):
+    import os
+    import requests
+    from azure.cli.core.util import should_disable_connection_verify
+
+    total_size = os.path.getsize(zip_path)
+    progress = cmd.cli_ctx.get_progress_controller(det=True)
+    progress.begin()
+    try:
+        with open(zip_path, 'rb') as fs:
+            stream = _ZipUploadStream(fs, total_size, progress)
+            for attempt in range(retries + 1):
+                stream.rewind()
+                try:
+                    response = requests.post(zip_url, data=stream, headers=headers,
+                                             verify=not should_disable_connection_verify())
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as ex:
+                    if attempt == retries:
+                        raise CLIError("Zip upload failed after {} attempts: {}".format(attempt + 1, ex))
+                    logger.warning("Zip upload interrupted (%s), retrying ...", ex)
+                else:
+                    if response.status_code < 500 and response.status_code not in (408, 429):
+                        break
+                    if attempt == retries:
+                        break
+                    logger.warning("Zip upload returned status code %s, retrying ...", response.status_code)
+                time.sleep(min(2 ** attempt, 30))
+    finally:
+        progress.end()
+    if response.status_code >= 400:
+        raise CLIError("Zip deployment upload failed with status code {}: {}".format(response.status_code,
+                                                                                     response.text))
+    return response
+
+
 def get_sku_name(tier):  # pylint: disable=too-many-return-statements
     tier = tier.upper()
     if tier in ['F1', 'FREE']:
@@ -2224,22 +2295,40 @@ def list_locations(cmd, sku, linux_workers_enabled=None):
 
 def _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout=None):
     import requests
-    total_trials = (int(timeout) // 2) if timeout else 450
-    num_trials = 0
-    while num_trials < total_trials:
-        time.sleep(2)
-        response = requests.get(deployment_status_url, headers=authorization)
-        time.sleep(2)
-        res_dict = response.json()
-        num_trials = num_trials + 1
-        if res_dict.get('status', 0) == 3:
-            _configure_default_logging(cmd, rg_name, name)
-            raise CLIError("""Zip deployment failed. {}. Please run the command az webapp log tail
-                           -n {} -g {}""".format(res_dict, name, rg_name))
-        elif res_dict.get('status', 0) == 4:
-            break
-        if 'progress' in res_dict:
-            logger.info(res_dict['progress'])  # show only in debug mode, customers seem to find this confusing
+    timeout = int(timeout) if timeout else ZIP_DEPLOY_STATUS_TIMEOUT
+    deadline = time.time() + timeout
+    interval = ZIP_DEPLOY_STATUS_MIN_INTERVAL
+    last_progress = None
+    res_dict = {}
+    progress = cmd.cli_ctx.get_progress_controller()
+    progress.begin()
+    try:
+        while time.time() < deadline:
+            time.sleep(min(interval, max(deadline - time.time(), 0)))
+            response = requests.get(deployment_status_url, headers=authorization)
+            try:
+                res_dict = response.json()
+            except ValueError:
+                # Kudu returns an empty body while the deployment record is being created
+                res_dict = {}
+            if res_dict.get('status', 0) == 3:
+                progress.stop()
+                _configure_default_logging(cmd, rg_name, name)
+                raise CLIError("""Zip deployment failed. {}. Please run the command az webapp log tail
+                               -n {} -g {}""".format(res_dict, name, rg_name))
+            elif res_dict.get('status', 0) == 4:
+                break
+            current_progress = res_dict.get('progress')
+            if current_progress and current_progress != last_progress:
+                # Kudu is making progress, check back soon
+                logger.info(current_progress)  # show only in debug mode, customers seem to find this confusing
+                progress.add(message='Deploying')
+                last_progress = current_progress
+                interval = ZIP_DEPLOY_STATUS_MIN_INTERVAL
+            else:
+                interval = min(interval * 2, ZIP_DEPLOY_STATUS_MAX_INTERVAL)
+    finally:
+        progress.end()
     # if the deployment is taking longer than expected
     if res_dict.get('status', 0) != 4:
         _configure_default_logging(cmd, rg_name, name)
@@ -2492,16 +2581,13 @@ def webapp_up(cmd, name, resource_group_name=None, plan=None,  # pylint: disable
 
     if do_deployment:
         logger.warning("Creating zip with contents of dir %s ...", src_dir)
-        # zip contents & deploy
-        zip_file_path = zip_contents_from_dir(src_dir, language)
+        # zip contents & deploy, keeping the archive so that unchanged files are reused on the next run
+        cache_dir = _get_webapp_up_cache_dir(cmd, src_dir)
+        zip_file_path = zip_contents_from_dir(src_dir, language, cache_dir=cache_dir)
+        evict_zip_caches(os.path.dirname(cache_dir), os.path.basename(cache_dir))
 
         logger.warning("Preparing to deploy %s contents to app.", '' if is_skip_build else 'and build')
         enable_zip_deploy(cmd, rg_name, name, zip_file_path)
-        # Remove the file after deployment, handling exception if user removed the file manually
-        try:
-            os.remove(zip_file_path)
-        except OSError:
-            pass
     logger.warning("All done.")
     with ConfiguredDefaultSetter(cmd.cli_ctx.config, True):
         cmd.cli_ctx.config.set_value('defaults', 'group', rg_name)
@@ -2687,6 +2773,13 @@ def create_devops_build(
     return azure_devops_build_interactive.interactive_azure_devops_build()
 
 
+def _get_webapp_up_cache_dir(cmd, src_dir):
+    import hashlib
+    import os
+    src_hash = hashlib.sha256(os.path.abspath(src_dir).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cmd.cli_ctx.config.config_dir, 'webapp_up', src_hash)
+
+
 def _configure_default_logging(cmd, rg_name, name):
     logger.warning("Configuring default logging for the app, if not already enabled")
     return config_diagnostics(cmd, rg_name, name,
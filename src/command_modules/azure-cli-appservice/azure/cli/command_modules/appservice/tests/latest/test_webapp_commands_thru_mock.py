@@ -2,7 +2,9 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import os
 import unittest
+import zlib
 import mock
 
 from msrestazure.azure_exceptions import CloudError
@@ -30,7 +32,12 @@ from azure.cli.command_modules.appservice.custom import (set_deployment_user,
                                                          validate_container_app_create_options,
                                                          restore_deleted_webapp,
                                                          list_snapshots,
-                                                         restore_snapshot)
+                                                         restore_snapshot,
+                                                         _ZipUploadStream,
+                                                         _upload_zip_to_kudu,
+                                                         _check_zip_deployment_status)
+from azure.cli.command_modules.appservice._create_util import zip_contents_from_dir, ZipIgnoreMatcher, evict_zip_caches
+from azure.cli.command_modules.appservice.tunnel import encode_websocket_frame, WebSocketFrameDecoder
 
 # pylint: disable=line-too-long
 from vsts_cd_manager.continuous_delivery_manager import ContinuousDeliveryResult
@@ -381,6 +388,202 @@ class TestWebappMocked(unittest.TestCase):
         self.assertFalse(validate_container_app_create_options(None, None, test_multi_container_config, None))
         self.assertFalse(validate_container_app_create_options(None, None, None, None))
 
+    def test_zip_upload_stream_reads_in_chunks(self):
+        import io
+        progress_mock = mock.MagicMock()
+        stream = _ZipUploadStream(io.BytesIO(b'x' * 10), 10, progress_mock, chunk_size=4)
+
+        self.assertEqual(len(stream), 10)
+        self.assertEqual(list(stream), [b'xxxx', b'xxxx', b'xx'])
+        self.assertEqual(len(stream), 0)
+        progress_mock.add.assert_called_with(message='Uploading', value=10, total_val=10)
+
+        stream.rewind()
+        self.assertEqual(len(stream), 10)
+
+    @mock.patch('azure.cli.command_modules.appservice.custom.time.sleep', autospec=True)
+    @mock.patch('requests.post', autospec=True)
+    def test_zip_upload_retries_transient_failures(self, post_mock, sleep_mock):
+        import os
+        import tempfile
+        import requests
+        fd, zip_path = tempfile.mkstemp()
+        os.write(fd, b'zip content')
+        os.close(fd)
+        uploaded = []
+
+        def _post(url, data, headers, verify):
+            uploaded.append(b''.join(data))
+            if len(uploaded) == 1:
+                raise requests.exceptions.ConnectionError('connection reset')
+            if len(uploaded) == 2:
+                return FakedResponse(503)
+            return FakedResponse(202)
+
+        post_mock.side_effect = _post
+        try:
+            response = _upload_zip_to_kudu(mock.MagicMock(), 'https://scm/api/zipdeploy', zip_path, {})
+        finally:
+            os.remove(zip_path)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(uploaded, [b'zip content'] * 3)
+        self.assertEqual(sleep_mock.call_count, 2)
+
+    @mock.patch('azure.cli.command_modules.appservice.custom.time.sleep', autospec=True)
+    @mock.patch('requests.get', autospec=True)
+    def test_zip_deployment_status_backs_off_while_idle(self, get_mock, sleep_mock):
+        statuses = [{'status': 1}, {'status': 1}, {'status': 1, 'progress': 'Running deployment command...'},
+                    {'status': 4}]
+        get_mock.side_effect = [mock.MagicMock(json=mock.MagicMock(return_value=x)) for x in statuses]
+
+        result = _check_zip_deployment_status(mock.MagicMock(), 'rg', 'web1', 'https://scm/api/deployments/latest',
+                                              {}, timeout=600)
+
+        self.assertEqual(result, {'status': 4})
+        self.assertEqual([c[0][0] for c in sleep_mock.call_args_list], [2, 4, 8, 2])
+
+
+class TestZipContentsFromDir(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.root = tempfile.mkdtemp()
+        self.src = os.path.join(self.root, 'app')
+        self.cache = os.path.join(self.root, 'cache')
+        self._write('app.js', 'console.log(1)')
+        self._write('lib/util.js', 'module.exports = {}')
+        self._write('node_modules/left-pad/index.js', 'pad')
+        self._write('logs/today.log', 'log')
+        self._write('logs/keep.txt', 'keep')
+        self._write('secrets.env', 'KEY=1')
+        self._write('.webappignore', '# comment\n*.env\nlogs/*\n!logs/keep.txt\n')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.root)
+
+    def _write(self, relpath, content):
+        path = os.path.join(self.src, *relpath.split('/'))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def test_zip_contents_honours_ignore_file(self):
+        import zipfile
+        zip_path = zip_contents_from_dir(self.src, 'node', cache_dir=self.cache)
+
+        with zipfile.ZipFile(zip_path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(sorted(zf.namelist()), ['.webappignore', 'app.js', 'lib/util.js', 'logs/keep.txt'])
+            self.assertEqual(zf.read('lib/util.js'), b'module.exports = {}')
+
+    @mock.patch('azure.cli.command_modules.appservice._create_util.zlib.compressobj', wraps=zlib.compressobj)
+    def test_zip_contents_reuses_unchanged_files(self, compress_mock):
+        import zipfile
+        zip_contents_from_dir(self.src, 'node', cache_dir=self.cache)
+        self.assertEqual(compress_mock.call_count, 4)
+
+        compress_mock.reset_mock()
+        self._write('app.js', 'console.log(2)')
+        zip_path = zip_contents_from_dir(self.src, 'node', cache_dir=self.cache)
+
+        self.assertEqual(compress_mock.call_count, 1)
+        with zipfile.ZipFile(zip_path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read('app.js'), b'console.log(2)')
+            self.assertEqual(zf.read('logs/keep.txt'), b'keep')
+
+    def test_zip_contents_entries(self):
+        import stat
+        import zipfile
+        os.chmod(os.path.join(self.src, 'app.js'), 0o755)
+        self._write(u'lib/caf\xe9.js', 'cafe')
+        zip_path = zip_contents_from_dir(self.src, 'node', cache_dir=self.cache)
+
+        with zipfile.ZipFile(zip_path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read(u'lib/caf\xe9.js'), b'cafe')
+            info = zf.getinfo('app.js')
+            self.assertEqual(info.compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(stat.S_IMODE(info.external_attr >> 16), 0o755)
+
+    @mock.patch('azure.cli.command_modules.appservice._create_util._needs_zip64', return_value=True)
+    def test_zip_contents_large_folder(self, _):
+        import zipfile
+        zip_contents_from_dir(self.src, 'node', cache_dir=self.cache)
+        # the serially written archive is not reused, so no manifest is kept
+        self.assertFalse(os.path.exists(os.path.join(self.cache, 'manifest.json')))
+        with zipfile.ZipFile(os.path.join(self.cache, 'content.zip')) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(len(zf.namelist()), 4)
+
+    def test_zip_contents_failure_removes_partial_archive(self):
+        import zipfile
+        zip_path = zip_contents_from_dir(self.src, 'node', cache_dir=self.cache)
+        self._write('app.js', 'console.log(2)')
+        with mock.patch('azure.cli.command_modules.appservice._create_util._compress_file',
+                        side_effect=IOError('denied')):
+            with self.assertRaises(IOError):
+                zip_contents_from_dir(self.src, 'node', cache_dir=self.cache)
+
+        self.assertEqual(sorted(os.listdir(self.cache)), ['content.zip', 'manifest.json'])
+        with zipfile.ZipFile(zip_path) as zf:
+            self.assertEqual(zf.read('app.js'), b'console.log(1)')
+
+    def test_evict_zip_caches(self):
+        import time
+        now = time.time()
+        for index in range(12):
+            cache = os.path.join(self.cache, 'src{}'.format(index))
+            os.makedirs(cache)
+            with open(os.path.join(cache, 'content.zip'), 'w') as f:
+                f.write('zip')
+            # src0 was used 40 days ago, src1 a day ago and so on
+            used = now - (40 if index == 0 else index) * 24 * 3600
+            os.utime(os.path.join(cache, 'content.zip'), (used, used))
+
+        evict_zip_caches(self.cache, 'src11')
+        self.assertEqual(sorted(os.listdir(self.cache)), sorted('src{}'.format(i) for i in [1, 2, 3, 4, 5, 6, 7, 8, 9, 11]))
+        evict_zip_caches(os.path.join(self.root, 'missing'), 'src1')
+
+    def test_ignore_matcher(self):
+        matcher = ZipIgnoreMatcher(['bin/', '/build', '*.pyc', 'docs/**/*.md'])
+        self.assertTrue(matcher.is_ignored('bin', is_dir=True))
+        self.assertTrue(matcher.is_ignored('src/bin', is_dir=True))
+        self.assertFalse(matcher.is_ignored('bin'))
+        self.assertTrue(matcher.is_ignored('build', is_dir=True))
+        self.assertFalse(matcher.is_ignored('src/build', is_dir=True))
+        self.assertTrue(matcher.is_ignored('pkg/mod.pyc'))
+        self.assertTrue(matcher.is_ignored('docs/a/b/readme.md'))
+        self.assertFalse(matcher.is_ignored('docs/readme.txt'))
+
+    def test_ignore_matcher_char_classes(self):
+        matcher = ZipIgnoreMatcher(['log[0-9].txt', 'tmp[!a-c]', 'file[]]', 'broken[', r'\#notes', r'\!important'])
+        self.assertTrue(matcher.is_ignored('log1.txt'))
+        self.assertFalse(matcher.is_ignored('logx.txt'))
+        self.assertTrue(matcher.is_ignored('tmpd'))
+        self.assertFalse(matcher.is_ignored('tmpa'))
+        self.assertFalse(matcher.is_ignored('tmp/'))
+        self.assertTrue(matcher.is_ignored('file]'))
+        self.assertTrue(matcher.is_ignored('broken['))
+        self.assertTrue(matcher.is_ignored('#notes'))
+        self.assertTrue(matcher.is_ignored('!important'))
+        self.assertFalse(ZipIgnoreMatcher(['a[/]b']).is_ignored('a/b'))
+
+
+class TestTunnelWebSocketFrames(unittest.TestCase):
+    def test_frames_round_trip_across_partial_reads(self):
+        payloads = [b'', b'small', b'm' * 300, b'l' * 70000]
+        stream = b''.join(encode_websocket_frame(p) for p in payloads) + encode_websocket_frame(b'', 0x8)
+        decoder = WebSocketFrameDecoder()
+
+        frames = []
+        for i in range(0, len(stream), 1000):
+            frames.extend(decoder.feed(stream[i:i + 1000]))
+
+        self.assertEqual(frames, [(0x2, p) for p in payloads] + [(0x8, b'')])
+
 
 class FakedResponse(object):  # pylint: disable=too-few-public-methods
     def __init__(self, status_code):
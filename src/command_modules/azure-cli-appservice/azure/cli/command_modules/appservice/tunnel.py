@@ -7,48 +7,150 @@
 import sys
 import ssl
 import socket
+import errno
+import os
+import struct
 import time
 import traceback
 import logging as logs
 from contextlib import closing
 from datetime import datetime
-from threading import Thread
+from threading import Thread, Lock
+
+try:
+    import selectors
+except ImportError:  # Python 2.7
+    import selectors2 as selectors
 
 import websocket
-from websocket import create_connection, WebSocket
+from websocket import create_connection, ABNF
 
 from knack.util import CLIError
 from knack.log import get_logger
 logger = get_logger(__name__)
 
+# bytes read from a socket per call
+DEFAULT_BUFFER_SIZE = 64 * 1024
+# pending bytes queued for a socket after which the opposite side stops being read (backpressure)
+DEFAULT_MAX_PENDING = 1024 * 1024
+# websocket handshakes are blocking, so they run on a small pool outside of the event loop
+DEFAULT_MAX_CONCURRENT_HANDSHAKES = 8
+
+
+def _mask_payload(mask_key, data):
+    if not hasattr(int, 'from_bytes'):  # Python 2.7
+        return ABNF.mask(mask_key, data)
+    length = len(data)
+    key = (mask_key * (length // 4 + 1))[:length]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+
+
+def encode_websocket_frame(payload, opcode=ABNF.OPCODE_BINARY):
+    """Build a single, final, client-to-server (masked) websocket frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, 0x80 | length)
+    elif length < (1 << 16):
+        header = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, length)
+    mask_key = os.urandom(4)
+    return header + mask_key + _mask_payload(mask_key, bytes(payload))
+
+
+class WebSocketFrameDecoder(object):
+    """Incrementally parses websocket frames out of the bytes read from a non-blocking socket."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Append data and return a list of (opcode, payload) tuples for every complete frame."""
+        self._buffer += data
+        frames = []
+        while len(self._buffer) >= 2:
+            opcode = self._buffer[0] & 0x0f
+            masked = self._buffer[1] & 0x80
+            length = self._buffer[1] & 0x7f
+            offset = 2
+            if length == 126:
+                if len(self._buffer) < 4:
+                    break
+                length = struct.unpack('!H', bytes(self._buffer[2:4]))[0]
+                offset = 4
+            elif length == 127:
+                if len(self._buffer) < 10:
+                    break
+                length = struct.unpack('!Q', bytes(self._buffer[2:10]))[0]
+                offset = 10
+            mask_key = None
+            if masked:
+                mask_key = bytes(self._buffer[offset:offset + 4])
+                offset += 4
+            if len(self._buffer) < offset + length:
+                break
+            payload = bytes(self._buffer[offset:offset + length])
+            del self._buffer[:offset + length]
+            if mask_key is not None:
+                payload = _mask_payload(mask_key, payload)
+            frames.append((opcode, payload))
+        return frames
+
 
-class TunnelWebSocket(WebSocket):
-    def recv_frame(self):
-        frame = super(TunnelWebSocket, self).recv_frame()
-        logger.info('Received frame: %s', frame)
-        return frame
+class _TunnelConnection(object):  # pylint: disable=too-few-public-methods
+    """A forwarded local client connection paired with the websocket carrying its traffic."""
 
-    def recv(self):
-        data = super(TunnelWebSocket, self).recv()
-        logger.info('Received websocket data: %s', data)
-        return data
+    def __init__(self, client, ws, index):
+        self.client = client
+        self.ws = ws
+        self.ws_sock = ws.sock
+        self.index = index
+        self.to_client = bytearray()
+        self.to_ws = bytearray()
+        self.decoder = WebSocketFrameDecoder()
+        self.closing = False
+        self.closed = False
+
+
+def _is_would_block(ex):
+    if isinstance(ex, (ssl.SSLWantReadError, ssl.SSLWantWriteError)):
+        return True
+    return getattr(ex, 'errno', None) in (errno.EAGAIN, errno.EWOULDBLOCK)
 
 
 # pylint: disable=no-member,too-many-instance-attributes,bare-except,no-self-use
 class TunnelServer(object):
-    def __init__(self, local_addr, local_port, remote_addr, remote_user_name, remote_password):
+    """Forwards local TCP connections to the App Service tunnel endpoint over websockets.
+
+    All client sockets and websockets are multiplexed on a single selector-based event loop.
+    """
+
+    def __init__(self, local_addr, local_port, remote_addr, remote_user_name, remote_password,
+                 buffer_size=DEFAULT_BUFFER_SIZE, max_pending=DEFAULT_MAX_PENDING,
+                 max_concurrent_handshakes=DEFAULT_MAX_CONCURRENT_HANDSHAKES):
         self.local_addr = local_addr
         self.local_port = local_port
         if self.local_port != 0 and not self.is_port_open():
             raise CLIError('Defined port is currently unavailable')
+        self.ws_scheme = 'wss'
         if remote_addr.startswith("https://"):
             self.remote_addr = remote_addr[8:]
+        elif remote_addr.startswith("http://"):
+            self.ws_scheme = 'ws'
+            self.remote_addr = remote_addr[7:]
         else:
             self.remote_addr = remote_addr
         self.remote_user_name = remote_user_name
         self.remote_password = remote_password
-        self.client = None
-        self.ws = None
+        self.buffer_size = buffer_size
+        self.max_pending = max_pending
+        self.max_concurrent_handshakes = max_concurrent_handshakes
+        self.connections = set()
+        self._selector = None
+        self._ready = []
+        self._ready_lock = Lock()
+        self._wakeup_reader, self._wakeup_writer = None, None
+        self._running = False
         logger.info('Creating a socket on port: %s', self.local_port)
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         logger.info('Setting socket options')
@@ -110,89 +212,239 @@ class TunnelServer(object):
             return True
         return False
 
+    def _connect_websocket(self):
+        host = '{}://{}{}'.format(self.ws_scheme, self.remote_addr, '/AppServiceTunnel/Tunnel.ashx')
+        basic_auth_header = 'Authorization: Basic {}'.format(self.create_basic_auth())
+        ws = create_connection(host,
+                               sockopt=((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),),
+                               header=[basic_auth_header],
+                               sslopt={'cert_reqs': ssl.CERT_NONE},
+                               timeout=60 * 60)
+        logger.info('Websocket, connected status: %s', ws.connected)
+        return ws
+
     def _listen(self):
+        from concurrent.futures import ThreadPoolExecutor
+        cli_logger = get_logger()  # get CLI logger which has the level set through command lines
+        is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
+        if is_verbose:
+            logger.info('Websocket tracing enabled')
+            websocket.enableTrace(True)
+        else:
+            logger.info('Websocket tracing disabled, use --verbose flag to enable')
+            websocket.enableTrace(False)
+
         self.sock.listen(100)
+        self.sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_reader, self._wakeup_writer = _socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._selector.register(self.sock, selectors.EVENT_READ, None)
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ, None)
+        self._running = True
         index = 0
-        basic_auth_string = self.create_basic_auth()
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_handshakes) as handshake_pool:
+            try:
+                while self._running:
+                    for key, events in self._selector.select():
+                        if key.fileobj is self.sock:
+                            index = self._accept(handshake_pool, index)
+                        elif key.fileobj is self._wakeup_reader:
+                            self._register_ready_connections()
+                        else:
+                            self._handle_event(key.data, key.fileobj, events)
+            finally:
+                for conn in list(self.connections):
+                    self._close(conn)
+                self._selector.close()
+                self._wakeup_reader.close()
+                self._wakeup_writer.close()
+                self.sock.close()
+        logger.info('Stopped local server..')
+
+    def _accept(self, handshake_pool, index):
         while True:
-            self.client, _address = self.sock.accept()
-            self.client.settimeout(60 * 60)
-            host = 'wss://{}{}'.format(self.remote_addr, '/AppServiceTunnel/Tunnel.ashx')
-            basic_auth_header = 'Authorization: Basic {}'.format(basic_auth_string)
-            cli_logger = get_logger()  # get CLI logger which has the level set through command lines
-            is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
-            if is_verbose:
-                logger.info('Websocket tracing enabled')
-                websocket.enableTrace(True)
-            else:
-                logger.info('Websocket tracing disabled, use --verbose flag to enable')
-                websocket.enableTrace(False)
-            self.ws = create_connection(host,
-                                        sockopt=((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),),
-                                        class_=TunnelWebSocket,
-                                        header=[basic_auth_header],
-                                        sslopt={'cert_reqs': ssl.CERT_NONE},
-                                        timeout=60 * 60,
-                                        enable_multithread=True)
-            logger.info('Websocket, connected status: %s', self.ws.connected)
+            try:
+                client, _address = self.sock.accept()
+            except socket.error as ex:
+                if _is_would_block(ex):
+                    return index
+                raise
             index = index + 1
             logger.info('Got debugger connection... index: %s', index)
-            debugger_thread = Thread(target=self._listen_to_client, args=(self.client, self.ws, index))
-            web_socket_thread = Thread(target=self._listen_to_web_socket, args=(self.client, self.ws, index))
-            debugger_thread.start()
-            web_socket_thread.start()
-            logger.info('Both debugger and websocket threads started...')
-            logger.info('Successfully connected to local server..')
-            debugger_thread.join()
-            web_socket_thread.join()
-            logger.info('Both debugger and websocket threads stopped...')
-            logger.info('Stopped local server..')
-
-    def _listen_to_web_socket(self, client, ws_socket, index):
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            future = handshake_pool.submit(self._connect_websocket)
+            future.add_done_callback(lambda f, c=client, i=index: self._on_websocket_connected(f, c, i))
+
+    def _on_websocket_connected(self, future, client, index):
+        # runs on the handshake pool, hand the connection over to the event loop
         try:
-            while True:
-                logger.info('Waiting for websocket data, connection status: %s, index: %s', ws_socket.connected, index)
-                data = ws_socket.recv()
-                logger.info('Received websocket data: %s, index: %s', data, index)
-                if data:
-                    # Set the response to echo back the recieved data
-                    response = data
-                    logger.info('Sending to debugger, response: %s, index: %s', response, index)
-                    client.sendall(response)
-                    logger.info('Done sending to debugger, index: %s', index)
-                else:
-                    break
+            ws = future.result()
         except Exception as ex:  # pylint: disable=broad-except
-            logger.info(ex)
-        finally:
-            logger.info('Client disconnected!, index: %s', index)
+            logger.warning('Unable to open a websocket for connection %s: %s', index, ex)
             client.close()
-            ws_socket.close()
+            return
+        with self._ready_lock:
+            self._ready.append(_TunnelConnection(client, ws, index))
+        try:
+            self._wakeup_writer.send(b'\0')
+        except socket.error:
+            pass
+
+    def _register_ready_connections(self):
+        try:
+            while self._wakeup_reader.recv(4096):
+                pass
+        except socket.error:
+            pass
+        with self._ready_lock:
+            ready, self._ready = self._ready, []
+        for conn in ready:
+            if not self._running:
+                self._close(conn)
+                continue
+            conn.client.setblocking(False)
+            conn.ws_sock.setblocking(False)
+            self.connections.add(conn)
+            self._selector.register(conn.client, selectors.EVENT_READ, conn)
+            self._selector.register(conn.ws_sock, selectors.EVENT_READ, conn)
+            logger.info('Successfully connected to local server.., index: %s', conn.index)
 
-    def _listen_to_client(self, client, ws_socket, index):
+    def _handle_event(self, conn, sock, events):
         try:
-            while True:
-                logger.info('Waiting for debugger data, index: %s', index)
-                buf = bytearray(4096)
-                nbytes = client.recv_into(buf, 4096)
-                logger.info('Received debugger data, nbytes: %s, index: %s', nbytes, index)
-                if nbytes > 0:
-                    responseData = buf[0:nbytes]
-                    logger.info('Sending to websocket, response data: %s, index: %s', responseData, index)
-                    ws_socket.send_binary(responseData)
-                    logger.info('Done sending to websocket, index: %s', index)
+            if events & selectors.EVENT_READ:
+                if sock is conn.client:
+                    self._read_client(conn)
                 else:
-                    break
+                    self._read_web_socket(conn)
+            if events & selectors.EVENT_WRITE and not conn.closed:
+                self._flush(conn)
+            if not conn.closed:
+                self._update_interest(conn)
         except Exception as ex:  # pylint: disable=broad-except
-            logger.info(ex)
-            logger.warning("Connection Timed Out")
-        finally:
-            logger.info('Client disconnected %s', index)
-            client.close()
-            ws_socket.close()
+            logger.info('Connection %s failed: %s', conn.index, ex)
+            self._close(conn)
+
+    def _read_client(self, conn):
+        try:
+            data = conn.client.recv(self.buffer_size)
+        except socket.error as ex:
+            if _is_would_block(ex):
+                return
+            raise
+        if not data:
+            logger.info('Client disconnected %s', conn.index)
+            conn.to_ws += encode_websocket_frame(b'', ABNF.OPCODE_CLOSE)
+            conn.closing = True
+        else:
+            conn.to_ws += encode_websocket_frame(data)
+        self._flush(conn)
+
+    def _read_web_socket(self, conn):
+        while True:
+            try:
+                data = conn.ws_sock.recv(self.buffer_size)
+            except socket.error as ex:
+                if _is_would_block(ex):
+                    break
+                raise
+            if not data:
+                logger.info('Websocket disconnected!, index: %s', conn.index)
+                conn.closing = True
+                break
+            for opcode, payload in conn.decoder.feed(data):
+                if opcode in (ABNF.OPCODE_BINARY, ABNF.OPCODE_TEXT, ABNF.OPCODE_CONT):
+                    conn.to_client += payload
+                elif opcode == ABNF.OPCODE_PING:
+                    conn.to_ws += encode_websocket_frame(payload, ABNF.OPCODE_PONG)
+                elif opcode == ABNF.OPCODE_CLOSE:
+                    logger.info('Websocket closed by server, index: %s', conn.index)
+                    conn.closing = True
+            # decrypted bytes buffered by the SSL layer do not make the socket readable again
+            if conn.closing or not (hasattr(conn.ws_sock, 'pending') and conn.ws_sock.pending()):
+                break
+        self._flush(conn)
+
+    def _flush(self, conn):
+        for sock, buf in ((conn.client, conn.to_client), (conn.ws_sock, conn.to_ws)):
+            while buf:
+                try:
+                    sent = sock.send(buf[:self.buffer_size])
+                except socket.error as ex:
+                    if _is_would_block(ex):
+                        break
+                    raise
+                del buf[:sent]
+
+    def _update_interest(self, conn):
+        if conn.closing:
+            if not conn.to_client and not conn.to_ws:
+                self._close(conn)
+                return
+            client_events = selectors.EVENT_WRITE if conn.to_client else 0
+            ws_events = selectors.EVENT_WRITE if conn.to_ws else 0
+        else:
+            # stop reading from one side while the other side cannot keep up
+            client_events = selectors.EVENT_READ if len(conn.to_ws) < self.max_pending else 0
+            ws_events = selectors.EVENT_READ if len(conn.to_client) < self.max_pending else 0
+            if conn.to_client:
+                client_events |= selectors.EVENT_WRITE
+            if conn.to_ws:
+                ws_events |= selectors.EVENT_WRITE
+        self._set_events(conn.client, client_events, conn)
+        self._set_events(conn.ws_sock, ws_events, conn)
+
+    def _set_events(self, sock, events, conn):
+        try:
+            registered = self._selector.get_key(sock).events
+        except KeyError:
+            registered = 0
+        if events == registered:
+            return
+        if not events:
+            self._selector.unregister(sock)
+        elif not registered:
+            self._selector.register(sock, events, conn)
+        else:
+            self._selector.modify(sock, events, conn)
+
+    def _close(self, conn):
+        if conn.closed:
+            return
+        conn.closed = True
+        self.connections.discard(conn)
+        for sock in (conn.client, conn.ws_sock):
+            try:
+                self._selector.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+        conn.client.close()
+        # shutdown rather than close, which would block waiting for the server's close frame
+        conn.ws.shutdown()
+        logger.info('Client disconnected!, index: %s', conn.index)
 
     def start_server(self):
         self._listen()
 
+    def stop_server(self):
+        self._running = False
+        if self._wakeup_writer:
+            try:
+                self._wakeup_writer.send(b'\0')
+            except socket.error:
+                pass
+
     def get_port(self):
         return self.local_port
+
+
+def _socketpair():
+    if hasattr(socket, 'socketpair'):
+        return socket.socketpair()
+    # Python 2.7 on Windows
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as listener:
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        writer = socket.create_connection(listener.getsockname())
+        reader, _ = listener.accept()
+        return reader, writer
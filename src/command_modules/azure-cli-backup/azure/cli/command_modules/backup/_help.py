@@ -97,11 +97,14 @@ examples:
 
 helps['backup job wait'] = """
 type: command
-short-summary: Wait until either the job completes or the specified timeout value is reached.
+short-summary: Wait until either the jobs complete or the specified timeout value is reached.
+long-summary: The jobs are polled concurrently and their status changes are reported as they happen.
 examples:
   - name: Wait until either the job completes or the specified timeout value is reached
     text: az backup job wait --name MyJob --resource-group MyResourceGroup --vault-name MyVault
     crafted: true
+  - name: Wait for several jobs for at most an hour
+    text: az backup job wait --name MyJob1 MyJob2 --resource-group MyResourceGroup --vault-name MyVault --timeout 3600
 """
 
 helps['backup policy'] = """
@@ -152,4 +152,5 @@ def load_arguments(self, _):
         c.argument('end_date', type=datetime_type, help='The end date of the range in UTC (d-m-Y).')
 
     with self.argument_context('backup job wait') as c:
-        c.argument('timeout', type=int, help='Maximum time, in seconds, to wait before aborting.')
+        c.argument('name', job_name_type, nargs='+', help='Names of the jobs. You can use the backup job list command to get the name of a job.')
+        c.argument('timeout', type=int, help='Maximum time, in seconds, to wait for all the jobs before aborting.')
@@ -36,6 +36,9 @@ os_windows = 'Windows'
 os_linux = 'Linux'
 password_offset = 33
 password_length = 15
+# seconds between the polls of a job, see wait_for_jobs
+job_wait_min_interval = 5
+job_wait_max_interval = 30
 
 
 def create_vault(client, vault_name, resource_group_name, location):
@@ -477,18 +480,16 @@ def stop_job(client, resource_group_name, vault_name, name):
 
 
 def wait_for_job(client, resource_group_name, vault_name, name, timeout=None):
-    logger.warning("Waiting for job '%s' ...", name)
-    start_timestamp = datetime.utcnow()
-    job_details = client.get(vault_name, resource_group_name, name)
-    while _job_in_progress(job_details.properties.status):
-        if timeout:
-            elapsed_time = datetime.utcnow() - start_timestamp
-            if elapsed_time.seconds > timeout:
-                logger.warning("Command timed out while waiting for job '%s'", name)
-                break
-        job_details = client.get(vault_name, resource_group_name, name)
-        time.sleep(30)
-    return job_details
+    from azure.cli.core.commands.job_waiter import wait_for_jobs
+    names = name if isinstance(name, list) else [name]
+    logger.warning("Waiting for job%s '%s' ...", 's' if len(names) > 1 else '', "', '".join(names))
+    result = wait_for_jobs(names, lambda job_name: client.get(vault_name, resource_group_name, job_name),
+                           lambda job: job.properties.status,
+                           lambda job: not _job_in_progress(job.properties.status),
+                           timeout=timeout, min_interval=job_wait_min_interval, max_interval=job_wait_max_interval)
+    for job_name in result.timed_out:
+        logger.warning("Command timed out while waiting for job '%s'", job_name)
+    return result.jobs[0] if len(result.jobs) == 1 else result.jobs
 
 # Client Utilities
 
@@ -424,11 +424,15 @@ helps['batchai job file stream'] = """
 
 helps['batchai job wait'] = """
     type: command
-    short-summary: Waits for specified job completion and setups the exit code to the job's exit code.
+    short-summary: Waits for specified jobs completion and setups the exit code to the exit code of the first failed job.
+    long-summary: The jobs are polled concurrently and their state changes are reported as they happen.
     examples:
         - name: Wait for the job completion.
           text: |
             az batchai job wait -g MyResourceGroup -w MyWorkspace -n MyJob
+        - name: Wait for the completion of several jobs of an experiment.
+          text: |
+            az batchai job wait -g MyResourceGroup -w MyWorkspace -e MyExperiment -n MyJob1 MyJob2
 """
 
 helps['batchai file-server'] = """
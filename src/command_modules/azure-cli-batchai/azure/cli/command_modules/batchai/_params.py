@@ -148,7 +148,8 @@ def load_arguments(self, _):
         c.argument('expiry', options_list=['--expiry'], type=int, help='Time in minutes for how long generated download URL should remain valid.')
 
     with self.argument_context('batchai job wait') as c:
-        c.argument('check_interval_sec', options_list=['--interval'], help="Polling interval in sec.")
+        c.argument('job_name', nargs='+', help='Space-separated names of the jobs.')
+        c.argument('check_interval_sec', options_list=['--interval'], type=int, help="Maximum polling interval in sec. The interval starts shorter and grows while the state of a job does not change.")
 
     for group in ['batchai cluster node exec', 'batchai job node exec']:
         with self.argument_context(group) as c:
@@ -924,27 +924,35 @@ def tail_file(client, resource_group, workspace_name, experiment_name, job_name,
 
 
 def wait_for_job_completion(client, resource_group, workspace_name, experiment_name, job_name, check_interval_sec=15):
-    job = client.jobs.get(resource_group, workspace_name, experiment_name, job_name)  # type: models.Job
-    logger.warning('Job submitted at %s', str(job.creation_time))
-    last_state = None
-    reported_job_start_time = False
-    while True:
+    from azure.cli.core.commands.job_waiter import wait_for_jobs
+    job_names = job_name if isinstance(job_name, list) else [job_name]
+    # a single job is reported as before, without its name
+    prefixes = {n: ('Job "{}"'.format(n) if len(job_names) > 1 else 'Job') for n in job_names}
+    reported_start = set()
+
+    def _get_job(name):
+        return client.jobs.get(resource_group, workspace_name, experiment_name, name)  # type: models.Job
+
+    def _report_transition(name, job, last_state, state):
         info = job.execution_info  # type: models.JobPropertiesExecutionInfo
-        if info and not reported_job_start_time:
-            logger.warning('Job started execution at %s', str(info.start_time))
-            reported_job_start_time = True
-        if job.execution_state != last_state:
-            logger.warning('Job state: %s', job.execution_state)
-            last_state = job.execution_state
-        if job.execution_state == models.ExecutionState.succeeded:
-            logger.warning('Job completed at %s; execution took %s', str(info.end_time),
+        if last_state is None:
+            logger.warning('%s submitted at %s', prefixes[name], str(job.creation_time))
+        if info and name not in reported_start:
+            logger.warning('%s started execution at %s', prefixes[name], str(info.start_time))
+            reported_start.add(name)
+        logger.warning('%s state: %s', prefixes[name], state)
+        if state == models.ExecutionState.succeeded:
+            logger.warning('%s completed at %s; execution took %s', prefixes[name], str(info.end_time),
                            str(info.end_time - info.start_time))
-            return
-        if job.execution_state == models.ExecutionState.failed:
-            _log_failed_job(resource_group, job)
-            sys.exit(-1)
-        time.sleep(check_interval_sec)
-        job = client.jobs.get(resource_group, workspace_name, experiment_name, job_name)
+
+    result = wait_for_jobs(job_names, _get_job, lambda job: job.execution_state,
+                           lambda job: job.execution_state in (models.ExecutionState.succeeded,
+                                                               models.ExecutionState.failed),
+                           min_interval=1, max_interval=check_interval_sec, on_transition=_report_transition)
+    exit_codes = [_log_failed_job(resource_group, job) for job in result.jobs
+                  if job.execution_state == models.ExecutionState.failed]
+    if exit_codes:
+        sys.exit(exit_codes[0])
 
 
 def _log_failed_job(resource_group, job):
@@ -952,6 +960,7 @@ def _log_failed_job(resource_group, job):
 
     :param str resource_group: resource group name
     :param models.Job job: failed job.
+    :return int: the exit code of the job, -1 if it has no execution info.
     """
     logger.warning('The job "%s" in resource group "%s" failed.', job.name, resource_group)
     info = job.execution_info  # type: models.JobPropertiesExecutionInfo
@@ -965,8 +974,9 @@ def _log_failed_job(resource_group, job):
                 if e.details:
                     details = '\n' + '\n'.join(['{0}: {1}'.format(d.name, d.value) for d in e.details])
                 logger.warning('Error message: %s\nDetails:\n %s', e.message, details)
-        sys.exit(info.exit_code)
+        return info.exit_code
     logger.warning('Failed job has no execution info')
+    return -1
 
 
 def create_file_server(client, resource_group, workspace, file_server_name, json_file=None, vm_size=None,
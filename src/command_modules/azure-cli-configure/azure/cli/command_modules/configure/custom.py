@@ -193,6 +193,9 @@ def list_cache_contents(cmd):
                 continue
             resource_type = os.path.split(dir_name)[1]
             for f in file_list:
+                if not f.endswith('.json'):
+                    # entries being written by another process
+                    continue
                 file_path = os.path.join(dir_name, f)
                 try:
                     with open(file_path, 'r') as cache_file:
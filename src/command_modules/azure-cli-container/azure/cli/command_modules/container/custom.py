@@ -45,6 +45,11 @@ AZURE_FILE_VOLUME_NAME = 'azurefile'
 SECRETS_VOLUME_NAME = 'secrets'
 GITREPO_VOLUME_NAME = 'gitrepo'
 MSI_LOCAL_ID = '[system]'
+# seconds between polls of a followed log, doubled while no new lines are written
+LOG_POLL_MIN_INTERVAL = 1
+LOG_POLL_MAX_INTERVAL = 16
+# characters at the end of the printed log which must be unchanged in the next poll, otherwise it was restarted
+LOG_CHECK_LENGTH = 256
 
 
 def list_containers(client, resource_group_name=None):
@@ -536,7 +541,7 @@ def _create_ip_address(ip_address, ports, protocol, dns_name_label, network_prof
 
 
 # pylint: disable=inconsistent-return-statements
-def container_logs(cmd, resource_group_name, name, container_name=None, follow=False):
+def container_logs(cmd, resource_group_name, name, container_name=None, follow=False, tail=None):
     """Tail a container instance log. """
     container_client = cf_container(cmd.cli_ctx)
     container_group_client = cf_container_groups(cmd.cli_ctx)
@@ -547,7 +552,7 @@ def container_logs(cmd, resource_group_name, name, container_name=None, follow=F
         container_name = container_group.containers[0].name
 
     if not follow:
-        log = container_client.list_logs(resource_group_name, name, container_name)
+        log = container_client.list_logs(resource_group_name, name, container_name, tail=tail)
         print(log.content)
     else:
         _start_streaming(
@@ -555,7 +560,8 @@ def container_logs(cmd, resource_group_name, name, container_name=None, follow=F
             terminate_condition_args=(container_group_client, resource_group_name, name, container_name),
             shupdown_grace_period=5,
             stream_target=_stream_logs,
-            stream_args=(container_client, resource_group_name, name, container_name, container_group.restart_policy))
+            stream_args=(container_client, resource_group_name, name, container_name, container_group.restart_policy,
+                         tail))
 
 
 def container_export(cmd, resource_group_name, name, file):
@@ -729,30 +735,47 @@ def _start_streaming(terminate_condition, terminate_condition_args, shupdown_gra
         colorama.deinit()
 
 
-def _stream_logs(client, resource_group_name, name, container_name, restart_policy):
-    """Stream logs for a container. """
-    lastOutputLines = 0
+def _stream_logs(client, resource_group_name, name, container_name, restart_policy, tail=None):
+    """Stream logs for a container, printing only the lines written since the previous poll. """
+    printed = 0  # length of the log which has been printed
+    printed_end = ''
+    first_poll = True
+    interval = LOG_POLL_MIN_INTERVAL
     while True:
-        log = client.list_logs(resource_group_name, name, container_name)
-        lines = log.content.split('\n')
-        currentOutputLines = len(lines)
+        content = client.list_logs(resource_group_name, name, container_name).content or ''
 
         # Should only happen when the container restarts.
-        if currentOutputLines < lastOutputLines and restart_policy != 'Never':
-            print("Warning: you're having '--restart-policy={}'; the container '{}' was just restarted; the tail of the current log might be missing. Exiting...".format(restart_policy, container_name))
-            break
-
-        _move_console_cursor_up(lastOutputLines)
-        print(log.content)
+        if printed and (len(content) < printed or not content.startswith(printed_end, printed - len(printed_end))):
+            if restart_policy != 'Never':
+                print("Warning: you're having '--restart-policy={}'; the container '{}' was just restarted; the tail of the current log might be missing. Exiting...".format(restart_policy, container_name))
+                break
+            printed, printed_end = 0, ''
+
+        # Only complete lines are printed, the last line may still be written to.
+        end = content.rfind('\n') + 1
+        if end > printed:
+            new_lines = content[printed:end]
+            if first_poll and tail is not None:
+                new_lines = ''.join(new_lines.splitlines(True)[-tail:]) if tail > 0 else ''
+            sys.stdout.write(new_lines)
+            sys.stdout.flush()
+            printed, printed_end = end, content[max(0, end - LOG_CHECK_LENGTH):end]
+            interval = LOG_POLL_MIN_INTERVAL
+        else:
+            interval = min(interval * 2, LOG_POLL_MAX_INTERVAL)
 
-        lastOutputLines = currentOutputLines
-        time.sleep(2)
+        first_poll = False
+        time.sleep(interval)
 
 
 def _stream_container_events_and_logs(container_group_client, container_client, resource_group_name, name, container_name):
     """Stream container events and logs. """
     lastOutputLines = 0
     lastContainerState = None
+    # Redrawing the events with cursor movements is only possible on a terminal. Otherwise, for example when the
+    # output is redirected to a file, only the events which were not printed yet are printed.
+    redraw = sys.stdout.isatty()
+    printed_events = set()
 
     while True:
         container_group, container = _find_container(container_group_client, resource_group_name, name, container_name)
@@ -761,14 +784,20 @@ def _stream_container_events_and_logs(container_group_client, container_client,
         if container.instance_view and container.instance_view.current_state and container.instance_view.current_state.state:
             container_state = container.instance_view.current_state.state
 
-        _move_console_cursor_up(lastOutputLines)
+        if redraw:
+            _move_console_cursor_up(lastOutputLines)
         if container_state != lastContainerState:
             print("Container '{}' is in state '{}'...".format(container_name, container_state))
 
         currentOutputLines = 0
         if container.instance_view and container.instance_view.events:
             for event in sorted(container.instance_view.events, key=lambda e: e.last_timestamp):
-                print('(count: {}) (last timestamp: {}) {}'.format(event.count, event.last_timestamp, event.message))
+                event_line = '(count: {}) (last timestamp: {}) {}'.format(event.count, event.last_timestamp, event.message)
+                if not redraw:
+                    if event_line in printed_events:
+                        continue
+                    printed_events.add(event_line)
+                print(event_line)
                 currentOutputLines += 1
 
         lastOutputLines = currentOutputLines
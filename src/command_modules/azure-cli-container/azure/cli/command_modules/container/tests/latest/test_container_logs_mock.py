@@ -0,0 +1,65 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+
+import mock
+from six import StringIO
+
+from azure.cli.command_modules.container.custom import _stream_logs
+
+
+class _StopStreaming(Exception):
+    pass
+
+
+class TestContainerLogsMocked(unittest.TestCase):
+
+    def _stream(self, contents, restart_policy='Never', tail=None):
+        """Stream the log contents returned by successive polls. Returns the output and the poll intervals."""
+        logs = [mock.MagicMock(content=content) for content in contents]
+        client = mock.MagicMock()
+        client.list_logs.side_effect = logs + [_StopStreaming()]
+        with mock.patch('time.sleep') as sleep_mock, mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+            try:
+                _stream_logs(client, 'rg', 'group', 'container', restart_policy, tail)
+            except _StopStreaming:
+                pass
+        return stdout.getvalue(), [c[0][0] for c in sleep_mock.call_args_list]
+
+    def test_stream_logs_prints_appended_lines(self):
+        output, _ = self._stream(['a\n', 'a\nb\npar', 'a\nb\npartial\n', 'a\nb\npartial\n', 'a\nb\npartial\nc\n'])
+
+        # partial lines are printed once complete and each line only once
+        self.assertEqual(output, 'a\nb\npartial\nc\n')
+
+    def test_stream_logs_backoff(self):
+        output, intervals = self._stream(['a\n'] * 7 + ['a\nb\n', 'a\nb\n'])
+
+        self.assertEqual(output, 'a\nb\n')
+        # doubled while nothing is written, up to 16 seconds, and reset by new lines
+        self.assertEqual(intervals, [1, 2, 4, 8, 16, 16, 16, 1, 2])
+
+    def test_stream_logs_restarted_container(self):
+        # the log of the restarted container is shorter, or as long but different
+        output, _ = self._stream(['a\nb\n', 'c\n', 'c\nd\n', 'x\ny\nz\n'])
+        self.assertEqual(output, 'a\nb\nc\nd\nx\ny\nz\n')
+
+        output, intervals = self._stream(['a\nb\n', 'c\n', 'c\nd\n'], restart_policy='Always')
+        self.assertTrue(output.startswith('a\nb\nWarning: '))
+        self.assertNotIn('c\n', output)
+        # streaming stops at the restart
+        self.assertEqual(intervals, [1])
+
+    def test_stream_logs_tail(self):
+        output, _ = self._stream(['a\nb\nc\n', 'a\nb\nc\nd\n'], tail=2)
+        self.assertEqual(output, 'b\nc\nd\n')
+
+        output, _ = self._stream(['a\nb\nc\n', 'a\nb\nc\nd\n'], tail=0)
+        self.assertEqual(output, 'd\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
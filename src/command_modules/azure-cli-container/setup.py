@@ -14,7 +14,7 @@ except ImportError:
     logger.warn("Wheel is not available, disabling bdist_wheel hook")
     cmdclass = {}
 
-VERSION = "0.3.17"
+VERSION = "0.3.18"
 
 CLASSIFIERS = [
     'Development Status :: 4 - Beta',
@@ -426,10 +426,10 @@ parameters:
 
 helps['dla job wait'] = """
 type: command
-short-summary: Wait for a Data Lake Analytics job to finish.
-long-summary: This command exits when the job completes.
+short-summary: Wait for Data Lake Analytics jobs to finish.
+long-summary: This command exits when all the jobs complete. The jobs are polled concurrently and their state changes are reported as they happen.
 parameters:
   - name: --job-id
     type: string
-    short-summary: 'Job ID to poll for completion.'
+    short-summary: 'Space-separated IDs of the jobs to poll for completion.'
 """
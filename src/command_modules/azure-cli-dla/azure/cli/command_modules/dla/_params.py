@@ -61,8 +61,9 @@ def load_arguments(self, _):
         c.argument('script', completer=FilesCompleter(), help="The script to submit. This is either the script contents or use `@<file path>` to load the script from a file")
 
     with self.argument_context('dla job wait') as c:
-        c.argument('max_wait_time_sec', help='The maximum amount of time to wait before erroring out. Default value is to never timeout. Any value <= 0 means never timeout', type=int)
-        c.argument('wait_interval_sec', help='The polling interval between checks for the job status, in seconds.', type=int)
+        c.argument('job_id', nargs='+', help='Space-separated IDs of the jobs to poll for completion.')
+        c.argument('max_wait_time_sec', help='The maximum amount of time to wait for all the jobs before erroring out. Default value is to never timeout. Any value <= 0 means never timeout', type=int)
+        c.argument('wait_interval_sec', help='The maximum polling interval between checks for the status of a job, in seconds. The interval starts shorter and grows while the status does not change.', type=int)
 
     with self.argument_context('dla job list') as c:
         c.argument('submitted_after', help='A filter which returns jobs only submitted after the specified time, in ISO-8601 format.', type=datetime_format)
@@ -2,7 +2,6 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
-import time
 import uuid
 
 from knack.log import get_logger
@@ -293,21 +292,19 @@ def submit_adla_job(client, account_name, job_name, script, runtime_version=None
 
 def wait_adla_job(client, account_name, job_id, wait_interval_sec=5, max_wait_time_sec=-1):
     from azure.mgmt.datalake.analytics.job.models import JobState
+    from azure.cli.core.commands.job_waiter import wait_for_jobs
     if wait_interval_sec < 1:
         raise CLIError('wait times must be greater than 0 when polling jobs. Value specified: {}'
                        .format(wait_interval_sec))
 
-    job = client.get(account_name, job_id)
-    time_waited_sec = 0
-    while job.state != JobState.ended:
-        if max_wait_time_sec > 0 and time_waited_sec >= max_wait_time_sec:
-            # pylint: disable=line-too-long
-            raise CLIError('Data Lake Analytics Job with ID: {0} has not completed in {1} seconds. Check job runtime or increase the value of --max-wait-time-sec'.format(job_id, time_waited_sec))
-        logger.info('Job is not yet done. Current job state: \'%s\'', job.state)
-        time.sleep(wait_interval_sec)
-        job = client.get(account_name, job_id)
-
-    return job
+    job_ids = job_id if isinstance(job_id, list) else [job_id]
+    result = wait_for_jobs([str(j) for j in job_ids], lambda j: client.get(account_name, j),
+                           lambda job: getattr(job.state, 'value', job.state), lambda job: job.state == JobState.ended,
+                           timeout=max_wait_time_sec, min_interval=1, max_interval=wait_interval_sec)
+    if result.timed_out:
+        # pylint: disable=line-too-long
+        raise CLIError('Data Lake Analytics Job with ID: {0} has not completed in {1} seconds. Check job runtime or increase the value of --max-wait-time-sec'.format(', '.join(result.timed_out), max_wait_time_sec))
+    return result.jobs[0] if len(result.jobs) == 1 else result.jobs
 # endregion
 
 
@@ -19,19 +19,69 @@ def keyvault_data_plane_factory(cli_ctx, _):
     from azure.cli.core.profiles import ResourceType, get_api_version
     version = str(get_api_version(cli_ctx, ResourceType.DATA_KEYVAULT))
 
-    def get_token(server, resource, scope):  # pylint: disable=unused-argument
+    provider = cli_ctx.data.get('keyvault_token_provider')
+    if provider is None:
+        provider = cli_ctx.data['keyvault_token_provider'] = KeyVaultTokenProvider(cli_ctx)
+
+    return KeyVaultClient(KeyVaultAuthentication(provider.get_token), api_version=version)
+
+
+class KeyVaultTokenProvider(object):
+    """ Answers the challenges of the Key Vault data plane. The tokens of the current account are cached per
+    resource until they are about to expire, so that the vaults and the retried requests of a command share them
+    instead of loading the profile and the token cache on every challenge. """
+
+    # seconds before the expiry of a token at which a new one is retrieved
+    EXPIRY_MARGIN = 300
+
+    def __init__(self, cli_ctx):
+        import threading
+        self.cli_ctx = cli_ctx
+        self._profile = None
+        self._tokens = {}
+        # the clients of the bulk commands answer challenges from several threads
+        self._lock = threading.Lock()
+
+    # KeyVaultAuthentication passes the scheme to a bound method, as it counts self among the arguments
+    def get_token(self, server, resource, scope, scheme=None):  # pylint: disable=unused-argument
+        import time
         import adal
         from azure.cli.core._profile import Profile
-        try:
-            return Profile(cli_ctx=cli_ctx).get_raw_token(resource)[0]
-        except adal.AdalError as err:
-            from knack.util import CLIError
-            # pylint: disable=no-member
-            if (hasattr(err, 'error_response') and
-                    ('error_description' in err.error_response) and
-                    ('AADSTS70008:' in err.error_response['error_description'])):
-                raise CLIError(
-                    "Credentials have expired due to inactivity. Please run 'az login'")
-            raise CLIError(err)
-
-    return KeyVaultClient(KeyVaultAuthentication(get_token), api_version=version)
+        with self._lock:
+            try:
+                if self._profile is None:
+                    self._profile = Profile(cli_ctx=self.cli_ctx)
+                # the account may be switched in between the commands of a session
+                key = (self._profile.get_subscription_id(), resource)
+                cached = self._tokens.get(key)
+                if cached and cached[0] - self.EXPIRY_MARGIN > time.time():
+                    return cached[1]
+                creds = self._profile.get_raw_token(resource)[0]
+            except adal.AdalError as err:
+                from knack.util import CLIError
+                # pylint: disable=no-member
+                if (hasattr(err, 'error_response') and
+                        ('error_description' in err.error_response) and
+                        ('AADSTS70008:' in err.error_response['error_description'])):
+                    raise CLIError(
+                        "Credentials have expired due to inactivity. Please run 'az login'")
+                raise CLIError(err)
+            expires_on = _get_token_expiry(creds[2])
+            if expires_on:
+                self._tokens[key] = (expires_on, creds)
+            return creds
+
+
+def _get_token_expiry(token_entry):
+    """ Return the expiry of an ADAL or MSI token entry in seconds since the epoch, or None if it is unknown. """
+    import time
+    from datetime import datetime
+    try:
+        if 'expiresOn' in token_entry:
+            expires_on = token_entry['expiresOn']
+            # ADAL stores the local time, without the microseconds when they are 0
+            fmt = '%Y-%m-%d %H:%M:%S.%f' if '.' in expires_on else '%Y-%m-%d %H:%M:%S'
+            return time.mktime(datetime.strptime(expires_on, fmt).timetuple())
+        return float(token_entry['expires_on'])
+    except (KeyError, TypeError, ValueError):
+        return None
@@ -17,6 +17,29 @@ type: group
 short-summary: Manage certificates.
 """
 
+helps['keyvault certificate backup-all'] = """
+type: command
+short-summary: Back up all the certificates of a vault to a directory.
+long-summary: |
+    The certificates are backed up concurrently, one file per certificate, and recorded in the manifest.json file of the
+    directory as they complete. Running the command again with the same directory resumes an interrupted or
+    partially failed backup: the certificates already recorded are skipped.
+examples:
+  - name: Back up the certificates of a vault.
+    text: az keyvault certificate backup-all --vault-name vault -d ./certificates
+"""
+
+helps['keyvault certificate restore-all'] = """
+type: command
+short-summary: Restore all the certificates backed up in a directory to a vault.
+long-summary: |
+    The manifest.json file of the directory records the vaults to which each certificate was restored, so running the
+    command again resumes an interrupted or partially failed restore.
+examples:
+  - name: Restore the certificates backed up with 'az keyvault certificate backup-all' to another vault.
+    text: az keyvault certificate restore-all --vault-name vault2 -d ./certificates
+"""
+
 helps['keyvault certificate contact'] = """
 type: group
 short-summary: Manage contacts for certificate management.
@@ -134,6 +157,30 @@ type: group
 short-summary: Manage keys.
 """
 
+helps['keyvault key backup-all'] = """
+type: command
+short-summary: Back up all the keys of a vault to a directory.
+long-summary: |
+    The keys are backed up concurrently, one file per key, and recorded in the manifest.json file of the
+    directory as they complete. Running the command again with the same directory resumes an interrupted or
+    partially failed backup: the keys already recorded are skipped. The keys of certificates are
+    backed up with the certificates.
+examples:
+  - name: Back up the keys of a vault.
+    text: az keyvault key backup-all --vault-name vault -d ./keys
+"""
+
+helps['keyvault key restore-all'] = """
+type: command
+short-summary: Restore all the keys backed up in a directory to a vault.
+long-summary: |
+    The manifest.json file of the directory records the vaults to which each key was restored, so running the
+    command again resumes an interrupted or partially failed restore.
+examples:
+  - name: Restore the keys backed up with 'az keyvault key backup-all' to another vault.
+    text: az keyvault key restore-all --vault-name vault2 -d ./keys
+"""
+
 helps['keyvault list'] = """
 type: command
 short-summary: List key vaults.
@@ -159,6 +206,30 @@ type: group
 short-summary: Manage secrets.
 """
 
+helps['keyvault secret backup-all'] = """
+type: command
+short-summary: Back up all the secrets of a vault to a directory.
+long-summary: |
+    The secrets are backed up concurrently, one file per secret, and recorded in the manifest.json file of the
+    directory as they complete. Running the command again with the same directory resumes an interrupted or
+    partially failed backup: the secrets already recorded are skipped. The secrets of certificates are
+    backed up with the certificates.
+examples:
+  - name: Back up the secrets of a vault.
+    text: az keyvault secret backup-all --vault-name vault -d ./secrets
+"""
+
+helps['keyvault secret restore-all'] = """
+type: command
+short-summary: Restore all the secrets backed up in a directory to a vault.
+long-summary: |
+    The manifest.json file of the directory records the vaults to which each secret was restored, so running the
+    command again resumes an interrupted or partially failed restore.
+examples:
+  - name: Restore the secrets backed up with 'az keyvault secret backup-all' to another vault.
+    text: az keyvault secret restore-all --vault-name vault2 -d ./secrets
+"""
+
 helps['keyvault secret set'] = """
 type: command
 short-summary: Create a secret (if one doesn't exist) or update a secret in a KeyVault.
@@ -116,6 +116,12 @@ def load_arguments(self, _):
                 c.argument(item + '_name', help='Name of the {}. Required if --id is not specified.'.format(item), required=False)
                 c.argument('vault_base_url', help='Name of the key vault. Required if --id is not specified.', required=False)
                 c.argument(item + '_version', required=False)
+
+        with self.argument_context('keyvault {} backup-all'.format(item)) as c:
+            c.argument('directory', options_list=['--directory', '-d'], completer=FilesCompleter(), help='Directory in which to store the {} backups and their manifest. Created if it does not exist.'.format(item))
+
+        with self.argument_context('keyvault {} restore-all'.format(item)) as c:
+            c.argument('directory', options_list=['--directory', '-d'], completer=FilesCompleter(), help='Directory holding the {} backups and their manifest.'.format(item))
     # endregion
 
     # region keys
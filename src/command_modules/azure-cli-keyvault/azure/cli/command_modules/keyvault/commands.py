@@ -78,6 +78,8 @@ def load_command_table(self, _):
         g.keyvault_command('recover', 'recover_deleted_key')
         g.keyvault_custom('backup', 'backup_key', doc_string_source=data_doc_string.format('backup_key'))
         g.keyvault_custom('restore', 'restore_key', doc_string_source=data_doc_string.format('restore_key'))
+        g.keyvault_custom('backup-all', 'backup_all_keys')
+        g.keyvault_custom('restore-all', 'restore_all_keys')
         g.keyvault_custom('import', 'import_key')
 
     with self.command_group('keyvault secret', kv_data_sdk) as g:
@@ -94,6 +96,8 @@ def load_command_table(self, _):
         g.keyvault_custom('download', 'download_secret')
         g.keyvault_custom('backup', 'backup_secret', doc_string_source=data_doc_string.format('backup_secret'))
         g.keyvault_custom('restore', 'restore_secret', doc_string_source=data_doc_string.format('restore_secret'))
+        g.keyvault_custom('backup-all', 'backup_all_secrets')
+        g.keyvault_custom('restore-all', 'restore_all_secrets')
 
     with self.command_group('keyvault certificate', kv_data_sdk) as g:
         g.keyvault_custom('create',
@@ -135,6 +139,10 @@ def load_command_table(self, _):
         g.keyvault_custom('delete', 'delete_certificate_issuer_admin')
 
     if data_api_version != '2016_10_01':
+        with self.command_group('keyvault certificate', kv_data_sdk) as g:
+            g.keyvault_custom('backup-all', 'backup_all_certificates')
+            g.keyvault_custom('restore-all', 'restore_all_certificates')
+
         with self.command_group('keyvault storage', kv_data_sdk) as g:
             g.keyvault_command('add', 'set_storage_account')
             g.keyvault_command('list', 'get_storage_accounts')
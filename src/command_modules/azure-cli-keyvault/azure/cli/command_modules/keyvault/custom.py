@@ -1003,3 +1003,180 @@ def restore_storage_account(client, vault_base_url, file_path):
         data = file_in.read()
         return client.restore_storage_account(vault_base_url, data)
 # endregion
+
+
+# region bulk backup and restore
+BULK_WORKERS = 8
+BACKUP_MANIFEST_FILE_NAME = 'manifest.json'
+BACKUP_FILE_EXTENSION = '.backup'
+# the maximum page size when listing the items of a vault
+LIST_PAGE_SIZE = 25
+# completed items after which the manifest is written, so that an interrupted command can be resumed
+MANIFEST_SAVE_INTERVAL = 50
+THROTTLING_RETRIES = 6
+# seconds
+THROTTLING_MAX_DELAY = 60
+
+
+def backup_all_keys(client, vault_base_url, directory):
+    """ Back up the keys of a vault to a directory. """
+    return _backup_all(client, 'key', vault_base_url, directory)
+
+
+def restore_all_keys(client, vault_base_url, directory):
+    """ Restore the keys backed up in a directory to a vault. """
+    return _restore_all(client, 'key', vault_base_url, directory)
+
+
+def backup_all_secrets(client, vault_base_url, directory):
+    """ Back up the secrets of a vault to a directory. """
+    return _backup_all(client, 'secret', vault_base_url, directory)
+
+
+def restore_all_secrets(client, vault_base_url, directory):
+    """ Restore the secrets backed up in a directory to a vault. """
+    return _restore_all(client, 'secret', vault_base_url, directory)
+
+
+def backup_all_certificates(client, vault_base_url, directory):
+    """ Back up the certificates of a vault to a directory. """
+    return _backup_all(client, 'certificate', vault_base_url, directory)
+
+
+def restore_all_certificates(client, vault_base_url, directory):
+    """ Restore the certificates backed up in a directory to a vault. """
+    return _restore_all(client, 'certificate', vault_base_url, directory)
+
+
+def _call_with_backoff(func, *args):
+    """ Call a data plane operation, waiting and retrying while the vault throttles the requests. """
+    from msrest.exceptions import HttpOperationError
+    attempt = 0
+    while True:
+        try:
+            return func(*args)
+        except HttpOperationError as ex:
+            if getattr(ex.response, 'status_code', None) not in (429, 503) or attempt >= THROTTLING_RETRIES:
+                raise
+            try:
+                delay = float(ex.response.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                delay = 2 ** attempt
+            delay = min(delay, THROTTLING_MAX_DELAY)
+            logger.info('The vault is throttling requests, retrying in %s seconds.', delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+def _get_error_message(ex):
+    try:
+        return ex.inner_exception.error.message
+    except AttributeError:
+        return str(ex)
+
+
+def _load_backup_manifest(directory, item_type):
+    from azure.cli.core._session import Session
+    manifest = Session()
+    manifest.load(os.path.join(directory, BACKUP_MANIFEST_FILE_NAME))
+    if manifest.data.setdefault('type', item_type) != item_type:
+        raise CLIError("'{}' holds a backup of {}s.".format(directory, manifest['type']))
+    manifest.data.setdefault('items', {})
+    return manifest
+
+
+def _run_bulk(operation, names, record, manifest):
+    """ Apply `operation` to the names concurrently. The successful ones are recorded in the manifest, which is
+    written periodically and when the command ends or is interrupted. Return the names which failed. """
+    from multiprocessing.pool import ThreadPool
+
+    def _apply(name):
+        try:
+            operation(name)
+            return name, None
+        except Exception as ex:  # pylint: disable=broad-except
+            return name, ex
+
+    failed = []
+    pool = ThreadPool(BULK_WORKERS)
+    try:
+        for index, (name, error) in enumerate(pool.imap_unordered(_apply, names)):
+            if error:
+                logger.warning("%s: %s", name, _get_error_message(error))
+                failed.append(name)
+            else:
+                record(name)
+            if (index + 1) % MANIFEST_SAVE_INTERVAL == 0:
+                manifest.save()
+    finally:
+        pool.close()
+        manifest.save()
+    return failed
+
+
+def _backup_all(client, item_type, vault_base_url, directory):
+    """ Write a backup of each item of the vault to the directory. The items already recorded in the manifest
+    of the directory are skipped, so that running the command again resumes an interrupted backup. A directory
+    holds the backup of one vault. """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    manifest = _load_backup_manifest(directory, item_type)
+    source_vault = manifest.data.setdefault('vault', vault_base_url)
+    if source_vault.rstrip('/').lower() != vault_base_url.rstrip('/').lower():
+        raise CLIError("'{}' holds a backup of {}. Use another directory.".format(directory, source_vault))
+    items = manifest['items']
+    list_items = getattr(client, 'get_{}s'.format(item_type))
+    backup_item = getattr(client, 'backup_' + item_type)
+
+    names = []
+    skipped = 0
+    for item in list_items(vault_base_url, maxresults=LIST_PAGE_SIZE):
+        if getattr(item, 'managed', False):
+            # the key and the secret of a certificate are backed up with the certificate
+            continue
+        name = (item.kid if item_type == 'key' else item.id).rstrip('/').split('/')[-1]
+        if name in items and os.path.isfile(os.path.join(directory, items[name]['file'])):
+            skipped += 1
+        else:
+            names.append(name)
+
+    def _backup(name):
+        backup = _call_with_backoff(backup_item, vault_base_url, name).value
+        with open(os.path.join(directory, name + BACKUP_FILE_EXTENSION), 'wb') as output:
+            output.write(backup)
+
+    def _record(name):
+        items[name] = {'file': name + BACKUP_FILE_EXTENSION}
+
+    failed = _run_bulk(_backup, names, _record, manifest)
+    if failed:
+        raise CLIError('{} of {} {}s could not be backed up. Run the command again to retry them.'.format(
+            len(failed), len(names) + skipped, item_type))
+    return {'directory': directory, 'backedUp': len(names), 'skipped': skipped}
+
+
+def _restore_all(client, item_type, vault_base_url, directory):
+    """ Restore each item backed up in the directory to the vault. The vaults to which an item was restored are
+    recorded in the manifest, so that running the command again resumes an interrupted restore. """
+    if not os.path.isfile(os.path.join(directory, BACKUP_MANIFEST_FILE_NAME)):
+        raise CLIError("'{}' does not hold a backup: {} is missing.".format(directory, BACKUP_MANIFEST_FILE_NAME))
+    manifest = _load_backup_manifest(directory, item_type)
+    items = manifest['items']
+    restore_item = getattr(client, 'restore_' + item_type)
+    vault_key = vault_base_url.rstrip('/').lower()
+    names = sorted(n for n, item in items.items() if vault_key not in item.get('restoredTo', []))
+
+    def _restore(name):
+        with open(os.path.join(directory, items[name]['file']), 'rb') as file_in:
+            data = file_in.read()
+        _call_with_backoff(restore_item, vault_base_url, data)
+
+    def _record(name):
+        items[name]['restoredTo'] = items[name].get('restoredTo', []) + [vault_key]
+
+    failed = _run_bulk(_restore, names, _record, manifest)
+    if failed:
+        raise CLIError('{} of {} {}s could not be restored. Run the command again to retry them.'.format(
+            len(failed), len(items), item_type))
+    return {'directory': directory, 'restored': len(names), 'skipped': len(items) - len(names)}
+# endregion
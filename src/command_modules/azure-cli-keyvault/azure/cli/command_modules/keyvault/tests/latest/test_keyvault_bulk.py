@@ -0,0 +1,115 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from codecs import open as codecs_open
+
+import mock
+from knack.util import CLIError
+from msrest.exceptions import HttpOperationError
+from requests import Response
+
+from azure.cli.command_modules.keyvault.custom import backup_all_secrets, restore_all_secrets
+from azure.cli.command_modules.keyvault._client_factory import KeyVaultTokenProvider
+
+VAULT = 'https://vault1.vault.azure.net'
+
+
+class _ThrottledError(HttpOperationError):
+
+    def __init__(self):
+        response = Response()
+        response.status_code = 429
+        response.headers['Retry-After'] = '0'
+        super(_ThrottledError, self).__init__(mock.MagicMock(), response)
+
+
+class TestKeyVaultBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = os.path.join(tempfile.mkdtemp(), 'secrets')
+        self.client = mock.MagicMock()
+        self.client.get_secrets.return_value = [
+            mock.MagicMock(id=VAULT + '/secrets/' + name, managed=name == 'cert1') for name in ['s1', 's2', 'cert1']]
+        self.failures = {}
+
+        def _backup_secret(vault_base_url, secret_name):
+            if self.failures.get(secret_name):
+                self.failures[secret_name] -= 1
+                raise _ThrottledError()
+            return mock.MagicMock(value=secret_name.encode('utf-8'))
+        self.client.backup_secret.side_effect = _backup_secret
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.directory))
+
+    def _read_manifest(self):
+        with codecs_open(os.path.join(self.directory, 'manifest.json'), 'r', encoding='utf-8-sig') as f:
+            return json.load(f)
+
+    def test_backup_all_resumes(self):
+        # s2 stays throttled after the retries and is backed up by the next run
+        self.failures = {'s1': 1, 's2': 10}
+        with mock.patch('time.sleep'):
+            with self.assertRaises(CLIError):
+                backup_all_secrets(self.client, VAULT, self.directory)
+            self.assertEqual(list(self._read_manifest()['items']), ['s1'])
+
+            result = backup_all_secrets(self.client, VAULT, self.directory)
+        self.assertEqual((result['backedUp'], result['skipped']), (1, 1))
+        self.assertEqual(sorted(self._read_manifest()['items']), ['s1', 's2'])
+        with open(os.path.join(self.directory, 's2.backup'), 'rb') as f:
+            self.assertEqual(f.read(), b's2')
+        self.client.get_secrets.assert_called_with(VAULT, maxresults=25)
+
+    def test_backup_all_single_vault(self):
+        backup_all_secrets(self.client, VAULT, self.directory)
+        result = backup_all_secrets(self.client, VAULT.upper() + '/', self.directory)
+        self.assertEqual((result['backedUp'], result['skipped']), (0, 2))
+
+        # the backups of another vault with items of the same names are not mixed in
+        with self.assertRaisesRegexp(CLIError, 'holds a backup of ' + VAULT):
+            backup_all_secrets(self.client, 'https://vault2.vault.azure.net', self.directory)
+        self.assertEqual(self._read_manifest()['vault'], VAULT)
+
+    def test_restore_all_records_vaults(self):
+        backup_all_secrets(self.client, VAULT, self.directory)
+        target = 'https://vault2.vault.azure.net'
+        result = restore_all_secrets(self.client, target, self.directory)
+        self.assertEqual((result['restored'], result['skipped']), (2, 0))
+        self.assertEqual(sorted(c[0][1] for c in self.client.restore_secret.call_args_list), [b's1', b's2'])
+
+        result = restore_all_secrets(self.client, target + '/', self.directory)
+        self.assertEqual((result['restored'], result['skipped']), (0, 2))
+        self.assertEqual(self._read_manifest()['items']['s1']['restoredTo'], [target])
+
+    def test_token_provider_caches_tokens(self):
+        expires_on = time.strftime('%Y-%m-%d %H:%M:%S.000001', time.localtime(time.time() + 3600))
+        creds = ('Bearer', 'token1', {'expiresOn': expires_on})
+        with mock.patch('azure.cli.core._profile.Profile') as profile_class:
+            profile = profile_class.return_value
+            profile.get_subscription_id.return_value = 'sub1'
+            profile.get_raw_token.return_value = (creds, 'sub1', 'tenant1')
+            provider = KeyVaultTokenProvider(mock.MagicMock())
+            self.assertEqual(provider.get_token('server', 'https://vault.azure.net', ''), creds)
+            self.assertEqual(provider.get_token('server', 'https://vault.azure.net', ''), creds)
+            self.assertEqual(profile_class.call_count, 1)
+            self.assertEqual(profile.get_raw_token.call_count, 1)
+
+            # a token about to expire is renewed
+            creds[2]['expiresOn'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time() + 60))
+            provider = KeyVaultTokenProvider(mock.MagicMock())
+            provider.get_token('server', 'https://vault.azure.net', '')
+            provider.get_token('server', 'https://vault.azure.net', '')
+            self.assertEqual(profile.get_raw_token.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -240,6 +240,8 @@ short-summary: Download log files.
 examples:
   - name: Download log files f1 and f2 to the current directory from the server 'testsvr'.
     text: az mariadb server-logs download -g testgroup -s testsvr -n f1.log f2.log
+  - name: Download the log files of 'testsvr' modified in the last 10 hours whose name contains 'error' to the directory 'logs'.
+    text: az mariadb server-logs download -g testgroup -s testsvr --file-last-written 10 --filename-contains error -d logs
 """
 
 helps['mariadb server-logs list'] = """
@@ -536,6 +538,8 @@ short-summary: Download log files.
 examples:
   - name: Download log files f1 and f2 to the current directory from the server 'testsvr'.
     text: az mysql server-logs download -g testgroup -s testsvr -n f1.log f2.log
+  - name: Download the log files of 'testsvr' modified in the last 10 hours whose name contains 'error' to the directory 'logs'.
+    text: az mysql server-logs download -g testgroup -s testsvr --file-last-written 10 --filename-contains error -d logs
 """
 
 helps['mysql server-logs list'] = """
@@ -832,6 +836,8 @@ short-summary: Download log files.
 examples:
   - name: Download log files f1 and f2 to the current directory from the server 'testsvr'.
     text: az postgres server-logs download -g testgroup -s testsvr -n f1.log f2.log
+  - name: Download the log files of 'testsvr' modified in the last 10 hours whose name contains 'error' to the directory 'logs'.
+    text: az postgres server-logs download -g testgroup -s testsvr --file-last-written 10 --filename-contains error -d logs
 """
 
 helps['postgres server-logs list'] = """
@@ -0,0 +1,170 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Filtering and download of server log files.
+
+The files are downloaded concurrently into `<name>.part` files which are renamed once complete, so that an
+interrupted download is resumed with a ranged request by the next run, unless the file was modified on the server
+since. A file already downloaded is skipped when its local size and modification time match the server's.
+"""
+
+import os
+import time
+
+from knack.log import get_logger
+from knack.util import CLIError
+
+logger = get_logger(__name__)
+
+# hours, see `--file-last-written`
+DEFAULT_FILE_LAST_WRITTEN = 72
+MAX_WORKERS = 4
+CHUNK_SIZE = 64 * 1024
+PART_FILE_EXTENSION = '.part'
+# seconds to wait for the server to accept the connection or to send more of a file
+REQUEST_TIMEOUT = 60
+
+
+def filter_log_files(files, file_names=None, filename_contains=None, file_last_written=None, max_file_size=None):
+    '''
+    Returns the files with one of `file_names`, whose name matches the `filename_contains` pattern, modified in the
+    last `file_last_written` hours and at most `max_file_size` KB large. A filter which is None is not applied.
+    '''
+
+    import re
+    from datetime import datetime, timedelta
+    from dateutil.tz import tzutc   # pylint: disable=import-error
+
+    pattern = re.compile(filename_contains) if filename_contains is not None else None
+    file_names = set(file_names) if file_names is not None else None
+    time_line = None
+    if file_last_written is not None:
+        time_line = datetime.utcnow().replace(tzinfo=tzutc()) - timedelta(hours=file_last_written)
+
+    result = []
+    for f in files:
+        if file_names is not None and f.name not in file_names:
+            continue
+        if time_line is not None and f.last_modified_time < time_line:
+            continue
+        if pattern is not None and pattern.search(f.name) is None:
+            continue
+        if max_file_size is not None and f.size_in_kb > max_file_size:
+            continue
+        result.append(f)
+    return result
+
+
+def _timestamp(value):
+    from calendar import timegm
+    return timegm(value.utctimetuple()) if value else None
+
+
+def _is_up_to_date(path, log_file):
+    # The server reports the size in KB, the modification time was set from the server's by the last download.
+    if not os.path.isfile(path):
+        return False
+    stat = os.stat(path)
+    modified = _timestamp(log_file.last_modified_time)
+    return (modified is not None and abs(stat.st_mtime - modified) < 1 and
+            log_file.size_in_kb is not None and abs(stat.st_size / 1024.0 - log_file.size_in_kb) < 1)
+
+
+def _get_resume_offset(part_path, log_file):
+    # The modification time of a partial file is set from the server's when it is written, so it is only resumed
+    # while the file on the server is unchanged, e.g. not rotated.
+    if not os.path.isfile(part_path):
+        return 0
+    stat = os.stat(part_path)
+    modified = _timestamp(log_file.last_modified_time)
+    if (modified is None or abs(stat.st_mtime - modified) >= 1 or
+            (log_file.size_in_kb is not None and stat.st_size >= (log_file.size_in_kb + 1) * 1024)):
+        logger.info("Discarding the partial download of '%s', the file changed on the server", log_file.name)
+        return 0
+    return stat.st_size
+
+
+def _download(log_file, path):
+    import requests
+    from azure.cli.core.util import should_disable_connection_verify
+
+    part_path = path + PART_FILE_EXTENSION
+    modified = _timestamp(log_file.last_modified_time)
+    offset = _get_resume_offset(part_path, log_file)
+    headers = {'Range': 'bytes={}-'.format(offset)} if offset else {}
+    request_args = {'stream': True, 'timeout': REQUEST_TIMEOUT, 'verify': not should_disable_connection_verify()}
+    response = requests.get(log_file.url, headers=headers, **request_args)
+    try:
+        if response.status_code == 416:
+            # the partial file is not a prefix of the current file, start over
+            response.close()
+            offset = 0
+            response = requests.get(log_file.url, **request_args)
+        response.raise_for_status()
+        if response.status_code != 206:
+            offset = 0
+        if offset:
+            logger.info("Resuming the download of '%s' at byte %d", log_file.name, offset)
+        with open(part_path, 'ab' if offset else 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+    finally:
+        response.close()
+        if modified is not None and os.path.isfile(part_path):
+            os.utime(part_path, (time.time(), modified))
+
+    if os.path.isfile(path):
+        os.remove(path)
+    os.rename(part_path, path)
+
+
+def download_log_files(files, directory=None):
+    '''
+    Downloads the log files into `directory`, the current directory by default, and returns a summary of the
+    downloaded and skipped files. Raises a CLIError listing the files which could not be downloaded once the
+    others are.
+    '''
+
+    from multiprocessing.pool import ThreadPool
+
+    directory = directory or os.getcwd()
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    downloads, skipped = [], []
+    for f in files:
+        path = os.path.join(directory, f.name)
+        if _is_up_to_date(path, f):
+            logger.info("Skipping '%s', it is already downloaded", f.name)
+            skipped.append(f.name)
+        else:
+            downloads.append((f, path))
+
+    def _run(download):
+        try:
+            _download(*download)
+            return download[0].name, None
+        except Exception as ex:  # pylint: disable=broad-except
+            return download[0].name, ex
+
+    downloaded, failed = [], []
+    if downloads:
+        pool = ThreadPool(min(MAX_WORKERS, len(downloads)))
+        try:
+            for name, error in pool.imap_unordered(_run, downloads):
+                if error:
+                    logger.warning("Unable to download '%s': %s", name, error)
+                    failed.append(name)
+                else:
+                    downloaded.append(name)
+                    logger.warning("Downloaded '%s' (%d/%d)", name, len(downloaded) + len(failed), len(downloads))
+        finally:
+            pool.close()
+
+    if failed:
+        raise CLIError('{} of {} log files could not be downloaded: {}. Run the command again to resume the '
+                       'downloads.'.format(len(failed), len(downloads), ', '.join(sorted(failed))))
+    return {'directory': directory, 'downloaded': sorted(downloaded), 'skipped': sorted(skipped)}
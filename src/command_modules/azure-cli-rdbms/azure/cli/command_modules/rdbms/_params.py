@@ -95,6 +95,7 @@ def load_arguments(self, _):    # pylint: disable=too-many-statements
             c.argument('max_file_size', type=int, help='The file size limitation to filter files.')
             c.argument('file_last_written', type=int, help='Integer in hours to indicate file last modify time, default value is 72.')
             c.argument('filename_contains', help='The pattern that file name should match.')
+            c.argument('directory', options_list=['--directory', '-d'], help='The directory to download the log files to. Default to the current directory. Files already downloaded are skipped and interrupted downloads are resumed.')
 
     for scope in ['mariadb db', 'mysql db', 'postgres db']:
         with self.argument_context(scope) as c:
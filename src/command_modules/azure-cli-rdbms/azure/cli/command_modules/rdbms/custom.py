@@ -5,6 +5,7 @@
 
 # pylint: disable=unused-argument, line-too-long
 
+from knack.log import get_logger
 from msrestazure.azure_exceptions import CloudError
 from msrestazure.tools import resource_id, is_valid_resource_id, parse_resource_id  # pylint: disable=import-error
 from azure.cli.core.commands.client_factory import get_subscription_id
@@ -13,6 +14,8 @@ from azure.mgmt.rdbms.mysql.operations.servers_operations import ServersOperatio
 from azure.mgmt.rdbms.mariadb.operations.servers_operations import ServersOperations as MariaDBServersOperations
 from ._client_factory import get_mariadb_management_client, get_mysql_management_client, get_postgresql_management_client
 
+logger = get_logger(__name__)
+
 SKU_TIER_MAP = {'Basic': 'b', 'GeneralPurpose': 'gp', 'MemoryOptimized': 'mo'}
 
 
@@ -361,41 +364,42 @@ def _download_log_files(
         client,
         resource_group_name,
         server_name,
-        file_name):
-    from six.moves.urllib.request import urlretrieve  # pylint: disable=import-error
+        file_name=None,
+        filename_contains=None,
+        file_last_written=None,
+        max_file_size=None,
+        directory=None):
+    from ._log_download import DEFAULT_FILE_LAST_WRITTEN, filter_log_files, download_log_files
+
+    # files requested by name are downloaded whatever their age unless --file-last-written is specified
+    if file_name is None and file_last_written is None:
+        file_last_written = DEFAULT_FILE_LAST_WRITTEN
 
     # list all files
-    files = client.list_by_server(resource_group_name, server_name)
+    files = filter_log_files(client.list_by_server(resource_group_name, server_name), file_names=file_name,
+                             filename_contains=filename_contains, file_last_written=file_last_written,
+                             max_file_size=max_file_size)
+    if file_name:
+        missing = set(file_name) - set(f.name for f in files)
+        if missing:
+            logger.warning("No log file with these names matches the filters: %s", ', '.join(sorted(missing)))
 
-    for f in files:
-        if f.name in file_name:
-            urlretrieve(f.url, f.name)
+    return download_log_files(files, directory)
 
 
 def _list_log_files_with_filter(client, resource_group_name, server_name, filename_contains=None,
                                 file_last_written=None, max_file_size=None):
-    import re
-    from datetime import datetime, timedelta
-    from dateutil.tz import tzutc   # pylint: disable=import-error
-
-    # list all files
-    all_files = client.list_by_server(resource_group_name, server_name)
-    files = []
+    from ._log_download import DEFAULT_FILE_LAST_WRITTEN, filter_log_files
 
     if file_last_written is None:
-        file_last_written = 72
-    time_line = datetime.utcnow().replace(tzinfo=tzutc()) - timedelta(hours=file_last_written)
-
-    for f in all_files:
-        if f.last_modified_time < time_line:
-            continue
-        if filename_contains is not None and re.search(filename_contains, f.name) is None:
-            continue
-        if max_file_size is not None and f.size_in_kb > max_file_size:
-            continue
+        file_last_written = DEFAULT_FILE_LAST_WRITTEN
 
+    # list all files
+    files = filter_log_files(client.list_by_server(resource_group_name, server_name),
+                             filename_contains=filename_contains, file_last_written=file_last_written,
+                             max_file_size=max_file_size)
+    for f in files:
         del f.created_time
-        files.append(f)
 
     return files
 
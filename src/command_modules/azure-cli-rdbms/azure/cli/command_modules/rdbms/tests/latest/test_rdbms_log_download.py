@@ -0,0 +1,95 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import calendar
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import mock
+from dateutil.tz import tzutc   # pylint: disable=import-error
+
+from azure.cli.command_modules.rdbms._log_download import filter_log_files, download_log_files
+
+CONTENT = b'0123456789' * 300
+
+
+def _log_file(name, hours, size_in_kb=3):
+    log_file = mock.MagicMock(url='https://server/' + name, size_in_kb=size_in_kb,
+                              last_modified_time=datetime.utcnow().replace(tzinfo=tzutc(), microsecond=0) -
+                              timedelta(hours=hours))
+    log_file.name = name
+    return log_file
+
+
+def _get(url, headers=None, **kwargs):  # pylint: disable=unused-argument
+    offset = int(headers['Range'][len('bytes='):-1]) if headers else 0
+    response = mock.MagicMock(status_code=206 if offset else 200)
+    response.iter_content.return_value = [CONTENT[offset:]]
+    return response
+
+
+class TestLogDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_filter_log_files(self):
+        files = [_log_file('error-1.log', 1), _log_file('error-2.log', 100), _log_file('slow-1.log', 1, 50)]
+        self.assertEqual([f.name for f in filter_log_files(files, filename_contains='^error',
+                                                           file_last_written=72)], ['error-1.log'])
+        self.assertEqual([f.name for f in filter_log_files(files, max_file_size=10)], ['error-1.log', 'error-2.log'])
+        self.assertEqual([f.name for f in filter_log_files(files, file_names=['slow-1.log', 'other.log'])],
+                         ['slow-1.log'])
+
+    def _write_part(self, log_file, size, hours_modified_since=0):
+        path = os.path.join(self.directory, log_file.name + '.part')
+        with open(path, 'wb') as f:
+            f.write(CONTENT[:size])
+        # as left by an interrupted download of the file before it was modified
+        modified = calendar.timegm(log_file.last_modified_time.utctimetuple()) - hours_modified_since * 3600
+        os.utime(path, (modified, modified))
+
+    def test_download_resumes_and_skips(self):
+        files = [_log_file('f1.log', 1), _log_file('f2.log', 2)]
+        self._write_part(files[1], 1000)
+
+        with mock.patch('requests.get', side_effect=_get) as get:
+            result = download_log_files(files, self.directory)
+            self.assertEqual((result['downloaded'], result['skipped']), (['f1.log', 'f2.log'], []))
+            self.assertIn(mock.call('https://server/f2.log', headers={'Range': 'bytes=1000-'}, stream=True,
+                                    timeout=60, verify=True), get.call_args_list)
+            for name in ['f1.log', 'f2.log']:
+                with open(os.path.join(self.directory, name), 'rb') as f:
+                    self.assertEqual(f.read(), CONTENT)
+            self.assertFalse(os.path.exists(os.path.join(self.directory, 'f2.log.part')))
+
+            # the files are downloaded again once modified on the server
+            files[1].last_modified_time += timedelta(minutes=5)
+            result = download_log_files(files, self.directory)
+            self.assertEqual((result['downloaded'], result['skipped']), (['f2.log'], ['f1.log']))
+            self.assertEqual(get.call_count, 3)
+
+    def test_download_discards_stale_part(self):
+        files = [_log_file('f1.log', 1), _log_file('f2.log', 2)]
+        # f1 was rotated since the partial download, the partial download of f2 is larger than f2
+        self._write_part(files[0], 1000, hours_modified_since=1)
+        self._write_part(files[1], len(CONTENT))
+        files[1].size_in_kb = 1
+
+        with mock.patch('requests.get', side_effect=_get) as get:
+            download_log_files(files, self.directory)
+            self.assertEqual([c[1]['headers'] for c in get.call_args_list], [{}, {}])
+            with open(os.path.join(self.directory, 'f1.log'), 'rb') as f:
+                self.assertEqual(f.read(), CONTENT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Deletion of many resource groups.
+
+The locks of the groups and the references of their resources to the other groups are retrieved up front. A group
+is deleted once the groups whose resources refer to it are, e.g. the group of a virtual network after the groups of
+the network interfaces in its subnets, and the groups which do not depend on each other are deleted concurrently.
+A deletion which fails because of a resource of another group being deleted is retried as soon as that group is.
+"""
+
+import re
+import time
+from collections import OrderedDict
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+# the resources whose properties may refer to resources of other groups which cannot be deleted before them
+REFERENCING_RESOURCE_TYPES = {
+    'microsoft.compute/virtualmachines',
+    'microsoft.compute/virtualmachinescalesets',
+    'microsoft.containerservice/managedclusters',
+    'microsoft.network/applicationgateways',
+    'microsoft.network/loadbalancers',
+    'microsoft.network/networkinterfaces',
+    'microsoft.network/privateendpoints',
+    'microsoft.network/virtualnetworkgateways',
+    'microsoft.web/sites',
+}
+MAX_WORKERS = 8
+# seconds
+POLL_INTERVAL = 1
+# the number of times the deletion of a group is attempted when it fails because of other groups
+MAX_ATTEMPTS = 3
+
+_GROUP_REFERENCE = re.compile(r'/subscriptions/([^/"]+)/resourceGroups/([^/"]+)', re.IGNORECASE)
+
+
+def _referenced_groups(text, subscription_id):
+    return {group.lower() for subscription, group in _GROUP_REFERENCE.findall(text or '')
+            if subscription.lower() == subscription_id.lower()}
+
+
+def find_blockers(names, subscription_id, list_locks, list_resources, get_resource_properties):
+    """
+    Returns ({group: names of its locks}, {group: groups to delete before it}), the groups lowercased. A group
+    which cannot be inspected is deleted without waiting for other groups; it is left to `delete_groups` to report
+    the groups which do not exist.
+
+    :param list_locks: returns the locks of a group and of its resources.
+    :param list_resources: returns the resources of a group.
+    :param get_resource_properties: returns the properties of a resource from its ID.
+    """
+    import json
+    from multiprocessing.pool import ThreadPool
+    from msrestazure.azure_exceptions import CloudError
+
+    keys = {name.lower() for name in names}
+
+    def _inspect(name):
+        locks, referenced = [], set()
+        try:
+            locks = [lock.name for lock in list_locks(name)]
+            for resource in list_resources(name):
+                if (resource.type or '').lower() in REFERENCING_RESOURCE_TYPES:
+                    properties = get_resource_properties(resource.id)
+                    referenced |= _referenced_groups(json.dumps(properties), subscription_id)
+        except CloudError as ex:
+            # a group which does not exist has no locks or references
+            if ex.status_code != 404:
+                logger.warning("Unable to find the locks and references of resource group '%s': %s", name, ex)
+        return name.lower(), locks, referenced - {name.lower()}
+
+    locks, blockers = {}, {key: set() for key in keys}
+    pool = ThreadPool(min(MAX_WORKERS, len(names))) if names else None
+    try:
+        for key, group_locks, referenced in (pool.imap_unordered(_inspect, names) if pool else []):
+            if group_locks:
+                locks[key] = group_locks
+            for other in referenced & keys:
+                # the referenced group is deleted once the referencing one is
+                blockers[other].add(key)
+    finally:
+        if pool:
+            pool.close()
+    return locks, blockers
+
+
+def delete_groups(names, subscription_id, begin_delete, blockers, timeout=None):
+    """
+    Deletes the groups in the order of `blockers` and returns the status of each group: Deleted, NotFound, Failed,
+    or, at the deadline, Deleting or NotStarted.
+
+    :param begin_delete: starts the deletion of a group and returns its poller. The pollers are waited for together.
+    :param blockers: {group: groups to delete before it}, the groups lowercased. It is updated with the groups found
+                     in the errors.
+    """
+    from msrestazure.azure_exceptions import CloudError
+
+    deadline = time.time() + timeout if timeout else None
+    names = list(OrderedDict((name.lower(), name) for name in names).values())
+    keys = {name.lower() for name in names}
+    pending = list(names)
+    running, results, attempts = OrderedDict(), {}, {}
+
+    def _finished():
+        return set(name.lower() for name in results)
+
+    def _fail(name, ex):
+        # a group whose resource is used by a resource of another group being deleted is deleted again after it
+        unfinished = {n.lower() for n in pending} | {n.lower() for n in running}
+        referenced = (_referenced_groups(str(ex), subscription_id) - {name.lower()}) & unfinished
+        if referenced and attempts[name] < MAX_ATTEMPTS:
+            logger.warning("Deleting resource group '%s' failed because of %s, retrying once deleted.",
+                           name, ', '.join(sorted(referenced)))
+            blockers.setdefault(name.lower(), set()).update(referenced)
+            pending.append(name)
+        else:
+            logger.warning("Unable to delete resource group '%s': %s", name, ex)
+            results[name] = ('Failed', str(ex))
+
+    def _start(name):
+        attempts[name] = attempts.get(name, 0) + 1
+        try:
+            running[name] = begin_delete(name)
+            logger.warning("Deleting resource group '%s'", name)
+        except CloudError as ex:
+            if ex.status_code == 404:
+                results[name] = ('NotFound', None)
+            else:
+                _fail(name, ex)
+
+    while pending or running:
+        finished = _finished()
+        ready = [n for n in pending if not (blockers.get(n.lower(), set()) & keys) - finished]
+        if not ready and not running:
+            # the remaining groups depend on each other
+            ready = list(pending)
+        for name in ready:
+            pending.remove(name)
+            _start(name)
+
+        changed = False
+        for name, poller in list(running.items()):
+            if poller.done():
+                changed = True
+                del running[name]
+                try:
+                    poller.result()
+                    results[name] = ('Deleted', None)
+                    logger.warning("Deleted resource group '%s'", name)
+                except CloudError as ex:
+                    _fail(name, ex)
+        if deadline and time.time() >= deadline:
+            break
+        if running and not changed:
+            time.sleep(POLL_INTERVAL)
+
+    for name in running:
+        results[name] = ('Deleting', None)
+    for name in pending:
+        results.setdefault(name, ('NotStarted', None))
+    return [OrderedDict([('name', name), ('status', results[name][0]), ('error', results[name][1])])
+            for name in names]
@@ -247,6 +247,14 @@ type: group
 short-summary: Manage deployment operations.
 """
 
+helps['deployment operation show-failures'] = """
+type: command
+short-summary: Show the failed operations of a deployment and of its nested deployments as a tree.
+examples:
+  - name: Show why a deployment failed.
+    text: az deployment operation show-failures -n MyDeployment
+"""
+
 helps['deployment validate'] = """
 type: command
 short-summary: Validate whether a template is syntactically correct.
@@ -312,6 +320,22 @@ examples:
         az group delete -n MyResourceGroup
 """
 
+helps['group delete-batch'] = """
+type: command
+short-summary: Delete many resource groups.
+long-summary: >
+    Locked resource groups are skipped. A resource group is deleted after the resource groups whose resources refer to
+    it, such as the network interfaces in the subnets of its virtual networks, and the resource groups which do not
+    depend on each other are deleted concurrently.
+examples:
+  - name: Delete the resource groups of test environments.
+    text: >
+        az group delete-batch -n env1-rg env2-rg shared-network-rg --yes
+  - name: Delete the resource groups whose name starts with 'ci-'.
+    text: >
+        az group delete-batch -n $(az group list --query "[?starts_with(name, 'ci-')].name" -o tsv) --yes
+"""
+
 helps['group deployment'] = """
 type: group
 short-summary: Manage Azure Resource Manager deployments.
@@ -357,6 +381,14 @@ type: group
 short-summary: Manage deployment operations.
 """
 
+helps['group deployment operation show-failures'] = """
+type: command
+short-summary: Show the failed operations of a deployment and of its nested deployments as a tree.
+examples:
+  - name: Show why a deployment failed.
+    text: az group deployment operation show-failures -g MyResourceGroup -n MyDeployment
+"""
+
 helps['group deployment validate'] = """
 type: command
 short-summary: Validate whether a template is syntactically correct.
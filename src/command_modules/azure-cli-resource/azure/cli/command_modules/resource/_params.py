@@ -199,6 +199,10 @@ def load_arguments(self, _):
     with self.argument_context('group create') as c:
         c.argument('rg_name', options_list=['--name', '--resource-group', '-n', '-g'], help='name of the new resource group', completer=None)
 
+    with self.argument_context('group delete-batch') as c:
+        c.argument('resource_group_names', options_list=['--names', '-n'], nargs='+', completer=get_resource_group_completion_list, help='Space-separated names of the resource groups to delete.')
+        c.argument('timeout', type=int, help='Seconds to wait for the deletions. The deletions in progress at the deadline go on.')
+
     with self.argument_context('tag') as c:
         c.argument('tag_name', options_list=['--name', '-n'])
         c.argument('tag_value', options_list='--value')
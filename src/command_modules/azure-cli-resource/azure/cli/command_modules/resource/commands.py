@@ -157,6 +157,7 @@ def load_command_table(self, _):
 
     with self.command_group('group', resource_group_sdk, resource_type=ResourceType.MGMT_RESOURCE_RESOURCES) as g:
         g.command('delete', 'delete', supports_no_wait=True, confirmation=True)
+        g.custom_command('delete-batch', 'delete_resource_groups', confirmation=True)
         g.show_command('show', 'get')
         g.command('exists', 'check_existence')
         g.custom_command('list', 'list_resource_groups', table_transformer=transform_resource_group_list)
@@ -230,6 +231,7 @@ def load_command_table(self, _):
     with self.command_group('group deployment operation', resource_deployment_operation_sdk) as g:
         g.command('list', 'list')
         g.custom_show_command('show', 'get_deployment_operations', client_factory=cf_deployment_operations)
+        g.custom_show_command('show-failures', 'show_deployment_failures', client_factory=cf_deployment_operations)
 
     with self.command_group('deployment', resource_deployment_sdk, min_api='2018-05-01', resource_type=ResourceType.MGMT_RESOURCE_RESOURCES) as g:
         g.command('list', 'list_at_subscription_scope', table_transformer=transform_deployments_list)
@@ -243,6 +245,7 @@ def load_command_table(self, _):
     with self.command_group('deployment operation', resource_deployment_operation_sdk, min_api='2018-05-01', resource_type=ResourceType.MGMT_RESOURCE_RESOURCES) as g:
         g.command('list', 'list_at_subscription_scope')
         g.custom_show_command('show', 'get_deployment_operations_at_subscription_scope', client_factory=cf_deployment_operations)
+        g.custom_show_command('show-failures', 'show_deployment_failures_at_subscription_scope', client_factory=cf_deployment_operations)
 
     with self.command_group('policy assignment', resource_type=ResourceType.MGMT_RESOURCE_POLICY) as g:
         g.custom_command('create', 'create_policy_assignment')
@@ -44,6 +44,11 @@ from ._validators import MSI_LOCAL_ID
 
 logger = get_logger(__name__)
 
+# beyond this number of operation IDs, the operations of a deployment are listed rather than retrieved one by one
+DEPLOYMENT_OPERATION_LIST_THRESHOLD = 5
+DEPLOYMENT_OPERATION_WORKERS = 8
+DEPLOYMENT_RESOURCE_TYPE = 'microsoft.resources/deployments'
+
 
 def _build_resource_id(**kwargs):
     from msrestazure.tools import resource_id as resource_id_from_dict
@@ -550,6 +555,49 @@ def create_resource_group(cmd, rg_name, location, tags=None):
     return rcf.resource_groups.create_or_update(rg_name, parameters)
 
 
+def delete_resource_groups(cmd, resource_group_names, timeout=None):
+    """ Delete many resource groups, concurrently when they do not depend on each other.
+    :param list resource_group_names:the names of the resource groups
+    :param int timeout:seconds to wait for the deletions
+    """
+    from ._group_delete import find_blockers, delete_groups
+
+    rcf = _resource_client_factory(cmd.cli_ctx)
+    lock_client = _resource_lock_client_factory(cmd.cli_ctx)
+    subscription_id = rcf.config.subscription_id
+    api_versions = {}
+
+    def _get_resource_properties(resource_id):
+        parts = parse_resource_id(resource_id)
+        resource_type = '{}/{}'.format(parts['namespace'], parts['type']).lower()
+        if resource_type not in api_versions:
+            api_versions[resource_type] = _ResourceUtils._resolve_api_version_by_id(rcf, resource_id)  # pylint: disable=protected-access
+        return rcf.resources.get_by_id(resource_id, api_versions[resource_type]).properties
+
+    locks, blockers = find_blockers(resource_group_names, subscription_id,
+                                    lock_client.management_locks.list_at_resource_group_level,
+                                    rcf.resource_groups.list_resources, _get_resource_properties)
+    for name in resource_group_names:
+        if name.lower() in locks:
+            logger.warning("Skipping resource group '%s', it is locked by %s", name, ', '.join(locks[name.lower()]))
+    unlocked = [name for name in resource_group_names if name.lower() not in locks]
+    statuses = {r['name'].lower(): r for r in delete_groups(unlocked, subscription_id, rcf.resource_groups.delete,
+                                                            blockers, timeout)}
+
+    results = []
+    for name in OrderedDict((name.lower(), name) for name in resource_group_names).values():
+        if name.lower() in locks:
+            results.append(OrderedDict([('name', name), ('status', 'Locked'),
+                                        ('error', 'Locked by ' + ', '.join(locks[name.lower()]))]))
+        else:
+            results.append(statuses[name.lower()])
+    failed = [r['name'] for r in results if r['status'] in ('Failed', 'Locked')]
+    if failed:
+        raise CLIError('{} of {} resource groups could not be deleted: {}'.format(
+            len(failed), len(results), ', '.join(failed)))
+    return results
+
+
 def update_resource_group(instance, tags=None):
 
     if tags is not None:
@@ -945,22 +993,113 @@ def invoke_resource_action(cmd, action, request_body=None, resource_ids=None,
                                   .invoke_action(action, request_body) for id_dict in parsed_ids])
 
 
+def _get_deployment_operations(operation_ids, get_operation, list_operations):
+    """ Returns the operations in the order of their IDs. The operations of the deployment are listed once when
+    many IDs are requested, the others are retrieved concurrently. """
+    from multiprocessing.pool import ThreadPool
+
+    unique_ids = list(OrderedDict.fromkeys(operation_ids))
+    operations = {}
+    if len(unique_ids) > DEPLOYMENT_OPERATION_LIST_THRESHOLD:
+        wanted = set(unique_ids)
+        for operation in list_operations():
+            if operation.operation_id in wanted:
+                operations[operation.operation_id] = operation
+    # IDs which are not listed are retrieved to report them as not found
+    missing = [op_id for op_id in unique_ids if op_id not in operations]
+    if missing:
+        pool = ThreadPool(min(DEPLOYMENT_OPERATION_WORKERS, len(missing)))
+        try:
+            operations.update(zip(missing, pool.map(get_operation, missing)))
+        finally:
+            pool.close()
+    return [operations[op_id] for op_id in operation_ids]
+
+
 def get_deployment_operations(client, resource_group_name, deployment_name, operation_ids):
     """get a deployment's operation."""
-    result = []
-    for op_id in operation_ids:
-        dep = client.get(resource_group_name, deployment_name, op_id)
-        result.append(dep)
-    return result
+    return _get_deployment_operations(operation_ids,
+                                      lambda op_id: client.get(resource_group_name, deployment_name, op_id),
+                                      lambda: client.list(resource_group_name, deployment_name))
 
 
 def get_deployment_operations_at_subscription_scope(client, deployment_name, operation_ids):
     """get a deployment's operation."""
-    result = []
-    for op_id in operation_ids:
-        dep = client.get_at_subscription_scope(deployment_name, op_id)
-        result.append(dep)
-    return result
+    return _get_deployment_operations(operation_ids,
+                                      lambda op_id: client.get_at_subscription_scope(deployment_name, op_id),
+                                      lambda: client.list_at_subscription_scope(deployment_name))
+
+
+def _get_operation_error(status_message):
+    # the status message of a failed operation is usually {'error': {'code': ..., 'message': ...}}
+    error = status_message.get('error', status_message) if isinstance(status_message, dict) else None
+    if isinstance(error, dict):
+        return error.get('code'), error.get('message')
+    return None, str(status_message) if status_message is not None else None
+
+
+def _build_deployment_failure_tree(client, resource_group_name, deployment_name):
+    """ Returns the failed operations of the deployment and, recursively, of its failed nested deployments. Every
+    deployment is listed once, the nested deployments of a level concurrently. Nested deployments of other
+    subscriptions are reported as failed operations. """
+    from multiprocessing.pool import ThreadPool
+
+    def _node(name, group):
+        return OrderedDict([('name', name), ('resourceGroup', group), ('failedOperations', []),
+                            ('nestedDeployments', [])])
+
+    def _list_operations(node):
+        if node['resourceGroup']:
+            return list(client.list(node['resourceGroup'], node['name']))
+        return list(client.list_at_subscription_scope(node['name']))
+
+    subscription_id = (client.config.subscription_id or '').lower()
+    root = _node(deployment_name, resource_group_name)
+    visited = {((resource_group_name or '').lower(), deployment_name.lower())}
+    level = [root]
+    pool = ThreadPool(DEPLOYMENT_OPERATION_WORKERS)
+    try:
+        while level:
+            next_level = []
+            for node, operations in zip(level, pool.map(_list_operations, level)):
+                for operation in operations:
+                    properties = operation.properties
+                    if not properties or properties.provisioning_state != 'Failed':
+                        continue
+                    target = properties.target_resource
+                    code, message = _get_operation_error(properties.status_message)
+                    if target and target.id and (target.resource_type or '').lower() == DEPLOYMENT_RESOURCE_TYPE:
+                        parts = parse_resource_id(target.id)
+                        if parts.get('subscription', '').lower() == subscription_id:
+                            key = (parts.get('resource_group', '').lower(), target.resource_name.lower())
+                            if key in visited:
+                                continue
+                            visited.add(key)
+                            nested = _node(target.resource_name, parts.get('resource_group'))
+                            nested.update([('statusCode', properties.status_code), ('code', code),
+                                           ('message', message)])
+                            node['nestedDeployments'].append(nested)
+                            next_level.append(nested)
+                            continue
+                    node['failedOperations'].append(OrderedDict([
+                        ('operationId', operation.operation_id),
+                        ('resourceType', target.resource_type if target else None),
+                        ('resourceName', target.resource_name if target else None),
+                        ('statusCode', properties.status_code),
+                        ('code', code),
+                        ('message', message)]))
+            level = next_level
+    finally:
+        pool.close()
+    return root
+
+
+def show_deployment_failures(client, resource_group_name, deployment_name):
+    return _build_deployment_failure_tree(client, resource_group_name, deployment_name)
+
+
+def show_deployment_failures_at_subscription_scope(client, deployment_name):
+    return _build_deployment_failure_tree(client, None, deployment_name)
 
 
 def list_resources(cmd, resource_group_name=None,
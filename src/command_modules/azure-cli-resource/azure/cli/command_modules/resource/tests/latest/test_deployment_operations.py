@@ -0,0 +1,65 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+
+import mock
+
+from azure.cli.command_modules.resource.custom import get_deployment_operations, show_deployment_failures
+
+SUBSCRIPTION = '00000000-0000-0000-0000-000000000000'
+
+
+def _operation(operation_id, state='Succeeded', resource_type='Microsoft.Storage/storageAccounts', group='rg1',
+               name='sa1', status_message=None):
+    target = mock.MagicMock(resource_type=resource_type, resource_name=name,
+                            id='/subscriptions/{}/resourceGroups/{}/providers/{}/{}'.format(
+                                SUBSCRIPTION, group, resource_type, name))
+    properties = mock.MagicMock(provisioning_state=state, target_resource=target, status_code='BadRequest',
+                                status_message=status_message)
+    return mock.MagicMock(operation_id=operation_id, properties=properties)
+
+
+class TestDeploymentOperations(unittest.TestCase):
+
+    def test_get_deployment_operations(self):
+        client = mock.MagicMock()
+        client.get.side_effect = lambda group, name, op_id: op_id
+        self.assertEqual(get_deployment_operations(client, 'rg1', 'dep1', ['2', '1', '2']), ['2', '1', '2'])
+        client.list.assert_not_called()
+
+        # many IDs are listed once, the unlisted ones are retrieved
+        client.list.return_value = [_operation(str(i)) for i in range(10)]
+        result = get_deployment_operations(client, 'rg1', 'dep1', [str(i) for i in range(1, 7)] + ['42'])
+        self.assertEqual([getattr(r, 'operation_id', r) for r in result], ['1', '2', '3', '4', '5', '6', '42'])
+        client.list.assert_called_once_with('rg1', 'dep1')
+        self.assertEqual(client.get.call_args_list[-1], mock.call('rg1', 'dep1', '42'))
+
+    def test_show_deployment_failures(self):
+        client = mock.MagicMock()
+        client.config.subscription_id = SUBSCRIPTION
+        deployments = 'Microsoft.Resources/deployments'
+        operations = {
+            ('rg1', 'dep1'): [_operation('1'), _operation('2', 'Failed', deployments, 'rg2', 'nested1'),
+                              _operation('3', 'Failed', status_message={'error': {'code': 'Conflict',
+                                                                                  'message': 'In use'}})],
+            ('rg2', 'nested1'): [_operation('4', 'Failed', status_message='Invalid sku'),
+                                 _operation('5', 'Failed', deployments, 'rg1', 'dep1')]
+        }
+        client.list.side_effect = lambda group, name: operations[(group, name)]
+
+        tree = show_deployment_failures(client, 'rg1', 'dep1')
+        self.assertEqual([(o['operationId'], o['code'], o['message']) for o in tree['failedOperations']],
+                         [('3', 'Conflict', 'In use')])
+        nested = tree['nestedDeployments']
+        self.assertEqual([(n['name'], n['resourceGroup']) for n in nested], [('nested1', 'rg2')])
+        # the deployment referring back to its parent is not listed again
+        self.assertEqual([(o['operationId'], o['message']) for o in nested[0]['failedOperations']],
+                         [('4', 'Invalid sku')])
+        self.assertEqual(client.list.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+
+import mock
+from msrestazure.azure_exceptions import CloudError
+from requests import Response
+
+from azure.cli.command_modules.resource._group_delete import find_blockers, delete_groups
+
+SUBSCRIPTION = '00000000-0000-0000-0000-000000000000'
+
+
+def _subnet(group):
+    return '/subscriptions/{}/resourceGroups/{}/providers/Microsoft.Network/virtualNetworks/vnet/subnets/default' \
+        .format(SUBSCRIPTION, group)
+
+
+def _error(message, status_code=400):
+    response = Response()
+    response.status_code = status_code
+    return CloudError(response, error=message)
+
+
+class _Poller(object):
+
+    def __init__(self, error=None, polls=1):
+        self.error = error
+        self.polls = polls
+
+    def done(self):
+        self.polls -= 1
+        return self.polls <= 0
+
+    def result(self):
+        if self.error:
+            raise self.error
+
+
+class TestGroupDelete(unittest.TestCase):
+
+    def test_find_blockers(self):
+        resources = {
+            'app': [mock.MagicMock(type='Microsoft.Network/networkInterfaces', id='nic1'),
+                    mock.MagicMock(type='Microsoft.Storage/storageAccounts', id='sa1')],
+            'Network': [mock.MagicMock(type='Microsoft.Network/virtualNetworks', id='vnet')],
+            'locked': []
+        }
+        properties = {'nic1': {'ipConfigurations': [{'properties': {'subnet': {'id': _subnet('network')}}}]}}
+        locks = {'locked': [mock.MagicMock()]}
+        locks['locked'][0].name = 'DoNotDelete'
+        get_properties = mock.MagicMock(side_effect=properties.get)
+
+        found_locks, blockers = find_blockers(['app', 'Network', 'locked'], SUBSCRIPTION,
+                                              lambda name: locks.get(name, []), resources.get, get_properties)
+        self.assertEqual(found_locks, {'locked': ['DoNotDelete']})
+        self.assertEqual(blockers, {'app': set(), 'network': {'app'}, 'locked': set()})
+        get_properties.assert_called_once_with('nic1')
+
+    def test_find_blockers_inspection_errors(self):
+        def _list_locks(name):
+            if name == 'gone':
+                raise _error('Resource group could not be found.', 404)
+            return []
+
+        def _list_resources(name):
+            if name == 'forbidden':
+                raise _error('The client does not have authorization.', 403)
+            return [mock.MagicMock(type='Microsoft.Network/networkInterfaces', id='nic1')]
+
+        properties = {'nic1': {'ipConfigurations': [{'properties': {'subnet': {'id': _subnet('gone')}}}]}}
+        with mock.patch('azure.cli.command_modules.resource._group_delete.logger') as logger_mock:
+            found_locks, blockers = find_blockers(['app', 'gone', 'forbidden'], SUBSCRIPTION, _list_locks,
+                                                  _list_resources, properties.get)
+        self.assertEqual(found_locks, {})
+        self.assertEqual(blockers, {'app': set(), 'gone': {'app'}, 'forbidden': set()})
+        # the missing group is reported as not found when it is deleted, the other error is logged
+        self.assertEqual(logger_mock.warning.call_count, 1)
+        self.assertIn('forbidden', logger_mock.warning.call_args[0])
+
+        def _begin_delete(name):
+            if name == 'gone':
+                raise _error('Resource group could not be found.', 404)
+            return _Poller()
+
+        results = delete_groups(['app', 'gone', 'forbidden'], SUBSCRIPTION, _begin_delete, blockers)
+        self.assertEqual([(r['name'], r['status']) for r in results],
+                         [('app', 'Deleted'), ('gone', 'NotFound'), ('forbidden', 'Deleted')])
+
+    def test_delete_groups_in_order(self):
+        started = []
+        errors = {'network': [_error('Subnet {} is in use by {}'.format(_subnet('network'), _subnet('app2')))]}
+
+        def _begin_delete(name):
+            started.append(name)
+            if name == 'gone':
+                raise _error('not found', 404)
+            return _Poller(errors[name].pop(0) if errors.get(name) else None, polls=3 if name == 'app2' else 1)
+
+        # network waits for app, then fails because of app2 which it was not known to depend on
+        with mock.patch('time.sleep'):
+            results = delete_groups(['network', 'app', 'app2', 'gone'], SUBSCRIPTION, _begin_delete,
+                                    {'network': {'app'}})
+        self.assertEqual(started, ['app', 'app2', 'gone', 'network', 'network'])
+        self.assertEqual([(r['name'], r['status']) for r in results],
+                         [('network', 'Deleted'), ('app', 'Deleted'), ('app2', 'Deleted'), ('gone', 'NotFound')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Names of directory objects and role definitions. Listing the role assignments of many scopes resolves every
+principal and role definition once for `role.cache_ttl` seconds.
+"""
+
+import os
+
+from azure.cli.core._session import ExpiringCache
+
+DIRECTORY_CACHE_FILE_NAME = 'roleCache.json'
+# seconds, see `role.cache_ttl`. 0 disables the cache.
+DEFAULT_CACHE_TTL = 3600
+# the maximum number of object IDs in a getObjectsByObjectIds request
+OBJECT_BATCH_SIZE = 1000
+MAX_WORKERS = 8
+
+
+def _role_definition_key(role_definition_id):
+    # The name of a role definition is unique; built-in roles are referred to through every subscription.
+    return 'roleDefinitions/' + role_definition_id.rstrip('/').split('/')[-1].lower()
+
+
+class DirectoryCache(ExpiringCache):
+
+    def __init__(self, cli_ctx):
+        super(DirectoryCache, self).__init__(os.path.join(cli_ctx.config.config_dir, DIRECTORY_CACHE_FILE_NAME),
+                                             cli_ctx.config.getint('role', 'cache_ttl', fallback=DEFAULT_CACHE_TTL))
+
+    def get_role_names(self, role_definition_ids, list_role_definitions):
+        """ Return {role definition ID: role name}. `list_role_definitions` is only called with the IDs of the role
+        definitions which are not cached, and returns (ID, name) pairs. Deleted role definitions are left out. """
+        names = {}
+        for role_id in role_definition_ids:
+            name = self.get(_role_definition_key(role_id))
+            if name is not None:
+                names[role_id] = name
+        missing = [r for r in role_definition_ids if r not in names]
+        if missing:
+            listed = {}
+            for role_id, role_name in list_role_definitions(missing):
+                listed[_role_definition_key(role_id)] = role_name
+                self.set(_role_definition_key(role_id), role_name)
+            names.update({r: listed[_role_definition_key(r)] for r in missing if _role_definition_key(r) in listed})
+        return names
+
+    def get_principals(self, tenant_id, object_ids, get_objects):
+        """ Return {object ID: {'name': display name, 'type': object type}}. The objects which are not cached are
+        retrieved with `get_objects`, concurrently in batches. Deleted objects are left out and not cached, as new
+        objects may not be replicated yet. """
+        principals = {}
+        for object_id in object_ids:
+            principal = self.get('principals/{}/{}'.format(tenant_id, object_id))
+            if principal is not None:
+                principals[object_id] = principal
+        missing = [o for o in object_ids if o not in principals]
+        if missing:
+            from multiprocessing.pool import ThreadPool
+            batches = [missing[i:i + OBJECT_BATCH_SIZE] for i in range(0, len(missing), OBJECT_BATCH_SIZE)]
+            pool = ThreadPool(min(MAX_WORKERS, len(batches)))
+            try:
+                objects = [o for batch in pool.map(get_objects, batches) for o in batch]
+            finally:
+                pool.close()
+            for obj in objects:
+                principals[obj['objectId']] = {'name': obj['name'], 'type': obj['type']}
+                self.set('principals/{}/{}'.format(tenant_id, obj['objectId']), principals[obj['objectId']])
+        return principals
+
+    def get_object_id(self, tenant_id, assignee):
+        return self.get('assignees/{}/{}'.format(tenant_id, assignee.lower()))
+
+    def set_object_id(self, tenant_id, assignee, object_id):
+        self.set('assignees/{}/{}'.format(tenant_id, assignee.lower()), object_id)
@@ -501,7 +501,17 @@ examples:
 helps['role assignment list'] = """
 type: command
 short-summary: List role assignments.
-long-summary: By default, only assignments scoped to subscription will be displayed. To view assignments scoped by resource or group, use `--all`.
+long-summary: >
+    By default, only assignments scoped to subscription will be displayed. To view assignments scoped by resource or group, use `--all`.
+    To audit many scopes at once, use `--scopes`, `--all-resource-groups` or `--all-subscriptions`: the assignments of the scopes are
+    retrieved concurrently and the principal and role names are resolved once for all of them.
+examples:
+  - name: List the assignments of two resource groups, including the assignments inherited from the subscription.
+    text: >
+        az role assignment list --scopes /subscriptions/{SubID}/resourceGroups/rg1 /subscriptions/{SubID}/resourceGroups/rg2 --include-inherited
+  - name: List the assignments of every resource group in the current subscription.
+    text: >
+        az role assignment list --all-resource-groups
 """
 
 helps['role assignment list-changelogs'] = """
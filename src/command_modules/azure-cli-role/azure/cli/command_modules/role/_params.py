@@ -182,6 +182,11 @@ def load_arguments(self, _):
         c.argument('ids', nargs='+', help='space-separated role assignment ids')
         c.argument('include_classic_administrators', arg_type=get_three_state_flag(), help='list default role assignments for subscription classic administrators, aka co-admins')
 
+    with self.argument_context('role assignment list') as c:
+        c.argument('scopes', nargs='+', arg_group='Audit', help='space-separated scopes to list the assignments of, in one request per scope made concurrently')
+        c.argument('all_resource_groups', action='store_true', arg_group='Audit', help='list the assignments of every resource group in the current subscription')
+        c.argument('all_subscriptions', action='store_true', arg_group='Audit', help='list the assignments of every enabled subscription of the current tenant')
+
     time_help = ('The {} of the query in the format of %Y-%m-%dT%H:%M:%SZ, e.g. 2000-12-31T12:59:59Z. Defaults to {}')
     with self.argument_context('role assignment list-changelogs') as c:
         c.argument('start_time', help=time_help.format('start time', '1 Hour prior to the current time'))
@@ -12,6 +12,7 @@ import re
 import os
 import uuid
 import itertools
+from collections import OrderedDict
 from dateutil.relativedelta import relativedelta
 import dateutil.parser
 
@@ -32,10 +33,14 @@ from azure.graphrbac.models import (ApplicationCreateParameters, ApplicationUpda
                                     GroupCreateParameters, CheckGroupMembershipParameters)
 
 from ._client_factory import _auth_client_factory, _graph_client_factory
+from ._directory_cache import DirectoryCache
 from ._multi_api_adaptor import MultiAPIAdaptor
 
 logger = get_logger(__name__)
 
+# the number of scopes whose role assignments are listed concurrently
+ROLE_ASSIGNMENT_LIST_WORKERS = 8
+
 # pylint: disable=too-many-lines
 
 
@@ -154,11 +159,23 @@ def _create_role_assignment(cli_ctx, role, assignee, resource_group_name=None, s
 
 def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=None,
                           scope=None, include_inherited=False,
-                          show_all=False, include_groups=False, include_classic_administrators=False):
+                          show_all=False, include_groups=False, include_classic_administrators=False,
+                          scopes=None, all_resource_groups=False, all_subscriptions=False):
     '''
     :param include_groups: include extra assignments to the groups of which the user is a
     member(transitively).
     '''
+    if scopes or all_resource_groups or all_subscriptions:
+        if resource_group_name or scope or show_all or include_classic_administrators:
+            raise CLIError('usage error: --scopes, --all-resource-groups and --all-subscriptions can not be used '
+                           'with --resource-group, --scope, --all or --include-classic-administrators')
+        if (bool(scopes) + all_resource_groups + all_subscriptions) > 1:
+            raise CLIError('usage error: --scopes SCOPE [SCOPE ...] | --all-resource-groups | --all-subscriptions')
+        scopes = scopes or _get_audit_scopes(cmd.cli_ctx, all_subscriptions)
+        if not scopes:
+            return []
+        scope = scopes[0]
+
     graph_client = _graph_client_factory(cmd.cli_ctx)
     factory = _auth_client_factory(cmd.cli_ctx, scope)
     assignments_client = factory.role_assignments
@@ -168,13 +185,13 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
         if resource_group_name or scope:
             raise CLIError('group or scope are not required when --all is used')
         scope = None
-    else:
+    elif not scopes:
         scope = _build_role_scope(resource_group_name, scope,
                                   definitions_client.config.subscription_id)
 
     assignments = _search_role_assignments(cmd.cli_ctx, assignments_client, definitions_client,
-                                           scope, assignee, role,
-                                           include_inherited, include_groups)
+                                           scopes or ([scope] if scope else None), assignee, role,
+                                           include_inherited, include_groups, use_cache=True)
 
     results = todict(assignments) if assignments else []
     if include_classic_administrators:
@@ -186,10 +203,28 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
     # 1. fill in logic names to get things understandable.
     # (it's possible that associated roles and principals were deleted, and we just do nothing.)
     # 2. fill in role names
-    role_defs = list(definitions_client.list(
-        scope=scope or ('/subscriptions/' + definitions_client.config.subscription_id)))
     worker = MultiAPIAdaptor(cmd.cli_ctx)
-    role_dics = {i.id: worker.get_role_property(i, 'role_name') for i in role_defs}
+    cache = DirectoryCache(cmd.cli_ctx)
+    role_ids = {}
+    for i in results:
+        if not i.get('roleDefinitionName') and worker.get_role_property(i, 'roleDefinitionId'):
+            role_ids[worker.get_role_property(i, 'roleDefinitionId')] = worker.get_role_property(i, 'scope')
+
+    def _list_role_definitions(missing_role_ids):
+        # Custom roles may only be assignable at the scopes they are assigned at, so the role definitions are
+        # listed at the scopes of the assignments until all roles are found.
+        list_scopes = [scope or ('/subscriptions/' + definitions_client.config.subscription_id)]
+        list_scopes += sorted(set(role_ids[r] for r in missing_role_ids if role_ids[r]) - set(list_scopes))
+        missing, listed = set(missing_role_ids), []
+        for list_scope in list_scopes:
+            for role_def in definitions_client.list(scope=list_scope):
+                listed.append((role_def.id, worker.get_role_property(role_def, 'role_name')))
+                missing = set(r for r in missing if not _is_same_role(r, role_def.id))
+            if not missing:
+                break
+        return listed
+
+    role_dics = cache.get_role_names(list(role_ids), _list_role_definitions)
     for i in results:
         if not i.get('roleDefinitionName'):
             if role_dics.get(worker.get_role_property(i, 'roleDefinitionId')):
@@ -204,8 +239,9 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
 
     if principal_ids:
         try:
-            principals = _get_object_stubs(graph_client, principal_ids)
-            principal_dics = {i.object_id: _get_displayable_name(i) for i in principals}
+            principals = cache.get_principals(graph_client.config.tenant_id, list(principal_ids),
+                                              lambda ids: _get_object_names(graph_client, ids))
+            principal_dics = {k: v['name'] for k, v in principals.items()}
 
             for i in [r for r in results if not r.get('principalName')]:
                 i['principalName'] = ''
@@ -215,6 +251,7 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
         except (CloudError, GraphErrorException) as ex:
             # failure on resolving principal due to graph permission should not fail the whole thing
             logger.info("Failed to resolve graph object information per error '%s'", ex)
+    cache.save()
 
     for r in results:
         if not r.get('additionalProperties'):  # remove the useless "additionalProperties"
@@ -434,7 +471,7 @@ def delete_role_assignments(cmd, ids=None, assignee=None, role=None, resource_gr
     scope = _build_role_scope(resource_group_name, scope,
                               assignments_client.config.subscription_id)
     assignments = _search_role_assignments(cmd.cli_ctx, assignments_client, definitions_client,
-                                           scope, assignee, role, include_inherited,
+                                           [scope], assignee, role, include_inherited,
                                            include_groups=False)
 
     if assignments:
@@ -445,14 +482,14 @@ def delete_role_assignments(cmd, ids=None, assignee=None, role=None, resource_gr
 
 
 def _search_role_assignments(cli_ctx, assignments_client, definitions_client,
-                             scope, assignee, role, include_inherited, include_groups):
+                             scopes, assignee, role, include_inherited, include_groups, use_cache=False):
     assignee_object_id = None
     if assignee:
-        assignee_object_id = _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=True)
+        assignee_object_id = _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=True, use_cache=use_cache)
 
     # always use "scope" if provided, so we can get assignments beyond subscription e.g. management groups
-    if scope:
-        assignments = list(assignments_client.list_for_scope(scope=scope, filter='atScope()'))
+    if scopes:
+        assignments = _list_assignments_for_scopes(assignments_client, scopes)
     elif assignee_object_id:
         if include_groups:
             f = "assignedTo('{}')".format(assignee_object_id)
@@ -464,15 +501,15 @@ def _search_role_assignments(cli_ctx, assignments_client, definitions_client,
 
     worker = MultiAPIAdaptor(cli_ctx)
     if assignments:
-        assignments = [a for a in assignments if (
-            not scope or
-            include_inherited and re.match(worker.get_role_property(a, 'scope'), scope, re.I) or
-            worker.get_role_property(a, 'scope').lower() == scope.lower()
-        )]
+        if scopes:
+            trie = _ScopeTrie(scopes)
+            assignments = [a for a in assignments
+                           if trie.applies_to(worker.get_role_property(a, 'scope'), include_inherited)]
 
         if role:
-            role_id = _resolve_role_id(role, scope, definitions_client)
-            assignments = [i for i in assignments if worker.get_role_property(i, 'role_definition_id') == role_id]
+            role_id = _resolve_role_id(role, scopes[0] if scopes else None, definitions_client)
+            assignments = [i for i in assignments
+                           if _is_same_role(worker.get_role_property(i, 'role_definition_id'), role_id)]
 
         if assignee_object_id:
             assignments = [i for i in assignments if worker.get_role_property(i, 'principal_id') == assignee_object_id]
@@ -480,6 +517,76 @@ def _search_role_assignments(cli_ctx, assignments_client, definitions_client,
     return assignments
 
 
+def _list_assignments_for_scopes(assignments_client, scopes):
+    """ List the assignments at and above each of the scopes, concurrently. Assignments above several of the
+    scopes are returned once. """
+    from multiprocessing.pool import ThreadPool
+
+    def _list_for_scope(scope):
+        return list(assignments_client.list_for_scope(scope=scope, filter='atScope()'))
+
+    scopes = list(OrderedDict((s.rstrip('/').lower() or '/', s) for s in scopes).values())
+    if len(scopes) == 1:
+        scope_assignments = [_list_for_scope(scopes[0])]
+    else:
+        pool = ThreadPool(min(ROLE_ASSIGNMENT_LIST_WORKERS, len(scopes)))
+        try:
+            scope_assignments = pool.map(_list_for_scope, scopes)
+        finally:
+            pool.close()
+    assignments = OrderedDict()
+    for assignment in itertools.chain.from_iterable(scope_assignments):
+        assignments.setdefault(assignment.id.lower(), assignment)
+    return list(assignments.values())
+
+
+class _ScopeTrie(object):
+    """ Scopes indexed by their path segments, to check whether an assignment scope is one of the scopes or one
+    of their parents. """
+
+    _SCOPE = object()  # marks the node of a scope
+
+    def __init__(self, scopes):
+        self._root = {}
+        for scope in scopes:
+            node = self._root
+            for segment in self._segments(scope):
+                node = node.setdefault(segment, {})
+            node[self._SCOPE] = True
+
+    @staticmethod
+    def _segments(scope):
+        return [s for s in scope.lower().split('/') if s]
+
+    def applies_to(self, scope, include_inherited=False):
+        node = self._root
+        for segment in self._segments(scope):
+            node = node.get(segment)
+            if node is None:
+                return False
+        # the assignment scope is one of the scopes, or the parent of at least one
+        return self._SCOPE in node or include_inherited
+
+
+def _is_same_role(role_definition_id, other_role_definition_id):
+    # built-in role definitions are referred to through the subscription or management group of the assignment
+    def _name(role_id):
+        return (role_id or '').rstrip('/').split('/')[-1].lower()
+    return _name(role_definition_id) == _name(other_role_definition_id)
+
+
+def _get_audit_scopes(cli_ctx, all_subscriptions):
+    if all_subscriptions:
+        from azure.cli.core._profile import Profile
+        profile = Profile(cli_ctx=cli_ctx)
+        tenant_id = profile.get_subscription()['tenantId']
+        return ['/subscriptions/' + s['id'] for s in profile.load_cached_subscriptions()
+                if s.get('state') == 'Enabled' and s.get('tenantId') == tenant_id]
+    from azure.cli.core.commands.client_factory import get_mgmt_service_client
+    resource_client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES)
+    return [g.id for g in resource_client.resource_groups.list()]
+
+
 def _build_role_scope(resource_group_name, scope, subscription_id):
     subscription_scope = '/subscriptions/' + subscription_id
     if scope:
@@ -1606,8 +1713,13 @@ def _encode_custom_key_description(key_description):
     return key_description.encode('utf-16')
 
 
-def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False):
+def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False, use_cache=False):
     client = _graph_client_factory(cli_ctx)
+    # Only searches use cached object IDs: a principal may have been recreated with the same name.
+    cache = DirectoryCache(cli_ctx) if use_cache else None
+    object_id = cache.get_object_id(client.config.tenant_id, assignee) if cache else None
+    if object_id:
+        return object_id
     result = None
     try:
         if assignee.find('@') >= 0:  # looks like a user principal name
@@ -1622,6 +1734,9 @@ def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False):
         if not result:
             raise CLIError("No matches in graph database for '{}'".format(assignee))
 
+        if cache:
+            cache.set_object_id(client.config.tenant_id, assignee, result[0].object_id)
+            cache.save()
         return result[0].object_id
     except (CloudError, GraphErrorException):
         if fallback_to_object_id and _is_guid(assignee):
@@ -1648,6 +1763,11 @@ def _get_object_stubs(graph_client, assignees):
     return result
 
 
+def _get_object_names(graph_client, object_ids):
+    return [{'objectId': o.object_id, 'name': _get_displayable_name(o), 'type': o.object_type}
+            for o in _get_object_stubs(graph_client, object_ids)]
+
+
 def _get_owner_url(cli_ctx, owner_object_id):
     if '://' in owner_object_id:
         return owner_object_id
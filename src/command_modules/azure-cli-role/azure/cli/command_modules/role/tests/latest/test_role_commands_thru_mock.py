@@ -361,6 +361,28 @@ class TestRoleMocked(unittest.TestCase):
         # assert
         prompt_mock.assert_called_once_with(mock.ANY, 'n')
 
+    @mock.patch('azure.cli.command_modules.role.custom._graph_client_factory', autospec=True)
+    @mock.patch('azure.cli.command_modules.role.custom._auth_client_factory', autospec=True)
+    def test_role_assignment_delete_resolves_assignee_uncached(self, auth_client_mock, graph_client_mock):
+        # a principal may have been recreated with the same name since its object ID was cached
+        assignee_object_id = '00000000-0000-0000-0000-000000000001'
+        graph_client = mock.MagicMock()
+        graph_client.users.list.return_value = [mock.MagicMock(object_id=assignee_object_id)]
+        graph_client_mock.return_value = graph_client
+        assignments_client = auth_client_mock.return_value.role_assignments
+        assignments_client.config.subscription_id = '123'
+        assignment = mock.MagicMock(id='assignment1', scope='/subscriptions/123', principal_id=assignee_object_id)
+        assignments_client.list_for_scope.return_value = [assignment]
+
+        with mock.patch('azure.cli.command_modules.role.custom.DirectoryCache') as cache_mock, \
+                mock.patch('azure.cli.core._session.Session.load') as load_mock:
+            delete_role_assignments(mock.MagicMock(cli_ctx=DummyCli()), assignee='user@contoso.com')
+
+        cache_mock.assert_not_called()
+        self.assertFalse([c for c in load_mock.call_args_list if 'roleCache.json' in str(c)])
+        graph_client.users.list.assert_called_once_with(filter="userPrincipalName eq 'user@contoso.com'")
+        assignments_client.delete_by_id.assert_called_once_with('assignment1')
+
     @mock.patch('azure.cli.command_modules.role.custom._graph_client_factory', autospec=True)
     def test_role_list_app_owner(self, graph_client_mock):
 
@@ -2,10 +2,14 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import shutil
+import tempfile
 import unittest
 import mock
 
-from azure.cli.command_modules.role.custom import _resolve_role_id
+from azure.cli.command_modules.role.custom import (_resolve_role_id, _ScopeTrie, _list_assignments_for_scopes,
+                                                   _is_same_role)
+from azure.cli.command_modules.role._directory_cache import DirectoryCache
 
 # pylint: disable=line-too-long
 
@@ -26,3 +30,60 @@ class TestRoleCustomCommands(unittest.TestCase):
         # action (using a full id)
         test_full_id = '/subscriptions/0b1f6471-1bf0-4dda-aec3-cb9272123456/providers/microsoft.authorization/roleDefinitions/5370bbf4-6b73-4417-969b-8f2e6e123456'
         self.assertEqual(test_full_id, _resolve_role_id(test_full_id, 'foobar', mock_client))
+
+    def test_directory_cache(self):
+        config_dir = tempfile.mkdtemp()
+        try:
+            cli_ctx = mock.MagicMock()
+            cli_ctx.config.config_dir = config_dir
+            cli_ctx.config.getint.return_value = 3600
+            role_id = '/subscriptions/{}/providers/Microsoft.Authorization/roleDefinitions/acdd72a7-3385-48ef-bd42-f606fba81ae7'
+            list_role_definitions = mock.Mock(return_value=[(role_id.format('sub1'), 'Reader')])
+            get_objects = mock.Mock(side_effect=lambda ids: [{'objectId': i, 'name': 'user ' + i, 'type': 'User'}
+                                                             for i in ids if i != 'deleted'])
+
+            cache = DirectoryCache(cli_ctx)
+            self.assertEqual(cache.get_role_names([role_id.format('sub1')], list_role_definitions),
+                             {role_id.format('sub1'): 'Reader'})
+            principals = cache.get_principals('tenant1', ['id{}'.format(i) for i in range(1500)] + ['deleted'],
+                                              get_objects)
+            self.assertEqual(len(principals), 1500)
+            self.assertEqual(principals['id1'], {'name': 'user id1', 'type': 'User'})
+            self.assertEqual(get_objects.call_count, 2)
+            cache.save()
+
+            # another process, listing the assignments of another subscription
+            cache = DirectoryCache(cli_ctx)
+            self.assertEqual(cache.get_role_names([role_id.format('sub2')], list_role_definitions),
+                             {role_id.format('sub2'): 'Reader'})
+            self.assertEqual(list_role_definitions.call_count, 1)
+            cache.get_principals('tenant1', ['id1', 'deleted'], get_objects)
+            self.assertEqual(get_objects.call_args[0][0], ['deleted'])
+        finally:
+            shutil.rmtree(config_dir)
+
+    def test_scope_trie(self):
+        trie = _ScopeTrie(['/subscriptions/sub1/resourceGroups/rg1', '/subscriptions/sub1/resourceGroups/rg2/'])
+        self.assertTrue(trie.applies_to('/subscriptions/SUB1/resourcegroups/rg1'))
+        self.assertFalse(trie.applies_to('/subscriptions/sub1'))
+        self.assertTrue(trie.applies_to('/subscriptions/sub1', include_inherited=True))
+        self.assertTrue(trie.applies_to('/', include_inherited=True))
+        self.assertFalse(trie.applies_to('/subscriptions/sub1/resourceGroups/rg10', include_inherited=True))
+        self.assertFalse(trie.applies_to('/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Web/sites/a',
+                                         include_inherited=True))
+
+    def test_list_assignments_for_scopes(self):
+        client = mock.Mock()
+        inherited = mock.Mock(id='/subscriptions/sub1/providers/Microsoft.Authorization/roleAssignments/a0')
+        client.list_for_scope.side_effect = lambda scope, filter: [
+            mock.Mock(id=scope + '/providers/Microsoft.Authorization/roleAssignments/a1'), inherited]
+        scopes = ['/subscriptions/sub1/resourceGroups/rg{}'.format(i) for i in range(20)]
+
+        assignments = _list_assignments_for_scopes(client, scopes + [scopes[0].upper()])
+        self.assertEqual(client.list_for_scope.call_count, 20)
+        self.assertEqual(len(assignments), 21)
+
+    def test_is_same_role(self):
+        self.assertTrue(_is_same_role('/subscriptions/sub1/providers/Microsoft.Authorization/roleDefinitions/ACDD72A7',
+                                      '/providers/Microsoft.Authorization/roleDefinitions/acdd72a7'))
+        self.assertFalse(_is_same_role(None, '/providers/Microsoft.Authorization/roleDefinitions/acdd72a7'))
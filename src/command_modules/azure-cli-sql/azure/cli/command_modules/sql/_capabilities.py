@@ -0,0 +1,103 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Capabilities of the SQL locations. Creating or updating many databases, elastic pools or managed instances in a
+location retrieves the capability tree once every `sql.capabilities_cache_ttl` seconds, and it is indexed to resolve
+a sku from its edition, family and capacity.
+"""
+
+import os
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+CAPABILITIES_CACHE_FILE_NAME = 'sqlCapabilities.json'
+# seconds, see `sql.capabilities_cache_ttl`. 0 disables the cache.
+DEFAULT_CACHE_TTL = 6 * 3600
+
+
+def get_location_capabilities(cli_ctx, client, location, include):
+    '''
+    Returns the capabilities of the location which `include` selects, from the cache if they were retrieved
+    less than `sql.capabilities_cache_ttl` seconds ago.
+    '''
+
+    from azure.cli.core._session import ExpiringCache
+    from azure.mgmt.sql.models import LocationCapabilities
+
+    ttl = cli_ctx.config.getint('sql', 'capabilities_cache_ttl', fallback=DEFAULT_CACHE_TTL)
+    if ttl <= 0:
+        return client.list_by_location(location, include)
+
+    cache = ExpiringCache(os.path.join(cli_ctx.config.config_dir, CAPABILITIES_CACHE_FILE_NAME), ttl)
+    # the availability of the capabilities may differ between subscriptions
+    key = '/'.join([client.config.subscription_id or '', location.lower().replace(' ', ''),
+                    getattr(include, 'value', include) or ''])
+    value = cache.get(key)
+    if value:
+        logger.debug('Using the capabilities of %s cached in %s', location, CAPABILITIES_CACHE_FILE_NAME)
+        return LocationCapabilities.deserialize(value)
+    capabilities = client.list_by_location(location, include)
+    cache.set(key, capabilities.serialize(keep_readonly=True))
+    cache.save()
+    return capabilities
+
+
+class CapabilitiesIndex(object):
+    '''
+    The editions of a server version and their performance levels (service objectives), indexed by edition name,
+    by (edition, family, capacity), by (edition, performance level name) and by (edition, unit, value).
+    Names are compared case-insensitively.
+    '''
+
+    def __init__(self, editions, performance_levels_attr):
+        self.editions = editions
+        self.performance_levels_attr = performance_levels_attr
+        self._editions = {}
+        self._skus = {}
+        self._levels = {}
+        for edition in editions:
+            edition_key = edition.name.lower()
+            self._editions.setdefault(edition_key, edition)
+            for level in self.performance_levels(edition):
+                if level.sku and level.sku.capacity is not None:
+                    self._skus.setdefault((edition_key, level.sku.family, int(level.sku.capacity)), level)
+                if getattr(level, 'name', None):
+                    self._levels.setdefault((edition_key, 'name', level.name.lower()), []).append(level)
+                if level.performance_level:
+                    self._levels.setdefault(
+                        (edition_key, getattr(level.performance_level.unit, 'value', level.performance_level.unit),
+                         level.performance_level.value), []).append(level)
+
+    def performance_levels(self, edition):
+        return getattr(edition, self.performance_levels_attr) or []
+
+    def find_edition(self, name):
+        return self._editions.get(name.lower())
+
+    def find_sku(self, edition, family, capacity, allow_reset_family=False):
+        '''
+        Returns the performance level of the edition with the family and capacity. If `allow_reset_family` is
+        set, a performance level without family is also a match.
+        '''
+
+        edition_key = edition.name.lower()
+        return (self._skus.get((edition_key, family, int(capacity))) or
+                (self._skus.get((edition_key, None, int(capacity))) if allow_reset_family else None))
+
+    def find_performance_levels(self, edition, name=None, unit=None, value=None):
+        '''
+        Returns the performance levels of the edition with the name, or with the performance level (unit, value),
+        in their original order. Returns all of them if neither is specified.
+        '''
+
+        edition_key = edition.name.lower()
+        if name:
+            return list(self._levels.get((edition_key, 'name', name.lower()), []))
+        if unit:
+            return list(self._levels.get((edition_key, unit, int(value)), []))
+        return list(self.performance_levels(edition))
@@ -36,6 +36,11 @@ from azure.mgmt.sql.models import (
 
 from knack.log import get_logger
 
+from ._capabilities import (
+    CapabilitiesIndex,
+    get_location_capabilities
+)
+
 from ._util import (
     get_sql_capabilities_operations,
     get_sql_servers_operations,
@@ -134,6 +139,20 @@ def _filter_available(capabilities):
     return [c for c in capabilities if is_available(c.status)]
 
 
+def _find_performance_levels(capabilities_index, edition_capability, name, dtu, vcores):
+    '''
+    Finds the performance levels of the edition that match all of the requested
+    name, dtu and vcores.
+    '''
+
+    levels = capabilities_index.find_performance_levels(edition_capability, name=name)
+    for unit, value in ((PerformanceLevelUnit.dtu.value, dtu), (PerformanceLevelUnit.vcores.value, vcores)):
+        if value:
+            matches = capabilities_index.find_performance_levels(edition_capability, unit=unit, value=value)
+            levels = [level for level in levels if any(level is m for m in matches)]
+    return levels
+
+
 def _find_edition_capability(sku, supported_editions):
     '''
     Finds the DB edition capability in the collection of supported editions
@@ -180,11 +199,10 @@ def _find_family_capability(sku, supported_families):
         return _get_default_capability(supported_families)
 
 
-def _find_performance_level_capability(sku, supported_service_level_objectives, allow_reset_family):
+def _find_performance_level_capability(sku, capabilities_index, edition_capability, allow_reset_family):
     '''
-    Finds the DB or elastic pool performance level (i.e. service objective) in the
-    collection of supported service objectives that matches the requested sku's
-    family and capacity.
+    Finds the DB or elastic pool performance level (i.e. service objective) of the
+    edition that matches the requested sku's family and capacity.
 
     If the sku has no capacity or family specified, returns the default service
     objective.
@@ -192,15 +210,13 @@ def _find_performance_level_capability(sku, supported_service_level_objectives,
 
     logger.debug('_find_performance_level_capability input: %s, allow_reset_family: %s', sku, allow_reset_family)
 
+    supported_service_level_objectives = capabilities_index.performance_levels(edition_capability)
     if sku.capacity:
-        try:
-            # Find requested service objective based on capacity & family.
-            # Note that for non-vcore editions, family is None.
-            return next(slo for slo in supported_service_level_objectives
-                        if ((slo.sku.family == sku.family) or
-                            (slo.sku.family is None and allow_reset_family)) and
-                        int(slo.sku.capacity) == int(sku.capacity))
-        except StopIteration:
+        # Find requested service objective based on capacity & family.
+        # Note that for non-vcore editions, family is None.
+        performance_level_capability = capabilities_index.find_sku(
+            edition_capability, sku.family, sku.capacity, allow_reset_family=allow_reset_family)
+        if not performance_level_capability:
             if allow_reset_family:
                 raise CLIError(
                     "Could not find sku in tier '{tier}' with capacity {capacity}."
@@ -220,12 +236,13 @@ def _find_performance_level_capability(sku, supported_service_level_objectives,
                     skus=[(slo.sku.family, slo.sku.capacity)
                           for slo in supported_service_level_objectives]
                 ))
-    elif sku.family:
+        return performance_level_capability
+    if sku.family:
         # Error - cannot find based on family alone.
         raise CLIError('If --family is specified, --capacity must also be specified.')
-    else:
-        # Find default service objective
-        return _get_default_capability(supported_service_level_objectives)
+
+    # Find default service objective
+    return _get_default_capability(supported_service_level_objectives)
 
 
 def _db_elastic_pool_update_sku(
@@ -489,8 +506,11 @@ def _find_db_sku_from_capabilities(cli_ctx, location, sku, allow_reset_family=Fa
 
     # Get default server version capability
     capabilities_client = get_sql_capabilities_operations(cli_ctx, None)
-    capabilities = capabilities_client.list_by_location(location, CapabilityGroup.supported_editions)
+    capabilities = get_location_capabilities(
+        cli_ctx, capabilities_client, location, CapabilityGroup.supported_editions)
     server_version_capability = _get_default_server_version(capabilities)
+    capabilities_index = CapabilitiesIndex(
+        server_version_capability.supported_editions, 'supported_service_level_objectives')
 
     # Find edition capability, based on requested sku properties
     edition_capability = _find_edition_capability(
@@ -498,7 +518,7 @@ def _find_db_sku_from_capabilities(cli_ctx, location, sku, allow_reset_family=Fa
 
     # Find performance level capability, based on requested sku properties
     performance_level_capability = _find_performance_level_capability(
-        sku, edition_capability.supported_service_level_objectives,
+        sku, capabilities_index, edition_capability,
         allow_reset_family=allow_reset_family)
 
     # Ideally, we would return the sku object from capability (`return performance_level_capability.sku`).
@@ -823,6 +843,7 @@ class DatabaseCapabilitiesAdditionalDetails(Enum):  # pylint: disable=too-few-pu
 
 
 def db_list_capabilities(
+        cmd,
         client,
         location,
         edition=None,
@@ -839,38 +860,23 @@ def db_list_capabilities(
     if not show_details:
         show_details = []
 
-    # Get capabilities tree from server
-    capabilities = client.list_by_location(location, CapabilityGroup.supported_editions)
+    # Get capabilities tree from server, or from the cache
+    capabilities = get_location_capabilities(cmd.cli_ctx, client, location, CapabilityGroup.supported_editions)
 
     # Get subtree related to databases
-    editions = _get_default_server_version(capabilities).supported_editions
+    capabilities_index = CapabilitiesIndex(
+        _get_default_server_version(capabilities).supported_editions, 'supported_service_level_objectives')
 
     # Filter by edition
+    editions = capabilities_index.editions
     if edition:
-        editions = [e for e in editions if e.name.lower() == edition.lower()]
-
-    # Filter by service objective
-    if service_objective:
-        for e in editions:
-            e.supported_service_level_objectives = [
-                slo for slo in e.supported_service_level_objectives
-                if slo.name.lower() == service_objective.lower()]
-
-    # Filter by dtu
-    if dtu:
-        for e in editions:
-            e.supported_service_level_objectives = [
-                slo for slo in e.supported_service_level_objectives
-                if slo.performance_level.value == int(dtu) and
-                slo.performance_level.unit == PerformanceLevelUnit.dtu.value]
+        editions = [e for e in [capabilities_index.find_edition(edition)] if e]
 
-    # Filter by vcores
-    if vcores:
+    # Filter by service objective, dtu and vcores
+    if service_objective or dtu or vcores:
         for e in editions:
-            e.supported_service_level_objectives = [
-                slo for slo in e.supported_service_level_objectives
-                if slo.performance_level.value == int(vcores) and
-                slo.performance_level.unit == PerformanceLevelUnit.vcores.value]
+            e.supported_service_level_objectives = _find_performance_levels(
+                capabilities_index, e, service_objective, dtu, vcores)
 
     # Filter by availability
     if available:
@@ -1456,15 +1462,18 @@ def _find_elastic_pool_sku_from_capabilities(cli_ctx, location, sku, allow_reset
 
     # Get default server version capability
     capabilities_client = get_sql_capabilities_operations(cli_ctx, None)
-    capabilities = capabilities_client.list_by_location(location, CapabilityGroup.supported_elastic_pool_editions)
+    capabilities = get_location_capabilities(
+        cli_ctx, capabilities_client, location, CapabilityGroup.supported_elastic_pool_editions)
     server_version_capability = _get_default_server_version(capabilities)
+    capabilities_index = CapabilitiesIndex(
+        server_version_capability.supported_elastic_pool_editions, 'supported_elastic_pool_performance_levels')
 
     # Find edition capability, based on requested sku properties
     edition_capability = _find_edition_capability(sku, server_version_capability.supported_elastic_pool_editions)
 
     # Find performance level capability, based on requested sku properties
     performance_level_capability = _find_performance_level_capability(
-        sku, edition_capability.supported_elastic_pool_performance_levels,
+        sku, capabilities_index, edition_capability,
         allow_reset_family=allow_reset_family)
 
     # Copy sku object from capability
@@ -1562,6 +1571,7 @@ class ElasticPoolCapabilitiesAdditionalDetails(Enum):  # pylint: disable=too-few
 
 
 def elastic_pool_list_capabilities(
+        cmd,
         client,
         location,
         edition=None,
@@ -1579,39 +1589,34 @@ def elastic_pool_list_capabilities(
     if dtu:
         dtu = int(dtu)
 
-    # Get capabilities tree from server
-    capabilities = client.list_by_location(location, CapabilityGroup.supported_elastic_pool_editions)
+    # Get capabilities tree from server, or from the cache
+    capabilities = get_location_capabilities(
+        cmd.cli_ctx, client, location, CapabilityGroup.supported_elastic_pool_editions)
 
     # Get subtree related to elastic pools
-    editions = _get_default_server_version(capabilities).supported_elastic_pool_editions
+    capabilities_index = CapabilitiesIndex(
+        _get_default_server_version(capabilities).supported_elastic_pool_editions,
+        'supported_elastic_pool_performance_levels')
 
     # Filter by edition
+    editions = capabilities_index.editions
     if edition:
-        editions = [e for e in editions if e.name.lower() == edition.lower()]
-
-    # Filter by dtu
-    if dtu:
-        for e in editions:
-            e.supported_elastic_pool_performance_levels = [
-                pl for pl in e.supported_elastic_pool_performance_levels
-                if pl.performance_level.value == int(dtu) and
-                pl.performance_level.unit == PerformanceLevelUnit.dtu.value]
+        editions = [e for e in [capabilities_index.find_edition(edition)] if e]
 
-    # Filter by vcores
-    if vcores:
+    # Filter by dtu and vcores
+    if dtu or vcores:
         for e in editions:
-            e.supported_elastic_pool_performance_levels = [
-                pl for pl in e.supported_elastic_pool_performance_levels
-                if pl.performance_level.value == int(vcores) and
-                pl.performance_level.unit == PerformanceLevelUnit.vcores.value]
+            e.supported_elastic_pool_performance_levels = _find_performance_levels(
+                capabilities_index, e, None, dtu, vcores)
 
     # Filter by availability
     if available:
         editions = _filter_available(editions)
         for e in editions:
             e.supported_elastic_pool_performance_levels = _filter_available(e.supported_elastic_pool_performance_levels)
-            for slo in e.supported_service_level_objectives:
-                slo.supported_max_sizes = _filter_available(slo.supported_max_sizes)
+            for pl in e.supported_elastic_pool_performance_levels:
+                if pl.supported_max_sizes:
+                    pl.supported_max_sizes = _filter_available(pl.supported_max_sizes)
 
     # Remove editions with no service objectives (due to filters)
     editions = [e for e in editions if e.supported_elastic_pool_performance_levels]
@@ -1972,7 +1977,8 @@ def _find_managed_instance_sku_from_capabilities(cli_ctx, location, sku):
 
     # Get default server version capability
     capabilities_client = get_sql_capabilities_operations(cli_ctx, None)
-    capabilities = capabilities_client.list_by_location(location, CapabilityGroup.supported_managed_instance_versions)
+    capabilities = get_location_capabilities(
+        cli_ctx, capabilities_client, location, CapabilityGroup.supported_managed_instance_versions)
     managed_instance_version_capability = _get_default_capability(capabilities.supported_managed_instance_versions)
 
     # Find edition capability, based on requested sku properties
@@ -0,0 +1,47 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+
+import mock
+
+from azure.cli.command_modules.sql._capabilities import CapabilitiesIndex
+
+
+def _slo(name, family, capacity, unit):
+    slo = mock.MagicMock(sku=mock.MagicMock(family=family, capacity=capacity),
+                         performance_level=mock.MagicMock(unit=unit, value=capacity))
+    slo.name = name
+    return slo
+
+
+class TestCapabilitiesIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.standard = mock.MagicMock(supported_service_level_objectives=[
+            _slo('S0', None, 10, 'DTU'), _slo('S1', None, 20, 'DTU')])
+        self.standard.name = 'Standard'
+        self.general_purpose = mock.MagicMock(supported_service_level_objectives=[
+            _slo('GP_Gen4_2', 'Gen4', 2, 'VCores'), _slo('GP_Gen5_2', 'Gen5', 2, 'VCores')])
+        self.general_purpose.name = 'GeneralPurpose'
+        self.index = CapabilitiesIndex([self.standard, self.general_purpose], 'supported_service_level_objectives')
+
+    def test_find_sku(self):
+        self.assertEqual(self.index.find_sku(self.general_purpose, 'Gen5', '2').name, 'GP_Gen5_2')
+        self.assertIsNone(self.index.find_sku(self.general_purpose, 'Gen5', 4))
+        self.assertIsNone(self.index.find_sku(self.standard, 'Gen5', 20))
+        self.assertEqual(self.index.find_sku(self.standard, 'Gen5', 20, allow_reset_family=True).name, 'S1')
+
+    def test_find_performance_levels(self):
+        self.assertIs(self.index.find_edition('standard'), self.standard)
+        self.assertEqual([s.name for s in self.index.find_performance_levels(self.standard, name='s0')], ['S0'])
+        self.assertEqual([s.name for s in self.index.find_performance_levels(
+            self.general_purpose, unit='VCores', value='2')], ['GP_Gen4_2', 'GP_Gen5_2'])
+        self.assertEqual(self.index.find_performance_levels(self.standard, unit='VCores', value=2), [])
+        self.assertEqual(len(self.index.find_performance_levels(self.standard)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
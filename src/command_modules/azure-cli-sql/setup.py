@@ -12,7 +12,7 @@ except ImportError:
     logger.warn("Wheel is not available, disabling bdist_wheel hook")
     cmdclass = {}
 
-VERSION = "2.2.5"
+VERSION = "2.2.6"
 
 CLASSIFIERS = [
     'Development Status :: 4 - Beta',